@@ -0,0 +1,215 @@
+"""
+Approval notification channel for pipeline runs waiting on Telegram.
+
+Runs waiting for approval register an asyncio Future keyed by run_id. The
+Future is resolved as soon as an approve/reject decision is seen, either
+through an in-process `notify()` call (e.g. from a Telegram callback
+handler) or by a watcher on the run status directory. The watcher uses
+watchdog (inotify/FSEvents/...) when it is installed and otherwise falls
+back to a single shared scan that only re-parses status files whose
+modification time changed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# Statuses written while a run is still waiting for a decision
+WAITING_STATUSES = {"pending_approval"}
+
+
+class _StatusDirEventHandler(FileSystemEventHandler):
+    """Forwards status file changes from the watchdog thread."""
+
+    def __init__(self, notifier: "ApprovalNotifier"):
+        super().__init__()
+        self.notifier = notifier
+
+    def on_created(self, event):
+        self._handle(event.src_path, event.is_directory)
+
+    def on_modified(self, event):
+        self._handle(event.src_path, event.is_directory)
+
+    def on_moved(self, event):
+        self._handle(event.dest_path, event.is_directory)
+
+    def _handle(self, path, is_directory):
+        if not is_directory:
+            self.notifier.check_file(path)
+
+
+class ApprovalNotifier:
+    """Registry of approval Futures fed by a run status directory watcher."""
+
+    def __init__(
+        self,
+        status_dir: str,
+        scan_interval: float = 1.0,
+        use_watchdog: bool = True,
+    ):
+        """
+        Args:
+            status_dir: Directory holding `<run_id>.json` status files.
+            scan_interval: Seconds between scans when watchdog is not used.
+            use_watchdog: Use a watchdog observer if the library is present.
+        """
+        self.status_dir = status_dir
+        self.scan_interval = scan_interval
+        self.use_watchdog = use_watchdog and Observer is not None
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._mtimes: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._observer = None
+        self._scan_task: Optional[asyncio.Task] = None
+
+    # --- Lifecycle --- #
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and (self._observer or self._scan_task):
+            return
+        self._loop = loop
+        if self.use_watchdog:
+            try:
+                os.makedirs(self.status_dir, exist_ok=True)
+                self._observer = Observer()
+                self._observer.schedule(
+                    _StatusDirEventHandler(self),
+                    self.status_dir,
+                    recursive=False,
+                )
+                self._observer.daemon = True
+                self._observer.start()
+                logger.info(
+                    f"Watching {self.status_dir} for approval decisions "
+                    f"(watchdog)."
+                )
+                return
+            except Exception as e:
+                logger.warning(
+                    f"Failed to start watchdog observer on "
+                    f"{self.status_dir}: {e}. Falling back to scanning."
+                )
+                self._observer = None
+        self._scan_task = loop.create_task(self._scan_loop())
+        logger.info(
+            f"Watching {self.status_dir} for approval decisions "
+            f"(scan every {self.scan_interval}s)."
+        )
+
+    async def stop(self):
+        """Stops the directory watcher and cancels pending waiters."""
+        if self._observer:
+            self._observer.stop()
+            await asyncio.to_thread(self._observer.join, 5)
+            self._observer = None
+        if self._scan_task:
+            self._scan_task.cancel()
+            try:
+                await self._scan_task
+            except asyncio.CancelledError:
+                pass
+            self._scan_task = None
+        for future in self._waiters.values():
+            if not future.done():
+                future.cancel()
+        self._waiters.clear()
+        self._mtimes.clear()
+
+    # --- Waiter registry --- #
+    def register(self, run_id: str) -> asyncio.Future:
+        """Returns a Future resolved with the status data of the decision.
+
+        Must be called from within the running event loop.
+        """
+        self._ensure_started()
+        future = self._waiters.get(run_id)
+        if future is None or future.done():
+            future = self._loop.create_future()
+            self._waiters[run_id] = future
+        return future
+
+    def unregister(self, run_id: str):
+        """Drops the waiter for a run once it stopped waiting."""
+        future = self._waiters.pop(run_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+        self._mtimes.pop(run_id, None)
+
+    def notify(
+        self, run_id: str, status: str, data: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Wakes the run waiting on `run_id` with the given decision.
+
+        Safe to call from any thread.
+
+        Returns:
+            True if a run was waiting for this decision.
+        """
+        if status in WAITING_STATUSES:
+            return False
+        status_data = {"run_id": run_id, "status": status}
+        if data:
+            status_data.update(data)
+        if run_id not in self._waiters or self._loop is None:
+            return False
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._resolve(run_id, status_data)
+        else:
+            self._loop.call_soon_threadsafe(self._resolve, run_id, status_data)
+        return True
+
+    def _resolve(self, run_id: str, status_data: Dict[str, Any]):
+        future = self._waiters.get(run_id)
+        if future is not None and not future.done():
+            future.set_result(status_data)
+
+    # --- Status file handling --- #
+    def check_file(self, path: str):
+        """Parses a changed status file and notifies its waiter, if any."""
+        name = os.path.basename(path)
+        if not name.endswith(".json"):
+            return
+        run_id = name[: -len(".json")]
+        if run_id not in self._waiters:
+            return
+        try:
+            with open(path, "r") as f:
+                status_data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            # The writer may still be writing; the next event retries.
+            logger.debug(f"Could not read status file {path} yet: {e}")
+            return
+        status = status_data.get("status")
+        if status:
+            self.notify(run_id, status, status_data)
+
+    async def _scan_loop(self):
+        """Fallback watcher: stats waited files, parses only changed ones."""
+        while True:
+            for run_id in list(self._waiters):
+                path = os.path.join(self.status_dir, f"{run_id}.json")
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                if self._mtimes.get(run_id) == mtime:
+                    continue
+                self._mtimes[run_id] = mtime
+                self.check_file(path)
+            await asyncio.sleep(self.scan_interval)
@@ -30,13 +30,16 @@ try:
     from services.telegram_service import send_preview_to_telegram
     from release_chain.release_chain import process_approved_run
     from llm_orchestrator.orchestrator import (
-        LLMOrchestrator,
         LLMOrchestratorError,
+        get_orchestrator,
     )
+    from llm_orchestrator.streaming import extract_json_object
     from services.artist_db_service import (
         add_artist,
         get_artist,
         get_all_artists,
+        count_artists,
+        select_next_artists,
         update_artist,
         update_artist_performance_db,
         initialize_database as initialize_artist_db,
@@ -68,6 +71,25 @@ except ImportError as e:
     )
     # sys.exit(1) # Commented out to allow pytest collection
 
+# --- Concurrent pipeline scheduler (no external dependencies) ---
+from batch_runner.approval_notifier import ApprovalNotifier  # noqa: E402
+from batch_runner.process_pool import ProcessStageRunner  # noqa: E402
+from batch_runner.reflection_prompt import (  # noqa: E402
+    ReflectionMetrics,
+    ReflectionPolicy,
+    build_reflection_prompt,
+    legacy_prompt_tokens,
+)
+from services.artifact_cache import get_artifact_cache  # noqa: E402
+from batch_runner.pipeline_scheduler import (  # noqa: E402
+    PipelineScheduler,
+    StageLimiter,
+    STAGE_AUDIO_PROCESSING,
+    STAGE_BEAT_GENERATION,
+    STAGE_LLM,
+    STAGE_VIDEO_SEARCH,
+)
+
 # --- Configuration ---
 LOG_FILE = os.path.join(PROJECT_ROOT, "logs", "batch_runner.log")
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
@@ -76,6 +98,9 @@ MAX_APPROVAL_WAIT_TIME = int(
     os.getenv("MAX_APPROVAL_WAIT_TIME", "300").split("#")[0].strip()
 )
 POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "10").split("#")[0].strip())
+APPROVAL_SCAN_INTERVAL = float(
+    os.getenv("APPROVAL_SCAN_INTERVAL", "1").split("#")[0].strip()
+)
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 REFLECTION_LLM_PRIMARY = os.getenv(
     "REFLECTION_LLM_PRIMARY", "deepseek:deepseek-chat"
@@ -85,16 +110,35 @@ REFLECTION_LLM_FALLBACKS = os.getenv(
 ).split(",")
 REFLECTION_MAX_TOKENS = int(os.getenv("REFLECTION_MAX_TOKENS", 500))
 REFLECTION_TEMPERATURE = float(os.getenv("REFLECTION_TEMPERATURE", 0.6))
+# Race a fallback provider when the primary is slower than usual
+REFLECTION_LLM_HEDGE = (
+    os.getenv("REFLECTION_LLM_HEDGE", "True").lower() == "true"
+)
 ARTIST_RETIREMENT_THRESHOLD = int(
     os.getenv("RETIREMENT_CONSECUTIVE_REJECTIONS", 5)
 )
 ARTIST_CREATION_PROBABILITY = float(
     os.getenv("ARTIST_CREATION_PROBABILITY", "0.05").split("#")[0].strip()
 )
+# Statuses eligible for selection, in priority order
+SELECTABLE_ARTIST_STATUSES = ["Candidate", "Active"]
 LIFECYCLE_CHECK_INTERVAL_MINUTES = int(
     os.getenv("LIFECYCLE_CHECK_INTERVAL_MINUTES", 60 * 6)
 )
 
+# --- Concurrency Configuration ---
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", 4))
+STAGE_CONCURRENCY_LIMITS = {
+    STAGE_BEAT_GENERATION: int(os.getenv("BEAT_GENERATION_CONCURRENCY", 2)),
+    STAGE_LLM: int(os.getenv("LLM_CONCURRENCY", 4)),
+    STAGE_VIDEO_SEARCH: int(os.getenv("VIDEO_SEARCH_CONCURRENCY", 4)),
+    STAGE_AUDIO_PROCESSING: int(os.getenv("AUDIO_PROCESSING_CONCURRENCY", 2)),
+}
+# Worker processes for CPU-bound audio analysis/post-processing (0 = threads)
+AUDIO_WORKER_PROCESSES = int(
+    os.getenv("AUDIO_WORKER_PROCESSES", min(2, os.cpu_count() or 1))
+)
+
 # --- API Keys ---
 # AIMLAPI_KEY is loaded within BeatService
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
@@ -161,7 +205,7 @@ if not PIXABAY_API_KEY:
 
 logger.info(f"Log level set to: {LOG_LEVEL}")
 logger.info(f"Max approval wait time: {MAX_APPROVAL_WAIT_TIME}s")
-logger.info(f"Approval poll interval: {POLL_INTERVAL}s")
+logger.info(f"Approval poll interval (fallback): {POLL_INTERVAL}s")
 logger.info(f"Reflection LLM Primary: {REFLECTION_LLM_PRIMARY}")
 logger.info(f"Reflection LLM Fallbacks: {REFLECTION_LLM_FALLBACKS}")
 # logger.info(f"Music Models Order: {MUSIC_MODELS_ORDER}") # Handled in
@@ -174,6 +218,9 @@ logger.info(f"Artist Creation Probability: {ARTIST_CREATION_PROBABILITY}")
 logger.info(
     f"Lifecycle Check Interval: {LIFECYCLE_CHECK_INTERVAL_MINUTES} minutes"
 )
+logger.info(f"Max Concurrent Runs: {MAX_CONCURRENT_RUNS}")
+logger.info(f"Stage Concurrency Limits: {STAGE_CONCURRENCY_LIMITS}")
+logger.info(f"Audio Worker Processes: {AUDIO_WORKER_PROCESSES}")
 logger.info(f"A/B Testing Enabled: {AB_TESTING_ENABLED}")
 if AB_TESTING_ENABLED:
     logger.info(f"A/B Testing Parameter: {AB_TEST_PARAMETER}")
@@ -181,89 +228,98 @@ if AB_TESTING_ENABLED:
         f"A/B Testing Variations: {AB_TEST_VARIATIONS.get(AB_TEST_PARAMETER)}"
     )
 
+
 # --- Initialize Artist Database ---
-try:
-    initialize_artist_db()
-    if not get_all_artists():
-        logger.info(
-            "Artist database is empty. "
-            "Adding seed artists from file if available."
-        )
-        seed_file_path = os.path.join(
-            PROJECT_ROOT, "data", "artists", "seed_artists.json"
-        )
-        if os.path.exists(seed_file_path):
-            try:
-                with open(seed_file_path, "r") as f:
-                    seed_artists = json.load(f)
-                for artist_data in seed_artists:
-                    # Check if artist already exists before adding
-                    if not get_artist(artist_data["artist_id"]):
-                        added_id = add_artist(artist_data)
-                        if added_id:
-                            # Corrected f-string
-                            logger.info(
-                                f"Added seed artist: {artist_data['name']}"
-                            )
-                            # TODO: Optionally generate voice for seed artists
-                            # here?
+def initialize_artist_database():
+    """Creates the artist tables and seeds them if they are empty.
+
+    Called from main() rather than at import time, so importing this
+    module (e.g. from tests) never writes to the artist database.
+    """
+    try:
+        initialize_artist_db()
+        if not get_all_artists():
+            logger.info(
+                "Artist database is empty. "
+                "Adding seed artists from file if available."
+            )
+            seed_file_path = os.path.join(
+                PROJECT_ROOT, "data", "artists", "seed_artists.json"
+            )
+            if os.path.exists(seed_file_path):
+                try:
+                    with open(seed_file_path, "r") as f:
+                        seed_artists = json.load(f)
+                    for artist_data in seed_artists:
+                        # Check if artist already exists before adding
+                        if not get_artist(artist_data["artist_id"]):
+                            added_id = add_artist(artist_data)
+                            if added_id:
+                                # Corrected f-string
+                                logger.info(
+                                    f"Added seed artist: {artist_data['name']}"
+                                )
+                                # TODO: Optionally generate voice for seed artists
+                                # here?
+                            else:
+                                # Corrected f-string
+                                logger.error(
+                                    f"Failed to add seed artist "
+                                    f"{artist_data['name']}"
+                                )
                         else:
                             # Corrected f-string
-                            logger.error(
-                                f"Failed to add seed artist "
-                                f"{artist_data['name']}"
+                            logger.info(
+                                f"Seed artist {artist_data['name']} "
+                                f"already exists, skipping."
                             )
-                    else:
-                        # Corrected f-string
-                        logger.info(
-                            f"Seed artist {artist_data['name']} "
-                            f"already exists, skipping."
-                        )
-            except (json.JSONDecodeError, IOError) as e:
-                logger.error(
-                    f"Error reading or parsing seed file {seed_file_path}: "
-                    f"{e}. Continuing without seeding."
-                )
-        else:
-            logger.warning(
-                f"Seed file {seed_file_path} not found. "
-                f"Adding a single default artist."
-            )
-            default_artist_data = {
-                "artist_id": "1",
-                "name": "Synthwave Dreamer",
-                "genre": "synthwave",
-                "style_notes": "Prefers dreamy melodies, moderate tempo, "
-                + "avoids harsh sounds.",
-                "llm_config": {"model": "default-llm", "temperature": 0.7},
-                "created_at": datetime.utcnow().isoformat(),
-                "status": "Active",
-                "voice_url": None,  # Ensure seed/default artists have this field
-            }
-            added_id = add_artist(default_artist_data)
-            if added_id:
-                logger.info(
-                    f"Added default artist {default_artist_data['name']}"
-                )
-                # TODO: Optionally generate voice for default artist here?
+                except (json.JSONDecodeError, IOError) as e:
+                    logger.error(
+                        f"Error reading or parsing seed file {seed_file_path}: "
+                        f"{e}. Continuing without seeding."
+                    )
             else:
-                # Corrected f-string
-                logger.error(
-                    f"Failed to add default artist "
-                    f"{default_artist_data['name']}"
+                logger.warning(
+                    f"Seed file {seed_file_path} not found. "
+                    f"Adding a single default artist."
                 )
-except Exception as e:
-    logger.critical(
-        f"Failed to initialize or populate artist database: {e}. Exiting."
-    )
-    # sys.exit(1) # Commented out to allow pytest collection
+                default_artist_data = {
+                    "artist_id": "1",
+                    "name": "Synthwave Dreamer",
+                    "genre": "synthwave",
+                    "style_notes": "Prefers dreamy melodies, moderate tempo, "
+                    + "avoids harsh sounds.",
+                    "llm_config": {"model": "default-llm", "temperature": 0.7},
+                    "created_at": datetime.utcnow().isoformat(),
+                    "status": "Active",
+                    "voice_url": None,  # Ensure seed/default artists have this field
+                }
+                added_id = add_artist(default_artist_data)
+                if added_id:
+                    logger.info(
+                        f"Added default artist {default_artist_data['name']}"
+                    )
+                    # TODO: Optionally generate voice for default artist here?
+                else:
+                    # Corrected f-string
+                    logger.error(
+                        f"Failed to add default artist "
+                        f"{default_artist_data['name']}"
+                    )
+    except Exception as e:
+        logger.critical(
+            f"Failed to initialize or populate artist database: {e}. Exiting."
+        )
+        # sys.exit(1) # Commented out to allow pytest collection
+
 
 # --- Initialize Services ---
 try:
-    llm_orchestrator = LLMOrchestrator(
+    llm_orchestrator = get_orchestrator(
         primary_model=REFLECTION_LLM_PRIMARY,
         fallback_models=REFLECTION_LLM_FALLBACKS,
         enable_auto_discovery=False,
+        config={"hedge": REFLECTION_LLM_HEDGE},
     )
 except Exception as e:
     logger.error(
@@ -316,6 +372,15 @@ except Exception as e:
     )
     production_service = None
 
+# Shared by all concurrent pipeline runs
+stage_limiter = StageLimiter(STAGE_CONCURRENCY_LIMITS)
+approval_notifier = ApprovalNotifier(
+    RUN_STATUS_DIR, scan_interval=APPROVAL_SCAN_INTERVAL
+)
+process_stage_runner = ProcessStageRunner(AUDIO_WORKER_PROCESSES)
+reflection_policy = ReflectionPolicy()
+reflection_metrics = ReflectionMetrics()
+
 
 def create_new_artist_profile():
     logger.info("Attempting to create a new artist profile...")
@@ -402,17 +467,11 @@ def run_global_lifecycle_check_if_needed():
     ):
         logger.info("Running global artist lifecycle check...")
         try:
-            all_artists = get_all_artists()
-            logger.info(
-                f"Evaluating lifecycle for {len(all_artists)} artists..."
-            )
-            for artist in all_artists:
-                lifecycle_manager.evaluate_artist_lifecycle(
-                    artist["artist_id"]
-                )
+            report = lifecycle_manager.run_lifecycle_checks()
             last_lifecycle_check_time = now
             logger.info(
-                f"Finished lifecycle check. Evaluated {len(all_artists)}                     artists."
+                f"Finished lifecycle check. Evaluated {report['evaluated']} "
+                f"artists in {report['timings'].get('total', 0):.3f}s."
             )
         except Exception as e:
             logger.error(
@@ -422,17 +481,24 @@ def run_global_lifecycle_check_if_needed():
         logger.debug("Skipping global lifecycle check (interval not reached).")
 
 
-def select_next_artist():
+def select_next_artist(exclude_ids=None):
+    """Selects the next artist to run.
+
+    Args:
+        exclude_ids: Artist IDs that already have a run in flight. They are
+            never selected.
+
+    Returns:
+        The selected artist profile, or None if no artist is eligible.
+    """
     logger.info("Selecting next artist...")
+    exclude_ids = {str(a) for a in (exclude_ids or ())}
     run_global_lifecycle_check_if_needed()
-    active_artists = get_all_artists(status_filter="Active")
-    candidate_artists = get_all_artists(status_filter="Candidate")
-
-    selectable_artists = active_artists + candidate_artists
+    pool_size = count_artists(SELECTABLE_ARTIST_STATUSES)
 
     create_new = random.random() < ARTIST_CREATION_PROBABILITY
 
-    if create_new or not selectable_artists:
+    if create_new or not pool_size:
         logger.info("Triggering new artist creation...")
         new_artist = create_new_artist_profile()
         if new_artist:
@@ -441,32 +507,24 @@ def select_next_artist():
             logger.warning(
                 "Failed to create a new artist. Proceeding with existing pool."
             )
-            selectable_artists = get_all_artists(
-                status_filter="Active"
-            ) + get_all_artists(status_filter="Candidate")
-            if not selectable_artists:
-                logger.error(
-                    "No active or candidate artists available and failed to                         create a new one. Cannot proceed."
-                )
-                return None
-
-    if not selectable_artists:
-        logger.error("No active or candidate artists found in the database.")
-        return None
 
     # Prioritize candidates, then least recent active artists
-    sorted_artists = sorted(
-        selectable_artists,
-        key=lambda a: (
-            a["status"] != "Candidate",
-            (
-                datetime.fromisoformat(a["last_run_at"])
-                if a["last_run_at"]
-                else datetime.min
-            ),
-        ),
+    selected = select_next_artists(
+        SELECTABLE_ARTIST_STATUSES, limit=1, exclude_ids=list(exclude_ids)
     )
-    selected_artist = sorted_artists[0]
+    if not selected:
+        if exclude_ids and pool_size:
+            logger.info(
+                "All active and candidate artists already have a run in "
+                "flight."
+            )
+        else:
+            logger.error(
+                "No active or candidate artists found in the database."
+            )
+        return None
+
+    selected_artist = selected[0]
     # Corrected f-string
     logger.info(
         f"Selected artist {selected_artist['artist_id']}             ('{selected_artist['name']}'), Status: {selected_artist['status']}"
@@ -711,40 +769,71 @@ def delete_run_status_file(run_id):
 
 
 # --- Approval Workflow --- #
+def _interpret_approval_status(run_id, status_data):
+    """Maps run status data to an approval outcome.
+
+    Returns:
+        ("approved" | "rejected", status_data) once a decision is known, or
+        None while the run is still waiting.
+    """
+    if not status_data:
+        # Status file might not exist yet or failed to load
+        logger.debug(
+            f"Run status file for {run_id} not found or invalid. Still                 waiting..."
+        )
+        return None
+    status = status_data.get("status")
+    if status == "approved":
+        logger.info(f"Run {run_id} approved.")
+        return "approved", status_data
+    elif status == "rejected":
+        logger.info(f"Run {run_id} rejected.")
+        return "rejected", status_data
+    elif status == "pending_approval":
+        # Still waiting
+        return None
+    logger.warning(
+        f"Run {run_id} found with unexpected status:             {status}. Assuming rejection."
+    )
+    return "rejected", status_data  # Treat unexpected status as rejection
+
+
 async def wait_for_approval(run_id, timeout):
-    """Waits for the approval status file to indicate approval or rejection."""
+    """Waits for the run to be approved or rejected.
+
+    Wakes up as soon as the approval notifier sees a decision (in-process
+    notification or status file change). The status file is still re-read
+    every POLL_INTERVAL seconds as a fallback.
+    """
     start_time = time.time()
     logger.info(
         f"Waiting for approval for run {run_id} (timeout: {timeout}s)..."
     )
-    while time.time() - start_time < timeout:
-        status_data = load_run_status(run_id)
-        if status_data:
-            status = status_data.get("status")
-            if status == "approved":
-                logger.info(f"Run {run_id} approved.")
-                return "approved", status_data
-            elif status == "rejected":
-                logger.info(f"Run {run_id} rejected.")
-                return "rejected", status_data
-            elif status == "pending_approval":
-                # Still waiting
-                pass
-            else:
-                logger.warning(
-                    f"Run {run_id} found with unexpected status:                         {status}. Assuming rejection."
-                )
-                return (
-                    "rejected",
-                    status_data,
-                )  # Treat unexpected status as rejection
-        else:
-            # Status file might not exist yet or failed to load
-            logger.debug(
-                f"Run status file for {run_id} not found or invalid. Still                     waiting..."
+    decision = approval_notifier.register(run_id)
+    try:
+        while True:
+            result = _interpret_approval_status(
+                run_id, load_run_status(run_id)
             )
+            if result:
+                return result
 
-        await asyncio.sleep(POLL_INTERVAL)
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                break
+            try:
+                status_data = await asyncio.wait_for(
+                    asyncio.shield(decision),
+                    timeout=min(POLL_INTERVAL, remaining),
+                )
+            except asyncio.TimeoutError:
+                continue  # Fallback: re-read the status file
+            result = _interpret_approval_status(run_id, status_data)
+            if result:
+                return result
+            decision = approval_notifier.register(run_id)
+    finally:
+        approval_notifier.unregister(run_id)
 
     logger.warning(
         f"Timeout waiting for approval for run {run_id}. Assuming rejection."
@@ -752,8 +841,19 @@ async def wait_for_approval(run_id, timeout):
     return "rejected", None  # Timeout is treated as rejection
 
 
+def notify_approval_decision(run_id, status, data=None):
+    """Records an approval decision and wakes the waiting run immediately.
+
+    Intended for in-process callers such as a Telegram callback handler.
+    The status file is updated as well so out-of-process readers and the
+    polling fallback see the same decision.
+    """
+    save_run_status(run_id, status, data)
+    return approval_notifier.notify(run_id, status, data)
+
+
 # --- Reflection and Adaptation --- #
-def reflect_on_run(artist_profile, run_data, outcome):
+async def reflect_on_run(artist_profile, run_data, outcome):
     """Uses LLM to reflect on the run and suggest improvements for the artist
     profile."""
     # Corrected f-string
@@ -766,57 +866,56 @@ def reflect_on_run(artist_profile, run_data, outcome):
         )
         return None
 
-    # Prepare context for the LLM
-    # Corrected multi-line f-string with single quotes for .get()
-    context = f"""Artist Profile:
-Name: {artist_profile.get('name')}
-Genre: {artist_profile.get('genre')}
-Style Notes: {artist_profile.get('style_notes')}
-LLM Config: {json.dumps(artist_profile.get('llm_config', {}))}
-Status: {artist_profile.get('status')}
-Consecutive Rejections: {artist_profile.get('consecutive_rejections', 0)}
-Performance History (last 5):
-    {json.dumps(artist_profile.get('performance_history', [])[-5:], indent=2)}
-Voice URL: {artist_profile.get('voice_url', 'N/A')}
-
-Run Details:
-Run ID: {run_data.get('run_id')}
-Parameters Used: {json.dumps(run_data.get('parameters_used', {}), indent=2)}
-Generated Track URL: {run_data.get('track_url')}
-Track Model Used: {run_data.get('track_model_used', 'N/A')}
-Track Tempo (BPM): {run_data.get('tempo', 'N/A')}
-Track Duration (s): {run_data.get('duration', 'N/A')}
-Generated Lyrics:
-{run_data.get('lyrics', 'N/A')[:200]}...
-Selected Video URL: {run_data.get('video_url')}
-Video Source: {run_data.get('video_source', 'N/A')}
-Processed Audio URL: {run_data.get('processed_audio_url', 'N/A')}
-Outcome: {outcome}
-
-Task: Based on the artist profile and the details of the latest run,     suggest specific, actionable modifications to the artist's 'style_notes' or
-    'llm_config' (like temperature or prompt adjustments) to improve future outcomes. Aim for subtle changes. If the outcome was 'approved', suggest refinements to maintain success or explore slight variations. If 'rejected', suggest changes to address potential reasons for rejection (e.g., if lyrics were generic, suggest adding more specific themes to style_notes; if music was poor, suggest adjusting style notes related to instrumentation or mood). Provide the suggestions ONLY as a JSON object with keys 'style_notes' and/or 'llm_config'. Example: {{"style_notes": "Maintain dreamy synthwave but add more prominent basslines."}} or {{"llm_config": {{"temperature": 0.65}}}}
-"""
+    # Skip runs with nothing to critique; batch low-signal ones per artist
+    artist_id = artist_profile.get("artist_id")
+    provider = REFLECTION_LLM_PRIMARY.split(":", 1)[0]
+    baseline_tokens = legacy_prompt_tokens(
+        artist_profile, run_data, outcome, provider
+    )
+    action, runs = reflection_policy.plan(artist_id, run_data, outcome)
+    if action != "reflect":
+        reflection_metrics.record(action, baseline_tokens)
+        logger.info(
+            f"Reflection {'skipped' if action == 'skip' else 'deferred'} for "
+            f"run {run_data.get('run_id')} (saved ~{baseline_tokens} tokens)."
+        )
+        return None
+
+    context, prompt_tokens = build_reflection_prompt(
+        artist_profile, runs, provider
+    )
+    saved = reflection_metrics.record(action, baseline_tokens, prompt_tokens)
+    logger.info(
+        f"Reflection prompt for {len(runs)} run(s): {prompt_tokens} tokens "
+        f"(previous format ~{baseline_tokens}, saved {saved}). "
+        f"Totals: {reflection_metrics.snapshot()}"
+    )
 
     try:
-        response = llm_orchestrator.generate_text(
+        # generate_text keeps retries, health gating, hedging and the
+        # response cache; only the first JSON object of the reply is parsed
+        response_text = await llm_orchestrator.generate_text(
             prompt=context,
-            model_name=REFLECTION_LLM_PRIMARY,
             max_tokens=REFLECTION_MAX_TOKENS,
             temperature=REFLECTION_TEMPERATURE,
-            response_format={"type": "json_object"},
         )
-        # Ensure response is stripped before potential logging in except block
-        response_content = response.strip()
-        suggestions = json.loads(response_content)
+        suggestions = json.loads(
+            extract_json_object(response_text) or response_text
+        )
+        if not isinstance(suggestions, dict):
+            logger.error(
+                f"Reflection returned {type(suggestions).__name__}, "
+                f"expected a JSON object: {suggestions}"
+            )
+            return None
         logger.info(f"Reflection suggestions received: {suggestions}")
         return suggestions
     except LLMOrchestratorError as e:
         logger.error(f"LLM reflection failed: {e}")
         return None
     except json.JSONDecodeError as e:
-        # Use response_content which is guaranteed to exist if json.loads fails
         logger.error(
-            f"Failed to parse JSON reflection suggestions: {e}. Raw response: {response_content}"
+            f"Failed to parse JSON reflection suggestions: {e}. Raw response: {e.doc}"
         )
         return None
     except Exception as e:
@@ -875,6 +974,145 @@ def apply_reflection_suggestions(artist_id, suggestions):
     return success
 
 
+# --- Concurrent Pipeline Stages --- #
+async def run_concurrent_stages(*stages):
+    """Awaits independent stages together.
+
+    Every stage finishes (or fails) before this returns, so none is left
+    running against a run that has already been cleaned up. The first
+    failure is then re-raised.
+    """
+    results = await asyncio.gather(*stages, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def generate_run_lyrics(artist_profile, params, run_data):
+    """Step 3: Generate lyrics (using LyricsService) into run_data."""
+    run_id = run_data["run_id"]
+    if not lyrics_service:
+        logger.warning(
+            "Lyrics Service not initialized. Proceeding without lyrics."
+        )
+        run_data["lyrics"] = "(Lyrics service unavailable)"
+    else:
+        try:
+            async with stage_limiter.stage(STAGE_LLM):
+                lyrics = await lyrics_service.generate_lyrics(
+                    base_prompt=params.get(
+                        "music_prompt", "synthwave dreams"
+                    ),  # Use music prompt as theme
+                    genre=artist_profile.get("genre", "electronic"),
+                    style_notes=artist_profile.get("style_notes", ""),
+                    llm_config=artist_profile.get("llm_config", {}),
+                    tempo=run_data["tempo"],
+                    duration=run_data["duration"],
+                )
+            if not lyrics:
+                logger.warning(
+                    "Lyrics generation failed or returned empty. Proceeding                         without lyrics."
+                )
+                run_data["lyrics"] = "(Lyrics generation failed)"
+            else:
+                run_data["lyrics"] = lyrics
+                logger.info("Lyrics generated.")
+        except LyricsServiceError as e:
+            logger.error(f"Lyrics generation failed: {e}")
+            run_data["lyrics"] = "(Lyrics generation error)"
+
+    save_run_status(
+        run_id,
+        "lyrics_generated",
+        {
+            "lyrics_preview": (
+                run_data["lyrics"][:100] if run_data["lyrics"] else "N/A"
+            )
+        },
+    )
+
+
+async def select_run_video(params, run_data):
+    """Step 4: Select a stock video into run_data."""
+    run_id = run_data["run_id"]
+    video_info = await stage_limiter.run(
+        STAGE_VIDEO_SEARCH, select_video, params
+    )
+    if not video_info or not video_info.get("video_url"):
+        # Non-critical? Decide if we proceed without video or fail.
+        logger.warning("Video selection failed. Proceeding without video.")
+        run_data["video_url"] = None
+        run_data["video_source"] = None
+        # run_data["status"] = "failed"
+        # run_data["outcome"] = "selection_failed_video"
+        # raise Exception("Video selection failed")
+    else:
+        run_data.update(
+            {
+                "video_id": video_info.get("video_id"),
+                "video_url": video_info.get("video_url"),
+                "video_source": video_info.get("source"),
+            }
+        )
+        # Corrected f-string
+        logger.info(
+            f"Video selected: {run_data['video_url']} (Source:                 {run_data['video_source']}) "
+        )
+
+    save_run_status(
+        run_id,
+        "video_selected",
+        {
+            "video_url": run_data["video_url"],
+            "video_source": run_data["video_source"],
+        },
+    )
+
+
+async def post_process_run_audio(run_data, local_track=None):
+    """Step 5: Post-process (humanize) the track audio into run_data."""
+    run_id = run_data["run_id"]
+    if not production_service:
+        logger.warning(
+            "Production Service not initialized. Skipping audio                 post-processing."
+        )
+    elif not run_data["track_url"]:
+        logger.warning(
+            "No track URL available. Skipping audio post-processing."
+        )
+    else:
+        try:
+            if not local_track:
+                # Workers get a local path; the cache stays in this process
+                local_track = await asyncio.to_thread(
+                    get_artifact_cache().acquire, run_data["track_url"], run_id
+                )
+            if not local_track:
+                raise ProductionServiceError("Failed to download input audio.")
+            async with stage_limiter.stage(STAGE_AUDIO_PROCESSING):
+                processed_audio_url = await process_stage_runner.run(
+                    production_service.humanize_audio, local_track
+                )
+            if processed_audio_url:
+                run_data["processed_audio_url"] = processed_audio_url
+                logger.info(
+                    f"Audio post-processing complete:                         {processed_audio_url}"
+                )
+            else:
+                logger.warning(
+                    "Audio post-processing failed. Using original audio                         URL."
+                )
+        except ProductionServiceError as e:
+            logger.error(f"Audio post-processing failed: {e}")
+
+    save_run_status(
+        run_id,
+        "audio_processed",
+        {"processed_audio_url": run_data["processed_audio_url"]},
+    )
+
+
 # --- Main Pipeline --- #
 async def run_artist_pipeline(artist_profile):
     """Runs the full generation pipeline for a single artist."""
@@ -900,6 +1138,8 @@ async def run_artist_pipeline(artist_profile):
         "track_model_used": None,
         "tempo": None,
         "duration": None,
+        "energy": None,
+        "key": None,
         "lyrics": None,
         "video_id": None,
         "video_url": None,
@@ -924,9 +1164,30 @@ async def run_artist_pipeline(artist_profile):
         if not beat_service:
             raise Exception("Beat Service not initialized.")
 
-        track_analysis_info = beat_service.generate_and_analyze_beat(
-            params.get("music_prompt", "default prompt")
+        track_info = await stage_limiter.run(
+            STAGE_BEAT_GENERATION,
+            beat_service.generate_beat,
+            params.get("music_prompt", "default prompt"),
         )
+        track_analysis_info = None
+        local_track = None
+        if track_info:
+            # Download once into the artifact cache (pinned for the run);
+            # the CPU-bound analysis then runs in a worker process, which
+            # only sees the local path and digest; the cache and its pins
+            # stay in this process.
+            cache = get_artifact_cache()
+            local_track = await asyncio.to_thread(
+                cache.acquire, track_info["track_url"], run_id
+            )
+            if local_track:
+                async with stage_limiter.stage(STAGE_AUDIO_PROCESSING):
+                    track_analysis_info = await process_stage_runner.run(
+                        BeatService.analyze_beat,
+                        track_info,
+                        local_track,
+                        cache.digest(track_info["track_url"]),
+                    )
         if not track_analysis_info or not track_analysis_info.get("track_url"):
             logger.error("Track generation or analysis failed.")
             run_data["status"] = "failed"
@@ -940,6 +1201,8 @@ async def run_artist_pipeline(artist_profile):
                 "track_model_used": track_analysis_info.get("model_used"),
                 "tempo": track_analysis_info.get("tempo"),
                 "duration": track_analysis_info.get("duration"),
+                "energy": track_analysis_info.get("energy"),
+                "key": track_analysis_info.get("key"),
             }
         )
         save_run_status(
@@ -957,111 +1220,16 @@ async def run_artist_pipeline(artist_profile):
             f"Track generated: {run_data['track_url']} (Tempo:                 {run_data['tempo']:.2f}, Duration:                 {run_data['duration']:.2f}s)"
         )
 
-        # 3. Generate Lyrics (using LyricsService)
-        logger.info("Step 3: Generating lyrics...")
-        if not lyrics_service:
-            logger.warning(
-                "Lyrics Service not initialized. Proceeding without lyrics."
-            )
-            run_data["lyrics"] = "(Lyrics service unavailable)"
-        else:
-            try:
-                lyrics = lyrics_service.generate_lyrics(
-                    base_prompt=params.get(
-                        "music_prompt", "synthwave dreams"
-                    ),  # Use music prompt as theme
-                    genre=artist_profile.get("genre", "electronic"),
-                    style_notes=artist_profile.get("style_notes", ""),
-                    llm_config=artist_profile.get("llm_config", {}),
-                    tempo=run_data["tempo"],
-                    duration=run_data["duration"],
-                )
-                if not lyrics:
-                    logger.warning(
-                        "Lyrics generation failed or returned empty. Proceeding                             without lyrics."
-                    )
-                    run_data["lyrics"] = "(Lyrics generation failed)"
-                else:
-                    run_data["lyrics"] = lyrics
-                    logger.info("Lyrics generated.")
-            except LyricsServiceError as e:
-                logger.error(f"Lyrics generation failed: {e}")
-                run_data["lyrics"] = "(Lyrics generation error)"
-
-        save_run_status(
-            run_id,
-            "lyrics_generated",
-            {
-                "lyrics_preview": (
-                    run_data["lyrics"][:100] if run_data["lyrics"] else "N/A"
-                )
-            },
-        )
-
-        # 4. Select Video
-        logger.info("Step 4: Selecting video...")
-        video_info = select_video(params)
-        if not video_info or not video_info.get("video_url"):
-            # Non-critical? Decide if we proceed without video or fail.
-            logger.warning("Video selection failed. Proceeding without video.")
-            run_data["video_url"] = None
-            run_data["video_source"] = None
-            # run_data["status"] = "failed"
-            # run_data["outcome"] = "selection_failed_video"
-            # raise Exception("Video selection failed")
-        else:
-            run_data.update(
-                {
-                    "video_id": video_info.get("video_id"),
-                    "video_url": video_info.get("video_url"),
-                    "video_source": video_info.get("source"),
-                }
-            )
-            # Corrected f-string
-            logger.info(
-                f"Video selected: {run_data['video_url']} (Source:                     {run_data['video_source']}) "
-            )
-
-        save_run_status(
-            run_id,
-            "video_selected",
-            {
-                "video_url": run_data["video_url"],
-                "video_source": run_data["video_source"],
-            },
+        # 3-5. Lyrics, video selection and audio post-processing only need
+        # the analyzed track, so they run concurrently.
+        logger.info(
+            "Steps 3-5: Generating lyrics, selecting video and "
+            "post-processing audio..."
         )
-
-        # 5. Post-Process Audio (Humanization)
-        logger.info("Step 5: Post-processing audio...")
-        if not production_service:
-            logger.warning(
-                "Production Service not initialized. Skipping audio                     post-processing."
-            )
-        elif not run_data["track_url"]:
-            logger.warning(
-                "No track URL available. Skipping audio post-processing."
-            )
-        else:
-            try:
-                processed_audio_url = production_service.humanize_audio(
-                    run_data["track_url"]
-                )
-                if processed_audio_url:
-                    run_data["processed_audio_url"] = processed_audio_url
-                    logger.info(
-                        f"Audio post-processing complete:                             {processed_audio_url}"
-                    )
-                else:
-                    logger.warning(
-                        "Audio post-processing failed. Using original audio                             URL."
-                    )
-            except ProductionServiceError as e:
-                logger.error(f"Audio post-processing failed: {e}")
-
-        save_run_status(
-            run_id,
-            "audio_processed",
-            {"processed_audio_url": run_data["processed_audio_url"]},
+        await run_concurrent_stages(
+            generate_run_lyrics(artist_profile, params, run_data),
+            select_run_video(params, run_data),
+            post_process_run_audio(run_data, local_track),
         )
 
         # 6. Send Preview for Approval (if Telegram configured)
@@ -1070,7 +1238,7 @@ async def run_artist_pipeline(artist_profile):
         preview_audio_url = (
             run_data["processed_audio_url"] or run_data["track_url"]
         )
-        telegram_message_id = send_preview_to_telegram(
+        telegram_message_id = await send_preview_to_telegram(
             run_id, run_data, preview_audio_url
         )
 
@@ -1117,9 +1285,9 @@ async def run_artist_pipeline(artist_profile):
                     "status": "approved",
                     "run_details": run_data,
                 }
-            process_approved_run(
-                approval_data
-            )  # Pass the approval data (which includes run_data)
+            # Pass the approval data (which includes run_data); the release
+            # chain does file and network I/O, so keep it off the event loop
+            await asyncio.to_thread(process_approved_run, approval_data)
             run_data["status"] = "completed"
         else:  # Rejected or timeout
             logger.info(
@@ -1129,7 +1297,8 @@ async def run_artist_pipeline(artist_profile):
 
         # 9. Update Artist Performance in DB
         logger.info("Step 9: Updating artist performance...")
-        update_artist_performance_db(
+        await asyncio.to_thread(
+            update_artist_performance_db,
             artist_id=artist_id,
             run_id=run_id,
             status=run_data["outcome"],  # Use the final outcome
@@ -1139,13 +1308,16 @@ async def run_artist_pipeline(artist_profile):
         # 10. Reflect on Run (if LLM available)
         if llm_orchestrator:
             logger.info("Step 10: Reflecting on run...")
-            suggestions = reflect_on_run(
-                artist_profile, run_data, run_data["outcome"]
-            )
+            async with stage_limiter.stage(STAGE_LLM):
+                suggestions = await reflect_on_run(
+                    artist_profile, run_data, run_data["outcome"]
+                )
             if suggestions:
-                apply_reflection_suggestions(artist_id, suggestions)
+                await asyncio.to_thread(
+                    apply_reflection_suggestions, artist_id, suggestions
+                )
             else:
-                logger.warning("Reflection did not produce valid suggestions.")
+                logger.info("No reflection suggestions to apply.")
         else:
             logger.info(
                 "Skipping reflection step (LLM Orchestrator not available)."
@@ -1159,7 +1331,8 @@ async def run_artist_pipeline(artist_profile):
             run_data["outcome"] = "error"
         # Attempt to update performance even on error
         try:
-            update_artist_performance_db(
+            await asyncio.to_thread(
+                update_artist_performance_db,
                 artist_id=artist_id,
                 run_id=run_id,
                 status=run_data["outcome"],
@@ -1171,6 +1344,7 @@ async def run_artist_pipeline(artist_profile):
             )
 
     finally:
+        get_artifact_cache().release_owner(run_id)
         run_data["end_time"] = datetime.utcnow().isoformat()
         # Corrected f-string
         logger.info(
@@ -1189,20 +1363,21 @@ async def run_artist_pipeline(artist_profile):
 
 async def main():
     logger.info("Starting AI Artist Batch Runner...")
+    initialize_artist_database()
+    # Start the audio workers (via forkserver) and warm them before any
+    # run starts
+    process_stage_runner.start()
+    scheduler = PipelineScheduler(
+        run_pipeline=run_artist_pipeline,
+        select_artist=select_next_artist,
+        max_concurrent_runs=MAX_CONCURRENT_RUNS,
+    )
     while True:
         try:
-            artist = select_next_artist()
-            if artist:
-                await run_artist_pipeline(artist)
-            else:
-                logger.warning("No artist selected. Waiting before retry...")
-                await asyncio.sleep(60)  # Wait a minute if no artist found
-
-            # Add a short delay between runs
-            await asyncio.sleep(5)
-
-        except KeyboardInterrupt:
-            logger.info("KeyboardInterrupt received. Shutting down...")
+            await scheduler.run_forever()
+            break
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.info("Shutdown requested. Stopping scheduler...")
             break
         except Exception as e:
             logger.critical(
@@ -1210,6 +1385,13 @@ async def main():
             )
             logger.info("Restarting main loop after a delay...")
             await asyncio.sleep(30)
+            scheduler = PipelineScheduler(
+                run_pipeline=run_artist_pipeline,
+                select_artist=select_next_artist,
+                max_concurrent_runs=MAX_CONCURRENT_RUNS,
+            )
+    await approval_notifier.stop()
+    process_stage_runner.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""
+Bounded-concurrency scheduler for artist pipeline runs.
+
+Runs several artist pipelines at once as asyncio tasks so that one run
+waiting on Telegram approval no longer blocks the rest of the roster.
+Individual pipeline stages (beat generation, LLM calls, video search,
+audio post-processing) are throttled separately through a StageLimiter.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Stage names used by the batch runner
+STAGE_BEAT_GENERATION = "beat_generation"
+STAGE_LLM = "llm"
+STAGE_VIDEO_SEARCH = "video_search"
+STAGE_AUDIO_PROCESSING = "audio_processing"
+
+
+class StageLimiter:
+    """Per-stage concurrency limits shared by all in-flight pipeline runs."""
+
+    def __init__(self, limits: Dict[str, int]):
+        """
+        Args:
+            limits: Mapping of stage name to the maximum number of runs
+                allowed inside that stage at the same time. Stages that are
+                not listed are unbounded.
+        """
+        self.limits = {name: max(1, int(n)) for name, n in limits.items()}
+        self._semaphores = {
+            name: asyncio.Semaphore(n) for name, n in self.limits.items()
+        }
+        self._active: Dict[str, int] = {name: 0 for name in self.limits}
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        """Holds a slot of the named stage for the duration of the block."""
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            self._active[name] += 1
+            try:
+                yield
+            finally:
+                self._active[name] -= 1
+
+    async def run(self, name: str, func: Callable[..., Any], *args, **kwargs):
+        """Runs a blocking callable in a worker thread under a stage slot.
+
+        Keeps the event loop free for approval waits and other runs while
+        the stage does network or CPU work.
+        """
+        async with self.stage(name):
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    def active_counts(self) -> Dict[str, int]:
+        """Returns the number of runs currently inside each limited stage."""
+        return dict(self._active)
+
+
+class PipelineScheduler:
+    """Keeps up to `max_concurrent_runs` artist pipelines running at once.
+
+    The scheduler never launches a second run for an artist whose previous
+    run is still in flight; the IDs of in-flight artists are passed to the
+    selector so it can pick someone else.
+    """
+
+    def __init__(
+        self,
+        run_pipeline: Callable[[Dict[str, Any]], Awaitable[Any]],
+        select_artist: Callable[[Set[str]], Optional[Dict[str, Any]]],
+        max_concurrent_runs: int = 4,
+        idle_delay: float = 60.0,
+        launch_delay: float = 5.0,
+    ):
+        """
+        Args:
+            run_pipeline: Coroutine function running one artist pipeline.
+            select_artist: Blocking callable returning the next artist
+                profile, given the set of artist IDs currently in flight.
+                Returns None when no artist is eligible.
+            max_concurrent_runs: Maximum number of pipelines in flight.
+            idle_delay: Seconds to wait when nothing is running and no
+                artist could be selected.
+            launch_delay: Seconds to wait between refill attempts while
+                runs are in flight.
+        """
+        self.run_pipeline = run_pipeline
+        self.select_artist = select_artist
+        self.max_concurrent_runs = max(1, int(max_concurrent_runs))
+        self.idle_delay = idle_delay
+        self.launch_delay = launch_delay
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+        self.runs_started = 0
+        self.runs_finished = 0
+
+    @property
+    def in_flight_artist_ids(self) -> Set[str]:
+        return set(self._in_flight)
+
+    async def fill_slots(self) -> int:
+        """Launches runs until all slots are used or no artist is eligible.
+
+        Returns:
+            The number of runs launched.
+        """
+        launched = 0
+        while (
+            not self._stopping
+            and len(self._in_flight) < self.max_concurrent_runs
+        ):
+            artist = await asyncio.to_thread(
+                self.select_artist, self.in_flight_artist_ids
+            )
+            if not artist:
+                break
+            artist_id = str(artist["artist_id"])
+            if artist_id in self._in_flight:
+                # Selector ignored the exclusion set; do not double-book.
+                logger.warning(
+                    f"Artist {artist_id} already has a run in flight. "
+                    f"Not launching a second one."
+                )
+                break
+            task = asyncio.create_task(
+                self._run_one(artist_id, artist),
+                name=f"artist-pipeline-{artist_id}",
+            )
+            self._in_flight[artist_id] = task
+            self.runs_started += 1
+            launched += 1
+            logger.info(
+                f"Launched pipeline for artist {artist_id} "
+                f"({len(self._in_flight)}/{self.max_concurrent_runs} "
+                f"slots in use)."
+            )
+        return launched
+
+    async def _run_one(self, artist_id: str, artist: Dict[str, Any]):
+        try:
+            await self.run_pipeline(artist)
+        except asyncio.CancelledError:
+            logger.info(f"Pipeline for artist {artist_id} cancelled.")
+            raise
+        except Exception as e:
+            logger.error(
+                f"Pipeline for artist {artist_id} raised: {e}", exc_info=True
+            )
+        finally:
+            self._in_flight.pop(artist_id, None)
+            self.runs_finished += 1
+
+    async def run_forever(self):
+        """Main scheduling loop. Runs until `stop()` is called."""
+        logger.info(
+            f"Pipeline scheduler started "
+            f"(max concurrent runs: {self.max_concurrent_runs})."
+        )
+        try:
+            while not self._stopping:
+                try:
+                    await self.fill_slots()
+                except Exception as e:
+                    logger.critical(
+                        f"Unhandled exception while selecting artists: {e}",
+                        exc_info=True,
+                    )
+                if not self._in_flight:
+                    logger.warning(
+                        "No artist selected. Waiting before retry..."
+                    )
+                    await asyncio.sleep(self.idle_delay)
+                    continue
+                # Wake up as soon as a run finishes, or periodically to pick
+                # up artists that became eligible in the meantime.
+                await asyncio.wait(
+                    list(self._in_flight.values()),
+                    timeout=self.launch_delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+        finally:
+            await self.shutdown()
+
+    def stop(self):
+        """Stops launching new runs. In-flight runs are cancelled on exit."""
+        self._stopping = True
+
+    async def shutdown(self):
+        """Cancels in-flight runs and waits for them to unwind."""
+        self._stopping = True
+        tasks = list(self._in_flight.values())
+        if not tasks:
+            return
+        logger.info(f"Cancelling {len(tasks)} in-flight pipeline runs...")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,150 @@
+"""
+Process pool for CPU-bound pipeline stages.
+
+Audio analysis (librosa) and post-processing (NumPy effect chain) hold the
+GIL for seconds per track, so running them in threads still stalls the
+event loop that serves approval waits and Telegram I/O. ProcessStageRunner
+runs such callables in a ProcessPoolExecutor whose workers import the
+heavy audio libraries once at startup.
+
+Workers are started with "forkserver" (or "spawn" where it is missing),
+not "fork": by the time the pool starts, the parent has threads (event
+loop helpers, the session expiry thread) and open SQLite connections, and
+a forked child would inherit their locks and file descriptors mid-use.
+The forkserver preloads the audio modules, so forked workers still start
+with them imported.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# multiprocessing start method; empty picks forkserver, else spawn
+AUDIO_WORKER_START_METHOD = os.getenv("AUDIO_WORKER_START_METHOD", "")
+
+# Modules imported by every worker before it takes its first task
+AUDIO_WARM_MODULES = (
+    "numpy",
+    "scipy.signal",
+    "soundfile",
+    "librosa",
+    "video_processing.audio_analyzer",
+    "services.production_service",
+)
+
+
+def _warm_imports(modules: Iterable[str], sys_path: list):
+    """Worker initializer: mirrors the parent's sys.path, preloads modules."""
+    for path in sys_path:
+        if path not in sys.path:
+            sys.path.append(path)
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(
+                f"Worker {os.getpid()} could not import {name}: {e}"
+            )
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class ProcessStageRunner:
+    """Runs picklable callables in a shared, pre-warmed process pool."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        warm_modules: Iterable[str] = AUDIO_WARM_MODULES,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_workers: Number of worker processes. 0 runs callables in
+                threads instead (no process pool).
+            warm_modules: Modules each worker imports at startup.
+            start_method: multiprocessing start method. Defaults to
+                AUDIO_WORKER_START_METHOD, else "forkserver" where
+                available and "spawn" elsewhere. "fork" is not safe once
+                the parent has threads or open SQLite connections.
+        """
+        self.max_workers = max(0, int(max_workers))
+        self.warm_modules = tuple(warm_modules)
+        if not start_method:
+            start_method = AUDIO_WORKER_START_METHOD
+        if not start_method:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> Optional[ProcessPoolExecutor]:
+        """Creates the pool and warms all workers. Idempotent."""
+        if self.max_workers == 0 or self._executor is not None:
+            return self._executor
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            # Imported once in the server; every forked worker inherits them
+            context.set_forkserver_preload(list(self.warm_modules))
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_warm_imports,
+            initargs=(self.warm_modules, list(sys.path)),
+        )
+        # One task per worker forces every worker to start and run the
+        # initializer now rather than on a run's first audio task.
+        pids = {
+            future.result()
+            for future in [
+                self._executor.submit(_worker_pid)
+                for _ in range(self.max_workers)
+            ]
+        }
+        logger.info(
+            f"Started {self.max_workers} audio worker processes "
+            f"({self.start_method}): {sorted(pids)}"
+        )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs `func(*args, **kwargs)` in a worker process.
+
+        `func` and its arguments must be picklable. If the pool breaks (a
+        worker crashed), it is recreated for later calls and this call falls
+        back to a thread.
+        """
+        call = partial(func, *args, **kwargs)
+        if self.max_workers == 0:
+            return await asyncio.to_thread(call)
+        executor = self._executor or await asyncio.to_thread(self.start)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, call)
+        except BrokenProcessPool as e:
+            logger.error(
+                f"Audio worker pool broke while running "
+                f"{getattr(func, '__qualname__', func)}: {e}. Recreating "
+                f"the pool; running this call in a thread."
+            )
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            return await asyncio.to_thread(call)
+
+    def shutdown(self, wait: bool = True):
+        """Stops the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
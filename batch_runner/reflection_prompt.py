@@ -0,0 +1,344 @@
+"""
+Prompt building and budgeting for post-run reflection.
+
+reflect_on_run used to send the full profile and run details, with indented
+JSON and media URLs, on every run. This module keeps that prompt small:
+
+- The fixed task instructions come first and are byte-identical on every
+  call, so providers that cache prompt prefixes (OpenAI, DeepSeek) can
+  reuse them across runs and artists.
+- The per-run context is compact JSON without empty fields or URLs.
+- The context is trimmed to REFLECTION_PROMPT_TOKEN_BUDGET tokens, counted
+  for the provider that receives the prompt.
+- ReflectionPolicy skips runs with nothing to critique and batches
+  low-signal runs into one reflection.
+- ReflectionMetrics records tokens sent against the previous prompt format.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from llm_orchestrator.rate_limiter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+REFLECTION_PROMPT_TOKEN_BUDGET = int(
+    os.getenv("REFLECTION_PROMPT_TOKEN_BUDGET", 1200)
+)
+# Skip runs that produced nothing to critique and batch low-signal ones
+REFLECTION_POLICY_ENABLED = (
+    os.getenv("REFLECTION_POLICY_ENABLED", "True").lower() == "true"
+)
+# Low-signal runs per artist collected before one batched reflection
+REFLECTION_BATCH_SIZE = int(os.getenv("REFLECTION_BATCH_SIZE", 3))
+REFLECTION_LYRICS_CHARS = 200
+REFLECTION_HISTORY_LENGTH = 5
+
+# Outcomes where the pipeline failed before there was music to judge
+NO_SIGNAL_OUTCOMES = {"error", "generation_failed_track"}
+
+REFLECTION_INSTRUCTIONS = (
+    "You tune an AI music artist's profile from the results of its recent "
+    "pipeline runs. The context below is JSON with the artist profile and "
+    "one or more runs, newest last.\n"
+    "Suggest specific, actionable modifications to the artist's "
+    "'style_notes' or 'llm_config' (like temperature or prompt adjustments) "
+    "to improve future outcomes. Aim for subtle changes. For approved runs, "
+    "suggest refinements to maintain success or explore slight variations. "
+    "For rejected runs, address likely reasons for rejection (e.g. if lyrics "
+    "were generic, add more specific themes to style_notes; if the music was "
+    "poor, adjust style notes on instrumentation or mood).\n"
+    "Reply ONLY with a JSON object with keys 'style_notes' and/or "
+    "'llm_config'. Example: "
+    '{"style_notes": "Maintain dreamy synthwave but add more prominent '
+    'basslines."} or {"llm_config": {"temperature": 0.65}}\n'
+)
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or spaces after separators."""
+    return json.dumps(
+        value, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+
+
+def _prune(value: Any) -> Any:
+    """Drops None, "", "N/A" and empty containers, recursively."""
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if _present(item)}
+    if isinstance(value, list):
+        return [_prune(item) for item in value if _present(item)]
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def _present(value: Any) -> bool:
+    return value not in (None, "", "N/A") and value != {} and value != []
+
+
+def summarize_run(
+    run_data: Dict[str, Any],
+    outcome: Optional[str],
+    lyrics_chars: int = REFLECTION_LYRICS_CHARS,
+) -> Dict[str, Any]:
+    """The parts of a run that matter for reflection (no URLs or IDs)."""
+    lyrics = run_data.get("lyrics") or ""
+    if lyrics.startswith("("):
+        # Placeholder such as "(Lyrics generation failed)"
+        lyrics = ""
+    return _prune(
+        {
+            "outcome": outcome,
+            "parameters": run_data.get("parameters_used"),
+            "track_model": run_data.get("track_model_used"),
+            "tempo": run_data.get("tempo"),
+            "duration": run_data.get("duration"),
+            "energy": run_data.get("energy"),
+            "key": run_data.get("key"),
+            "lyrics": lyrics[:lyrics_chars],
+            "video_source": run_data.get("video_source"),
+            "humanized": bool(run_data.get("processed_audio_url")),
+        }
+    )
+
+
+def summarize_profile(
+    artist_profile: Dict[str, Any],
+    history_length: int = REFLECTION_HISTORY_LENGTH,
+) -> Dict[str, Any]:
+    history = artist_profile.get("performance_history") or []
+    recent = history[-history_length:] if history_length else []
+    return _prune(
+        {
+            "name": artist_profile.get("name"),
+            "genre": artist_profile.get("genre"),
+            "style_notes": artist_profile.get("style_notes"),
+            "llm_config": artist_profile.get("llm_config"),
+            "status": artist_profile.get("status"),
+            "consecutive_rejections": artist_profile.get(
+                "consecutive_rejections", 0
+            ),
+            "recent_outcomes": [entry.get("status") for entry in recent],
+        }
+    )
+
+
+# Progressively smaller context shapes tried until the prompt fits:
+# (history entries, lyrics characters, parameters for older runs, runs)
+_TRIM_LEVELS = [
+    (REFLECTION_HISTORY_LENGTH, REFLECTION_LYRICS_CHARS, True, None),
+    (2, 120, False, None),
+    (0, 60, False, None),
+    (0, 0, False, 1),
+]
+
+
+def build_reflection_prompt(
+    artist_profile: Dict[str, Any],
+    runs: List[Tuple[Dict[str, Any], Optional[str]]],
+    provider: Optional[str] = None,
+    token_budget: int = REFLECTION_PROMPT_TOKEN_BUDGET,
+) -> Tuple[str, int]:
+    """
+    Builds the reflection prompt for one or more runs of an artist.
+
+    Args:
+        artist_profile: The artist's profile.
+        runs: (run_data, outcome) pairs, oldest first.
+        provider: Provider that will receive the prompt, for counting.
+        token_budget: Largest prompt to send, in tokens; the context is
+            trimmed (older history, lyrics, then older runs) to fit.
+
+    Returns:
+        The prompt and its token count. The smallest form is returned even
+        if it is still over budget.
+    """
+    prompt, tokens = "", 0
+    for (
+        history_length,
+        lyrics_chars,
+        all_parameters,
+        last_runs,
+    ) in _TRIM_LEVELS:
+        selected = runs[-last_runs:] if last_runs else runs
+        run_summaries = []
+        for index, (run_data, outcome) in enumerate(selected):
+            summary = summarize_run(run_data, outcome, lyrics_chars)
+            if not all_parameters and index < len(selected) - 1:
+                summary.pop("parameters", None)
+            run_summaries.append(summary)
+        context = {
+            "artist": summarize_profile(artist_profile, history_length),
+            "runs": run_summaries,
+        }
+        prompt = (
+            f"{REFLECTION_INSTRUCTIONS}\nContext:\n{compact_json(context)}"
+        )
+        tokens = count_tokens(prompt, provider)
+        if tokens <= token_budget:
+            break
+    else:
+        logger.warning(
+            f"Reflection prompt for {artist_profile.get('artist_id')} is "
+            f"{tokens} tokens after trimming (budget {token_budget})."
+        )
+    return prompt, tokens
+
+
+def legacy_prompt_tokens(
+    artist_profile: Dict[str, Any],
+    run_data: Dict[str, Any],
+    outcome: Optional[str],
+    provider: Optional[str] = None,
+) -> int:
+    """Tokens the pre-compaction prompt would have used for this run.
+
+    Renders the prompt reflect_on_run used to send; the savings baseline.
+    """
+    history = artist_profile.get("performance_history", [])[-5:]
+    prompt = f"""Artist Profile:
+Name: {artist_profile.get('name')}
+Genre: {artist_profile.get('genre')}
+Style Notes: {artist_profile.get('style_notes')}
+LLM Config: {json.dumps(artist_profile.get('llm_config', {}))}
+Status: {artist_profile.get('status')}
+Consecutive Rejections: {artist_profile.get('consecutive_rejections', 0)}
+Performance History (last 5):
+    {json.dumps(history, indent=2)}
+Voice URL: {artist_profile.get('voice_url', 'N/A')}
+
+Run Details:
+Run ID: {run_data.get('run_id')}
+Parameters Used: {json.dumps(run_data.get('parameters_used', {}), indent=2)}
+Generated Track URL: {run_data.get('track_url')}
+Track Model Used: {run_data.get('track_model_used', 'N/A')}
+Track Tempo (BPM): {run_data.get('tempo', 'N/A')}
+Track Duration (s): {run_data.get('duration', 'N/A')}
+Generated Lyrics:
+{(run_data.get('lyrics') or 'N/A')[:200]}...
+Selected Video URL: {run_data.get('video_url')}
+Video Source: {run_data.get('video_source', 'N/A')}
+Processed Audio URL: {run_data.get('processed_audio_url', 'N/A')}
+Outcome: {outcome}
+
+{_LEGACY_TASK}"""
+    return count_tokens(prompt, provider)
+
+
+# Task paragraph of the pre-compaction prompt (REFLECTION_INSTRUCTIONS
+# replaces it)
+_LEGACY_TASK = (
+    "Task: Based on the artist profile and the details of the latest run,"
+    "     suggest specific, actionable modifications to the artist's "
+    "'style_notes' or\n    'llm_config' (like temperature or prompt "
+    "adjustments) to improve future outcomes. Aim for subtle changes. If "
+    "the outcome was 'approved', suggest refinements to maintain success or "
+    "explore slight variations. If 'rejected', suggest changes to address "
+    "potential reasons for rejection (e.g., if lyrics were generic, suggest "
+    "adding more specific themes to style_notes; if music was poor, suggest "
+    "adjusting style notes related to instrumentation or mood). Provide the "
+    "suggestions ONLY as a JSON object with keys 'style_notes' and/or "
+    '\'llm_config\'. Example: {"style_notes": "Maintain dreamy synthwave '
+    'but add more prominent basslines."} or {"llm_config": '
+    '{"temperature": 0.65}}\n'
+)
+
+
+class ReflectionPolicy:
+    """Decides per run whether to reflect now, later in a batch, or never.
+
+    - Runs that failed before producing music are skipped: there is
+      nothing creative to critique.
+    - Runs with a human decision (a rejection, or an approval through
+      Telegram) are high signal when rejected: reflect right away, together
+      with any runs waiting in the artist's batch.
+    - Approvals and runs whose outcome was assumed (no preview was sent)
+      are low signal: they wait until `batch_size` have collected for the
+      artist and are then reflected on together.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = REFLECTION_BATCH_SIZE,
+        enabled: bool = REFLECTION_POLICY_ENABLED,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.enabled = enabled
+        self._pending: Dict[Any, List[Tuple[Dict[str, Any], str]]] = {}
+        self._lock = threading.Lock()
+
+    def plan(
+        self,
+        artist_id: Any,
+        run_data: Dict[str, Any],
+        outcome: Optional[str],
+    ) -> Tuple[str, List[Tuple[Dict[str, Any], Optional[str]]]]:
+        """
+        Returns ("reflect", runs), ("defer", []) or ("skip", []).
+
+        For "reflect", `runs` are the (run_data, outcome) pairs to include,
+        oldest first.
+        """
+        if not self.enabled:
+            return "reflect", [(run_data, outcome)]
+        if outcome in NO_SIGNAL_OUTCOMES or not run_data.get("track_url"):
+            return "skip", []
+
+        human_decision = bool(run_data.get("telegram_message_id"))
+        high_signal = human_decision and outcome == "rejected"
+        with self._lock:
+            pending = self._pending.setdefault(artist_id, [])
+            pending.append((run_data, outcome))
+            if high_signal or len(pending) >= self.batch_size:
+                del self._pending[artist_id]
+                return "reflect", pending
+        return "defer", []
+
+    def pending_counts(self) -> Dict[Any, int]:
+        with self._lock:
+            return {key: len(runs) for key, runs in self._pending.items()}
+
+
+class ReflectionMetrics:
+    """Counts reflection prompts and tokens saved against the old format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.prompts_sent = 0
+        self.skipped = 0
+        self.deferred = 0
+        self.tokens_sent = 0
+        self.tokens_baseline = 0
+
+    def record(self, action: str, baseline_tokens: int, sent_tokens: int = 0):
+        """Records one run's reflection decision; returns tokens saved."""
+        with self._lock:
+            self.runs += 1
+            self.tokens_baseline += baseline_tokens
+            self.tokens_sent += sent_tokens
+            if action == "reflect":
+                self.prompts_sent += 1
+            elif action == "skip":
+                self.skipped += 1
+            else:
+                self.deferred += 1
+        return baseline_tokens - sent_tokens
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "prompts_sent": self.prompts_sent,
+                "skipped": self.skipped,
+                "deferred": self.deferred,
+                "tokens_sent": self.tokens_sent,
+                "tokens_baseline": self.tokens_baseline,
+                "tokens_saved": self.tokens_baseline - self.tokens_sent,
+            }
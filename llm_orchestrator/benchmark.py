@@ -0,0 +1,469 @@
+"""
+Benchmark harness for the LLM orchestration stack.
+
+Runs a seeded workload of concurrent "workflows" against LLMOrchestrator
+(backed by mock providers instead of real APIs), SessionManager and
+ReviewLogger, and reports throughput plus p50/p95/p99 latency per stage:
+
+- session: creating, updating and completing the session
+- llm: LLMOrchestrator.generate_text, including retries, fallback and the
+  client-side rate limiter
+- review_log: writing the prompt version and iteration summary
+- workflow: the whole workflow end to end
+
+Mock latency, error rate and quota come from the command line, so the
+same seed and settings replay the same workload. Session and review
+storage goes to a temporary directory unless --storage-dir is given.
+
+Usage:
+    python -m llm_orchestrator.benchmark --requests 500 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator.llm_interface import (  # noqa: E402
+    LLMRequest,
+    LLMRequestType,
+    MockLLMProvider,
+    MockProviderError,
+)
+from llm_orchestrator.orchestrator import (  # noqa: E402
+    LLMOrchestrator,
+    LLMProviderInstance,
+    OrchestrationResult,
+    OrchestrationStatus,
+    OrchestratorError,
+)
+from llm_orchestrator.rate_limiter import ProviderRateLimiter  # noqa: E402
+from llm_orchestrator.review_logger import ReviewLogger  # noqa: E402
+from llm_orchestrator.session_manager import SessionManager  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Preference order of the mocked providers. Provider names must exist in
+# PROVIDER_CONFIG; model names only label the mocks.
+MOCK_PROVIDER_KEYS = [
+    "openai:mock-primary",
+    "anthropic:mock-fallback",
+    "gemini:mock-fallback",
+]
+STAGES = ["session", "llm", "review_log", "workflow"]
+
+PROMPT_GENRES = ["synthwave", "dark trap", "lo-fi", "drill", "ambient"]
+PROMPT_ISSUES = [
+    "low engagement on short-form video",
+    "beat analysis timed out",
+    "lyrics flagged as repetitive",
+    "video selection fell back to stock footage",
+    "release completed without errors",
+]
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank q-quantile (0..1) of `samples`; 0.0 if empty."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Count, mean, p50/p95/p99 and max of latency samples (seconds)."""
+    return {
+        "count": len(samples),
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+        "p50": percentile(samples, 0.50),
+        "p95": percentile(samples, 0.95),
+        "p99": percentile(samples, 0.99),
+        "max": max(samples) if samples else 0.0,
+    }
+
+
+class MockProviderInstance(LLMProviderInstance):
+    """Provider slot served by a MockLLMProvider instead of an SDK client."""
+
+    def __init__(
+        self,
+        provider: str,
+        model_name: str,
+        mock: MockLLMProvider,
+        config: Dict[str, Any],
+    ):
+        super().__init__(provider, model_name, "benchmark", config)
+        self.mock = mock
+
+    @property
+    def retryable_errors(self) -> Tuple[type, ...]:
+        # Mock failures take the same retry/Retry-After path as SDK errors
+        return (MockProviderError,)
+
+
+class MockBackedOrchestrator(LLMOrchestrator):
+    """LLMOrchestrator whose providers are mocks.
+
+    Retries, fallback, circuit breakers, hedging and rate limiting all run
+    unchanged; only the API call itself is replaced. Rate limiters are
+    private to the instance (not the process-wide ones) so a benchmark
+    does not throttle, or get throttled by, real traffic.
+    """
+
+    def __init__(
+        self,
+        mock_providers: Dict[str, MockLLMProvider],
+        config: Optional[Dict[str, Any]] = None,
+        rate_limits: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            mock_providers: "provider:model" -> mock, in preference order.
+            config: LLMOrchestrator config (max_retries, hedge, ...).
+            rate_limits: ProviderRateLimiter arguments applied to every
+                provider (requests_per_minute, tokens_per_minute,
+                max_in_flight); unlimited by default.
+        """
+        self.mock_providers = mock_providers
+        self.rate_limits = rate_limits or {}
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+        keys = list(mock_providers)
+        super().__init__(
+            primary_model=keys[0],
+            fallback_models=keys[1:],
+            config=config,
+            enable_auto_discovery=False,
+            enable_fallback_notifications=False,
+        )
+        # Every benchmark prompt should reach a provider
+        self.response_cache = None
+
+    def _add_provider(self, model_identifier: str):
+        provider, model_name = model_identifier.split(":", 1)
+        self.providers[model_identifier] = MockProviderInstance(
+            provider,
+            model_name,
+            self.mock_providers[model_identifier],
+            self.config,
+        )
+        self.model_preference.append((provider, model_name))
+        self.initialized_models.add((provider, model_name))
+
+    def _rate_limiter(self, provider: str) -> ProviderRateLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderRateLimiter(provider, **self.rate_limits)
+            self._limiters[provider] = limiter
+        return limiter
+
+    async def _request_completion(
+        self,
+        provider_instance: LLMProviderInstance,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        request = LLMRequest(
+            LLMRequestType.GENERATE,
+            prompt,
+            {"max_tokens": max_tokens, "temperature": temperature},
+        )
+        response = await provider_instance.mock.send_request(request)
+        return response.content
+
+
+def build_mock_providers(
+    seed: int,
+    provider_count: int = 2,
+    latency_range: Tuple[float, float] = (0.05, 0.25),
+    error_rate: float = 0.02,
+    requests_per_minute: int = 0,
+) -> Dict[str, MockLLMProvider]:
+    """Creates seeded mocks for the first `provider_count` provider keys."""
+    providers = {}
+    for index, key in enumerate(MOCK_PROVIDER_KEYS[:provider_count]):
+        provider_name, model_name = key.split(":", 1)
+        providers[key] = MockLLMProvider(
+            provider_name=provider_name,
+            model_name=model_name,
+            latency_range=latency_range,
+            error_rate=error_rate,
+            requests_per_minute=requests_per_minute,
+            seed=seed + index,
+        )
+    return providers
+
+
+def build_prompts(seed: int, count: int) -> List[str]:
+    """Reflection-style prompts of varying length, reproducible per seed."""
+    rng = random.Random(seed)
+    prompts = []
+    for index in range(count):
+        issues = rng.sample(PROMPT_ISSUES, rng.randint(1, 3))
+        prompts.append(
+            f"Run {index} for a {rng.choice(PROMPT_GENRES)} artist. "
+            f"Observations: {'; '.join(issues)}. "
+            "Suggest prompt adjustments as JSON."
+        )
+    return prompts
+
+
+async def _run_workflow(
+    index: int,
+    prompt: str,
+    orchestrator: LLMOrchestrator,
+    sessions: SessionManager,
+    reviews: ReviewLogger,
+    timings: Dict[str, List[float]],
+) -> bool:
+    """One session: create, generate, log the review, store the result."""
+    started = time.perf_counter()
+
+    stage = time.perf_counter()
+    session = sessions.create_session(metadata={"benchmark_run": index})
+    session_time = time.perf_counter() - stage
+
+    result = OrchestrationResult()
+    stage = time.perf_counter()
+    try:
+        result.content = await orchestrator.generate_text(
+            prompt, max_tokens=256, bypass_cache=True
+        )
+        result.status = OrchestrationStatus.COMPLETED
+    except OrchestratorError as e:
+        result.status = OrchestrationStatus.FAILED
+        result.error = str(e)
+    timings["llm"].append(time.perf_counter() - stage)
+    result.iterations = 1
+
+    stage = time.perf_counter()
+    prompt_id = reviews.log_prompt_version(session.id, 1, prompt)
+    reviews.log_iteration_summary(
+        session.id,
+        1,
+        prompt_id,
+        None,
+        "",
+        result.status.value,
+        1.0 if result.status is OrchestrationStatus.COMPLETED else 0.0,
+    )
+    timings["review_log"].append(time.perf_counter() - stage)
+
+    stage = time.perf_counter()
+    sessions.add_orchestration_to_session(session.id, result)
+    if result.status is OrchestrationStatus.COMPLETED:
+        sessions.complete_session(session.id)
+    else:
+        sessions.fail_session(session.id)
+    timings["session"].append(session_time + time.perf_counter() - stage)
+
+    timings["workflow"].append(time.perf_counter() - started)
+    return result.status is OrchestrationStatus.COMPLETED
+
+
+async def run_benchmark(
+    requests: int = 200,
+    concurrency: int = 16,
+    seed: int = 0,
+    storage_dir: Optional[str] = None,
+    provider_count: int = 2,
+    latency_range: Tuple[float, float] = (0.05, 0.25),
+    error_rate: float = 0.02,
+    mock_requests_per_minute: int = 0,
+    rate_limits: Optional[Dict[str, int]] = None,
+    orchestrator_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs `requests` workflows with at most `concurrency` in flight.
+
+    Args:
+        requests: Number of workflows to run.
+        concurrency: Workflows in flight at once.
+        seed: Seed for prompts and mock behaviour.
+        storage_dir: Where sessions and reviews are written (a temporary
+            directory, removed afterwards, if None).
+        provider_count: Number of mock providers in the fallback chain.
+        latency_range: Simulated provider latency (min, max) in seconds.
+        error_rate: Simulated provider error probability.
+        mock_requests_per_minute: Simulated provider quota (0 = none).
+        rate_limits: Client-side limiter settings per provider.
+        orchestrator_config: LLMOrchestrator config overrides.
+
+    Returns:
+        Report with throughput, outcome counts, per-stage latency
+        summaries, per-provider mock counters and limiter metrics.
+    """
+    if storage_dir is None:
+        with tempfile.TemporaryDirectory(prefix="llm_benchmark_") as tmp:
+            return await run_benchmark(
+                requests,
+                concurrency,
+                seed,
+                tmp,
+                provider_count,
+                latency_range,
+                error_rate,
+                mock_requests_per_minute,
+                rate_limits,
+                orchestrator_config,
+            )
+
+    mocks = build_mock_providers(
+        seed,
+        provider_count,
+        latency_range,
+        error_rate,
+        mock_requests_per_minute,
+    )
+    config = {"max_retries": 2, "initial_delay": 0.1}
+    config.update(orchestrator_config or {})
+    orchestrator = MockBackedOrchestrator(mocks, config, rate_limits)
+    sessions = SessionManager(
+        storage_dir=os.path.join(storage_dir, "sessions")
+    )
+    reviews = ReviewLogger(storage_dir=os.path.join(storage_dir, "reviews"))
+    prompts = build_prompts(seed, requests)
+
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    outcomes: List[bool] = []
+    next_index = iter(range(requests))
+
+    async def worker():
+        for index in next_index:
+            outcomes.append(
+                await _run_workflow(
+                    index,
+                    prompts[index],
+                    orchestrator,
+                    sessions,
+                    reviews,
+                    timings,
+                )
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    sessions.close()
+    reviews.close()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seed": seed,
+        "elapsed": elapsed,
+        "throughput": requests / elapsed if elapsed else 0.0,
+        "succeeded": outcomes.count(True),
+        "failed": outcomes.count(False),
+        "stages": {stage: summarize(timings[stage]) for stage in STAGES},
+        "providers": {
+            key: {
+                "requests": mock.request_count,
+                "errors": mock.error_count,
+                "rate_limited": mock.rate_limited_count,
+            }
+            for key, mock in mocks.items()
+        },
+        "rate_limits": orchestrator.rate_limit_metrics(),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['requests']} workflows, concurrency "
+        f"{report['concurrency']}, seed {report['seed']}: "
+        f"{report['throughput']:.1f}/s over {report['elapsed']:.2f}s "
+        f"({report['succeeded']} ok, {report['failed']} failed)",
+        f"{'stage':<12}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}",
+    ]
+    for stage, stats in report["stages"].items():
+        lines.append(
+            f"{stage:<12}"
+            + "".join(
+                f"{stats[name] * 1000:>7.1f}ms"
+                for name in ("mean", "p50", "p95", "p99", "max")
+            )
+        )
+    for key, counters in report["providers"].items():
+        lines.append(
+            f"{key}: {counters['requests']} requests, "
+            f"{counters['errors']} errors, "
+            f"{counters['rate_limited']} rate limited"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark LLMOrchestrator, SessionManager and "
+        "ReviewLogger against seeded mock providers."
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--storage-dir", default=None)
+    parser.add_argument("--providers", type=int, default=2)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        nargs=2,
+        default=(0.05, 0.25),
+        metavar=("MIN", "MAX"),
+        help="Simulated provider latency range in seconds.",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument(
+        "--mock-rpm",
+        type=int,
+        default=0,
+        help="Simulated provider quota per minute (0 = unlimited).",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=0,
+        help="Client-side in-flight cap per provider (0 = unlimited).",
+    )
+    parser.add_argument("--hedge", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print JSON.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        # Per-operation and per-retry logs would dominate the timings
+        logging.disable(logging.WARNING)
+
+    report = asyncio.run(
+        run_benchmark(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            seed=args.seed,
+            storage_dir=args.storage_dir,
+            provider_count=args.providers,
+            latency_range=tuple(args.latency),
+            error_rate=args.error_rate,
+            mock_requests_per_minute=args.mock_rpm,
+            rate_limits={"max_in_flight": args.max_in_flight},
+            orchestrator_config={"hedge": args.hedge},
+        )
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
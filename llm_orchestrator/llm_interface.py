@@ -7,9 +7,12 @@ It defines standardized request/response formats and provider-agnostic interface
 """
 
 import abc
+import asyncio
 import uuid
 import time
 import random
+from collections import deque
+from types import SimpleNamespace
 from typing import Dict, Any, Optional
 from enum import Enum
 from datetime import datetime
@@ -135,6 +138,29 @@ class LLMResponse:
         return response
 
 
+class MockProviderError(Exception):
+    """Simulated provider failure raised by the mock providers."""
+
+    pass
+
+
+class MockRateLimitError(MockProviderError):
+    """Simulated HTTP 429 from a mock provider.
+
+    Carries a `response` with a Retry-After header, shaped like the SDK
+    errors that `rate_limiter.retry_after_seconds` reads.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"Simulated rate limit; retry after {retry_after:.2f}s"
+        )
+        self.retry_after = retry_after
+        self.response = SimpleNamespace(
+            headers={"retry-after": f"{retry_after:.3f}"}
+        )
+
+
 class LLMProvider(abc.ABC):
     """
     Abstract base class for LLM providers.
@@ -189,6 +215,8 @@ class MockLLMProvider(LLMProvider):
         model_name: str = "mock-model-v1",
         latency_range: tuple = (0.5, 2.0),
         error_rate: float = 0.0,
+        requests_per_minute: int = 0,
+        seed: Optional[int] = None,
     ):
         """
         Initialize a new mock LLM provider.
@@ -198,11 +226,22 @@ class MockLLMProvider(LLMProvider):
             model_name: Name of the model
             latency_range: Range of simulated latency in seconds (min, max)
             error_rate: Probability of simulating an error (0.0 to 1.0)
+            requests_per_minute: Simulated provider quota; requests over
+                it raise MockRateLimitError (0 disables the limit)
+            seed: Seed for latency, errors and response choices, so runs
+                can be reproduced (None uses a random seed)
         """
         self.provider_name = provider_name
         self.model_name = model_name
         self.latency_range = latency_range
         self.error_rate = error_rate
+        self.requests_per_minute = requests_per_minute
+        self.rng = random.Random(seed)
+        # Start times of requests in the last minute, for the quota
+        self._request_times: deque = deque()
+        self.request_count = 0
+        self.error_count = 0
+        self.rate_limited_count = 0
 
         # Templates for different request types
         self.templates = {
@@ -274,13 +313,7 @@ class MockLLMProvider(LLMProvider):
         Returns:
             A simulated response
         """
-        # Simulate processing time
-        latency = random.uniform(self.latency_range[0], self.latency_range[1])
-        time.sleep(latency)
-
-        # Simulate random errors
-        if random.random() < self.error_rate:
-            raise Exception("Simulated LLM provider error")
+        latency = await self._simulate_call()
 
         # Generate response based on request type
         content = self._generate_mock_response(request)
@@ -306,6 +339,37 @@ class MockLLMProvider(LLMProvider):
             latency=latency,
         )
 
+    async def _simulate_call(self) -> float:
+        """
+        Simulate the network side of a request without blocking the loop.
+
+        Returns:
+            The simulated latency in seconds
+
+        Raises:
+            MockRateLimitError: If the request exceeds requests_per_minute
+            MockProviderError: With probability error_rate
+        """
+        self.request_count += 1
+        if self.requests_per_minute:
+            now = time.monotonic()
+            while self._request_times and now - self._request_times[0] >= 60:
+                self._request_times.popleft()
+            if len(self._request_times) >= self.requests_per_minute:
+                self.rate_limited_count += 1
+                raise MockRateLimitError(60 - (now - self._request_times[0]))
+            self._request_times.append(now)
+
+        # Simulate processing time
+        latency = self.rng.uniform(*self.latency_range)
+        await asyncio.sleep(latency)
+
+        # Simulate random errors
+        if self.rng.random() < self.error_rate:
+            self.error_count += 1
+            raise MockProviderError("Simulated LLM provider error")
+        return latency
+
     def get_provider_name(self) -> str:
         """Get the name of the mock LLM provider."""
         return self.provider_name
@@ -330,12 +394,12 @@ class MockLLMProvider(LLMProvider):
         )
 
         # Select a random template
-        template = random.choice(templates)
+        template = self.rng.choice(templates)
 
         if request.type == LLMRequestType.REVIEW:
             # For reviews, generate a quality assessment and feedback
-            quality = random.choice(self.quality_assessments)
-            feedback = random.choice(self.feedback_templates[quality])
+            quality = self.rng.choice(self.quality_assessments)
+            feedback = self.rng.choice(self.feedback_templates[quality])
             return template.format(quality=quality, feedback=feedback)
         else:
             # For other types, summarize the prompt
@@ -395,7 +459,7 @@ class MockLLMProvider(LLMProvider):
 
         # Add some randomness to the score
         base_score = quality_scores.get(quality, 0.5)
-        variation = random.uniform(-0.1, 0.1)
+        variation = self.rng.uniform(-0.1, 0.1)
 
         # Ensure score is between 0.0 and 1.0
         return max(0.0, min(1.0, base_score + variation))
@@ -416,6 +480,8 @@ class SmartMockLLMProvider(MockLLMProvider):
         latency_range: tuple = (1.0, 3.0),
         error_rate: float = 0.0,
         improvement_rate: float = 0.2,
+        requests_per_minute: int = 0,
+        seed: Optional[int] = None,
     ):
         """
         Initialize a new smart mock LLM provider.
@@ -427,8 +493,17 @@ class SmartMockLLMProvider(MockLLMProvider):
             error_rate: Probability of simulating an error (0.0 to 1.0)
             improvement_rate: How much to improve content on each iteration
                 (0.0 to 1.0)
-        """
-        super().__init__(provider_name, model_name, latency_range, error_rate)
+            requests_per_minute: Simulated provider quota (0 disables it)
+            seed: Seed for reproducible runs (None uses a random seed)
+        """
+        super().__init__(
+            provider_name,
+            model_name,
+            latency_range,
+            error_rate,
+            requests_per_minute,
+            seed,
+        )
         self.improvement_rate = improvement_rate
         self.iteration_memory = {}  # Track iterations for each session
 
@@ -458,13 +533,7 @@ class SmartMockLLMProvider(MockLLMProvider):
         self.iteration_memory[session_id]["iteration"] += 1
         iteration = self.iteration_memory[session_id]["iteration"]
 
-        # Simulate processing time
-        latency = random.uniform(self.latency_range[0], self.latency_range[1])
-        time.sleep(latency)
-
-        # Simulate random errors
-        if random.random() < self.error_rate:
-            raise Exception("Simulated LLM provider error")
+        latency = await self._simulate_call()
 
         # Generate response based on request type and iteration
         content = self._generate_smart_response(
@@ -515,7 +584,7 @@ class SmartMockLLMProvider(MockLLMProvider):
         )
 
         # Select a random template
-        template = random.choice(templates)
+        template = self.rng.choice(templates)
 
         if request.type == LLMRequestType.REVIEW:
             # For reviews, quality improves with iterations
@@ -531,7 +600,7 @@ class SmartMockLLMProvider(MockLLMProvider):
             quality = self.quality_assessments[quality_index]
 
             # Add more positive feedback with higher iterations
-            feedback = random.choice(self.feedback_templates[quality])
+            feedback = self.rng.choice(self.feedback_templates[quality])
 
             if iteration > 2:
                 feedback += (
@@ -554,7 +623,7 @@ class SmartMockLLMProvider(MockLLMProvider):
 
             # Add more improvements with higher iterations
             num_improvements = min(iteration, len(improvements))
-            selected_improvements = random.sample(
+            selected_improvements = self.rng.sample(
                 improvements, num_improvements
             )
 
@@ -594,7 +663,7 @@ class SmartMockLLMProvider(MockLLMProvider):
         iteration_bonus = min(0.3, self.improvement_rate * iteration)
 
         # Add some randomness
-        variation = random.uniform(-0.05, 0.05)
+        variation = self.rng.uniform(-0.05, 0.05)
 
         # Ensure score is between 0.0 and 1.0
         return max(0.0, min(1.0, base_score + iteration_bonus + variation))
@@ -632,6 +701,8 @@ class LLMProviderFactory:
                 model_name=config.get("model_name", "mock-model-v1"),
                 latency_range=config.get("latency_range", (0.5, 2.0)),
                 error_rate=config.get("error_rate", 0.0),
+                requests_per_minute=config.get("requests_per_minute", 0),
+                seed=config.get("seed"),
             )
 
         elif provider_type.lower() == "smart_mock":
@@ -641,6 +712,8 @@ class LLMProviderFactory:
                 latency_range=config.get("latency_range", (1.0, 3.0)),
                 error_rate=config.get("error_rate", 0.0),
                 improvement_rate=config.get("improvement_rate", 0.2),
+                requests_per_minute=config.get("requests_per_minute", 0),
+                seed=config.get("seed"),
             )
 
         # Add more provider types here as they are implemented
@@ -653,7 +726,6 @@ class LLMProviderFactory:
 
 # Example usage
 if __name__ == "__main__":
-    import asyncio
 
     async def test_mock_provider():
         # Create a mock provider
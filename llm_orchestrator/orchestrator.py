@@ -11,12 +11,31 @@ and implementing inter-provider fallback logic.
 Includes basic auto-discovery of models listed in llm_registry.py.
 """
 
+import importlib.util
+import json
+import hashlib
 import logging
 import os
 import sys
+import threading
+import time
+import uuid
+import weakref
 
 # Removed unused json
-from typing import List, Tuple, Dict, Any, Optional  # Keep used typing imports
+from datetime import datetime
+from enum import Enum
+from types import SimpleNamespace
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 import asyncio
 from dotenv import load_dotenv
 
@@ -44,70 +63,89 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# --- Import necessary components ---
-try:
-    from openai import AsyncOpenAI, APIError, RateLimitError
-except ImportError:
-    AsyncOpenAI = None
-    APIError = Exception
-    RateLimitError = Exception
-    logger.warning(
-        "OpenAI library not found. OpenAI, DeepSeek, Grok functionality "
-        "will be limited."
-    )
+# --- Provider SDKs (imported on first use) --- #
+# Importing openai, anthropic, google.generativeai and mistralai together
+# takes seconds, and a process usually talks to one or two providers. Only
+# the presence of each SDK is checked here; _load_sdk imports it when a
+# provider's client is first needed.
+PROVIDER_SDK_MODULES = {
+    "openai": "openai",
+    "gemini": "google.generativeai",
+    "mistral": "mistralai",
+    "anthropic": "anthropic",
+}
 
-try:
-    import google.generativeai as genai
-    from google.generativeai.types import HarmCategory, HarmBlockThreshold
-
-    DEFAULT_GEMINI_SAFETY_SETTINGS = {
-        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-    }
-except ImportError:
-    genai = None
-    HarmCategory = None
-    HarmBlockThreshold = None
-    DEFAULT_GEMINI_SAFETY_SETTINGS = {}
-    logger.warning(
-        "google-generativeai library not found. Gemini functionality "
-        "will be limited."
-    )
 
-try:
-    # Removed unused MistralClient
-    from mistralai.async_client import MistralAsyncClient
-    from mistralai.models.chat_completion import ChatMessage
-except ImportError:
-    MistralAsyncClient = None
-    ChatMessage = None
-    logger.warning(
-        "mistralai library not found. Mistral functionality "
-        "will be limited."
-    )
+def _sdk_available(module_name: str) -> bool:
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
 
-try:
-    from anthropic import (
-        AsyncAnthropic,
-        APIError as AnthropicAPIError,  # Keep for exception handling
-        RateLimitError as AnthropicRateLimitError,
-        # Keep for exception handling
-    )
-except ImportError:
-    AsyncAnthropic = None
 
-    # Define dummy exceptions if library is missing
-    class AnthropicAPIError(Exception):
-        pass
+_sdks: Dict[str, SimpleNamespace] = {}
+_sdks_lock = threading.Lock()
 
-    class AnthropicRateLimitError(Exception):
-        pass
 
-    logger.warning(
-        "Anthropic library not found. Claude functionality " "will be limited."
-    )
+def _load_sdk(module_name: str) -> SimpleNamespace:
+    """Imports a provider SDK once and returns the parts the orchestrator
+    uses: `client_class`, `retryable_errors` and SDK-specific extras.
+
+    Raises:
+        ImportError: If the SDK is not installed.
+    """
+    with _sdks_lock:
+        sdk = _sdks.get(module_name)
+        if sdk is not None:
+            return sdk
+        if module_name == "openai":
+            from openai import AsyncOpenAI, APIError, RateLimitError
+
+            sdk = SimpleNamespace(
+                client_class=AsyncOpenAI,
+                retryable_errors=(APIError, RateLimitError),
+            )
+        elif module_name == "google.generativeai":
+            import google.generativeai as genai
+            from google.generativeai.types import (
+                HarmCategory,
+                HarmBlockThreshold,
+            )
+
+            block = HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
+            sdk = SimpleNamespace(
+                client_class=None,  # Special handling
+                retryable_errors=(),
+                genai=genai,
+                safety_settings={
+                    HarmCategory.HARM_CATEGORY_HARASSMENT: block,
+                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: block,
+                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: block,
+                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: block,
+                },
+            )
+        elif module_name == "mistralai":
+            from mistralai.async_client import MistralAsyncClient
+            from mistralai.models.chat_completion import ChatMessage
+
+            sdk = SimpleNamespace(
+                client_class=MistralAsyncClient,
+                retryable_errors=(),
+                chat_message=ChatMessage,
+            )
+        elif module_name == "anthropic":
+            from anthropic import AsyncAnthropic, APIError, RateLimitError
+
+            sdk = SimpleNamespace(
+                client_class=AsyncAnthropic,
+                retryable_errors=(APIError, RateLimitError),
+            )
+        else:
+            raise ImportError(f"Unknown provider SDK: {module_name}")
+        _sdks[module_name] = sdk
+        logger.debug(f"Loaded provider SDK {module_name}")
+        return sdk
+
 
 # Import the registry
 try:
@@ -119,6 +157,25 @@ except ImportError:
         "Auto-discovery disabled."
     )
 
+from llm_orchestrator.provider_health import (  # noqa: E402
+    LLM_CIRCUIT_FAILURE_THRESHOLD,
+    LLM_CIRCUIT_RECOVERY_SECONDS,
+    ProviderHealthTracker,
+)
+from llm_orchestrator.rate_limiter import (  # noqa: E402
+    ProviderRateLimiter,
+    estimate_tokens,
+    get_rate_limiter,
+    retry_after_seconds,
+)
+from llm_orchestrator.streaming import JsonObjectDetector  # noqa: E402
+from llm_orchestrator.response_cache import (  # noqa: E402
+    LLM_RESPONSE_CACHE_ENABLED,
+    ResponseCache,
+    get_response_cache,
+    make_cache_key,
+)
+
 # Import Telegram Service for notifications
 try:
     from services.telegram_service import send_notification
@@ -135,45 +192,112 @@ except ImportError:
 
 
 # --- Provider Configuration --- #
+def _rate_limits(
+    env_prefix: str,
+    requests_per_minute: int,
+    tokens_per_minute: int,
+    max_in_flight: int,
+) -> Dict[str, int]:
+    """Client-side limits for a provider, overridable through
+    <PREFIX>_REQUESTS_PER_MINUTE, <PREFIX>_TOKENS_PER_MINUTE and
+    <PREFIX>_MAX_IN_FLIGHT. 0 disables a limit."""
+    defaults = {
+        "requests_per_minute": requests_per_minute,
+        "tokens_per_minute": tokens_per_minute,
+        "max_in_flight": max_in_flight,
+    }
+    return {
+        name: int(os.getenv(f"{env_prefix}_{name.upper()}", default))
+        for name, default in defaults.items()
+    }
+
+
 # Enhanced PROVIDER_CONFIG to include Anthropic and check library presence
 PROVIDER_CONFIG = {
     "openai": {
         "api_key_env": "OPENAI_API_KEY",
         "base_url": None,
-        "client_class": AsyncOpenAI,
-        "library_present": AsyncOpenAI is not None,
+        "sdk": PROVIDER_SDK_MODULES["openai"],
+        "rate_limits": _rate_limits("OPENAI", 500, 200000, 8),
     },
     "deepseek": {
         "api_key_env": "DEEPSEEK_API_KEY",
         "base_url": "https://api.deepseek.com/v1",
-        "client_class": AsyncOpenAI,
-        "library_present": AsyncOpenAI is not None,
+        "sdk": PROVIDER_SDK_MODULES["openai"],
+        "rate_limits": _rate_limits("DEEPSEEK", 60, 100000, 4),
     },
     "grok": {
         "api_key_env": "GROK_API_KEY",
         "base_url": "https://api.x.ai/v1",
-        "client_class": AsyncOpenAI,
-        "library_present": AsyncOpenAI is not None,
+        "sdk": PROVIDER_SDK_MODULES["openai"],
+        "rate_limits": _rate_limits("GROK", 60, 100000, 4),
     },
     "gemini": {
         "api_key_env": "GEMINI_API_KEY",
         "base_url": None,
-        "client_class": None,  # Special handling
-        "library_present": genai is not None,
+        "sdk": PROVIDER_SDK_MODULES["gemini"],
+        "rate_limits": _rate_limits("GEMINI", 60, 120000, 4),
     },
     "mistral": {
         "api_key_env": "MISTRAL_API_KEY",
         "base_url": None,
-        "client_class": MistralAsyncClient,
-        "library_present": MistralAsyncClient is not None,
+        "sdk": PROVIDER_SDK_MODULES["mistral"],
+        "rate_limits": _rate_limits("MISTRAL", 60, 100000, 2),
     },
     "anthropic": {
         "api_key_env": "ANTHROPIC_API_KEY",
         "base_url": None,
-        "client_class": AsyncAnthropic,
-        "library_present": AsyncAnthropic is not None,
+        "sdk": PROVIDER_SDK_MODULES["anthropic"],
+        "rate_limits": _rate_limits("ANTHROPIC", 50, 40000, 4),
     },
 }
+for _provider_info in PROVIDER_CONFIG.values():
+    _provider_info["library_present"] = _sdk_available(_provider_info["sdk"])
+
+# Model name prefixes that identify a provider without "provider:"
+MODEL_PREFIX_PROVIDERS = (
+    ("gpt-", "openai"),
+    ("deepseek-", "deepseek"),
+    ("grok-", "grok"),
+    ("gemini-", "gemini"),
+    ("gemma-", "gemini"),
+    ("mistral-", "mistral"),
+    ("open-mixtral-", "mistral"),
+    ("codestral-", "mistral"),
+    ("claude-", "anthropic"),
+)
+
+
+def infer_provider(model_identifier: str) -> Optional[str]:
+    """Returns the provider a model identifier names, or None if unclear.
+
+    Accepts "provider:model" or a bare model name, which is matched by
+    prefix and then against the LLM registry. The result may still be a
+    provider missing from PROVIDER_CONFIG.
+    """
+    if ":" in model_identifier:
+        return model_identifier.split(":", 1)[0].lower()
+    model_lower = model_identifier.lower()
+    for prefix, provider in MODEL_PREFIX_PROVIDERS:
+        if model_lower.startswith(prefix):
+            return provider
+    for provider, data in LLM_REGISTRY.items():
+        if model_identifier in data.get("models", []):
+            return provider
+    return None
+
+
+# --- Hedged Requests --- #
+# Start the next provider once the current one has been slower than this
+# quantile of its recent latencies...
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", 0.9))
+# ...or than this many seconds while it has no latency history yet.
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", 5.0))
+
+# --- Batch Generation --- #
+# Prompts of one generate_batch call in flight at once (provider rate
+# limiters still apply on top of this)
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", 8))
 
 
 # --- Helper Function to Get Env Var ---
@@ -188,9 +312,146 @@ class OrchestratorError(Exception):
     pass
 
 
+# Name the services and batch runner import
+LLMOrchestratorError = OrchestratorError
+
+
+class OrchestrationStatus(Enum):
+    """Status of one orchestration (a generate/review/refine cycle)."""
+
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class OrchestrationResult:
+    """Outcome of one orchestration, as stored in a SessionManager session.
+
+    Attributes:
+        id: Unique identifier for the orchestration
+        status: Current OrchestrationStatus
+        content: Final content, if any
+        iterations: Number of generate/review/refine iterations run
+        confidence_score: Confidence in the final content
+        history: One entry per step ({"type", "data", "timestamp"})
+        error: Error message if the orchestration failed
+    """
+
+    def __init__(self, orchestration_id: Optional[str] = None):
+        self.id = orchestration_id or str(uuid.uuid4())
+        self.status = OrchestrationStatus.PENDING
+        self.content: Optional[str] = None
+        self.iterations = 0
+        self.confidence_score: Optional[float] = None
+        self.history: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    def add_to_history(self, entry_type: str, data: Dict[str, Any]) -> None:
+        self.history.append(
+            {
+                "type": entry_type,
+                "data": data,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status.value,
+            "content": self.content,
+            "iterations": self.iterations,
+            "confidence_score": self.confidence_score,
+            "history": self.history,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OrchestrationResult":
+        result = cls(data["id"])
+        result.status = OrchestrationStatus(
+            data.get("status", OrchestrationStatus.PENDING.value)
+        )
+        result.content = data.get("content")
+        result.iterations = data.get("iterations", 0)
+        result.confidence_score = data.get("confidence_score")
+        result.history = data.get("history", [])
+        result.error = data.get("error")
+        return result
+
+
+# Clients shared by every orchestrator in the process, so each provider
+# (per API key and base URL) keeps one HTTP connection pool. The async SDK
+# clients' pools are bound to the event loop that first used them, so they
+# are shared per loop: id(loop) -> (weak ref to the loop, {key: client}).
+_clients: Dict[int, Tuple[Any, Dict[Tuple[str, ...], Any]]] = {}
+_loopless_clients: Dict[Tuple[str, ...], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _loop_clients() -> Dict[Tuple[str, ...], Any]:
+    """Clients of the running event loop; call with _clients_lock held.
+
+    Entries of loops that were closed or collected are dropped when a new
+    loop registers.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _loopless_clients
+    entry = _clients.get(id(loop))
+    if entry is not None and entry[0]() is loop:
+        return entry[1]
+    for loop_id, (loop_ref, _) in list(_clients.items()):
+        other = loop_ref()
+        if other is None or other.is_closed():
+            del _clients[loop_id]
+    clients: Dict[Tuple[str, ...], Any] = {}
+    _clients[id(loop)] = (weakref.ref(loop), clients)
+    return clients
+
+
+def _get_shared_client(provider: str, model_name: str, api_key: str) -> Any:
+    """Returns the client for a provider in the running event loop,
+    creating it on first use."""
+    provider_info = PROVIDER_CONFIG[provider]
+    sdk = _load_sdk(provider_info["sdk"])
+    base_url = provider_info["base_url"]
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    if provider == "gemini":
+        # GenerativeModel is per model; the transport is configured globally
+        client_key = (provider, key_hash, model_name)
+    else:
+        client_key = (provider, key_hash, base_url or "")
+
+    with _clients_lock:
+        clients = _loop_clients()
+        client = clients.get(client_key)
+        if client is not None:
+            return client
+        if provider == "gemini":
+            sdk.genai.configure(api_key=api_key)
+            client = sdk.genai.GenerativeModel(model_name)
+        elif sdk.client_class:
+            client_args = {"api_key": api_key}
+            if base_url:
+                client_args["base_url"] = base_url
+            client = sdk.client_class(**client_args)
+        else:
+            raise OrchestratorError(
+                f"Client class not defined or library missing for "
+                f"{provider}"
+            )
+        clients[client_key] = client
+        logger.debug(f"Created {provider} client for {model_name}")
+        return client
+
+
 class LLMProviderInstance:
-    """Holds the initialized client and config
-    for a specific provider/model."""
+    """Holds the config for a specific provider/model. The SDK client is
+    created (or taken from the shared pool of the running event loop) on
+    first use."""
 
     def __init__(
         self,
@@ -204,27 +465,25 @@ class LLMProviderInstance:
         self.api_key = api_key
         self.config = config
         self.provider_info = PROVIDER_CONFIG[provider]
-        self.client = self._initialize_client()
+
+    @property
+    def sdk(self) -> SimpleNamespace:
+        return _load_sdk(self.provider_info["sdk"])
+
+    @property
+    def client(self) -> Any:
+        # Looked up on each call: a client only serves the loop it was
+        # created in
+        return self._initialize_client()
+
+    @property
+    def retryable_errors(self) -> Tuple[type, ...]:
+        """SDK API/rate-limit errors; empty until the SDK is loaded."""
+        sdk = _sdks.get(self.provider_info["sdk"])
+        return sdk.retryable_errors if sdk else ()
 
     def _initialize_client(self) -> Any:
-        client_class = self.provider_info["client_class"]
-        base_url = self.provider_info["base_url"]
-
-        if self.provider == "gemini":
-            if not genai:
-                raise ImportError("Gemini library required.")
-            genai.configure(api_key=self.api_key)
-            return genai.GenerativeModel(self.model_name)
-        elif client_class:
-            client_args = {"api_key": self.api_key}
-            if base_url:
-                client_args["base_url"] = base_url
-            return client_class(**client_args)
-        else:
-            raise OrchestratorError(
-                f"Client class not defined or library missing for "
-                f"{self.provider}"
-            )
+        return _get_shared_client(self.provider, self.model_name, self.api_key)
 
 
 class LLMOrchestrator:
@@ -247,6 +506,7 @@ class LLMOrchestrator:
         # Flag to enable/disable discovery
         enable_fallback_notifications: bool = True,
         # Flag to enable/disable Telegram notifications
+        response_cache: Optional[ResponseCache] = None,
     ):
         """
         Initialize the orchestrator with primary, fallback,
@@ -265,11 +525,36 @@ class LLMOrchestrator:
                                      primary/fallback.
             enable_fallback_notifications: If True, send Telegram
             # notifications on fallback events.
+            response_cache: Cache for generate_text responses. Defaults
+            # to the shared cache when LLM_RESPONSE_CACHE_ENABLED is
+            # set, otherwise no caching.
         """
         self.config = config or {}
         self.max_retries_per_provider = self.config.get("max_retries", 3)
         self.initial_delay = self.config.get("initial_delay", 1.0)
         self.enable_fallback_notifications = enable_fallback_notifications
+        if response_cache is None and LLM_RESPONSE_CACHE_ENABLED:
+            response_cache = get_response_cache()
+        self.response_cache = response_cache
+        # Circuit breakers and rolling latency/error stats per provider
+        self.health = ProviderHealthTracker(
+            failure_threshold=self.config.get(
+                "circuit_failure_threshold", LLM_CIRCUIT_FAILURE_THRESHOLD
+            ),
+            recovery_timeout=self.config.get(
+                "circuit_recovery_timeout", LLM_CIRCUIT_RECOVERY_SECONDS
+            ),
+        )
+        # Reorder the preference list by provider health on each call
+        self.health_ranking = self.config.get("health_ranking", True)
+        # Default for generate_text's hedge argument
+        self.hedge = self.config.get("hedge", False)
+        self.hedge_percentile = self.config.get(
+            "hedge_percentile", LLM_HEDGE_PERCENTILE
+        )
+        self.hedge_default_delay = self.config.get(
+            "hedge_default_delay", LLM_HEDGE_DEFAULT_DELAY
+        )
 
         self.providers: Dict[str, LLMProviderInstance] = {}
         self.model_preference: List[Tuple[str, str]] = (
@@ -321,35 +606,12 @@ class LLMOrchestrator:
     def _infer_provider(self, model_name: str) -> str:
         """Infers the provider based on common model name prefixes
         or registry."""
-        model_lower = model_name.lower()
-        # Check common prefixes first
-        if model_lower.startswith("gpt-"):
-            return "openai"
-        if model_lower.startswith("deepseek-"):
-            return "deepseek"
-        if model_lower.startswith("grok-"):
-            return "grok"
-        if model_lower.startswith("gemini-") or model_lower.startswith(
-            "gemma-"
-        ):
-            return "gemini"
-        if (
-            model_lower.startswith("mistral-")
-            or model_lower.startswith("open-mixtral-")
-            or model_lower.startswith("codestral-")
-        ):
-            return "mistral"
-        if model_lower.startswith("claude-"):
-            return "anthropic"
-
-        # If no prefix match, check the registry
-        for provider, data in LLM_REGISTRY.items():
-            if model_name in data.get("models", []):
-                logger.debug(
-                    f'Inferred provider "{provider}" for model '
-                    f'"{model_name}" from registry.'
-                )
-                return provider
+        provider = infer_provider(model_name)
+        if provider is not None:
+            logger.debug(
+                f'Inferred provider "{provider}" for model "{model_name}".'
+            )
+            return provider
 
         logger.warning(
             f'Could not infer provider for "{model_name}". '
@@ -440,6 +702,158 @@ class LLMOrchestrator:
                 self.model_preference.append(model_tuple)
             self.initialized_models.add(model_tuple)
 
+    async def _request_completion(
+        self,
+        provider_instance: LLMProviderInstance,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        """Makes a single completion request to one provider."""
+        provider = provider_instance.provider
+        model_name = provider_instance.model_name
+        client = provider_instance.client
+        sdk = provider_instance.sdk
+
+        if provider in ["openai", "deepseek", "grok"]:
+            response = await client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                n=1,
+                stop=None,
+            )
+            content = None
+            if response.choices and response.choices[0].message:
+                content = response.choices[0].message.content
+            if content is None:
+                raise OrchestratorError(
+                    "%s (%s) returned empty content." % (provider, model_name)
+                )
+            return content.strip()
+
+        elif provider == "gemini":
+            # Gemini uses generate_content_async
+            response = await client.generate_content_async(
+                prompt,
+                generation_config=sdk.genai.types.GenerationConfig(
+                    # candidate_count=1, # Default is 1
+                    max_output_tokens=max_tokens,
+                    temperature=temperature,
+                ),
+                safety_settings=sdk.safety_settings,
+            )
+            # Handle potential blocks or empty responses
+            if not response.candidates:
+                block_reason = response.prompt_feedback.block_reason
+                raise OrchestratorError(
+                    f"Gemini ({model_name}) call blocked. "
+                    f"Reason: {block_reason}"
+                )
+            return response.text.strip()
+        elif provider == "mistral":
+            chat_response = await client.chat(
+                model=model_name,
+                messages=[sdk.chat_message(role="user", content=prompt)],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            content = (
+                chat_response.choices[0].message.content
+                if chat_response.choices and chat_response.choices[0].message
+                else None
+            )
+            if content is None:
+                raise OrchestratorError(
+                    f"Mistral ({model_name}) returned empty content."
+                )
+            return content.strip()
+
+        elif provider == "anthropic":
+            message = await client.messages.create(
+                model=model_name,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            content = message.content[0].text if message.content else None
+            if content is None:
+                raise OrchestratorError(
+                    f"Anthropic ({model_name}) returned empty content."
+                )
+            return content.strip()
+
+        else:
+            # Should not happen if _add_provider worked correctly
+            raise OrchestratorError(f"Unsupported provider: {provider}")
+
+    async def _stream_completion(
+        self,
+        provider_instance: LLMProviderInstance,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> AsyncIterator[str]:
+        """Streams one completion from one provider as text chunks."""
+        provider = provider_instance.provider
+        model_name = provider_instance.model_name
+        client = provider_instance.client
+        sdk = provider_instance.sdk
+
+        if provider in ["openai", "deepseek", "grok"]:
+            stream = await client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                n=1,
+                stream=True,
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+
+        elif provider == "gemini":
+            response = await client.generate_content_async(
+                prompt,
+                generation_config=sdk.genai.types.GenerationConfig(
+                    max_output_tokens=max_tokens,
+                    temperature=temperature,
+                ),
+                safety_settings=sdk.safety_settings,
+                stream=True,
+            )
+            async for chunk in response:
+                if chunk.candidates and chunk.text:
+                    yield chunk.text
+
+        elif provider == "mistral":
+            async for chunk in client.chat_stream(
+                model=model_name,
+                messages=[sdk.chat_message(role="user", content=prompt)],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        elif provider == "anthropic":
+            async with client.messages.stream(
+                model=model_name,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}],
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+
+        else:
+            raise OrchestratorError(f"Unsupported provider: {provider}")
+
     async def _call_provider_with_retry(
         self,
         provider_instance: LLMProviderInstance,
@@ -454,109 +868,56 @@ class LLMOrchestrator:
         last_exception = None  # Initialize last_exception here
         provider = provider_instance.provider
         model_name = provider_instance.model_name
-        client = provider_instance.client
+        provider_key = f"{provider}:{model_name}"
+        limiter = self._rate_limiter(provider)
+        estimated_tokens = estimate_tokens(prompt, max_tokens, provider)
 
         while retries < self.max_retries_per_provider:
+            if not self.health.allow_request(provider_key):
+                # Circuit opened (or another call holds the half-open probe)
+                logger.warning(
+                    f"Circuit open for {provider_key}; not retrying."
+                )
+                break
             try:
                 logger.debug(
                     f"Attempt {retries + 1}/{self.max_retries_per_provider} "
                     f"calling {provider} model {model_name}"
                 )
-                if provider in ["openai", "deepseek", "grok"]:
-                    if not AsyncOpenAI:
-                        raise ImportError("OpenAI library required.")
-                    response = await client.chat.completions.create(
-                        model=model_name,
-                        messages=[{"role": "user", "content": prompt}],
-                        max_tokens=max_tokens,
-                        temperature=temperature,
-                        n=1,
-                        stop=None,
+                async with limiter.slot(estimated_tokens):
+                    started = time.monotonic()
+                    result = await self._request_completion(
+                        provider_instance, prompt, max_tokens, temperature
                     )
-                    content = None
-                    if response.choices and response.choices[0].message:
-                        content = response.choices[0].message.content
-                    if content is None:
-                        raise OrchestratorError(
-                            "%s (%s) returned empty content."
-                            % (provider, model_name)
-                        )
-                    return content.strip()
-
-                elif provider == "gemini":
-                    if not genai:
-                        raise ImportError("Gemini library required.")
-                    # Gemini uses generate_content_async
-                    response = await client.generate_content_async(
-                        prompt,
-                        generation_config=genai.types.GenerationConfig(
-                            # candidate_count=1, # Default is 1
-                            max_output_tokens=max_tokens,
-                            temperature=temperature,
-                        ),
-                        safety_settings=DEFAULT_GEMINI_SAFETY_SETTINGS,
-                    )
-                    # Handle potential blocks or empty responses
-                    if not response.candidates:
-                        block_reason = response.prompt_feedback.block_reason
-                        raise OrchestratorError(
-                            f"Gemini ({model_name}) call blocked. "
-                            f"Reason: {block_reason}"
-                        )
-                    return response.text.strip()
-                elif provider == "mistral":
-                    if not MistralAsyncClient or not ChatMessage:
-                        raise ImportError("Mistral library required.")
-                    chat_response = await client.chat(
-                        model=model_name,
-                        messages=[ChatMessage(role="user", content=prompt)],
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                    )
-                    content = (
-                        chat_response.choices[0].message.content
-                        if chat_response.choices
-                        and chat_response.choices[0].message
-                        else None
-                    )
-                    if content is None:
-                        raise OrchestratorError(
-                            f"Mistral ({model_name}) returned empty content."
-                        )
-                    return content.strip()
-
-                elif provider == "anthropic":
-                    if not AsyncAnthropic:
-                        raise ImportError("Anthropic library required.")
-                    message = await client.messages.create(
-                        model=model_name,
-                        max_tokens=max_tokens,
-                        temperature=temperature,
-                        messages=[{"role": "user", "content": prompt}],
-                    )
-                    content = (
-                        message.content[0].text if message.content else None
-                    )
-                    if content is None:
-                        raise OrchestratorError(
-                            f"Anthropic ({model_name}) returned empty content."
-                        )
-                    return content.strip()
+                self.health.record_success(
+                    provider_key, time.monotonic() - started
+                )
+                return result
 
-                else:
-                    # Should not happen if _add_provider worked correctly
-                    raise OrchestratorError(
-                        f"Unsupported provider: {provider}"
-                    )
+            except asyncio.CancelledError:
+                # A hedged call lost the race; not a provider failure
+                self.health.release_probe(provider_key)
+                raise
 
-            except (
-                APIError,  # OpenAI/DeepSeek/Grok specific
-                RateLimitError,  # OpenAI/DeepSeek/Grok specific
-                AnthropicAPIError,  # Anthropic specific
-                AnthropicRateLimitError,  # Anthropic specific
-            ) as e:
+            except provider_instance.retryable_errors as e:
+                # SDK API/rate-limit errors (OpenAI-compatible, Anthropic)
                 last_exception = e
                 retries += 1
+                retry_after = retry_after_seconds(e)
+                if retry_after is not None:
+                    # The provider said how long to wait; the limiter holds
+                    # back this and every other caller until then. Being
+                    # throttled is not ill health, so the breaker is left
+                    # alone (only a half-open probe slot is given back).
+                    self.health.release_probe(provider_key)
+                    limiter.pause(retry_after)
+                    logger.warning(
+                        f"API error calling {provider} ({model_name}): {e}. "
+                        f"Retrying after {retry_after:.1f}s (Retry-After)... "
+                        f"({retries}/{self.max_retries_per_provider})"
+                    )
+                    continue
+                self.health.record_failure(provider_key)
                 logger.warning(
                     f"API error calling {provider} ({model_name}): {e}. "
                     f"Retrying in {delay}s... "
@@ -565,6 +926,7 @@ class LLMOrchestrator:
                 await asyncio.sleep(delay)
                 delay *= 2  # Exponential backoff
             except ImportError as e:
+                self.health.record_failure(provider_key)
                 last_exception = e
                 logger.error(
                     f"Import error during API call for {provider} "
@@ -572,6 +934,7 @@ class LLMOrchestrator:
                 )
                 break  # Don't retry import errors
             except Exception as e:
+                self.health.record_failure(provider_key)
                 last_exception = e
                 retries += 1
                 logger.error(
@@ -587,31 +950,62 @@ class LLMOrchestrator:
         # If loop finishes without returning, raise the last exception
         raise OrchestratorError(
             f"Failed to call {provider} ({model_name}) after "
-            f"{self.max_retries_per_provider} retries."
+            f"{retries} retries."
         ) from last_exception
 
-    async def generate_text(
+    @staticmethod
+    def _rate_limiter(provider: str) -> ProviderRateLimiter:
+        return get_rate_limiter(
+            provider, **PROVIDER_CONFIG[provider]["rate_limits"]
+        )
+
+    def rate_limit_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, in-flight count and wait totals per provider."""
+        providers = dict.fromkeys(p for p, _ in self.model_preference)
+        return {p: self._rate_limiter(p).metrics() for p in providers}
+
+    def _ranked_preference(self) -> List[Tuple[str, str]]:
+        """Providers to try for the next call, skipping open circuits."""
+        ranked = self.health.rank(self.model_preference)
+        if self.health_ranking:
+            return ranked
+        allowed = set(ranked)
+        return [m for m in self.model_preference if m in allowed]
+
+    def _get_cached_response(
+        self, prompt: str, max_tokens: int, temperature: float
+    ) -> Optional[str]:
+        """Returns a cached response from the first provider that has one."""
+        keys = [
+            make_cache_key(
+                provider, model_name, prompt, max_tokens, temperature
+            )
+            for provider, model_name in self.model_preference
+        ]
+        hit = self.response_cache.get_first(keys)
+        if hit is None:
+            return None
+        key, response = hit
+        logger.info(f"Using cached response ({key.rsplit(':', 3)[0]})")
+        return response
+
+    async def _generate_sequential(
         self,
+        candidates: List[Tuple[str, str]],
         prompt: str,
-        max_tokens: int = 1024,
-        temperature: float = 0.7,
-    ) -> str:
-        """
-        Generates text using the configured LLM providers, with fallback.
-
-        Args:
-            prompt: The input prompt.
-            max_tokens: Maximum number of tokens to generate.
-            temperature: Sampling temperature.
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[str, str, str]:
+        """Tries `candidates` one after another until one succeeds.
 
         Returns:
-            The generated text.
+            (provider, model_name, text) of the successful call.
 
         Raises:
-            OrchestratorError: If all providers fail after retries.
+            The last provider's exception if all of them fail.
         """
-        last_exception = None
-        for i, (provider, model_name) in enumerate(self.model_preference):
+        last_exception = OrchestratorError("No initialized LLM providers.")
+        for i, (provider, model_name) in enumerate(candidates):
             provider_key = f"{provider}:{model_name}"
             if provider_key not in self.providers:
                 logger.warning(
@@ -632,7 +1026,7 @@ class LLMOrchestrator:
                     f"Successfully generated text using "
                     f"{provider}:{model_name}"
                 )
-                return result
+                return provider, model_name, result
             except Exception as e:
                 last_exception = e
                 logger.error(
@@ -644,11 +1038,9 @@ class LLMOrchestrator:
                 # provider
                 if (
                     self.enable_fallback_notifications
-                    and i < len(self.model_preference) - 1
+                    and i < len(candidates) - 1
                 ):
-                    fallback_to_provider, fallback_to_model = (
-                        self.model_preference[i + 1]
-                    )
+                    fallback_to_provider, fallback_to_model = candidates[i + 1]
                     notification_msg = (
                         f"🚨 LLM Fallback Triggered! 🚨\n\n"
                         f"Failed Provider: `{provider}`\n"
@@ -658,18 +1050,429 @@ class LLMOrchestrator:
                         f"`{fallback_to_provider}:{fallback_to_model}`"
                     )
                     await send_notification(notification_msg)
+        raise last_exception
+
+    def _hedge_delay(self, provider_key: str) -> float:
+        """Seconds to wait on a provider before hedging to the next one."""
+        delay = self.health.latency_percentile(
+            provider_key, self.hedge_percentile
+        )
+        return self.hedge_default_delay if delay is None else delay
+
+    async def _generate_hedged(
+        self,
+        candidates: List[Tuple[str, str]],
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[str, str, str]:
+        """Races providers, starting the next one when the latest is slow.
+
+        The first candidate starts immediately. Whenever the most recently
+        started call exceeds its hedge delay (its `hedge_percentile`
+        latency), or every running call has failed, the next candidate is
+        started too. The first successful response wins and the other
+        calls are cancelled.
+
+        Returns:
+            (provider, model_name, text) of the winning call.
+
+        Raises:
+            The last provider's exception if all of them fail.
+        """
+        queue = [
+            (provider, model_name)
+            for provider, model_name in candidates
+            if f"{provider}:{model_name}" in self.providers
+        ]
+        pending: Dict[asyncio.Task, Tuple[str, str]] = {}
+        last_exception: BaseException = OrchestratorError(
+            "No initialized LLM providers."
+        )
+        timeout = None
+
+        def start_next():
+            provider, model_name = queue.pop(0)
+            provider_key = f"{provider}:{model_name}"
+            logger.info(f"Attempting generation with: {provider_key}")
+            task = asyncio.ensure_future(
+                self._call_provider_with_retry(
+                    self.providers[provider_key],
+                    prompt,
+                    max_tokens,
+                    temperature,
+                )
+            )
+            pending[task] = (provider, model_name)
+            return self._hedge_delay(provider_key)
+
+        try:
+            while pending or queue:
+                if not pending:
+                    timeout = start_next()
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=timeout if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    provider, model_name = queue[0]
+                    logger.info(
+                        f"No response within {timeout:.2f}s; hedging to "
+                        f"{provider}:{model_name}"
+                    )
+                    timeout = start_next()
+                    continue
+                for task in done:
+                    provider, model_name = pending.pop(task)
+                    if task.exception() is None:
+                        logger.info(
+                            f"Successfully generated text using "
+                            f"{provider}:{model_name} (hedged)"
+                        )
+                        return provider, model_name, task.result()
+                    last_exception = task.exception()
+                    logger.error(
+                        f"Failed to generate text with "
+                        f"{provider}:{model_name}: {last_exception}"
+                    )
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        raise last_exception
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        cache_ttl: Optional[float] = None,
+        bypass_cache: bool = False,
+        hedge: Optional[bool] = None,
+    ) -> str:
+        """
+        Generates text using the configured LLM providers, with fallback.
+
+        When a response cache is configured, a cached response from any
+        provider in the preference list is returned without an API call.
+        Providers are tried in health-ranked order; providers whose
+        circuit breaker is open are skipped without a request.
+
+        Args:
+            prompt: The input prompt.
+            max_tokens: Maximum number of tokens to generate.
+            temperature: Sampling temperature.
+            cache_ttl: Seconds to cache this response (None uses the
+                cache's default TTL).
+            bypass_cache: If True, skip the cache lookup and always call a
+                provider; the fresh response still replaces the cached one.
+            hedge: If True, start the next provider whenever the current
+                one is slower than its usual latency (see
+                `_generate_hedged`) and use whichever answers first.
+                Defaults to the orchestrator's "hedge" config.
+
+        Returns:
+            The generated text.
+
+        Raises:
+            OrchestratorError: If all providers fail after retries.
+        """
+        return await self._generate(
+            prompt, max_tokens, temperature, cache_ttl, bypass_cache, hedge
+        )
+
+    async def _generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        cache_ttl: Optional[float],
+        bypass_cache: bool,
+        hedge: Optional[bool],
+        notify_failure: bool = True,
+    ) -> str:
+        """generate_text, optionally without the critical-failure
+        notification (batches send one summary instead)."""
+        if self.response_cache is not None and not bypass_cache:
+            cached = self._get_cached_response(prompt, max_tokens, temperature)
+            if cached is not None:
+                return cached
+
+        candidates = self._ranked_preference()
+        if not candidates:
+            final_error_msg = (
+                "All configured LLM providers have open circuits."
+            )
+            logger.error(final_error_msg)
+            raise OrchestratorError(final_error_msg)
+
+        if hedge is None:
+            hedge = self.hedge
+        if hedge and len(candidates) > 1:
+            generate = self._generate_hedged
+        else:
+            generate = self._generate_sequential
+        try:
+            provider, model_name, result = await generate(
+                candidates, prompt, max_tokens, temperature
+            )
+        except Exception as e:
+            last_exception = e
+        else:
+            if self.response_cache is not None:
+                self.response_cache.set(
+                    make_cache_key(
+                        provider, model_name, prompt, max_tokens, temperature
+                    ),
+                    result,
+                    ttl=cache_ttl,
+                )
+            return result
 
-        # If loop completes without returning, all providers failed
+        # All providers failed
         final_error_msg = (
             "All configured LLM providers failed to generate text."
         )
         logger.critical(final_error_msg)
-        await send_notification(
-            f"🆘 Critical LLM Failure! 🆘\n\n{final_error_msg}\n"
-            f"Last Error: `{str(last_exception)[:200]}...`"
+        if notify_failure:
+            await send_notification(
+                f"🆘 Critical LLM Failure! 🆘\n\n{final_error_msg}\n"
+                f"Last Error: `{str(last_exception)[:200]}...`"
+            )
+        raise OrchestratorError(final_error_msg) from last_exception
+
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        max_concurrency: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        bypass_cache: bool = False,
+        hedge: Optional[bool] = None,
+    ) -> List[Union[str, Exception]]:
+        """
+        Generates text for several prompts concurrently.
+
+        Each prompt goes through the same path as generate_text (cache,
+        health ranking, hedging, per-provider rate limits). Identical
+        prompts in one batch are sent once. A failed prompt does not
+        affect the others; one summary notification is sent if any fail.
+
+        Args:
+            prompts: The input prompts.
+            max_tokens: Maximum number of tokens to generate per prompt.
+            temperature: Sampling temperature.
+            max_concurrency: Prompts in flight at once (defaults to
+                LLM_BATCH_CONCURRENCY).
+            cache_ttl, bypass_cache, hedge: As for generate_text.
+
+        Returns:
+            One entry per prompt, in order: the generated text, or the
+            exception raised for that prompt.
+        """
+        semaphore = asyncio.Semaphore(
+            max(1, max_concurrency or LLM_BATCH_CONCURRENCY)
+        )
+
+        async def run(prompt: str) -> str:
+            async with semaphore:
+                return await self._generate(
+                    prompt,
+                    max_tokens,
+                    temperature,
+                    cache_ttl,
+                    bypass_cache,
+                    hedge,
+                    notify_failure=False,
+                )
+
+        unique_prompts = list(dict.fromkeys(prompts))
+        outcomes = await asyncio.gather(
+            *(run(prompt) for prompt in unique_prompts),
+            return_exceptions=True,
         )
+        by_prompt = dict(zip(unique_prompts, outcomes))
+        results = [by_prompt[prompt] for prompt in prompts]
+
+        failures = [r for r in outcomes if isinstance(r, BaseException)]
+        for failure in failures:
+            if not isinstance(failure, Exception):
+                raise failure  # e.g. cancellation
+        if failures:
+            logger.error(
+                f"Batch generation: {len(failures)}/{len(unique_prompts)} "
+                f"prompts failed."
+            )
+            await send_notification(
+                f"🆘 LLM Batch Failures 🆘\n\n"
+                f"{len(failures)} of {len(unique_prompts)} prompts failed.\n"
+                f"Last Error: `{str(failures[-1])[:200]}...`"
+            )
+        return results
+
+    async def generate_text_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        stop_when: Optional[Callable[[str], bool]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streams generated text chunk by chunk.
+
+        Providers are tried in health-ranked order. A provider that fails
+        before sending its first chunk is skipped for the next one; once
+        text has been yielded the stream cannot switch providers, so a
+        later failure raises OrchestratorError.
+
+        Args:
+            prompt: The input prompt.
+            max_tokens: Maximum number of tokens to generate.
+            temperature: Sampling temperature.
+            stop_when: Called with the text received so far after each
+                chunk; returning True closes the provider stream early.
+
+        Yields:
+            Text chunks as the provider produces them.
+
+        Raises:
+            OrchestratorError: If every provider fails before streaming,
+                or the stream breaks part way through.
+        """
+        last_exception = None
+        for provider, model_name in self._ranked_preference():
+            provider_key = f"{provider}:{model_name}"
+            provider_instance = self.providers.get(provider_key)
+            if provider_instance is None:
+                continue
+            if not self.health.allow_request(provider_key):
+                continue
+            limiter = self._rate_limiter(provider)
+            received = []
+            started = time.monotonic()
+            try:
+                logger.info(f"Streaming generation with: {provider_key}")
+                async with limiter.slot(
+                    estimate_tokens(prompt, max_tokens, provider)
+                ):
+                    stream = self._stream_completion(
+                        provider_instance, prompt, max_tokens, temperature
+                    )
+                    try:
+                        async for chunk in stream:
+                            received.append(chunk)
+                            yield chunk
+                            if stop_when and stop_when("".join(received)):
+                                logger.debug(
+                                    f"Stopping {provider_key} stream early."
+                                )
+                                break
+                    finally:
+                        await stream.aclose()
+                self.health.record_success(
+                    provider_key, time.monotonic() - started
+                )
+                return
+            except (asyncio.CancelledError, GeneratorExit):
+                # The consumer stopped iterating; not a provider failure
+                self.health.release_probe(provider_key)
+                raise
+            except Exception as e:
+                self.health.record_failure(provider_key)
+                if received:
+                    raise OrchestratorError(
+                        f"Stream from {provider_key} failed after "
+                        f"{len(received)} chunks: {e}"
+                    ) from e
+                last_exception = e
+                logger.error(
+                    f"Failed to start stream with {provider_key}: {e}"
+                )
+
+        final_error_msg = "All configured LLM providers failed to stream."
+        logger.critical(final_error_msg)
         raise OrchestratorError(final_error_msg) from last_exception
 
+    async def generate_json(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+    ) -> Any:
+        """
+        Streams a response and parses the first JSON object in it.
+
+        The stream is closed as soon as the object's closing brace
+        arrives, so trailing text is never generated.
+
+        Returns:
+            The parsed JSON object.
+
+        Raises:
+            OrchestratorError: If generation fails.
+            json.JSONDecodeError: If no complete, valid JSON object was
+                received.
+        """
+        detector = JsonObjectDetector()
+        received = []
+        async for chunk in self.generate_text_stream(
+            prompt,
+            max_tokens,
+            temperature,
+            stop_when=lambda _: detector.complete,
+        ):
+            received.append(chunk)
+            detector.feed(chunk)
+        return json.loads(detector.result or "".join(received))
+
+
+# --- Shared Orchestrators --- #
+_orchestrators: Dict[str, LLMOrchestrator] = {}
+_orchestrators_lock = threading.Lock()
+
+
+def get_orchestrator(
+    primary_model: str,
+    fallback_models: Optional[List[str]] = None,
+    config: Optional[Dict[str, Any]] = None,
+    enable_auto_discovery: bool = True,
+    enable_fallback_notifications: bool = True,
+) -> LLMOrchestrator:
+    """Returns a process-wide LLMOrchestrator for these settings.
+
+    Services that ask for the same models and config share one instance,
+    and with it provider health statistics and clients.
+
+    Raises:
+        ValueError: If no provider could be configured (not cached).
+    """
+    key = json.dumps(
+        [
+            primary_model,
+            list(fallback_models or []),
+            config or {},
+            enable_auto_discovery,
+            enable_fallback_notifications,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    with _orchestrators_lock:
+        orchestrator = _orchestrators.get(key)
+        if orchestrator is None:
+            orchestrator = LLMOrchestrator(
+                primary_model=primary_model,
+                fallback_models=fallback_models,
+                config=config,
+                enable_auto_discovery=enable_auto_discovery,
+                enable_fallback_notifications=enable_fallback_notifications,
+            )
+            _orchestrators[key] = orchestrator
+        return orchestrator
+
 
 # --- Example Usage --- #
 async def main():
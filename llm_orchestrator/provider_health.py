@@ -0,0 +1,243 @@
+"""
+Per-provider health tracking for LLMOrchestrator.
+
+Each provider/model gets a circuit breaker and rolling call statistics:
+
+- CLOSED: calls flow normally. `failure_threshold` consecutive failures
+  open the circuit.
+- OPEN: calls are skipped without touching the network until
+  `recovery_timeout` seconds have passed.
+- HALF_OPEN: one probe call is let through. Success closes the circuit,
+  failure opens it again for another `recovery_timeout`.
+
+ProviderHealthTracker.rank() turns the configured preference list into the
+order to try on the next call: healthy providers first (the ones with
+latency data fastest first), then degraded or probing ones, with open
+circuits left out.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(
+    os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", 3)
+)
+LLM_CIRCUIT_RECOVERY_SECONDS = float(
+    os.getenv("LLM_CIRCUIT_RECOVERY_SECONDS", 60)
+)
+LLM_HEALTH_WINDOW = int(os.getenv("LLM_HEALTH_WINDOW", 20))
+# Error rate over the window above which a closed provider is "degraded"
+LLM_DEGRADED_ERROR_RATE = float(os.getenv("LLM_DEGRADED_ERROR_RATE", 0.5))
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Circuit breaker and rolling statistics for one provider/model."""
+
+    def __init__(
+        self,
+        failure_threshold: int = LLM_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = LLM_CIRCUIT_RECOVERY_SECONDS,
+        window: int = LLM_HEALTH_WINDOW,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        # True for success, False for failure, most recent last
+        self.outcomes: deque = deque(maxlen=window)
+        # Latencies of recent successful calls, for percentile deadlines
+        self.latencies: deque = deque(maxlen=window)
+        self.latency_ewma: Optional[float] = None
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """Returns the q-quantile (0..1) of recent latencies, if any."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def current_state(self, now: Optional[float] = None) -> CircuitState:
+        """Returns the state, moving OPEN to HALF_OPEN once it has cooled."""
+        now = time.monotonic() if now is None else now
+        if (
+            self.state is CircuitState.OPEN
+            and now - self.opened_at >= self.recovery_timeout
+        ):
+            self.state = CircuitState.HALF_OPEN
+            self.probe_in_flight = False
+        return self.state
+
+    def allow_request(self, now: Optional[float] = None) -> bool:
+        """Returns True if a call may be made now (claims the probe slot)."""
+        state = self.current_state(now)
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self, latency: float):
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.state = CircuitState.CLOSED
+        self.latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += LATENCY_EWMA_ALPHA * (
+                latency - self.latency_ewma
+            )
+
+    def record_failure(self, now: Optional[float] = None):
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic() if now is None else now
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.current_state().value,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ewma": self.latency_ewma,
+            "samples": len(self.outcomes),
+        }
+
+
+class ProviderHealthTracker:
+    """Holds a ProviderHealth per provider key and ranks providers."""
+
+    def __init__(
+        self,
+        failure_threshold: int = LLM_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = LLM_CIRCUIT_RECOVERY_SECONDS,
+        window: int = LLM_HEALTH_WINDOW,
+        degraded_error_rate: float = LLM_DEGRADED_ERROR_RATE,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.window = window
+        self.degraded_error_rate = degraded_error_rate
+        self._lock = threading.Lock()
+        self._health: Dict[str, ProviderHealth] = {}
+
+    def get(self, provider_key: str) -> ProviderHealth:
+        with self._lock:
+            health = self._health.get(provider_key)
+            if health is None:
+                health = ProviderHealth(
+                    self.failure_threshold,
+                    self.recovery_timeout,
+                    self.window,
+                )
+                self._health[provider_key] = health
+            return health
+
+    def allow_request(self, provider_key: str) -> bool:
+        health = self.get(provider_key)
+        with self._lock:
+            return health.allow_request()
+
+    def record_success(self, provider_key: str, latency: float):
+        health = self.get(provider_key)
+        with self._lock:
+            health.record_success(latency)
+
+    def release_probe(self, provider_key: str):
+        """Frees a half-open probe slot whose call was cancelled."""
+        health = self.get(provider_key)
+        with self._lock:
+            health.probe_in_flight = False
+
+    def latency_percentile(
+        self, provider_key: str, q: float
+    ) -> Optional[float]:
+        health = self.get(provider_key)
+        with self._lock:
+            return health.latency_percentile(q)
+
+    def record_failure(self, provider_key: str):
+        health = self.get(provider_key)
+        with self._lock:
+            previous = health.state
+            health.record_failure()
+            opened = (
+                health.state is CircuitState.OPEN
+                and previous is not CircuitState.OPEN
+            )
+        if opened:
+            logger.warning(
+                f"Circuit opened for {provider_key} after "
+                f"{health.consecutive_failures} consecutive failures; "
+                f"skipping it for {self.recovery_timeout}s."
+            )
+
+    def rank(self, preference: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Orders `preference` by health, leaving out open circuits.
+
+        Healthy providers come first; among them, those with latency data
+        are tried fastest first, then the rest in configured order.
+        Degraded and half-open providers follow in configured order.
+        """
+        healthy_timed = []
+        healthy_untimed = []
+        degraded = []
+        with self._lock:
+            for position, (provider, model_name) in enumerate(preference):
+                health = self._health.get(f"{provider}:{model_name}")
+                if health is None:
+                    healthy_untimed.append((position, provider, model_name))
+                    continue
+                state = health.current_state()
+                if state is CircuitState.OPEN:
+                    continue
+                entry = (position, provider, model_name)
+                if (
+                    state is CircuitState.HALF_OPEN
+                    or health.error_rate >= self.degraded_error_rate
+                ):
+                    degraded.append(entry)
+                elif health.latency_ewma is not None:
+                    healthy_timed.append((health.latency_ewma, entry))
+                else:
+                    healthy_untimed.append(entry)
+        ordered = [entry for _, entry in sorted(healthy_timed)]
+        ordered += healthy_untimed + degraded
+        return [(provider, model_name) for _, provider, model_name in ordered]
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                key: health.snapshot() for key, health in self._health.items()
+            }
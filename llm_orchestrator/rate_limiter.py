@@ -0,0 +1,270 @@
+"""
+Client-side rate limiting for LLM providers.
+
+Each provider gets one ProviderRateLimiter per process (shared by every
+orchestrator) combining:
+
+- a requests-per-minute token bucket,
+- a tokens-per-minute token bucket, charged with an estimate of the
+  prompt plus completion tokens of each call,
+- a cap on concurrent in-flight requests, and
+- a shared pause set from a provider's Retry-After header, so one 429
+  holds back every caller instead of each discovering it separately.
+
+Callers wait in FIFO order; queue depth and wait time are exposed through
+`metrics()`.
+"""
+
+import asyncio
+import email.utils
+import functools
+import logging
+import math
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size estimate used when a provider has no better one
+CHARS_PER_TOKEN = 4
+# Average characters per token of each provider's tokenizer on English
+# prose, for providers without a local tokenizer
+CHARS_PER_TOKEN_BY_PROVIDER = {
+    "anthropic": 3.5,
+    "gemini": 4.0,
+    "mistral": 3.7,
+}
+# OpenAI-compatible providers; counted with tiktoken when it is installed
+# (exact for OpenAI, close for DeepSeek and Grok)
+TIKTOKEN_PROVIDERS = {"openai", "deepseek", "grok"}
+
+
+@functools.lru_cache(maxsize=1)
+def _tiktoken_encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # Encoding files are fetched on first use
+        logger.debug(f"tiktoken encoding unavailable: {e}")
+        return None
+
+
+def count_tokens(text: str, provider: Optional[str] = None) -> int:
+    """Prompt tokens of `text` for `provider` (estimated if no tokenizer)."""
+    if not text:
+        return 0
+    if provider in TIKTOKEN_PROVIDERS:
+        encoding = _tiktoken_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text))
+    chars_per_token = CHARS_PER_TOKEN_BY_PROVIDER.get(
+        provider, CHARS_PER_TOKEN
+    )
+    return math.ceil(len(text) / chars_per_token)
+
+
+def estimate_tokens(
+    prompt: str, max_tokens: int, provider: Optional[str] = None
+) -> int:
+    """Upper-bound token estimate for one call (prompt + completion)."""
+    return count_tokens(prompt, provider) + max(0, int(max_tokens))
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Reads Retry-After (seconds or HTTP date) from an SDK error."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = email.utils.parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class TokenBucket:
+    """Continuously refilling bucket of `capacity` tokens per `period`."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class ProviderRateLimiter:
+    """Async rate and concurrency governor for one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_in_flight: int = 0,
+    ):
+        """
+        Args:
+            name: Provider name, for logs and metrics.
+            requests_per_minute: Request budget; 0 disables the limit.
+            tokens_per_minute: Token budget; 0 disables the limit.
+            max_in_flight: Concurrent request cap; 0 disables the limit.
+        """
+        self.name = name
+        self.request_bucket = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        )
+        self.max_in_flight = max_in_flight
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.queued = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.wait_seconds_total = 0.0
+        # asyncio primitives are bound to the loop that first uses them
+        self._loop_state: "weakref.WeakKeyDictionary[Any, tuple]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._state_lock = threading.Lock()
+
+    def _primitives(self):
+        loop = asyncio.get_running_loop()
+        with self._state_lock:
+            state = self._loop_state.get(loop)
+            if state is None:
+                semaphore = (
+                    asyncio.Semaphore(self.max_in_flight)
+                    if self.max_in_flight
+                    else None
+                )
+                state = (asyncio.Lock(), semaphore)
+                self._loop_state[loop] = state
+            return state
+
+    def pause(self, seconds: float):
+        """Holds back all callers for `seconds` (e.g. from Retry-After)."""
+        self.rate_limited += 1
+        self.paused_until = max(
+            self.paused_until, time.monotonic() + max(0.0, seconds)
+        )
+        logger.warning(
+            f"{self.name} asked to back off; pausing requests for "
+            f"{seconds:.1f}s."
+        )
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0):
+        """Waits for rate budget and an in-flight slot, then holds it."""
+        bucket_lock, semaphore = self._primitives()
+        started = time.monotonic()
+        self.queued += 1
+        acquired = False
+        try:
+            # FIFO admission through the buckets
+            async with bucket_lock:
+                while True:
+                    now = time.monotonic()
+                    delay = max(0.0, self.paused_until - now)
+                    if self.request_bucket:
+                        delay = max(
+                            delay, self.request_bucket.delay_for(1, now)
+                        )
+                    if self.token_bucket:
+                        delay = max(
+                            delay,
+                            self.token_bucket.delay_for(estimated_tokens, now),
+                        )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                if self.request_bucket:
+                    self.request_bucket.take(1)
+                if self.token_bucket:
+                    self.token_bucket.take(estimated_tokens)
+            if semaphore is not None:
+                await semaphore.acquire()
+            acquired = True
+        finally:
+            self.queued -= 1
+            waited = time.monotonic() - started
+            self.wait_seconds_total += waited
+            if waited > 0.01:
+                self.throttled += 1
+                logger.debug(f"Waited {waited:.2f}s for a {self.name} slot.")
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if acquired and semaphore is not None:
+                semaphore.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "throttled": self.throttled,
+            "rate_limited": self.rate_limited,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "paused_for": round(
+                max(0.0, self.paused_until - time.monotonic()), 3
+            ),
+        }
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    requests_per_minute: int = 0,
+    tokens_per_minute: int = 0,
+    max_in_flight: int = 0,
+) -> ProviderRateLimiter:
+    """Returns the process-wide limiter for `provider`, creating it once."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderRateLimiter(
+                provider, requests_per_minute, tokens_per_minute, max_in_flight
+            )
+            _limiters[provider] = limiter
+        return limiter
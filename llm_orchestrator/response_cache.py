@@ -0,0 +1,266 @@
+"""
+Response cache for LLMOrchestrator.generate_text.
+
+Identical prompts are sent to the same provider/model again and again
+(lifecycle evolution prompts, error analysis of a recurring fault, test
+runs). ResponseCache stores completions keyed on (provider, model, prompt
+hash, max_tokens, temperature) in two tiers:
+
+- an in-memory LRU of the most recently used entries, and
+- an optional SQLite table that survives restarts and is shared by every
+  orchestrator in the process (and by later processes).
+
+Entries carry an absolute expiry time; expired entries count as misses and
+are removed when seen.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LLM_RESPONSE_CACHE_ENABLED = (
+    os.getenv("LLM_RESPONSE_CACHE_ENABLED", "False").lower() == "true"
+)
+LLM_RESPONSE_CACHE_DB = os.getenv(
+    "LLM_RESPONSE_CACHE_DB",
+    os.path.join(PROJECT_ROOT, "data", "llm_response_cache.db"),
+)
+LLM_RESPONSE_CACHE_MAX_ENTRIES = int(
+    os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", 512)
+)
+LLM_RESPONSE_CACHE_TTL = float(os.getenv("LLM_RESPONSE_CACHE_TTL", 86400))
+
+
+def make_cache_key(
+    provider: str,
+    model_name: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+) -> str:
+    """Builds the cache key for one provider call."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return (
+        f"{provider}:{model_name}:{prompt_hash}:"
+        f"{int(max_tokens)}:{float(temperature):.4f}"
+    )
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of LLM completions."""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_RESPONSE_CACHE_MAX_ENTRIES,
+        db_path: Optional[str] = LLM_RESPONSE_CACHE_DB,
+        default_ttl: float = LLM_RESPONSE_CACHE_TTL,
+    ):
+        """
+        Args:
+            max_entries: Entries kept in the in-memory tier.
+            db_path: SQLite file for the persistent tier, or None to keep
+                the cache in memory only.
+            default_ttl: Seconds an entry stays valid when `set` is called
+                without a ttl. 0 or less means entries never expire.
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.default_ttl = default_ttl
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # key -> (response, expires_at), least recently used first
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        try:
+            db_dir = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_expires "
+                "ON llm_response_cache (expires_at)"
+            )
+            self._conn.execute(
+                "DELETE FROM llm_response_cache "
+                "WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(
+                f"Failed to open LLM response cache at {db_path}: {e}. "
+                f"Using the in-memory tier only."
+            )
+            self._conn = None
+
+    # --- Public API --- #
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for `key`, or None on a miss."""
+        hit = self.get_first([key])
+        return hit[1] if hit else None
+
+    def get_first(self, keys: Iterable[str]) -> Optional[Tuple[str, str]]:
+        """Returns (key, response) for the first of `keys` that is cached.
+
+        Counts as one lookup however many keys are tried, so hit/miss
+        counters reflect calls rather than candidate providers.
+        """
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                response = self._lookup(key, now)
+                if response is not None:
+                    self.hits += 1
+                    return key, response
+            self.misses += 1
+            return None
+
+    def set(self, key: str, response: str, ttl: Optional[float] = None):
+        """Stores `response` under `key` for `ttl` seconds."""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl and ttl > 0 else None
+        with self._lock:
+            self._remember(key, response, expires_at)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_response_cache "
+                    "(cache_key, response, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, now, expires_at),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist LLM cache entry: {e}")
+
+    def invalidate(self, key: str):
+        """Removes `key` from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "DELETE FROM llm_response_cache WHERE cache_key = ?",
+                        (key,),
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to delete LLM cache entry: {e}")
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.misses = self.disk_hits = 0
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM llm_response_cache")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to clear LLM response cache: {e}")
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the in-memory size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Internals --- #
+    def _remember(self, key: str, response: str, expires_at: Optional[float]):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, now: float) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            response, expires_at = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                return response
+            del self._memory[key]
+
+        entry = self._db_get(key, now)
+        if entry is not None:
+            self._remember(key, *entry)
+            self.disk_hits += 1
+            return entry[0]
+        return None
+
+    def _db_get(
+        self, key: str, now: float
+    ) -> Optional[Tuple[str, Optional[float]]]:
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM llm_response_cache "
+                "WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM llm_response_cache WHERE cache_key = ?",
+                    (key,),
+                )
+                self._conn.commit()
+                return None
+            return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read LLM cache entry: {e}")
+            return None
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
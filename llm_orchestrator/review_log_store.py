@@ -0,0 +1,417 @@
+"""
+Storage backends for ReviewLogger.
+
+ReviewLogger entries (prompts, feedback, validations, summaries) belong to
+a session and an iteration. Two backends are available:
+
+- FileReviewLogStore: the original layout, one JSON file per entry under
+  storage_dir/<session_id>/<category>/<entry_id>.json. Every query lists
+  and parses a session's files.
+- SQLiteReviewLogStore: a single review_logs table indexed on
+  (session_id, category, iteration, timestamp), plus an index on
+  summary confidence, so latest/best prompt lookups are index seeks.
+
+`migrate_file_logs` imports an existing file tree into the SQLite store;
+run this module to migrate from the command line:
+
+    python -m llm_orchestrator.review_log_store --storage-dir <dir>
+"""
+
+import abc
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+REVIEW_LOG_BACKEND = os.getenv("REVIEW_LOG_BACKEND", "sqlite")
+REVIEW_LOG_DB_NAME = "review_logs.db"
+
+CATEGORIES = ["prompts", "feedback", "validations", "summaries"]
+
+
+def _sort_key(entry: Dict[str, Any]):
+    return (entry.get("iteration", 0), entry.get("timestamp", ""))
+
+
+class ReviewLogStore(abc.ABC):
+    """Entries of ReviewLogger, grouped by session and category."""
+
+    @abc.abstractmethod
+    def save(
+        self,
+        session_id: str,
+        category: str,
+        entry_id: str,
+        data: Dict[str, Any],
+    ) -> None:
+        """Stores one entry (replacing an entry with the same ID)."""
+
+    @abc.abstractmethod
+    def has_session(self, session_id: str) -> bool:
+        """True if any entry was logged for the session."""
+
+    @abc.abstractmethod
+    def entries(
+        self,
+        session_id: str,
+        category: str,
+        iteration: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Entries of one category, by iteration then timestamp."""
+
+    @abc.abstractmethod
+    def entry(
+        self, session_id: str, category: str, entry_id: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """One entry by ID, or None."""
+
+    @abc.abstractmethod
+    def latest(
+        self, session_id: str, category: str
+    ) -> Optional[Dict[str, Any]]:
+        """The entry with the highest iteration (then timestamp)."""
+
+    @abc.abstractmethod
+    def best_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The summary with the highest confidence score (earliest wins)."""
+
+    def close(self) -> None:
+        pass
+
+
+class FileReviewLogStore(ReviewLogStore):
+    """One JSON file per entry, as written by earlier versions."""
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+        os.makedirs(storage_dir, exist_ok=True)
+
+    def _category_dir(self, session_id: str, category: str) -> str:
+        return os.path.join(self.storage_dir, session_id, category)
+
+    def save(self, session_id, category, entry_id, data) -> None:
+        category_dir = self._category_dir(session_id, category)
+        os.makedirs(category_dir, exist_ok=True)
+        entry_path = os.path.join(category_dir, f"{entry_id}.json")
+        try:
+            with open(entry_path, "w") as f:
+                json.dump(data, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving log entry {entry_id}: {str(e)}")
+
+    def has_session(self, session_id: str) -> bool:
+        return os.path.isdir(os.path.join(self.storage_dir, session_id))
+
+    def entries(self, session_id, category, iteration=None):
+        category_dir = self._category_dir(session_id, category)
+        if not os.path.isdir(category_dir):
+            return []
+        loaded = []
+        for log_file in os.listdir(category_dir):
+            if not log_file.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(category_dir, log_file), "r") as f:
+                    loaded.append(json.load(f))
+            except Exception as e:
+                logger.error(f"Error loading log file {log_file}: {str(e)}")
+        if iteration is not None:
+            loaded = [e for e in loaded if e.get("iteration") == iteration]
+        loaded.sort(key=_sort_key)
+        return loaded
+
+    def entry(self, session_id, category, entry_id):
+        if not entry_id:
+            return None
+        entry_path = os.path.join(
+            self._category_dir(session_id, category), f"{entry_id}.json"
+        )
+        try:
+            with open(entry_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading log entry {entry_id}: {str(e)}")
+            return None
+
+    def latest(self, session_id, category):
+        loaded = self.entries(session_id, category)
+        return max(loaded, key=_sort_key) if loaded else None
+
+    def best_summary(self, session_id):
+        summaries = self.entries(session_id, "summaries")
+        if not summaries:
+            return None
+        return max(summaries, key=lambda s: s.get("confidence_score", 0))
+
+
+class SQLiteReviewLogStore(ReviewLogStore):
+    """All entries in one indexed SQLite table."""
+
+    # Both are answered from an index without sorting
+    LATEST_SQL = (
+        "SELECT data FROM review_logs "
+        "WHERE session_id = ? AND category = ? "
+        "ORDER BY iteration DESC, timestamp DESC LIMIT 1"
+    )
+    BEST_SQL = (
+        "SELECT data FROM review_logs "
+        "WHERE session_id = ? AND category = ? "
+        "ORDER BY confidence_score DESC, iteration, timestamp LIMIT 1"
+    )
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS review_logs (
+                id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                category TEXT NOT NULL,
+                iteration INTEGER NOT NULL DEFAULT 0,
+                timestamp TEXT NOT NULL DEFAULT '',
+                confidence_score REAL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_review_logs_session
+                ON review_logs (session_id, category, iteration, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_review_logs_confidence
+                ON review_logs (
+                    session_id, category, confidence_score DESC,
+                    iteration, timestamp
+                );
+            """)
+        self._conn.commit()
+
+    @staticmethod
+    def _row(session_id, category, entry_id, data):
+        confidence = data.get("confidence_score")
+        return (
+            entry_id,
+            session_id,
+            category,
+            data.get("iteration") or 0,
+            data.get("timestamp") or "",
+            confidence if isinstance(confidence, (int, float)) else None,
+            json.dumps(data),
+        )
+
+    def save(self, session_id, category, entry_id, data) -> None:
+        self.save_many([(session_id, category, entry_id, data)])
+
+    def save_many(self, rows, replace: bool = True) -> int:
+        """Stores (session_id, category, entry_id, data) tuples at once.
+
+        With replace=False, entries whose ID already exists are kept.
+        Returns the number of rows written.
+        """
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        try:
+            with self._lock, self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    f"{verb} INTO review_logs (id, session_id, category, "
+                    "iteration, timestamp, confidence_score, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._row(*row) for row in rows],
+                )
+                return self._conn.total_changes - before
+        except sqlite3.Error as e:
+            logger.error(f"Error saving review log entries: {e}")
+            return 0
+
+    def _query(self, sql: str, params) -> List[Dict[str, Any]]:
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading review logs: {e}")
+            return []
+        return [json.loads(row[0]) for row in rows]
+
+    def has_session(self, session_id: str) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM review_logs WHERE session_id = ? LIMIT 1",
+                    (session_id,),
+                ).fetchone()
+                is not None
+            )
+
+    def entries(self, session_id, category, iteration=None):
+        if iteration is None:
+            return self._query(
+                "SELECT data FROM review_logs "
+                "WHERE session_id = ? AND category = ? "
+                "ORDER BY iteration, timestamp",
+                (session_id, category),
+            )
+        return self._query(
+            "SELECT data FROM review_logs "
+            "WHERE session_id = ? AND category = ? AND iteration = ? "
+            "ORDER BY timestamp",
+            (session_id, category, iteration),
+        )
+
+    def entry(self, session_id, category, entry_id):
+        if not entry_id:
+            return None
+        found = self._query(
+            "SELECT data FROM review_logs "
+            "WHERE id = ? AND session_id = ? AND category = ?",
+            (entry_id, session_id, category),
+        )
+        return found[0] if found else None
+
+    def latest(self, session_id, category):
+        found = self._query(self.LATEST_SQL, (session_id, category))
+        return found[0] if found else None
+
+    def best_summary(self, session_id):
+        found = self._query(self.BEST_SQL, (session_id, "summaries"))
+        return found[0] if found else None
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM review_logs LIMIT 1"
+                ).fetchone()
+                is None
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def has_file_logs(storage_dir: str) -> bool:
+    """True if `storage_dir` holds a per-file review log tree."""
+    if not os.path.isdir(storage_dir):
+        return False
+    return any(
+        os.path.isdir(os.path.join(storage_dir, name, category))
+        for name in os.listdir(storage_dir)
+        for category in CATEGORIES
+    )
+
+
+def migrate_file_logs(
+    storage_dir: str, store: SQLiteReviewLogStore
+) -> Dict[str, int]:
+    """Imports storage_dir/<session>/<category>/*.json into `store`.
+
+    Entries already in the store are left untouched, so the migration can
+    be re-run safely. The files themselves are not removed.
+
+    Returns:
+        Counts of sessions, imported entries, skipped (already present)
+        entries and unreadable files
+    """
+    counts = {"sessions": 0, "imported": 0, "skipped": 0, "errors": 0}
+    for session_id in sorted(os.listdir(storage_dir)):
+        if not os.path.isdir(os.path.join(storage_dir, session_id)):
+            continue
+        rows = []
+        for category in CATEGORIES:
+            category_dir = os.path.join(storage_dir, session_id, category)
+            if not os.path.isdir(category_dir):
+                continue
+            for log_file in os.listdir(category_dir):
+                if not log_file.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(category_dir, log_file)) as f:
+                        data = json.load(f)
+                except Exception as e:
+                    logger.error(f"Skipping log file {log_file}: {e}")
+                    counts["errors"] += 1
+                    continue
+                entry_id = data.get("id") or log_file[: -len(".json")]
+                rows.append((session_id, category, entry_id, data))
+        if not rows:
+            continue
+        written = store.save_many(rows, replace=False)
+        counts["sessions"] += 1
+        counts["imported"] += written
+        counts["skipped"] += len(rows) - written
+    logger.info(
+        f"Migrated review logs from {storage_dir}: "
+        f"{counts['imported']} entries from {counts['sessions']} sessions "
+        f"({counts['skipped']} already present, {counts['errors']} errors)"
+    )
+    return counts
+
+
+def create_review_log_store(
+    storage_dir: str, backend: str = REVIEW_LOG_BACKEND
+) -> ReviewLogStore:
+    """Builds the configured backend ("sqlite" or "files").
+
+    A new SQLite store next to an existing file tree imports it first. If
+    the database cannot be opened, the file backend is used instead.
+    """
+    backend = (backend or "sqlite").lower()
+    if backend == "files":
+        return FileReviewLogStore(storage_dir)
+    if backend != "sqlite":
+        raise ValueError(f"Unsupported review log backend: {backend}")
+
+    db_path = os.path.join(storage_dir, REVIEW_LOG_DB_NAME)
+    try:
+        store = SQLiteReviewLogStore(db_path)
+    except sqlite3.Error as e:
+        logger.error(
+            f"Failed to open review log database at {db_path}: {e}. "
+            f"Falling back to per-file review logs."
+        )
+        return FileReviewLogStore(storage_dir)
+    if store.is_empty() and has_file_logs(storage_dir):
+        migrate_file_logs(storage_dir, store)
+    return store
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Import per-file ReviewLogger entries into SQLite."
+    )
+    parser.add_argument(
+        "--storage-dir",
+        required=True,
+        help="ReviewLogger storage directory holding <session>/<category>/",
+    )
+    parser.add_argument(
+        "--db-path",
+        help=f"SQLite file (default: <storage-dir>/{REVIEW_LOG_DB_NAME})",
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.storage_dir):
+        print(f"No such directory: {args.storage_dir}", file=sys.stderr)
+        return 1
+    logging.basicConfig(level=logging.INFO)
+    store = SQLiteReviewLogStore(
+        args.db_path or os.path.join(args.storage_dir, REVIEW_LOG_DB_NAME)
+    )
+    try:
+        counts = migrate_file_logs(args.storage_dir, store)
+    finally:
+        store.close()
+    print(json.dumps(counts))
+    return 1 if counts["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,17 @@ during the artist prompt creation process, enabling auditability and rollback.
 """
 
 import os
-import json
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from .review_log_store import (
+    CATEGORIES,
+    REVIEW_LOG_BACKEND,
+    ReviewLogStore,
+    create_review_log_store,
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,14 +31,18 @@ class ReviewLogger:
     Logs and retrieves review information during the artist prompt creation
         process.
 
-    This class saves all intermediate prompt versions, LLM feedbacks,         and validation
-    results, organized by session ID and iteration number.
+    This class saves all intermediate prompt versions, LLM feedbacks,
+    and validation results, organized by session ID and iteration number,
+    in a ReviewLogStore (an indexed SQLite table by default; see
+    review_log_store.py).
     """
 
     def __init__(
         self,
         storage_dir: str = "/tmp/llm_orchestrator/reviews",
         enable_detailed_logging: bool = True,
+        store: Optional[ReviewLogStore] = None,
+        backend: Optional[str] = None,
     ):
         """
         Initialize a new review logger.
@@ -40,6 +50,8 @@ class ReviewLogger:
         Args:
             storage_dir: Directory for storing review logs
             enable_detailed_logging: Whether to log detailed information
+            store: Review log store to use (built from `backend` if None)
+            backend: "sqlite" or "files" (REVIEW_LOG_BACKEND if None)
         """
         self.storage_dir = storage_dir
         self.enable_detailed_logging = enable_detailed_logging
@@ -47,6 +59,12 @@ class ReviewLogger:
         # Create storage directory if it doesn't exist
         os.makedirs(storage_dir, exist_ok=True)
 
+        if store is None:
+            store = create_review_log_store(
+                storage_dir, backend or REVIEW_LOG_BACKEND
+            )
+        self.store = store
+
         logger.info(
             f"Initialized review logger with storage directory: {storage_dir}"
         )
@@ -243,42 +261,18 @@ class ReviewLogger:
         Returns:
             A dictionary of log categories and their entries
         """
-        session_dir = os.path.join(self.storage_dir, session_id)
-        if not os.path.exists(session_dir):
+        if not self.store.has_session(session_id):
             logger.warning(f"No logs found for session {session_id}")
             return {}
 
         logs = {}
-        categories = ["prompts", "feedback", "validations", "summaries"]
+        categories = CATEGORIES
 
+        # Entries come back sorted by iteration and timestamp
         for category in categories:
-            category_dir = os.path.join(session_dir, category)
-            if os.path.exists(category_dir):
-                logs[category] = []
-
-                # Get all log files in the category
-                log_files = [
-                    f for f in os.listdir(category_dir) if f.endswith(".json")
-                ]
-
-                # Load each log file
-                for log_file in log_files:
-                    try:
-                        log_path = os.path.join(category_dir, log_file)
-                        with open(log_path, "r") as f:
-                            log_data = json.load(f)
-
-                        logs[category].append(log_data)
-                    except Exception as e:
-                        logger.error(
-                            f"Error loading log file {log_file}: {str(e)}"
-                        )
-
-        # Sort logs by iteration and timestamp
-        for category in logs:
-            logs[category].sort(
-                key=lambda x: (x.get("iteration", 0), x.get("timestamp", ""))
-            )
+            entries = self.store.entries(session_id, category)
+            if entries:
+                logs[category] = entries
 
         logger.info(
             f"Retrieved {sum(len(logs.get(c,                 [])) for c in categories)} logs for session {session_id}"
@@ -298,22 +292,13 @@ class ReviewLogger:
         Returns:
             A dictionary with iteration history
         """
-        # Get all logs for the session
-        all_logs = self.get_logs_by_session(session_id)
+        # Get the summaries (of one iteration, if specified)
+        summaries = self.store.entries(session_id, "summaries", iteration)
 
         # If no logs, return empty history
-        if not all_logs:
+        if not summaries:
             return {"iterations": []}
 
-        # Extract summaries
-        summaries = all_logs.get("summaries", [])
-
-        # Filter by iteration if specified
-        if iteration is not None:
-            summaries = [
-                s for s in summaries if s.get("iteration") == iteration
-            ]
-
         # Build iteration history
         iterations = []
         for summary in summaries:
@@ -323,29 +308,12 @@ class ReviewLogger:
             validation_id = summary.get("validation_id")
 
             # Find corresponding prompt, feedback, and validation
-            prompt_data = next(
-                (
-                    p
-                    for p in all_logs.get("prompts", [])
-                    if p.get("id") == prompt_id
-                ),
-                None,
-            )
-            feedback_data = next(
-                (
-                    f
-                    for f in all_logs.get("feedback", [])
-                    if f.get("id") == feedback_id
-                ),
-                None,
+            prompt_data = self.store.entry(session_id, "prompts", prompt_id)
+            feedback_data = self.store.entry(
+                session_id, "feedback", feedback_id
             )
-            validation_data = next(
-                (
-                    v
-                    for v in all_logs.get("validations", [])
-                    if v.get("id") == validation_id
-                ),
-                None,
+            validation_data = self.store.entry(
+                session_id, "validations", validation_id
             )
 
             # Build iteration data
@@ -375,9 +343,12 @@ class ReviewLogger:
         # Sort iterations by iteration number
         iterations.sort(key=lambda x: x.get("iteration", 0))
 
-        logger.info(
-            f"Retrieved history for session {session_id}, {'iteration ' +                 str(iteration) if iteration is not None else 'all iterations'}"
+        scope = (
+            f"iteration {iteration}"
+            if iteration is not None
+            else "all iterations"
         )
+        logger.info(f"Retrieved history for session {session_id}, {scope}")
         return {"iterations": iterations}
 
     def get_latest_prompt(self, session_id: str) -> Optional[Dict[str, Any]]:
@@ -390,19 +361,7 @@ class ReviewLogger:
         Returns:
             The latest prompt data, or None if not found
         """
-        # Get all logs for the session
-        all_logs = self.get_logs_by_session(session_id)
-
-        # If no logs, return None
-        if not all_logs or "prompts" not in all_logs:
-            return None
-
-        # Get prompts and sort by iteration (descending)
-        prompts = all_logs["prompts"]
-        prompts.sort(key=lambda x: x.get("iteration", 0), reverse=True)
-
-        # Return the first (latest) prompt
-        return prompts[0] if prompts else None
+        return self.store.latest(session_id, "prompts")
 
     def get_best_prompt(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -414,35 +373,16 @@ class ReviewLogger:
         Returns:
             The best prompt data, or None if not found
         """
-        # Get all logs for the session
-        all_logs = self.get_logs_by_session(session_id)
-
-        # If no logs, return None
-        if (
-            not all_logs
-            or "summaries" not in all_logs
-            or "prompts" not in all_logs
-        ):
-            return None
-
-        # Get summaries and find the one with the highest confidence score
-        summaries = all_logs["summaries"]
-        if not summaries:
+        # Find the summary with the highest confidence score
+        best_summary = self.store.best_summary(session_id)
+        if not best_summary:
             return None
 
-        best_summary = max(
-            summaries, key=lambda x: x.get("confidence_score", 0)
-        )
-        best_prompt_id = best_summary.get("prompt_id")
-
         # Find the corresponding prompt
-        best_prompt = next(
-            (p for p in all_logs["prompts"] if p.get("id") == best_prompt_id),
-            None,
+        return self.store.entry(
+            session_id, "prompts", best_summary.get("prompt_id")
         )
 
-        return best_prompt
-
     def _save_log_entry(
         self,
         session_id: str,
@@ -458,21 +398,11 @@ class ReviewLogger:
             category: The category of the log entry             entry_id: The ID of the log entry
             data: The log entry data
         """
-        # Create session directory if it doesn't exist
-        session_dir = os.path.join(self.storage_dir, session_id)
-        os.makedirs(session_dir, exist_ok=True)
-
-        # Create category directory if it doesn't exist
-        category_dir = os.path.join(session_dir, category)
-        os.makedirs(category_dir, exist_ok=True)
-
-        # Save log entry
-        entry_path = os.path.join(category_dir, f"{entry_id}.json")
-        try:
-            with open(entry_path, "w") as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving log entry {entry_id}: {str(e)}")
+        self.store.save(session_id, category, entry_id, data)
+
+    def close(self) -> None:
+        """Close the underlying store."""
+        self.store.close()
 
 
 # Example usage
@@ -1,19 +1,26 @@
 """
 Session Manager Module
 
-This module provides session management functionality for the orchestrator, allowing tracking and persistence of orchestration sessions.
+This module provides session management functionality for the orchestrator,
+allowing tracking and persistence of orchestration sessions.
 """
 
 import os
 import json
 import uuid
-import asyncio
-from typing import Dict, List, Any, Optional, Set
+import heapq
+import threading
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 import logging
 
 from .orchestrator import OrchestrationResult, OrchestrationStatus
+from .session_store import (
+    SESSION_STORE_BACKEND,
+    SessionStore,
+    create_session_store,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -174,7 +181,17 @@ class SessionManager:
     """
     Manages orchestration sessions.
 
-    This class provides functionality for creating, retrieving, updating,     and persisting sessions.
+    This class provides functionality for creating, retrieving, updating,
+    and persisting sessions. Changes are persisted as deltas through a
+    write-behind SessionStore (see session_store.py); call `close()` to
+    flush them on shutdown.
+
+    Expiry is driven by a min-heap of (expires_at, session_id) entries: a
+    background thread wakes at the earliest deadline (or every
+    `cleanup_interval_seconds`) and pops only the sessions that are due,
+    and lookups pop any entries that came due since. Extending a session
+    pushes a new entry; entries that no longer match their session are
+    dropped when popped.
     """
 
     def __init__(
@@ -182,6 +199,8 @@ class SessionManager:
         storage_dir="/tmp/llm_orchestrator/sessions",
         default_ttl_seconds=3600,
         cleanup_interval_seconds=300,
+        store: Optional[SessionStore] = None,
+        backend: Optional[str] = None,
     ):
         """
         Initialize a new session manager.
@@ -189,16 +208,31 @@ class SessionManager:
         Args:
             storage_dir: Directory for storing session data
             default_ttl_seconds: Default time-to-live for sessions in seconds
-            cleanup_interval_seconds: Interval for cleaning up expired sessions
+            cleanup_interval_seconds: Longest the expiry thread sleeps
+                between checks; 0 disables the thread (sessions then
+                expire when looked up or listed)
+            store: Session store to use (built from `backend` if None)
+            backend: "journal" or "sqlite" (SESSION_STORE_BACKEND if None)
         """
         self.storage_dir = storage_dir
         self.default_ttl_seconds = default_ttl_seconds
         self.cleanup_interval_seconds = cleanup_interval_seconds
         self.active_sessions: Dict[str, Session] = {}
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._lock = threading.RLock()
+        self._expiry_wakeup = threading.Condition(self._lock)
+        self._cleanup_thread: Optional[threading.Thread] = None
+        self._closed = False
 
         # Create storage directory if it doesn't exist
         os.makedirs(storage_dir, exist_ok=True)
 
+        if store is None:
+            store = create_session_store(
+                storage_dir, backend or SESSION_STORE_BACKEND
+            )
+        self.store = store
+
         # Load existing sessions
         self._load_sessions()
 
@@ -240,8 +274,10 @@ class SessionManager:
         )
 
         # Store the session
-        self.active_sessions[session.id] = session
-        self._save_session(session)
+        with self._lock:
+            self.active_sessions[session.id] = session
+            self._schedule_expiry(session)
+        self.store.put(session.to_dict())
 
         logger.info(f"Created session: {session.id}")
         return session
@@ -257,41 +293,35 @@ class SessionManager:
             The session, or None if not found
         """
         # Check active sessions first
-        if session_id in self.active_sessions:
-            session = self.active_sessions[session_id]
-
-            # Check if the session has expired
-            if session.is_expired():
-                session.expire()
-                self._save_session(session)
-                del self.active_sessions[session_id]
-                logger.info(f"Session expired: {session_id}")
-                return None
-
+        self._expire_due_sessions()
+        session = self.active_sessions.get(session_id)
+        if session is not None:
             return session
 
         # Try to load from storage
-        session_path = os.path.join(self.storage_dir, f"{session_id}.json")
-        if os.path.exists(session_path):
-            try:
-                with open(session_path, "r") as f:
-                    session_data = json.load(f)
+        try:
+            session_data = self.store.load(session_id)
+            if session_data is None:
+                return None
 
-                session = Session.from_dict(session_data)
+            session = Session.from_dict(session_data)
 
-                # Check if the session has expired
-                if session.is_expired():
+            # Check if the session has expired
+            if session.is_expired():
+                if session.status == SessionStatus.ACTIVE:
                     session.expire()
-                    self._save_session(session)
-                    logger.info(f"Session expired: {session_id}")
-                    return None
+                    self._save_fields(session, "status")
+                logger.info(f"Session expired: {session_id}")
+                return None
 
-                # Add to active sessions
+            # Add to active sessions
+            with self._lock:
                 self.active_sessions[session_id] = session
-                return session
+                self._schedule_expiry(session)
+            return session
 
-            except Exception as e:
-                logger.error(f"Error loading session {session_id}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error loading session {session_id}: {str(e)}")
 
         return None
 
@@ -303,7 +333,9 @@ class SessionManager:
             session: The updated session
         """
         # Update in active sessions
-        self.active_sessions[session.id] = session
+        with self._lock:
+            self.active_sessions[session.id] = session
+            self._schedule_expiry(session)
 
         # Save to storage
         self._save_session(session)
@@ -326,7 +358,7 @@ class SessionManager:
         session = self.get_session(session_id)
         if session:
             session.add_orchestration(orchestration)
-            self.update_session(session)
+            self._save_orchestration(session, orchestration)
             return session
 
         return None
@@ -365,8 +397,9 @@ class SessionManager:
         """
         session = self.get_session(session_id)
         if session:
-            session.update_orchestration(orchestration)
-            self.update_session(session)
+            if orchestration.id in session.orchestrations:
+                session.update_orchestration(orchestration)
+                self._save_orchestration(session, orchestration)
             return session
 
         return None
@@ -384,7 +417,7 @@ class SessionManager:
         session = self.get_session(session_id)
         if session:
             session.complete()
-            self.update_session(session)
+            self._save_fields(session, "status")
             return session
 
         return None
@@ -402,7 +435,7 @@ class SessionManager:
         session = self.get_session(session_id)
         if session:
             session.fail()
-            self.update_session(session)
+            self._save_fields(session, "status")
             return session
 
         return None
@@ -422,8 +455,10 @@ class SessionManager:
         """
         session = self.get_session(session_id)
         if session:
-            session.extend_expiry(ttl_seconds)
-            self.update_session(session)
+            with self._lock:
+                session.extend_expiry(ttl_seconds)
+                self._schedule_expiry(session)
+            self._save_fields(session, "expires_at")
             return session
 
         return None
@@ -440,60 +475,96 @@ class SessionManager:
         Returns:
             List of sessions
         """
-        # Refresh active sessions
-        self._refresh_active_sessions()
+        # Drop sessions that came due since the last expiry run
+        self._expire_due_sessions()
+
+        with self._lock:
+            sessions = list(self.active_sessions.values())
 
         # Filter by status if specified
         if status_filter:
             return [
                 session
-                for session in self.active_sessions.values()
+                for session in sessions
                 if session.status == status_filter
             ]
 
-        return list(self.active_sessions.values())
+        return sessions
+
+    def close(self) -> None:
+        """Stop the expiry thread, flush pending changes, close the store."""
+        with self._lock:
+            self._closed = True
+            self._expiry_wakeup.notify_all()
+        if self._cleanup_thread is not None:
+            self._cleanup_thread.join(timeout=5)
+        self.store.close()
 
     def _save_session(self, session: Session) -> None:
         """
-        Save a session to storage.
+        Save a whole session to storage.
 
         Args:
             session: The session to save
         """
-        session_path = os.path.join(self.storage_dir, f"{session.id}.json")
         try:
-            with open(session_path, "w") as f:
-                json.dump(session.to_dict(), f, indent=2)
+            self.store.put(session.to_dict())
         except Exception as e:
             logger.error(f"Error saving session {session.id}: {str(e)}")
 
+    def _save_fields(self, session: Session, *fields: str) -> None:
+        """
+        Save changed top-level fields of a session (plus updated_at).
+
+        Args:
+            session: The changed session
+            fields: Names of the changed fields
+        """
+        data = {"updated_at": session.updated_at}
+        for field in fields:
+            value = getattr(session, field)
+            data[field] = value.value if isinstance(value, Enum) else value
+        try:
+            self.store.patch(session.id, data)
+        except Exception as e:
+            logger.error(f"Error saving session {session.id}: {str(e)}")
+        logger.info(f"Updated session: {session.id}")
+
+    def _save_orchestration(
+        self, session: Session, orchestration: OrchestrationResult
+    ) -> None:
+        """
+        Save one added or updated orchestration of a session.
+
+        Args:
+            session: The session holding the orchestration
+            orchestration: The orchestration result to save
+        """
+        try:
+            self.store.put_orchestration(
+                session.id, orchestration.to_dict(), session.updated_at
+            )
+        except Exception as e:
+            logger.error(f"Error saving session {session.id}: {str(e)}")
+        logger.info(f"Updated session: {session.id}")
+
     def _load_sessions(self) -> None:
-        """Load existing sessions from storage."""
+        """Load active, unexpired sessions from storage."""
         try:
-            # Get all session files
-            session_files = [
-                f for f in os.listdir(self.storage_dir) if f.endswith(".json")
-            ]
+            if self.store.is_empty():
+                self._import_session_files()
 
-            # Load each session
-            for session_file in session_files:
+            now = datetime.now().isoformat()
+            for session_data in self.store.load_active(now):
                 try:
-                    session_path = os.path.join(self.storage_dir, session_file)
-                    with open(session_path, "r") as f:
-                        session_data = json.load(f)
-
                     session = Session.from_dict(session_data)
-
-                    # Only add active sessions
-                    if (
-                        session.status == SessionStatus.ACTIVE
-                        and not session.is_expired()
-                    ):
+                    with self._lock:
                         self.active_sessions[session.id] = session
-
+                        self._schedule_expiry(session)
                 except Exception as e:
                     logger.error(
-                        f"Error loading session file {session_file}: {str(e)}"
+                        f"Error loading session {session_data.get('id')}: "
+                        f"{str(e)}"
                     )
 
             logger.info(f"Loaded {len(self.active_sessions)} active sessions")
@@ -501,45 +572,128 @@ class SessionManager:
         except Exception as e:
             logger.error(f"Error loading sessions: {str(e)}")
 
-    def _refresh_active_sessions(self) -> None:
-        """Refresh the active sessions, removing expired ones."""
-        expired_sessions: Set[str] = set()
+    def _import_session_files(self) -> None:
+        """Import sessions saved as one JSON file each by older versions."""
+        session_files = [
+            f for f in os.listdir(self.storage_dir) if f.endswith(".json")
+        ]
+        if not session_files:
+            return
 
-        # Check each active session
-        for session_id, session in self.active_sessions.items():
-            if session.is_expired():
-                expired_sessions.add(session_id)
+        imported = 0
+        for session_file in session_files:
+            try:
+                session_path = os.path.join(self.storage_dir, session_file)
+                with open(session_path, "r") as f:
+                    session_data = json.load(f)
+                # Round-trip to validate the document
+                self.store.put(Session.from_dict(session_data).to_dict())
+                imported += 1
+            except Exception as e:
+                logger.error(
+                    f"Error importing session file {session_file}: {str(e)}"
+                )
+        self.store.flush()
+        logger.info(
+            f"Imported {imported} session files into the session store"
+        )
+
+    def _schedule_expiry(self, session: Session) -> None:
+        """
+        Push a heap entry for the session's current expiry time.
+
+        Args:
+            session: The session to schedule (caller holds the lock)
+        """
+        expires_at = datetime.fromisoformat(session.expires_at)
+        wake_thread = (
+            not self._expiry_heap or expires_at < self._expiry_heap[0][0]
+        )
+        heapq.heappush(self._expiry_heap, (expires_at, session.id))
+
+        # Superseded entries are only dropped when popped; rebuild the heap
+        # if they come to dominate it
+        if len(self._expiry_heap) > 2 * len(self.active_sessions) + 64:
+            self._expiry_heap = [
+                (datetime.fromisoformat(active.expires_at), active.id)
+                for active in self.active_sessions.values()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+        if wake_thread:
+            self._expiry_wakeup.notify_all()
+
+    def _expire_due_sessions(self) -> int:
+        """
+        Expire every session whose heap entry has come due.
+
+        Returns:
+            The number of sessions expired
+        """
+        now = datetime.now()
+        expired = []
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                expires_at, session_id = heapq.heappop(heap)
+                session = self.active_sessions.get(session_id)
+                # Skip entries superseded by an extension or a reload
+                if session is None or session.expires_at != (
+                    expires_at.isoformat()
+                ):
+                    continue
                 session.expire()
-                self._save_session(session)
+                del self.active_sessions[session_id]
+                expired.append(session)
 
-        # Remove expired sessions
-        for session_id in expired_sessions:
-            del self.active_sessions[session_id]
+        # The store buffers these patches and writes them in one flush
+        for session in expired:
+            self._save_fields(session, "status")
+        if expired:
+            logger.info(f"Removed {len(expired)} expired sessions")
+        return len(expired)
 
-        if expired_sessions:
-            logger.info(f"Removed {len(expired_sessions)} expired sessions")
+    def _refresh_active_sessions(self) -> None:
+        """Refresh the active sessions, removing expired ones."""
+        self._expire_due_sessions()
 
     def _start_cleanup_task(self) -> None:
-        """Start the cleanup task for expired sessions."""
-        # This would normally be an async task, but for simplicity
-        # we'll just log that it would be started
+        """Start the background thread that expires sessions."""
+        if self.cleanup_interval_seconds <= 0:
+            return
+        self._cleanup_thread = threading.Thread(
+            target=self._cleanup_task,
+            name="session-expiry",
+            daemon=True,
+        )
+        self._cleanup_thread.start()
         logger.info(
-            f"Cleanup task would run every {self.cleanup_interval_seconds}                 seconds"
+            "Started session expiry thread (checks at least every "
+            f"{self.cleanup_interval_seconds} seconds)"
         )
 
-    async def _cleanup_task(self) -> None:
-        """Task for cleaning up expired sessions."""
+    def _cleanup_task(self) -> None:
+        """Sleep until the earliest expiry (or the interval), then expire."""
         while True:
+            with self._lock:
+                if self._closed:
+                    return
+                timeout = self.cleanup_interval_seconds
+                if self._expiry_heap:
+                    until_due = (
+                        self._expiry_heap[0][0] - datetime.now()
+                    ).total_seconds()
+                    timeout = min(timeout, max(0.0, until_due))
+                if timeout > 0:
+                    self._expiry_wakeup.wait(timeout)
+                if self._closed:
+                    return
             try:
-                # Refresh active sessions
-                self._refresh_active_sessions()
-
-                # Sleep until next cleanup
-                await asyncio.sleep(self.cleanup_interval_seconds)
-
+                self._expire_due_sessions()
             except Exception as e:
                 logger.error(f"Error in cleanup task: {str(e)}")
-                await asyncio.sleep(60)  # Sleep for a minute on error
+                with self._lock:
+                    self._expiry_wakeup.wait(60)  # Back off on error
 
 
 # Example usage
@@ -572,3 +726,5 @@ if __name__ == "__main__":
     # Complete the session
     manager.complete_session(session.id)
     print(f"Completed session: {session.id}")
+
+    manager.close()
@@ -0,0 +1,488 @@
+"""
+Session storage backends for SessionManager.
+
+Session changes are recorded as small deltas rather than full session
+documents:
+
+- ("put", id, session_dict): a whole session (creation, or an update whose
+  changes are not known)
+- ("patch", id, fields): changed top-level fields (status, expires_at,
+  updated_at, ...)
+- ("orchestration", id, orchestration_dict, updated_at): one added or
+  updated OrchestrationResult
+
+Writes are buffered and flushed write-behind: the first buffered change
+arms a timer, and everything that arrives within `flush_interval` seconds
+is written together. `flush()` and `close()` write immediately.
+
+Backends:
+
+- JournalSessionStore: an append-only JSON-lines journal, replayed at
+  startup and compacted (one "put" per kept session) once it has grown
+  well past the number of active sessions. Compaction drops finished
+  sessions, and active ones that expired, once they are older than
+  SESSION_JOURNAL_RETENTION_HOURS.
+- SQLiteSessionStore: one row per session plus one row per orchestration,
+  with an index on (status, expires_at) so startup loads only active,
+  unexpired sessions.
+"""
+
+import abc
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "journal")
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", 0.5))
+# Buffered changes that force an immediate flush
+SESSION_MAX_PENDING = int(os.getenv("SESSION_MAX_PENDING", 500))
+# Journal records kept before compaction is considered
+SESSION_JOURNAL_COMPACT_RECORDS = int(
+    os.getenv("SESSION_JOURNAL_COMPACT_RECORDS", 1000)
+)
+# Finished (or expired) sessions kept in the journal for lookups
+SESSION_JOURNAL_RETENTION_HOURS = float(
+    os.getenv("SESSION_JOURNAL_RETENTION_HOURS", 24)
+)
+
+ACTIVE_STATUS = "active"
+
+Change = Tuple[Any, ...]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _apply_change(sessions: Dict[str, Dict[str, Any]], change: Change):
+    """Applies one delta to a dict of session documents."""
+    op, session_id = change[0], change[1]
+    if op == "put":
+        sessions[session_id] = change[2]
+        return
+    session = sessions.get(session_id)
+    if session is None:
+        logger.warning(f"Ignoring {op} for unknown session {session_id}")
+        return
+    if op == "patch":
+        session.update(change[2])
+    elif op == "orchestration":
+        orchestration = change[2]
+        session.setdefault("orchestrations", {})[
+            orchestration["id"]
+        ] = orchestration
+        session["updated_at"] = change[3]
+
+
+class SessionStore(abc.ABC):
+    """Write-behind store of session documents (Session.to_dict())."""
+
+    def __init__(
+        self,
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+        max_pending: int = SESSION_MAX_PENDING,
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self._pending: List[Change] = []
+        self._pending_lock = threading.Lock()
+        # Serializes _write calls (timer thread vs. explicit flushes)
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.flushes = 0
+        self.records_written = 0
+
+    # --- Change API --- #
+    def put(self, session: Dict[str, Any]):
+        self._enqueue(("put", session["id"], session))
+
+    def patch(self, session_id: str, fields: Dict[str, Any]):
+        self._enqueue(("patch", session_id, dict(fields)))
+
+    def put_orchestration(
+        self, session_id: str, orchestration: Dict[str, Any], updated_at: str
+    ):
+        self._enqueue(("orchestration", session_id, orchestration, updated_at))
+
+    def _enqueue(self, change: Change):
+        self._on_change(change)
+        with self._pending_lock:
+            self._pending.append(change)
+            flush_now = len(self._pending) >= self.max_pending
+            if (
+                not flush_now
+                and self._timer is None
+                and self.flush_interval > 0
+            ):
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now or self.flush_interval <= 0:
+            self.flush()
+
+    def flush(self):
+        """Writes every buffered change now."""
+        with self._write_lock:
+            with self._pending_lock:
+                changes, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not changes:
+                return
+            try:
+                self._write(changes)
+                self.flushes += 1
+                self.records_written += len(changes)
+            except Exception as e:
+                logger.error(
+                    f"Failed to write {len(changes)} session changes: {e}"
+                )
+                with self._pending_lock:
+                    # Keep them for the next flush, ahead of newer changes
+                    self._pending[:0] = changes
+
+    def close(self):
+        self.flush()
+
+    @property
+    def pending(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    # --- Backend hooks --- #
+    def _on_change(self, change: Change):
+        """Called synchronously for each change before it is buffered."""
+
+    @abc.abstractmethod
+    def _write(self, changes: List[Change]):
+        """Persists a batch of changes, in order."""
+
+    @abc.abstractmethod
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a session document, including unflushed changes."""
+
+    @abc.abstractmethod
+    def load_active(self, now: str) -> List[Dict[str, Any]]:
+        """Returns active sessions expiring after `now` (ISO timestamp)."""
+
+    @abc.abstractmethod
+    def is_empty(self) -> bool:
+        """True if the store holds no sessions (e.g. before migration)."""
+
+
+class JournalSessionStore(SessionStore):
+    """Append-only JSON-lines journal with periodic compaction.
+
+    The journal is replayed into memory at startup; reads are served from
+    memory, so unflushed changes are always visible.
+    """
+
+    JOURNAL_NAME = "sessions.journal"
+
+    def __init__(
+        self,
+        storage_dir: str,
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+        max_pending: int = SESSION_MAX_PENDING,
+        compact_records: int = SESSION_JOURNAL_COMPACT_RECORDS,
+        retention_hours: float = SESSION_JOURNAL_RETENTION_HOURS,
+    ):
+        super().__init__(flush_interval, max_pending)
+        self.path = os.path.join(storage_dir, self.JOURNAL_NAME)
+        self.compact_records = compact_records
+        self.retention = timedelta(hours=retention_hours)
+        self.compactions = 0
+        self.sessions_dropped = 0
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._state_lock = threading.Lock()
+        self._journal_records = 0
+        # Records left by the last compaction (retained sessions)
+        self._compacted_records = 0
+        os.makedirs(storage_dir, exist_ok=True)
+        self._replay()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        skipped = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Typically a record cut short by a crash mid-write
+                    skipped += 1
+                    continue
+                _apply_change(self._sessions, tuple(record))
+                self._journal_records += 1
+        if skipped:
+            logger.warning(
+                f"Skipped {skipped} unreadable records in {self.path}"
+            )
+        logger.info(
+            f"Replayed {self._journal_records} journal records into "
+            f"{len(self._sessions)} sessions"
+        )
+
+    def _on_change(self, change: Change):
+        # Serialize now so later in-memory mutation of the same dicts
+        # cannot change what is written
+        record = json.loads(_dumps(list(change)))
+        with self._state_lock:
+            _apply_change(self._sessions, tuple(record))
+
+    def _write(self, changes: List[Change]):
+        lines = "".join(_dumps(list(change)) + "\n" for change in changes)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self._journal_records += len(changes)
+        with self._state_lock:
+            active = sum(
+                1
+                for session in self._sessions.values()
+                if session.get("status") == ACTIVE_STATUS
+            )
+        # Growth since the last compaction, so retained finished sessions
+        # cannot trigger a rewrite on every flush
+        grown = self._journal_records - self._compacted_records
+        if grown > max(self.compact_records, 2 * active):
+            self._compact()
+
+    def _is_retained(self, session: Dict[str, Any], cutoff: str) -> bool:
+        if session.get("status") == ACTIVE_STATUS:
+            return session.get("expires_at", "") > cutoff
+        return session.get("updated_at", "") > cutoff
+
+    def _compact(self):
+        """Rewrites the journal as one "put" per retained session.
+
+        Sessions that finished, or expired, more than `retention` ago are
+        dropped from the journal and from memory.
+        """
+        tmp_path = self.path + ".tmp"
+        cutoff = (datetime.now() - self.retention).isoformat()
+        with self._state_lock:
+            dropped = [
+                session_id
+                for session_id, session in self._sessions.items()
+                if not self._is_retained(session, cutoff)
+            ]
+            for session_id in dropped:
+                del self._sessions[session_id]
+            lines = [
+                _dumps(["put", session_id, session]) + "\n"
+                for session_id, session in self._sessions.items()
+            ]
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        logger.info(
+            f"Compacted session journal from {self._journal_records} to "
+            f"{len(lines)} records ({len(dropped)} old sessions dropped)"
+        )
+        self._journal_records = len(lines)
+        self._compacted_records = len(lines)
+        self.sessions_dropped += len(dropped)
+        self.compactions += 1
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._state_lock:
+            session = self._sessions.get(session_id)
+            return json.loads(_dumps(session)) if session else None
+
+    def load_active(self, now: str) -> List[Dict[str, Any]]:
+        with self._state_lock:
+            return [
+                json.loads(_dumps(session))
+                for session in self._sessions.values()
+                if session.get("status") == ACTIVE_STATUS
+                and session.get("expires_at", "") > now
+            ]
+
+    def is_empty(self) -> bool:
+        with self._state_lock:
+            return not self._sessions
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions and their orchestrations as SQLite rows."""
+
+    DB_NAME = "sessions.db"
+
+    def __init__(
+        self,
+        db_path: str,
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+        max_pending: int = SESSION_MAX_PENDING,
+    ):
+        super().__init__(flush_interval, max_pending)
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                expires_at TEXT NOT NULL,
+                updated_at TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_status_expires
+                ON sessions (status, expires_at);
+            CREATE TABLE IF NOT EXISTS session_orchestrations (
+                session_id TEXT NOT NULL,
+                orchestration_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (session_id, orchestration_id)
+            );
+            """)
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+    def _write(self, changes: List[Change]):
+        with self._db_lock, self._conn:
+            for change in changes:
+                op, session_id = change[0], change[1]
+                if op == "put":
+                    self._put_row(change[2])
+                elif op == "patch":
+                    self._patch_row(session_id, change[2])
+                elif op == "orchestration":
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO session_orchestrations "
+                        "(session_id, orchestration_id, data) "
+                        "VALUES (?, ?, ?)",
+                        (session_id, change[2]["id"], _dumps(change[2])),
+                    )
+                    self._patch_row(session_id, {"updated_at": change[3]})
+
+    def _put_row(self, session: Dict[str, Any]):
+        session = dict(session)
+        orchestrations = session.pop("orchestrations", {}) or {}
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sessions "
+            "(id, status, expires_at, updated_at, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                session["id"],
+                session["status"],
+                session["expires_at"],
+                session.get("updated_at"),
+                _dumps(session),
+            ),
+        )
+        self._conn.execute(
+            "DELETE FROM session_orchestrations WHERE session_id = ?",
+            (session["id"],),
+        )
+        self._conn.executemany(
+            "INSERT INTO session_orchestrations "
+            "(session_id, orchestration_id, data) VALUES (?, ?, ?)",
+            [
+                (session["id"], orchestration_id, _dumps(orchestration))
+                for orchestration_id, orchestration in orchestrations.items()
+            ],
+        )
+
+    def _patch_row(self, session_id: str, fields: Dict[str, Any]):
+        row = self._conn.execute(
+            "SELECT data FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            logger.warning(f"Ignoring patch for unknown session {session_id}")
+            return
+        data = json.loads(row["data"])
+        data.update(fields)
+        self._conn.execute(
+            "UPDATE sessions SET status = ?, expires_at = ?, updated_at = ?, "
+            "data = ? WHERE id = ?",
+            (
+                data["status"],
+                data["expires_at"],
+                data.get("updated_at"),
+                _dumps(data),
+                session_id,
+            ),
+        )
+
+    def _with_orchestrations(self, rows) -> List[Dict[str, Any]]:
+        sessions = {row["id"]: json.loads(row["data"]) for row in rows}
+        for session in sessions.values():
+            session["orchestrations"] = {}
+        if not sessions:
+            return []
+        placeholders = ",".join("?" * len(sessions))
+        for row in self._conn.execute(
+            "SELECT session_id, orchestration_id, data "
+            "FROM session_orchestrations "
+            f"WHERE session_id IN ({placeholders})",
+            list(sessions),
+        ):
+            sessions[row["session_id"]]["orchestrations"][
+                row["orchestration_id"]
+            ] = json.loads(row["data"])
+        return list(sessions.values())
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, data FROM sessions WHERE id = ?", (session_id,)
+            ).fetchall()
+            sessions = self._with_orchestrations(rows)
+        return sessions[0] if sessions else None
+
+    def load_active(self, now: str) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, data FROM sessions "
+                "WHERE status = ? AND expires_at > ?",
+                (ACTIVE_STATUS, now),
+            ).fetchall()
+            return self._with_orchestrations(rows)
+
+    def is_empty(self) -> bool:
+        self.flush()
+        with self._db_lock:
+            return (
+                self._conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone()
+                is None
+            )
+
+    def close(self):
+        super().close()
+        with self._db_lock:
+            self._conn.close()
+
+
+def create_session_store(
+    storage_dir: str,
+    backend: str = SESSION_STORE_BACKEND,
+    flush_interval: float = SESSION_FLUSH_INTERVAL,
+) -> SessionStore:
+    """Builds the configured backend ("journal" or "sqlite")."""
+    backend = (backend or "journal").lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            os.path.join(storage_dir, SQLiteSessionStore.DB_NAME),
+            flush_interval=flush_interval,
+        )
+    if backend != "journal":
+        raise ValueError(f"Unsupported session store backend: {backend}")
+    return JournalSessionStore(storage_dir, flush_interval=flush_interval)
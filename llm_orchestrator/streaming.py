@@ -0,0 +1,70 @@
+"""
+Helpers for streamed LLM output.
+
+JsonObjectDetector scans streamed text chunk by chunk and reports when the
+first top-level JSON object is complete, so a caller that only needs that
+object (reflection suggestions, for example) can stop the stream instead
+of waiting for trailing prose or an over-long completion.
+"""
+
+from typing import Optional
+
+
+class JsonObjectDetector:
+    """Incrementally finds the first complete top-level JSON object.
+
+    Text before the opening brace (e.g. "Here you go:" or a ```json fence)
+    is skipped. Braces inside strings, and escaped quotes, are handled.
+    Each character is examined once across all `feed` calls.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._started = False
+        self.result: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.result is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Consumes the next chunk; returns True once an object is complete.
+
+        The object's text is then available as `result`; later chunks are
+        ignored.
+        """
+        if self.result is not None:
+            return True
+        for char in chunk:
+            if not self._started:
+                if char != "{":
+                    continue
+                self._started = True
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.result = "".join(self._buffer)
+                    return True
+        return False
+
+
+def extract_json_object(text: str) -> Optional[str]:
+    """Returns the first complete top-level JSON object in `text`."""
+    detector = JsonObjectDetector()
+    detector.feed(text)
+    return detector.result
@@ -4,6 +4,8 @@ import logging
 import os
 import sys
 import json
+import shutil
+import uuid
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
@@ -33,6 +35,8 @@ except ImportError:
         )
         # sys.exit(1) # Commented out to allow pytest collection
 
+from services.artifact_cache import get_artifact_cache  # noqa: E402
+
 # --- Configuration ---
 LOG_LEVEL = os.getenv("RELEASE_CHAIN_LOG_LEVEL", "INFO").upper()
 OUTPUT_BASE_DIR = os.getenv(
@@ -116,19 +120,49 @@ def create_release_directory(artist_slug, date_str):
 
 
 def download_asset(url, save_path):
-    """Placeholder function to simulate downloading an asset."""
-    logger.info(f"Simulating download of {url} to {save_path}")
+    """Saves an asset into the release directory.
+
+    HTTP(S) URLs are fetched through the shared artifact cache, so a track
+    already downloaded by earlier pipeline stages is not downloaded again.
+    Local paths and file:// URLs are copied. Other URLs get a placeholder.
+    """
     try:
         Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(save_path, "w") as f:
-            f.write(f"Placeholder content for {url}\n")
-        logger.info(f"Saved placeholder asset to {save_path}")
+        if url.startswith(("http://", "https://")):
+            cache = get_artifact_cache()
+            owner = f"release_chain:{uuid.uuid4()}"
+            try:
+                cached_path = cache.acquire(url, owner)
+                if not cached_path:
+                    logger.error(f"Failed to download asset {url}")
+                    return False
+                _copy_asset(cached_path, save_path)
+            finally:
+                cache.release(url, owner)
+        elif url.startswith("file://") or os.path.exists(url):
+            local_path = url[7:] if url.startswith("file://") else url
+            _copy_asset(local_path, save_path)
+        else:
+            logger.info(f"Simulating download of {url} to {save_path}")
+            with open(save_path, "w") as f:
+                f.write(f"Placeholder content for {url}\n")
+        logger.info(f"Saved asset {url} to {save_path}")
         return True
-    except IOError as e:
-        logger.error(f"Failed to save placeholder asset {save_path}: {e}")
+    except (IOError, OSError) as e:
+        logger.error(f"Failed to save asset {save_path}: {e}")
         return False
 
 
+def _copy_asset(src_path, save_path):
+    """Hard-links `src_path` to `save_path`, copying if linking fails."""
+    if os.path.exists(save_path):
+        os.remove(save_path)
+    try:
+        os.link(src_path, save_path)
+    except OSError:
+        shutil.copyfile(src_path, save_path)
+
+
 def generate_cover_art(artist_info, save_path):
     """Placeholder function to simulate cover art generation."""
     logger.info(
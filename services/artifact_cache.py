@@ -0,0 +1,279 @@
+"""
+Shared local cache for downloaded audio/video artifacts.
+
+A run's track is needed by several stages (beat analysis, humanization, the
+release chain). Instead of each stage downloading the URL into its own
+temporary file, they acquire it from this cache: the first caller downloads,
+later callers get the same local file.
+
+Files are content-addressed (`<sha256><ext>` in the cache directory) so two
+URLs serving identical bytes share one file. Holders pin an entry under an
+owner key (a run_id, or a per-call token) and release it when done; pinned
+entries are never evicted. Unpinned entries are evicted least recently used
+first once the cache grows beyond its size limit.
+
+Pins and eviction are tracked in memory, so the cache belongs to one
+process: worker processes must not create their own (it would evict files
+the parent has pinned). The parent acquires, hands workers the local path
+and digest, and releases when they are done.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARTIFACT_CACHE_DIR = os.getenv(
+    "ARTIFACT_CACHE_DIR", os.path.join(PROJECT_ROOT, "data", "artifact_cache")
+)
+ARTIFACT_CACHE_MAX_MB = int(os.getenv("ARTIFACT_CACHE_MAX_MB", 1024))
+DOWNLOAD_TIMEOUT = 60
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPE_EXTENSIONS = {
+    "audio/mpeg": ".mp3",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/ogg": ".ogg",
+    "audio/flac": ".flac",
+    "video/mp4": ".mp4",
+}
+
+
+def guess_extension(url: str, content_type: Optional[str] = None) -> str:
+    """Guesses a file extension from the URL, then the content type."""
+    file_extension = os.path.splitext(url.split("?")[0])[1]
+    if file_extension and len(file_extension) <= 5:  # Basic check
+        return file_extension.lower()
+    if content_type:
+        content_type = content_type.split(";")[0].strip().lower()
+    return CONTENT_TYPE_EXTENSIONS.get(content_type, ".audio")
+
+
+class _Entry:
+    """A cached file and the owners currently pinning it."""
+
+    __slots__ = ("digest", "path", "size", "owners")
+
+    def __init__(self, digest: str, path: str, size: int):
+        self.digest = digest
+        self.path = path
+        self.size = size
+        self.owners: Set[str] = set()
+
+
+class ArtifactCache:
+    """Content-addressed, size-bounded LRU cache of downloaded artifacts."""
+
+    def __init__(
+        self,
+        cache_dir: str = ARTIFACT_CACHE_DIR,
+        max_bytes: int = ARTIFACT_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # digest -> entry, least recently used first
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._url_digests: Dict[str, str] = {}
+        # url -> lock serializing concurrent downloads of the same URL
+        self._download_locks: Dict[str, threading.Lock] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_existing()
+
+    def _load_existing(self):
+        """Accounts for files left in the cache directory by a previous run."""
+        for name in sorted(
+            os.listdir(self.cache_dir),
+            key=lambda n: os.path.getmtime(os.path.join(self.cache_dir, n)),
+        ):
+            path = os.path.join(self.cache_dir, name)
+            digest = os.path.splitext(name)[0]
+            if len(digest) != 64 or not os.path.isfile(path):
+                continue
+            entry = _Entry(digest, path, os.path.getsize(path))
+            self._entries[digest] = entry
+            self.total_bytes += entry.size
+        with self._lock:
+            self._evict()
+
+    # --- Public API --- #
+    def acquire(self, url: str, owner: str) -> Optional[str]:
+        """Returns a local path for `url`, downloading it on first use.
+
+        The entry stays pinned for `owner` until `release` or
+        `release_owner` is called. The file must be treated as read-only.
+
+        Returns:
+            The cached file path, or None if the download failed.
+        """
+        path = self._pin_cached(url, owner)
+        if path:
+            return path
+
+        with self._lock:
+            download_lock = self._download_locks.setdefault(
+                url, threading.Lock()
+            )
+        with download_lock:
+            # Another thread may have finished downloading meanwhile
+            path = self._pin_cached(url, owner)
+            if path:
+                return path
+            with self._lock:
+                self.misses += 1
+            entry = self._download(url)
+            with self._lock:
+                self._download_locks.pop(url, None)
+                if entry is None:
+                    return None
+                existing = self._entries.get(entry.digest)
+                if existing is not None:
+                    # Same bytes already cached under another URL
+                    if entry.path != existing.path:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+                    entry = existing
+                    self._entries.move_to_end(entry.digest)
+                else:
+                    self._entries[entry.digest] = entry
+                    self.total_bytes += entry.size
+                self._url_digests[url] = entry.digest
+                entry.owners.add(owner)
+                self._evict()
+                return entry.path
+
+    def pin(self, url: str, owner: str) -> bool:
+        """Pins an already cached `url` for `owner` without downloading.
+
+        Returns:
+            True if the URL was cached.
+        """
+        return self._pin_cached(url, owner, count=False) is not None
+
+    def digest(self, url: str) -> Optional[str]:
+        """Returns the content hash of a cached `url`, if known."""
+        with self._lock:
+            return self._url_digests.get(url)
+
+    def release(self, url: str, owner: str):
+        """Drops `owner`'s pin on `url`."""
+        with self._lock:
+            entry = self._entries.get(self._url_digests.get(url, ""))
+            if entry is not None:
+                entry.owners.discard(owner)
+            self._evict()
+
+    def release_owner(self, owner: str):
+        """Drops every pin held by `owner` (e.g. when a run finishes)."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.owners.discard(owner)
+            self._evict()
+
+    # --- Internals --- #
+    def _pin_cached(
+        self, url: str, owner: str, count: bool = True
+    ) -> Optional[str]:
+        with self._lock:
+            digest = self._url_digests.get(url)
+            entry = self._entries.get(digest) if digest else None
+            if entry is None:
+                return None
+            if not os.path.exists(entry.path):
+                # Removed behind our back; forget it and download again
+                self._forget(entry)
+                return None
+            entry.owners.add(owner)
+            self._entries.move_to_end(digest)
+            if count:
+                self.hits += 1
+            return entry.path
+
+    def _download(self, url: str) -> Optional[_Entry]:
+        """Streams `url` into the cache directory, hashing while writing."""
+        tmp_path = None
+        try:
+            response = requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+            file_extension = guess_extension(
+                url, response.headers.get("content-type")
+            )
+            sha256 = hashlib.sha256()
+            size = 0
+            with tempfile.NamedTemporaryFile(
+                dir=self.cache_dir, suffix=".part", delete=False
+            ) as tmp_file:
+                tmp_path = tmp_file.name
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    tmp_file.write(chunk)
+                    sha256.update(chunk)
+                    size += len(chunk)
+            digest = sha256.hexdigest()
+            path = os.path.join(self.cache_dir, digest + file_extension)
+            os.replace(tmp_path, path)
+            tmp_path = None
+            logger.info(f"Cached {url} ({size} bytes) at {path}")
+            return _Entry(digest, path, size)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to download {url}: {e}")
+            return None
+        except IOError as e:
+            logger.error(f"Failed to write {url} to the artifact cache: {e}")
+            return None
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _forget(self, entry: _Entry):
+        self._entries.pop(entry.digest, None)
+        self.total_bytes -= entry.size
+        for url, digest in list(self._url_digests.items()):
+            if digest == entry.digest:
+                del self._url_digests[url]
+
+    def _evict(self):
+        """Removes unpinned entries, oldest first, until under the limit."""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for entry in list(self._entries.values()):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if entry.owners:
+                continue
+            self._forget(entry)
+            try:
+                os.remove(entry.path)
+                logger.debug(f"Evicted {entry.path} from the artifact cache.")
+            except OSError as e:
+                logger.warning(f"Failed to remove cached {entry.path}: {e}")
+
+
+_cache: Optional[ArtifactCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Returns the process-wide artifact cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArtifactCache()
+        return _cache
@@ -8,34 +8,71 @@ import sqlite3
 import json
 import logging
 import os
+import threading
 import uuid  # Keep uuid as it's used for generating artist_id
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 # --- Configuration ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DB_FILE = os.path.join(PROJECT_ROOT, "data", "artists.db")
-MAX_HISTORY_LENGTH = 20  # Max number of performance records to keep per artist
+MAX_HISTORY_LENGTH = (
+    20  # Number of recent runs returned as performance_history
+)
+SCHEMA_VERSION = 2  # Stored in PRAGMA user_version; 2 = artist_runs table
 MAX_ERROR_REPORTS = 500  # Max number of error reports to keep
+# Connection tuning (applied to every connection)
+SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", 16384))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_STATEMENT_CACHE_SIZE = 256  # Prepared statements kept per connection
 
 logger = logging.getLogger(__name__)
 
 # Ensure data directory exists
 os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
 
+# Thread-local pooled connections, keyed by database path
+_thread_local = threading.local()
+_pool_lock = threading.Lock()
+_pooled_connections: List[sqlite3.Connection] = []
+
 
 # --- Database Initialization ---
+def _connect(db_file: str, **kwargs) -> sqlite3.Connection:
+    """Opens a connection to `db_file` with the standard pragmas applied."""
+    # Determine if DB_FILE is a URI
+    is_uri = isinstance(db_file, str) and db_file.startswith("file:")
+    # Pass uri=True only if it's actually a URI
+    conn = sqlite3.connect(
+        db_file,
+        uri=is_uri,
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=SQLITE_STATEMENT_CACHE_SIZE,
+        **kwargs,
+    )
+    conn.row_factory = sqlite3.Row  # Return rows as dictionary-like objects
+    try:
+        # WAL lets readers proceed while a pipeline worker writes;
+        # synchronous=NORMAL is durable across app crashes in WAL mode.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+    except sqlite3.Error as e:
+        logger.warning(f"Could not apply pragmas to {db_file}: {e}")
+    return conn
+
+
 def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = None
+    """Establishes a new connection to the SQLite database.
+
+    The caller owns the returned connection and must close it. Service
+    functions use the pooled connection from `get_pooled_connection`.
+    """
     try:
-        # Determine if DB_FILE is a URI
-        is_uri = isinstance(DB_FILE, str) and DB_FILE.startswith("file:")
-        # Pass uri=True only if it's actually a URI
-        conn = sqlite3.connect(DB_FILE, uri=is_uri)
-        conn.row_factory = (
-            sqlite3.Row
-        )  # Return rows as dictionary-like objects
+        conn = _connect(DB_FILE)
         logger.debug(f"Connected to database: {DB_FILE}")
         return conn
     except sqlite3.Error as e:
@@ -43,6 +80,70 @@ def get_db_connection():
         raise
 
 
+def get_pooled_connection() -> sqlite3.Connection:
+    """Returns this thread's long-lived connection to the current DB_FILE.
+
+    The connection runs in autocommit mode; multi-statement work goes through
+    `db_transaction`. Its prepared statement cache is reused across calls.
+    Do not close it; use `close_db_connections` instead.
+    """
+    connections = getattr(_thread_local, "connections", None)
+    if connections is None:
+        connections = _thread_local.connections = {}
+    conn = connections.get(DB_FILE)
+    if conn is not None:
+        try:
+            conn.in_transaction  # Raises if the connection was closed
+            return conn
+        except sqlite3.ProgrammingError:
+            connections.pop(DB_FILE, None)
+    try:
+        conn = _connect(DB_FILE, isolation_level=None)
+    except sqlite3.Error as e:
+        logger.error(f"Error connecting to database {DB_FILE}: {e}")
+        raise
+    connections[DB_FILE] = conn
+    with _pool_lock:
+        _pooled_connections.append(conn)
+    logger.debug(f"Opened pooled connection to database: {DB_FILE}")
+    return conn
+
+
+def close_db_connections():
+    """Closes all pooled connections (all threads). Call on shutdown."""
+    with _pool_lock:
+        connections = list(_pooled_connections)
+        _pooled_connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _thread_local.connections = {}
+
+
+@contextmanager
+def db_transaction(immediate: bool = True):
+    """Runs a block as one transaction on the pooled connection.
+
+    Uses BEGIN IMMEDIATE by default so read-modify-write sequences take the
+    write lock up front and concurrent workers cannot lose updates. Nested
+    use joins the outer transaction.
+    """
+    conn = get_pooled_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
 def _add_column_if_not_exists(cursor, table_name, column_name, column_type):
     """Helper function to add a column if it doesn't exist."""
     cursor.execute(f"PRAGMA table_info({table_name})")
@@ -100,6 +201,59 @@ def _rename_column_if_exists(
         )
 
 
+def _migrate_performance_history(cursor):
+    """Moves performance_history JSON blobs into the artist_runs table."""
+    cursor.execute(
+        "SELECT artist_id, created_at, performance_history FROM artists "
+        "WHERE performance_history IS NOT NULL"
+    )
+    rows = cursor.fetchall()
+    migrated = 0
+    for row in rows:
+        try:
+            history = json.loads(row["performance_history"])
+        except (TypeError, json.JSONDecodeError) as e:
+            logger.error(
+                f"Skipping unreadable performance_history for artist {row['artist_id']} during migration: {e}"
+            )
+            history = []
+        if isinstance(history, list):
+            migrated += _insert_runs(
+                cursor, row["artist_id"], history, row["created_at"]
+            )
+        cursor.execute(
+            "UPDATE artists SET performance_history = NULL WHERE artist_id = ?",
+            (row["artist_id"],),
+        )
+    logger.info(
+        f"Migrated {migrated} performance history entries from {len(rows)} "
+        f"artists into 'artist_runs'."
+    )
+
+
+def _insert_runs(
+    conn, artist_id: str, history: List[Dict[str, Any]], default_ts=None
+) -> int:
+    """Inserts performance history entries for an artist. Returns count."""
+    default_ts = default_ts or datetime.utcnow().isoformat()
+    rows = [
+        (
+            artist_id,
+            entry.get("run_id"),
+            entry.get("status", "unknown"),
+            entry.get("timestamp") or default_ts,
+        )
+        for entry in history
+        if isinstance(entry, dict)
+    ]
+    conn.executemany(
+        "INSERT INTO artist_runs (artist_id, run_id, status, timestamp) "
+        "VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    return len(rows)
+
+
 def initialize_database():
     """Creates the artists and error_reports tables if they don't exist,         adding/modifying columns as needed."""
     conn = get_db_connection()
@@ -108,8 +262,7 @@ def initialize_database():
     try:
         cursor = conn.cursor()
         # Artists Table - Updated Schema
-        cursor.execute(
-            """
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS artists (
                 artist_id TEXT PRIMARY KEY,
                 name TEXT NOT NULL,
@@ -119,13 +272,12 @@ def initialize_database():
                 created_at TEXT NOT NULL,
                 last_run_at TEXT,
                 status TEXT DEFAULT 'Candidate',
-                performance_history TEXT, -- Storing as JSON string
+                performance_history TEXT, -- Legacy JSON; migrated to artist_runs
                 consecutive_rejections INTEGER DEFAULT 0,
                 autopilot_enabled INTEGER DEFAULT 0, -- Use INTEGER for boolean
                 voice_url TEXT
             )
-            """
-        )
+            """)
         logger.info("Database initialized. 'artists' table checked/created.")
 
         # --- Schema Migrations/Updates ---
@@ -141,9 +293,28 @@ def initialize_database():
             cursor, "artists", "voice_url", "TEXT"
         )  # Add the new voice_url column
 
-        # Error Reports Table (Unchanged)
+        # Artist Runs Table - one row per pipeline run outcome
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS artist_runs (
+                run_pk INTEGER PRIMARY KEY AUTOINCREMENT,
+                artist_id TEXT NOT NULL,
+                run_id TEXT,
+                status TEXT NOT NULL, -- approved, rejected, error, ...
+                timestamp TEXT NOT NULL -- ISO 8601 UTC
+            )
+            """)
         cursor.execute(
-            """
+            "CREATE INDEX IF NOT EXISTS idx_artist_runs_artist_ts ON artist_runs(artist_id, timestamp)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_artist_runs_ts ON artist_runs(timestamp)"
+        )
+        logger.info(
+            "Database initialized. 'artist_runs' table checked/created."
+        )
+
+        # Error Reports Table (Unchanged)
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS error_reports (
                 report_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
@@ -154,8 +325,7 @@ def initialize_database():
                 status TEXT DEFAULT 'new', -- e.g., new, analyzed, fix_suggested, fix_attempted, fix_failed, fix_applied, ignored
                 service_name TEXT -- e.g., batch_runner, error_analysis_service
             )
-            """
-        )
+            """)
         logger.info(
             "Database initialized. 'error_reports' table checked/created."
         )
@@ -167,9 +337,34 @@ def initialize_database():
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_error_hash ON error_reports(error_hash)"
         )
+
+        # Error Occurrences Table - one row per distinct error fingerprint
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS error_occurrences (
+                error_hash TEXT PRIMARY KEY,
+                report_id INTEGER, -- error_reports row of the first occurrence
+                service_name TEXT,
+                occurrence_count INTEGER NOT NULL DEFAULT 1,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+            """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_error_occurrences_last_seen "
+            "ON error_occurrences(last_seen DESC)"
+        )
+        # (status, last_run_at) serves status filters and next-artist
+        # selection without a sort; it supersedes idx_artist_status.
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_artist_status ON artists(status)"
+            "CREATE INDEX IF NOT EXISTS idx_artist_status_last_run ON artists(status, last_run_at)"
         )
+        cursor.execute("DROP INDEX IF EXISTS idx_artist_status")
+
+        user_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if user_version < 2:
+            _migrate_performance_history(cursor)
+        if user_version < SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
         conn.commit()
     except sqlite3.Error as e:
@@ -185,43 +380,43 @@ def initialize_database():
 
 def add_artist(artist_data: Dict[str, Any]) -> Optional[str]:
     """Adds a new artist to the database. Returns artist_id if successful."""
-    conn = get_db_connection()
-    if not conn:
-        return None
-
     artist_id = artist_data.get("artist_id", str(uuid.uuid4()))
     created_at = artist_data.get("created_at", datetime.utcnow().isoformat())
     initial_status = artist_data.get("status", "Candidate")
 
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO artists (
-                artist_id, name, genre, style_notes, llm_config, created_at,
-                last_run_at, status, performance_history, consecutive_rejections,
-                autopilot_enabled, voice_url
+        with db_transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO artists (
+                    artist_id, name, genre, style_notes, llm_config, created_at,
+                    last_run_at, status, consecutive_rejections,
+                    autopilot_enabled, voice_url
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    artist_id,
+                    artist_data["name"],
+                    artist_data.get("genre"),
+                    artist_data.get("style_notes"),
+                    json.dumps(artist_data.get("llm_config", {})),
+                    created_at,
+                    artist_data.get("last_run_at"),
+                    initial_status,
+                    artist_data.get("consecutive_rejections", 0),
+                    (
+                        1 if artist_data.get("autopilot_enabled", False) else 0
+                    ),  # Convert boolean to 1/0
+                    artist_data.get("voice_url"),
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
+            _insert_runs(
+                conn,
                 artist_id,
-                artist_data["name"],
-                artist_data.get("genre"),
-                artist_data.get("style_notes"),
-                json.dumps(artist_data.get("llm_config", {})),
+                artist_data.get("performance_history") or [],
                 created_at,
-                artist_data.get("last_run_at"),
-                initial_status,
-                json.dumps(artist_data.get("performance_history", [])),
-                artist_data.get("consecutive_rejections", 0),
-                (
-                    1 if artist_data.get("autopilot_enabled", False) else 0
-                ),  # Convert boolean to 1/0
-                artist_data.get("voice_url"),
-            ),
-        )
-        conn.commit()
+            )
         logger.info(
             f"Added new artist '{artist_data['name']}' with ID {artist_id} and "
             f"status '{initial_status}'\t."
@@ -235,131 +430,128 @@ def add_artist(artist_data: Dict[str, Any]) -> Optional[str]:
     except sqlite3.Error as e:
         logger.error(f"Error adding artist {artist_id}: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
-def get_artist(artist_id: str) -> Optional[Dict[str, Any]]:
-    """Retrieves a single artist by ID."""
-    conn = get_db_connection()
-    if not conn:
-        return None
-    llm_config_str = None  # Initialize for error logging
-    perf_history_str = None  # Initialize for error logging
+def _row_to_artist(
+    row: sqlite3.Row,
+    history: Optional[List[Dict[str, Any]]] = None,
+    context: str = "",
+) -> Dict[str, Any]:
+    """Converts an artists row to a dict, deserializing JSON fields safely.
+
+    `performance_history` is taken from `history` (recent artist_runs rows);
+    the legacy JSON column is ignored.
+    """
+    artist = dict(row)
+    artist_id = artist.get("artist_id", "UNKNOWN")
+    artist["performance_history"] = history or []
+
+    llm_config_str = artist.get("llm_config")
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM artists WHERE artist_id = ?", (artist_id,)
+        artist["llm_config"] = (
+            json.loads(llm_config_str) if llm_config_str is not None else {}
         )
-        row = cursor.fetchone()
-        if row:
-            artist = dict(row)
-            # Deserialize JSON fields safely
-            perf_history_str = artist.get("performance_history")
-            try:
-                artist["performance_history"] = (
-                    json.loads(perf_history_str)
-                    if perf_history_str is not None
-                    else []
-                )
-            except json.JSONDecodeError as e:
-                logger.error(
-                    f"Error decoding performance_history JSON for artist {artist_id}: {e}. Data: {perf_history_str}"
-                )
-                artist["performance_history"] = (
-                    []
-                )  # Default to empty list on error
+    except json.JSONDecodeError as e:
+        logger.error(
+            f"Error decoding llm_config JSON for artist {artist_id}{context}: {e}. Data: {llm_config_str}"
+        )
+        artist["llm_config"] = {}  # Default to empty dict on error
+
+    # Convert autopilot_enabled from 0/1 to boolean
+    artist["autopilot_enabled"] = bool(artist.get("autopilot_enabled", 0))
+    # voice_url is already TEXT, no conversion needed
+    return artist
+
+
+def _recent_history(conn, artist_id: str) -> List[Dict[str, Any]]:
+    """Returns the last MAX_HISTORY_LENGTH runs of an artist, oldest first."""
+    rows = conn.execute(
+        "SELECT run_id, status, timestamp FROM artist_runs "
+        "WHERE artist_id = ? ORDER BY timestamp DESC, run_pk DESC LIMIT ?",
+        (artist_id, MAX_HISTORY_LENGTH),
+    ).fetchall()
+    return [dict(r) for r in reversed(rows)]
+
+
+def _recent_histories(
+    conn, status_filter: Optional[str] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Returns recent runs for all artists (or one status) in one query."""
+    query = """
+        SELECT artist_id, run_id, status, timestamp FROM (
+            SELECT artist_id, run_id, status, timestamp, run_pk,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY artist_id
+                       ORDER BY timestamp DESC, run_pk DESC
+                   ) AS rn
+            FROM artist_runs
+            {where}
+        )
+        WHERE rn <= ?
+        ORDER BY artist_id, timestamp, run_pk
+    """
+    params: List[Any] = []
+    where = ""
+    if status_filter:
+        where = (
+            "WHERE artist_id IN "
+            "(SELECT artist_id FROM artists WHERE status = ?)"
+        )
+        params.append(status_filter)
+    params.append(MAX_HISTORY_LENGTH)
+    histories: Dict[str, List[Dict[str, Any]]] = {}
+    for r in conn.execute(query.format(where=where), tuple(params)):
+        histories.setdefault(r["artist_id"], []).append(
+            {
+                "run_id": r["run_id"],
+                "status": r["status"],
+                "timestamp": r["timestamp"],
+            }
+        )
+    return histories
 
-            llm_config_str = artist.get("llm_config")
-            try:
-                artist["llm_config"] = (
-                    json.loads(llm_config_str)
-                    if llm_config_str is not None
-                    else {}
-                )
-            except json.JSONDecodeError as e:
-                logger.error(
-                    f"Error decoding llm_config JSON for artist {artist_id}: {e}. Data: {llm_config_str}"
-                )
-                artist["llm_config"] = {}  # Default to empty dict on error
 
-            # Convert autopilot_enabled from 0/1 to boolean
-            artist["autopilot_enabled"] = bool(
-                artist.get("autopilot_enabled", 0)
-            )
-            # voice_url is already TEXT, no conversion needed
-            return artist
-        else:
+def get_artist(artist_id: str) -> Optional[Dict[str, Any]]:
+    """Retrieves a single artist by ID."""
+    conn = get_pooled_connection()
+    try:
+        row = conn.execute(
+            "SELECT * FROM artists WHERE artist_id = ?", (artist_id,)
+        ).fetchone()
+        if not row:
             return None
+        return _row_to_artist(row, _recent_history(conn, artist_id))
     except sqlite3.Error as e:
         logger.error(f"Error getting artist {artist_id}: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_all_artists(
     status_filter: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """Retrieves all artists, optionally filtering by status."""
-    conn = get_db_connection()
-    if not conn:
-        return []
+    conn = get_pooled_connection()
     try:
-        cursor = conn.cursor()
         query = "SELECT * FROM artists"
         params = []
         if status_filter:
             query += " WHERE status = ?"
             params.append(status_filter)
 
-        cursor.execute(query, tuple(params))
-        rows = cursor.fetchall()
+        rows = conn.execute(query, tuple(params)).fetchall()
+        histories = _recent_histories(conn, status_filter)
         artists = []
         for row in rows:
-            artist = dict(row)
-            llm_config_str = None  # Initialize for error logging
-            perf_history_str = None  # Initialize for error logging
             try:
-                # Deserialize JSON fields safely
-                perf_history_str = artist.get("performance_history")
-                try:
-                    artist["performance_history"] = (
-                        json.loads(perf_history_str)
-                        if perf_history_str is not None
-                        else []
-                    )
-                except json.JSONDecodeError as e:
-                    artist_id = artist.get("artist_id", "UNKNOWN")
-                    logger.error(
-                        f"Error decoding performance_history JSON for artist {artist_id} in get_all_artists: {e}. Data: {perf_history_str}"
+                artists.append(
+                    _row_to_artist(
+                        row,
+                        histories.get(row["artist_id"]),
+                        " in get_all_artists",
                     )
-                    artist["performance_history"] = []  # Default to empty list
-
-                llm_config_str = artist.get("llm_config")
-                try:
-                    artist["llm_config"] = (
-                        json.loads(llm_config_str)
-                        if llm_config_str is not None
-                        else {}
-                    )
-                except json.JSONDecodeError as e:
-                    artist_id = artist.get("artist_id", "UNKNOWN")
-                    logger.error(
-                        f"Error decoding llm_config JSON for artist {artist_id} in get_all_artists: {e}. Data: {llm_config_str}"
-                    )
-                    artist["llm_config"] = {}  # Default to empty dict
-
-                # Convert autopilot_enabled from 0/1 to boolean
-                artist["autopilot_enabled"] = bool(
-                    artist.get("autopilot_enabled", 0)
                 )
-                # voice_url is already TEXT, no conversion needed
-                artists.append(artist)
             except Exception as e:  # Catch broader errors during processing
-                artist_id = artist.get("artist_id", "UNKNOWN")
+                artist_id = dict(row).get("artist_id", "UNKNOWN")
                 logger.error(
                     f"Error processing artist {artist_id} in get_all_artists: {e}. Skipping."
                 )
@@ -368,25 +560,117 @@ def get_all_artists(
     except sqlite3.Error as e:
         logger.error(f"Error getting artists (filter: {status_filter}): {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 
-def update_artist(artist_id: str, update_data: Dict[str, Any]) -> bool:
-    """Updates specific fields for an existing artist."""
-    conn = get_db_connection()
-    if not conn:
-        return False
+# Columns returned by lightweight queries (no JSON decoding needed)
+LIGHTWEIGHT_ARTIST_COLUMNS = (
+    "artist_id",
+    "name",
+    "genre",
+    "style_notes",
+    "created_at",
+    "last_run_at",
+    "status",
+    "consecutive_rejections",
+    "autopilot_enabled",
+    "voice_url",
+)
+
+
+def count_artists(statuses: Optional[List[str]] = None) -> int:
+    """Counts artists, optionally only those whose status is in `statuses`."""
+    conn = get_pooled_connection()
+    query = "SELECT COUNT(*) FROM artists"
+    params: List[Any] = []
+    if statuses:
+        query += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+        params.extend(statuses)
+    try:
+        return conn.execute(query, tuple(params)).fetchone()[0]
+    except sqlite3.Error as e:
+        logger.error(f"Error counting artists (statuses: {statuses}): {e}")
+        return 0
+
+
+def select_next_artists(
+    statuses: Optional[List[str]] = None,
+    limit: int = 1,
+    exclude_ids: Optional[List[str]] = None,
+    lightweight: bool = False,
+) -> List[Dict[str, Any]]:
+    """Returns the next artists to run, least recently run first.
+
+    Statuses are tried in the given priority order; within a status,
+    artists that never ran come first, then the oldest last_run_at. Each
+    status is one probe of the (status, last_run_at) index that stops after
+    `limit` rows, so the cost does not grow with the roster size.
 
+    Args:
+        statuses: Eligible statuses in priority order
+            (default: Candidate, then Active).
+        limit: Maximum number of artists to return.
+        exclude_ids: Artist IDs that must not be selected.
+        lightweight: Return only LIGHTWEIGHT_ARTIST_COLUMNS, skipping the
+            JSON columns and run history.
+    """
+    statuses = statuses or ["Candidate", "Active"]
+    exclude_ids = [str(a) for a in (exclude_ids or ())]
+    columns = ", ".join(LIGHTWEIGHT_ARTIST_COLUMNS) if lightweight else "*"
+    query = f"SELECT {columns} FROM artists WHERE status = ?"
+    if exclude_ids:
+        query += f" AND artist_id NOT IN ({', '.join('?' * len(exclude_ids))})"
+    query += " ORDER BY last_run_at LIMIT ?"
+    conn = get_pooled_connection()
+    selected = []
+    try:
+        for status in statuses:
+            remaining = limit - len(selected)
+            if remaining <= 0:
+                break
+            rows = conn.execute(
+                query, (status, *exclude_ids, remaining)
+            ).fetchall()
+            for row in rows:
+                if lightweight:
+                    artist = dict(row)
+                    artist["autopilot_enabled"] = bool(
+                        artist.get("autopilot_enabled", 0)
+                    )
+                else:
+                    artist = _row_to_artist(
+                        row,
+                        _recent_history(conn, row["artist_id"]),
+                        " in select_next_artists",
+                    )
+                selected.append(artist)
+        return selected
+    except sqlite3.Error as e:
+        logger.error(
+            f"Error selecting next artists (statuses: {statuses}): {e}"
+        )
+        return []
+
+
+def _build_artist_update(
+    artist_id: str, update_data: Dict[str, Any]
+) -> Optional[tuple]:
+    """Builds the UPDATE statement for `update_data`.
+
+    `performance_history` is not a column update; see `update_artist`.
+
+    Returns:
+        (query, values), or None if no valid fields were provided.
+    """
     fields = []
     values = []
     for key, value in update_data.items():
         # Handle specific fields that need transformation
-        if key == "performance_history" or key == "llm_config":
+        if key == "performance_history":
+            continue  # Stored in artist_runs
+        elif key == "llm_config":
             try:
-                fields.append(f"{key} = ?")
                 values.append(json.dumps(value))
+                fields.append(f"{key} = ?")
             except (TypeError, OverflowError) as e:
                 logger.error(
                     f"Error serializing JSON field {key} for artist {artist_id}: {e}. Skipping field."
@@ -402,6 +686,26 @@ def update_artist(artist_id: str, update_data: Dict[str, Any]) -> bool:
             values.append(value)
 
     if not fields:
+        return None
+
+    # Sorted field order keeps the SQL text stable so the prepared
+    # statement cache can reuse it.
+    order = sorted(range(len(fields)), key=lambda i: fields[i])
+    set_clause = ", ".join(fields[i] for i in order)
+    values = [values[i] for i in order]
+    query = f"UPDATE artists SET {set_clause} WHERE artist_id = ?"
+    values.append(artist_id)
+    return query, tuple(values)
+
+
+def update_artist(artist_id: str, update_data: Dict[str, Any]) -> bool:
+    """Updates specific fields for an existing artist.
+
+    Passing `performance_history` replaces the artist's stored runs.
+    """
+    statement = _build_artist_update(artist_id, update_data)
+    replace_history = isinstance(update_data.get("performance_history"), list)
+    if not statement and not replace_history:
         logger.warning(
             f"No valid fields provided for update for artist {artist_id}."
         )
@@ -410,27 +714,35 @@ def update_artist(artist_id: str, update_data: Dict[str, Any]) -> bool:
         # Let's return False for clarity that no update occurred.
         return False
 
-    set_clause = ", ".join(fields)
-    query = f"UPDATE artists SET {set_clause} WHERE artist_id = ?"
-    values.append(artist_id)
-
     try:
-        cursor = conn.cursor()
-        cursor.execute(query, tuple(values))
-        conn.commit()
-        if cursor.rowcount == 0:
-            logger.warning(
-                f"Attempted to update non-existent artist ID: {artist_id}"
-            )
-            return False
+        with db_transaction() as conn:
+            if statement:
+                found = conn.execute(*statement).rowcount > 0
+            else:
+                found = (
+                    conn.execute(
+                        "SELECT 1 FROM artists WHERE artist_id = ?",
+                        (artist_id,),
+                    ).fetchone()
+                    is not None
+                )
+            if not found:
+                logger.warning(
+                    f"Attempted to update non-existent artist ID: {artist_id}"
+                )
+                return False
+            if replace_history:
+                conn.execute(
+                    "DELETE FROM artist_runs WHERE artist_id = ?", (artist_id,)
+                )
+                _insert_runs(
+                    conn, artist_id, update_data["performance_history"]
+                )
         logger.debug(f"Updated artist {artist_id} with data: {update_data}")
         return True
     except sqlite3.Error as e:
         logger.error(f"Error updating artist {artist_id}: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
 def update_artist_status(artist_id: str, new_status: str) -> bool:
@@ -438,10 +750,80 @@ def update_artist_status(artist_id: str, new_status: str) -> bool:
     return update_artist(artist_id, {"status": new_status})
 
 
+def update_artist_statuses(
+    updates: List[Tuple[str, str, str]],
+) -> Optional[List[str]]:
+    """Applies many status changes as compare-and-set, in one transaction.
+
+    Each change only applies if the artist still has the status it was
+    decided from, so a status a concurrent run changed in the meantime is
+    never overwritten.
+
+    Args:
+        updates: (artist_id, expected_status, new_status) triples.
+
+    Returns:
+        IDs of the artists updated (the others had a different status by
+        now), or None if the transaction failed.
+    """
+    if not updates:
+        return []
+    try:
+        applied = []
+        with db_transaction() as conn:
+            for artist_id, expected_status, new_status in updates:
+                cursor = conn.execute(
+                    "UPDATE artists SET status = ? "
+                    "WHERE artist_id = ? AND status = ?",
+                    (new_status, artist_id, expected_status),
+                )
+                if cursor.rowcount:
+                    applied.append(artist_id)
+        logger.debug(
+            f"Updated status for {len(applied)} of {len(updates)} artists "
+            f"in one batch."
+        )
+        return applied
+    except sqlite3.Error as e:
+        logger.error(f"Error applying batched artist status updates: {e}")
+        return None
+
+
+def get_lifecycle_states(
+    statuses: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Retrieves the columns lifecycle evaluation needs, without JSON fields.
+
+    Args:
+        statuses: Only artists whose status is in this list (all if None).
+
+    Returns:
+        Dicts with artist_id, status, last_run_at and consecutive_rejections.
+    """
+    conn = get_pooled_connection()
+    query = (
+        "SELECT artist_id, status, last_run_at, consecutive_rejections "
+        "FROM artists"
+    )
+    params: List[Any] = []
+    if statuses:
+        query += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+        params.extend(statuses)
+    try:
+        return [dict(r) for r in conn.execute(query, tuple(params))]
+    except sqlite3.Error as e:
+        logger.error(f"Error getting artist lifecycle states: {e}")
+        return []
+
+
 def update_artist_performance_db(
     artist_id: str, run_id: str, status: str, retirement_threshold: int
 ) -> bool:
-    """Updates performance history, rejection count,         and potentially status based on run outcome.
+    """Records a run outcome, updates rejection count,         and potentially status based on run outcome.
+
+    The run is appended to the artist_runs table. The read and the writes
+    run in a single BEGIN IMMEDIATE transaction so concurrent pipeline
+    workers cannot lose each other's updates.
 
     Args:
         artist_id: The ID of the artist.
@@ -453,54 +835,177 @@ def update_artist_performance_db(
     Returns:
         True if the update was successful, False otherwise.
     """
-    artist = get_artist(artist_id)
-    if not artist:
-        logger.warning(
-            f"Attempted to update performance for non-existent artist ID:                 {artist_id}"
-        )
-        return False
+    try:
+        with db_transaction() as conn:
+            artist = conn.execute(
+                "SELECT consecutive_rejections, status FROM artists "
+                "WHERE artist_id = ?",
+                (artist_id,),
+            ).fetchone()
+            if not artist:
+                logger.warning(
+                    f"Attempted to update performance for non-existent artist ID:                         {artist_id}"
+                )
+                return False
 
-    now_iso = datetime.utcnow().isoformat()
-    new_history_entry = {
-        "run_id": run_id,
-        "status": status,
-        "timestamp": now_iso,
-    }
-    performance_history = artist.get("performance_history", [])
-    performance_history.append(new_history_entry)
-    # Keep history trimmed to MAX_HISTORY_LENGTH
-    if len(performance_history) > MAX_HISTORY_LENGTH:
-        performance_history = performance_history[-MAX_HISTORY_LENGTH:]
-
-    update_payload = {
-        "last_run_at": now_iso,
-        "performance_history": performance_history,
-    }
-
-    current_rejections = artist.get("consecutive_rejections", 0)
-    current_status = artist.get("status", "Candidate")
-
-    if status == "approved":
-        update_payload["consecutive_rejections"] = 0
-        # If artist was Paused or Retired due to rejections, maybe reactivate?
-        # Current logic: Approval resets counter but doesn't change status automatically.
-        # Manual reactivation might be preferred.
-    elif status == "rejected":
-        new_rejection_count = current_rejections + 1
-        update_payload["consecutive_rejections"] = new_rejection_count
-        # Check for retirement only if currently Active or Candidate
-        if (
-            current_status in ["Active", "Candidate"]
-            and new_rejection_count >= retirement_threshold
-        ):
-            update_payload["status"] = "Retired"
-            logger.info(
-                f"Artist {artist_id} reached rejection threshold                     ({retirement_threshold}). Setting status to Retired."
+            now_iso = datetime.utcnow().isoformat()
+            _insert_runs(
+                conn,
+                artist_id,
+                [{"run_id": run_id, "status": status, "timestamp": now_iso}],
             )
-    # else: status is 'error' or something else, don't change rejection count or status
 
-    # Perform the update
-    return update_artist(artist_id, update_payload)
+            update_payload = {"last_run_at": now_iso}
+
+            current_rejections = artist["consecutive_rejections"] or 0
+            current_status = artist["status"] or "Candidate"
+
+            if status == "approved":
+                update_payload["consecutive_rejections"] = 0
+                # If artist was Paused or Retired due to rejections, maybe reactivate?
+                # Current logic: Approval resets counter but doesn't change status automatically.
+                # Manual reactivation might be preferred.
+            elif status == "rejected":
+                new_rejection_count = current_rejections + 1
+                update_payload["consecutive_rejections"] = new_rejection_count
+                # Check for retirement only if currently Active or Candidate
+                if (
+                    current_status in ["Active", "Candidate"]
+                    and new_rejection_count >= retirement_threshold
+                ):
+                    update_payload["status"] = "Retired"
+                    logger.info(
+                        f"Artist {artist_id} reached rejection threshold                             ({retirement_threshold}). Setting status to Retired."
+                    )
+            # else: status is 'error' or something else, don't change rejection count or status
+
+            # Perform the update
+            conn.execute(*_build_artist_update(artist_id, update_payload))
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error updating performance for artist {artist_id}: {e}")
+        return False
+
+
+# --- Artist Run Queries ---
+
+
+def get_artist_runs(
+    artist_id: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Retrieves an artist's runs, oldest first.
+
+    Args:
+        artist_id: The ID of the artist.
+        since: Only runs with timestamp >= this ISO timestamp.
+        until: Only runs with timestamp < this ISO timestamp.
+        limit: Return only the most recent `limit` runs.
+    """
+    conn = get_pooled_connection()
+    query = (
+        "SELECT run_id, status, timestamp FROM artist_runs WHERE artist_id = ?"
+    )
+    params: List[Any] = [artist_id]
+    if since:
+        query += " AND timestamp >= ?"
+        params.append(since)
+    if until:
+        query += " AND timestamp < ?"
+        params.append(until)
+    query += " ORDER BY timestamp DESC, run_pk DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    try:
+        rows = conn.execute(query, tuple(params)).fetchall()
+        return [dict(r) for r in reversed(rows)]
+    except sqlite3.Error as e:
+        logger.error(f"Error getting runs for artist {artist_id}: {e}")
+        return []
+
+
+def get_performance_summaries(
+    since: Optional[str] = None, until: Optional[str] = None
+) -> Dict[str, Dict[str, int]]:
+    """Aggregates run outcomes per artist in one GROUP BY query.
+
+    Args:
+        since: Only count runs with timestamp >= this ISO timestamp.
+        until: Only count runs with timestamp < this ISO timestamp.
+
+    Returns:
+        Mapping of artist_id to total_runs, approved_runs, rejected_runs and
+        error_runs. Artists without runs in the window are absent.
+    """
+    conn = get_pooled_connection()
+    query = """
+        SELECT artist_id,
+               COUNT(*) AS total_runs,
+               SUM(status = 'approved') AS approved_runs,
+               SUM(status = 'rejected') AS rejected_runs,
+               SUM(status = 'error') AS error_runs
+        FROM artist_runs
+    """
+    conditions = []
+    params: List[Any] = []
+    if since:
+        conditions.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        conditions.append("timestamp < ?")
+        params.append(until)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " GROUP BY artist_id"
+    try:
+        return {
+            r["artist_id"]: {
+                "total_runs": r["total_runs"],
+                "approved_runs": r["approved_runs"],
+                "rejected_runs": r["rejected_runs"],
+                "error_runs": r["error_runs"],
+            }
+            for r in conn.execute(query, tuple(params))
+        }
+    except sqlite3.Error as e:
+        logger.error(f"Error aggregating artist performance: {e}")
+        return {}
+
+
+def get_performance_summary(
+    artist_id: str, since: Optional[str] = None, until: Optional[str] = None
+) -> Dict[str, int]:
+    """Aggregates one artist's run outcomes over a time window."""
+    conn = get_pooled_connection()
+    query = """
+        SELECT COUNT(*) AS total_runs,
+               COALESCE(SUM(status = 'approved'), 0) AS approved_runs,
+               COALESCE(SUM(status = 'rejected'), 0) AS rejected_runs,
+               COALESCE(SUM(status = 'error'), 0) AS error_runs
+        FROM artist_runs WHERE artist_id = ?
+    """
+    params: List[Any] = [artist_id]
+    if since:
+        query += " AND timestamp >= ?"
+        params.append(since)
+    if until:
+        query += " AND timestamp < ?"
+        params.append(until)
+    try:
+        return dict(conn.execute(query, tuple(params)).fetchone())
+    except sqlite3.Error as e:
+        logger.error(
+            f"Error aggregating performance for artist {artist_id}: {e}"
+        )
+        return {
+            "total_runs": 0,
+            "approved_runs": 0,
+            "rejected_runs": 0,
+            "error_runs": 0,
+        }
 
 
 # --- Error Report CRUD Operations (Placeholder - Implement if needed) ---
@@ -508,13 +1013,10 @@ def update_artist_performance_db(
 
 def add_error_report(report_data: Dict[str, Any]) -> Optional[int]:
     """Adds a new error report to the database. Returns report_id."""
-    conn = get_db_connection()
-    if not conn:
-        return None
+    conn = get_pooled_connection()
     timestamp = report_data.get("timestamp", datetime.utcnow().isoformat())
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = conn.execute(
             """
             INSERT INTO error_reports (
                 timestamp, error_hash, error_log, analysis, fix_suggestion,
@@ -532,50 +1034,35 @@ def add_error_report(report_data: Dict[str, Any]) -> Optional[int]:
                 report_data.get("service_name"),
             ),
         )
-        conn.commit()
         report_id = cursor.lastrowid
         logger.info(f"Added new error report with ID {report_id}.")
         return report_id
     except sqlite3.Error as e:
         logger.error(f"Error adding error report: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_error_report(report_id: int) -> Optional[Dict[str, Any]]:
     """Retrieves a single error report by ID."""
-    conn = get_db_connection()
-    if not conn:
-        return None
+    conn = get_pooled_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        row = conn.execute(
             "SELECT * FROM error_reports WHERE report_id = ?", (report_id,)
-        )
-        row = cursor.fetchone()
+        ).fetchone()
         return dict(row) if row else None
     except sqlite3.Error as e:
         logger.error(f"Error getting error report {report_id}: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
 def update_error_report_status(report_id: int, new_status: str) -> bool:
     """Updates the status of an error report."""
-    conn = get_db_connection()
-    if not conn:
-        return False
+    conn = get_pooled_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = conn.execute(
             "UPDATE error_reports SET status = ? WHERE report_id = ?",
             (new_status, report_id),
         )
-        conn.commit()
         if cursor.rowcount == 0:
             logger.warning(
                 f"Attempted to update status for non-existent error report ID:                     {report_id}"
@@ -590,74 +1077,123 @@ def update_error_report_status(report_id: int, new_status: str) -> bool:
             f"Error updating status for error report {report_id}: {e}"
         )
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_error_reports_by_status(
     status: str = "new", limit: int = 100
 ) -> List[Dict[str, Any]]:
     """Retrieves error reports by status, ordered by timestamp."""
-    conn = get_db_connection()
-    if not conn:
-        return []
+    conn = get_pooled_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        rows = conn.execute(
             "SELECT * FROM error_reports WHERE status = ? ORDER BY timestamp ASC                 LIMIT ?",
             (status, limit),
-        )
-        rows = cursor.fetchall()
+        ).fetchall()
         return [dict(row) for row in rows]
     except sqlite3.Error as e:
         logger.error(f"Error getting error reports by status {status}: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 
 def prune_error_reports() -> bool:
     """Removes the oldest error reports if the total exceeds MAX_ERROR_REPORTS."""
-    conn = get_db_connection()
-    if not conn:
-        return False
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM error_reports")
-        count = cursor.fetchone()[0]
-
-        if count > MAX_ERROR_REPORTS:
-            num_to_delete = count - MAX_ERROR_REPORTS
-            # Find the timestamp of the Nth oldest report (where N = num_to_delete)
-            cursor.execute(
-                "SELECT timestamp FROM error_reports ORDER BY timestamp ASC LIMIT                     1 OFFSET ?",
-                (num_to_delete - 1,),
-            )
-            threshold_timestamp = cursor.fetchone()
-            if threshold_timestamp:
-                cursor.execute(
-                    "DELETE FROM error_reports WHERE timestamp <= ?",
-                    (threshold_timestamp["timestamp"],),
-                )
-                conn.commit()
-                logger.info(
-                    f"Pruned {cursor.rowcount} old error reports (exceeded                         {MAX_ERROR_REPORTS})."
-                )
+        with db_transaction() as conn:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM error_reports"
+            ).fetchone()[0]
+
+            if count > MAX_ERROR_REPORTS:
+                num_to_delete = count - MAX_ERROR_REPORTS
+                # Find the timestamp of the Nth oldest report (where N = num_to_delete)
+                threshold_timestamp = conn.execute(
+                    "SELECT timestamp FROM error_reports ORDER BY timestamp ASC LIMIT                         1 OFFSET ?",
+                    (num_to_delete - 1,),
+                ).fetchone()
+                if threshold_timestamp:
+                    cursor = conn.execute(
+                        "DELETE FROM error_reports WHERE timestamp <= ?",
+                        (threshold_timestamp["timestamp"],),
+                    )
+                    logger.info(
+                        f"Pruned {cursor.rowcount} old error reports (exceeded                             {MAX_ERROR_REPORTS})."
+                    )
+                else:
+                    logger.warning(
+                        "Could not determine threshold timestamp for pruning errors."
+                    )
             else:
-                logger.warning(
-                    "Could not determine threshold timestamp for pruning errors."
+                logger.debug(
+                    "Error report count within limit, no pruning needed."
                 )
-        else:
-            logger.debug("Error report count within limit, no pruning needed.")
         return True
     except sqlite3.Error as e:
         logger.error(f"Error pruning error reports: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
+
+
+def record_error_occurrence(
+    error_hash: str,
+    timestamp: Optional[str] = None,
+    service_name: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Counts one occurrence of a fingerprinted error.
+
+    Returns the updated occurrence row; an occurrence_count of 1 means the
+    error was seen for the first time.
+    """
+    timestamp = timestamp or datetime.utcnow().isoformat()
+    try:
+        with db_transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO error_occurrences (
+                    error_hash, service_name, occurrence_count,
+                    first_seen, last_seen
+                )
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(error_hash) DO UPDATE SET
+                    occurrence_count = occurrence_count + 1,
+                    last_seen = MAX(last_seen, excluded.last_seen)
+                """,
+                (error_hash, service_name, timestamp, timestamp),
+            )
+            row = conn.execute(
+                "SELECT * FROM error_occurrences WHERE error_hash = ?",
+                (error_hash,),
+            ).fetchone()
+        return dict(row)
+    except sqlite3.Error as e:
+        logger.error(f"Error recording occurrence of error {error_hash}: {e}")
+        return None
+
+
+def set_error_occurrence_report(error_hash: str, report_id: int) -> bool:
+    """Links an error fingerprint to the report created for it."""
+    conn = get_pooled_connection()
+    try:
+        cursor = conn.execute(
+            "UPDATE error_occurrences SET report_id = ? WHERE error_hash = ?",
+            (report_id, error_hash),
+        )
+        return cursor.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error linking error {error_hash} to a report: {e}")
+        return False
+
+
+def get_error_occurrence(error_hash: str) -> Optional[Dict[str, Any]]:
+    """Retrieves the occurrence row of an error fingerprint."""
+    conn = get_pooled_connection()
+    try:
+        row = conn.execute(
+            "SELECT * FROM error_occurrences WHERE error_hash = ?",
+            (error_hash,),
+        ).fetchone()
+        return dict(row) if row else None
+    except sqlite3.Error as e:
+        logger.error(f"Error getting occurrence of error {error_hash}: {e}")
+        return None
 
 
 # --- Main block for testing/initialization ---
@@ -8,6 +8,7 @@ import logging
 import os
 import sys
 import random
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
@@ -33,8 +34,10 @@ try:
         get_all_artists,
         initialize_database,
         add_artist,
-        # Add get_artist_performance_summary if it exists and is needed, or
-        # implement calculation here
+        get_performance_summary,
+        get_performance_summaries,
+        get_lifecycle_states,
+        update_artist_statuses,
     )
 
     db_imports_successful = True
@@ -72,6 +75,22 @@ except ImportError as e:
         logger.error("DB function add_artist not available.")
         return None
 
+    def get_performance_summary(artist_id, since=None, until=None):
+        logger.error("DB function get_performance_summary not available.")
+        return {}
+
+    def get_performance_summaries(since=None, until=None):
+        logger.error("DB function get_performance_summaries not available.")
+        return {}
+
+    def get_lifecycle_states(statuses=None):
+        logger.error("DB function get_lifecycle_states not available.")
+        return []
+
+    def update_artist_statuses(updates):
+        logger.error("DB function update_artist_statuses not available.")
+        return None
+
 
 # --- Configuration (Load from .env or config file ideally) ---
 # Performance Evaluation
@@ -102,6 +121,10 @@ RETIREMENT_PAUSED_DAYS = int(os.getenv("RETIREMENT_PAUSED_DAYS", 90))
 RETIREMENT_FAILED_EVOLUTIONS = int(
     os.getenv("RETIREMENT_FAILED_EVOLUTIONS", 3)
 )
+# Statuses evaluated by the periodic lifecycle sweep
+LIFECYCLE_CHECK_STATUSES = ["Active", "Evolving", "Candidate", "Paused"]
+# Decision returned when an artist should evolve rather than change status
+EVOLVE_ACTION = "evolve"
 
 
 class ArtistLifecycleManager:
@@ -118,50 +141,21 @@ class ArtistLifecycleManager:
         else:
             logger.info("Artist Lifecycle Manager initialized.")
 
-    def _get_performance_summary(self, artist_id: str) -> Dict[str, Any]:
-        """Retrieves and calculates performance summary for an artist."""
-        if not db_imports_successful:
-            return {"error": "Database functions not available"}
-
-        artist_data = get_artist(artist_id)
-        if not artist_data:
-            return {"error": "Artist not found"}
-
-        history = artist_data.get("performance_history", [])
-        if not isinstance(history, list):
-            logger.warning(
-                f"Performance history for artist {artist_id} is not a list: "
-                f"{history}"
-            )
-            history = []
-
-        # Filter history for the evaluation period
-        cutoff_date = datetime.utcnow() - timedelta(
-            days=PERFORMANCE_EVALUATION_PERIOD_DAYS
-        )
-        recent_history = [
-            run
-            for run in history
-            if datetime.fromisoformat(run["timestamp"]) >= cutoff_date
-        ]
-
-        total_runs = len(recent_history)
-        approved_runs = sum(
-            1 for run in recent_history if run["status"] == "approved"
-        )
-        rejected_runs = sum(
-            1 for run in recent_history if run["status"] == "rejected"
-        )
-        # TODO: Calculate error rate if error status is logged in history
-        error_runs = sum(
-            1 for run in recent_history if run["status"] == "error"
-        )
+    @staticmethod
+    def _build_performance_summary(
+        artist_id: str, artist_state: Dict[str, Any], counts: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Combines an artist's row fields with its aggregated run counts."""
+        total_runs = counts.get("total_runs", 0)
+        approved_runs = counts.get("approved_runs", 0)
+        rejected_runs = counts.get("rejected_runs", 0)
+        error_runs = counts.get("error_runs", 0)
 
         approval_rate = approved_runs / total_runs if total_runs > 0 else 0
         error_rate = error_runs / total_runs if total_runs > 0 else 0
 
         # Calculate inactivity
-        last_run_timestamp_str = artist_data.get("last_run_at")
+        last_run_timestamp_str = artist_state.get("last_run_at")
         inactivity_days = None
         if last_run_timestamp_str:
             try:
@@ -182,29 +176,43 @@ class ArtistLifecycleManager:
             "error_runs": error_runs,
             "approval_rate": approval_rate,
             "error_rate": error_rate,
-            "consecutive_rejections": artist_data.get(
-                "consecutive_rejections", 0
-            ),
+            "consecutive_rejections": artist_state.get(
+                "consecutive_rejections"
+            )
+            or 0,
             "inactivity_days": inactivity_days,
-            "current_status": artist_data.get("status", "Unknown"),
+            "current_status": artist_state.get("status") or "Unknown",
         }
         return summary
 
-    def evaluate_artist_lifecycle(self, artist_id: str) -> Optional[str]:
-        """Evaluates an artist and triggers lifecycle actions (evolution,
-        pausing, retirement)."""
+    def _get_performance_summary(self, artist_id: str) -> Dict[str, Any]:
+        """Retrieves and calculates performance summary for an artist."""
         if not db_imports_successful:
-            return None
+            return {"error": "Database functions not available"}
 
-        logger.info(f"Evaluating lifecycle for artist {artist_id}...")
-        performance = self._get_performance_summary(artist_id)
+        artist_data = get_artist(artist_id)
+        if not artist_data:
+            return {"error": "Artist not found"}
 
-        if "error" in performance:
-            logger.error(
-                f"Cannot evaluate artist {artist_id}: {performance['error']}"
-            )
-            return None
+        # Aggregate run outcomes for the evaluation period in SQL
+        cutoff_date = datetime.utcnow() - timedelta(
+            days=PERFORMANCE_EVALUATION_PERIOD_DAYS
+        )
+        counts = get_performance_summary(
+            artist_id, since=cutoff_date.isoformat()
+        )
+        return self._build_performance_summary(artist_id, artist_data, counts)
+
+    def _decide_lifecycle(
+        self, artist_id: str, performance: Dict[str, Any]
+    ) -> str:
+        """Decides an artist's next status from its performance summary.
 
+        Pure decision logic: nothing is written to the database.
+
+        Returns:
+            The target status, or EVOLVE_ACTION if the artist should evolve.
+        """
         total_runs = performance["total_runs"]
         approval_rate = performance["approval_rate"]
         error_rate = performance["error_rate"]
@@ -230,7 +238,6 @@ class ArtistLifecycleManager:
                 f"Artist {artist_id} met retirement threshold "
                 f"({consecutive_rejections} consecutive rejections). Retiring."
             )
-            update_artist_status(artist_id, "Retired")
             return "Retired"
 
         # 1. Handle non-active states first
@@ -244,7 +251,6 @@ class ArtistLifecycleManager:
                 logger.warning(
                     f"Artist {artist_id} has been paused for {inactivity_days} days. Retiring."
                 )
-                update_artist_status(artist_id, "Retired")
                 return "Retired"
             # If already Retired or Paused (but not long enough for retirement), skip further evaluation
             logger.info(
@@ -264,7 +270,6 @@ class ArtistLifecycleManager:
                 logger.warning(
                     f"Artist {artist_id} has insufficient runs ({total_runs}) but is inactive for {inactivity_days} days. Pausing."
                 )
-                update_artist_status(artist_id, "Paused")
                 return "Paused"
             logger.info(
                 f"Artist {artist_id} has insufficient runs ({total_runs}) for full performance evaluation. Skipping performance checks."
@@ -280,7 +285,6 @@ class ArtistLifecycleManager:
             logger.warning(
                 f"Artist {artist_id} performance is critically low (Approval: {approval_rate:.2f}, Error: {error_rate:.2f}). Pausing."
             )
-            update_artist_status(artist_id, "Paused")
             return "Paused"
 
         # 4. Check for Pausing (Inactivity)
@@ -291,7 +295,6 @@ class ArtistLifecycleManager:
             logger.warning(
                 f"Artist {artist_id} has been inactive for {inactivity_days} days. Pausing."
             )
-            update_artist_status(artist_id, "Paused")
             return "Paused"
 
         # 5. Check for Evolution (Poor Performance, but not critical)
@@ -299,18 +302,7 @@ class ArtistLifecycleManager:
             logger.warning(
                 f"Artist {artist_id} shows poor performance (Approval Rate: {approval_rate:.2f}). Triggering evolution."
             )
-            evolved = self.trigger_evolution(artist_id, performance)
-            # trigger_evolution sets status to Active if successful, Paused if failed
-            # We return the status set by trigger_evolution implicitly via DB read next cycle, or just report Evolving attempt
-            # For clarity, let's return the status set by the evolution function if possible, otherwise the current status
-            # Re-fetch status after evolution attempt? Or rely on next cycle?
-            # Let's rely on next cycle for now.
-            # The function returns True/False, not the new status. Let's report 'Evolving' conceptually.
-            # If evolution was attempted, the status is likely 'Active' or 'Paused' now.
-            # Let's return the *intended* outcome status based on `evolved` flag.
-            return (
-                "Active" if evolved else "Paused"
-            )  # Return status set by evolution attempt
+            return EVOLVE_ACTION
 
         # 6. Check for Evolution (Good Performance - Refinement Opportunity)
         if approval_rate > EVOLUTION_GOOD_PERF_APPROVAL_RATE:
@@ -324,7 +316,6 @@ class ArtistLifecycleManager:
                 logger.info(
                     f"Promoting Candidate artist {artist_id} to Active based on good performance."
                 )
-                update_artist_status(artist_id, "Active")
                 return "Active"
             return current_status  # No status change for Active/Evolving high performers for now
 
@@ -335,34 +326,47 @@ class ArtistLifecycleManager:
             logger.info(
                 f"Promoting Candidate artist {artist_id} to Active based on adequate performance."
             )
-            update_artist_status(artist_id, "Active")
             return "Active"
         # If status was Evolving, set back to Active after successful evaluation period
         if current_status == "Evolving":
-            update_artist_status(artist_id, "Active")
             return "Active"
         return current_status  # Should already be Active
 
-    def trigger_evolution(
-        self, artist_id: str, performance_summary: Dict[str, Any]
-    ) -> bool:
-        """Attempts to evolve an artist based on poor performance. Sets status
-        to Active if successful, Paused if failed."""
+    def evaluate_artist_lifecycle(self, artist_id: str) -> Optional[str]:
+        """Evaluates an artist and triggers lifecycle actions (evolution,
+        pausing, retirement)."""
         if not db_imports_successful:
-            return False
+            return None
 
-        artist_data = get_artist(artist_id)
-        if not artist_data:
-            logger.error(f"Cannot evolve non-existent artist {artist_id}.")
-            return False
+        logger.info(f"Evaluating lifecycle for artist {artist_id}...")
+        performance = self._get_performance_summary(artist_id)
 
-        logger.info(
-            f"Attempting evolution for artist {artist_id} due to poor performance."
-        )
-        # Set status to Evolving temporarily during the process? Or just attempt change?
-        # Let's attempt change and set final status based on outcome.
-        # update_artist_status(artist_id, "Evolving") # Maybe not needed if we set Active/Paused at end
+        if "error" in performance:
+            logger.error(
+                f"Cannot evaluate artist {artist_id}: {performance['error']}"
+            )
+            return None
+
+        decision = self._decide_lifecycle(artist_id, performance)
+        if decision == EVOLVE_ACTION:
+            # trigger_evolution sets status to Active if successful, Paused
+            # if failed; report the status it set.
+            evolved = self.trigger_evolution(artist_id, performance)
+            return "Active" if evolved else "Paused"
+        if decision != performance["current_status"]:
+            update_artist_status(artist_id, decision)
+        return decision
+
+    def _apply_evolution(self, artist_data: Dict[str, Any]) -> bool:
+        """Applies an evolution strategy to an artist's profile.
 
+        Only the evolved profile fields are written; the caller sets the
+        resulting status.
+
+        Returns:
+            True if a strategy was applied and saved.
+        """
+        artist_id = artist_data["artist_id"]
         # --- Evolution Strategies --- #
         # Strategy 1: Adjust LLM Config (e.g., temperature)
         current_llm_config = artist_data.get("llm_config", {})
@@ -381,18 +385,14 @@ class ArtistLifecycleManager:
                 logger.info(
                     f"Evolution Strategy: Adjusting LLM temperature for {artist_id} from {original_temp} to {new_temp}."
                 )
-                success = update_artist(
+                if update_artist(
                     artist_id, {"llm_config": current_llm_config}
-                )
-                if success:
-                    update_artist_status(artist_id, "Active")
+                ):
                     return True
-                else:
-                    logger.error(
-                        f"Failed to update LLM config for artist {artist_id}. Pausing."
-                    )
-                    update_artist_status(artist_id, "Paused")
-                    return False
+                logger.error(
+                    f"Failed to update LLM config for artist {artist_id}. Pausing."
+                )
+                return False
 
         # Strategy 2: (Placeholder) Modify Style Notes via LLM
         # logger.info(f"Evolution Strategy: Requesting LLM to refine style notes for {artist_id}.")
@@ -400,7 +400,6 @@ class ArtistLifecycleManager:
         # if new_style_notes:
         #     success = update_artist(artist_id, {"style_notes": new_style_notes})
         #     if success:
-        #         update_artist_status(artist_id, "Active")
         #         return True
 
         # Strategy 3: (Placeholder) Change Genre slightly
@@ -410,42 +409,139 @@ class ArtistLifecycleManager:
         logger.warning(
             f"Evolution failed for artist {artist_id} (no applicable strategy or update failed). Pausing."
         )
-        update_artist_status(artist_id, "Paused")
         # TODO: Increment a 'failed_evolutions' counter?
         return False
 
-    def run_lifecycle_checks(self):
-        """Runs lifecycle evaluation for all relevant artists."""
+    def trigger_evolution(
+        self, artist_id: str, performance_summary: Dict[str, Any]
+    ) -> bool:
+        """Attempts to evolve an artist based on poor performance. Sets status
+        to Active if successful, Paused if failed."""
+        if not db_imports_successful:
+            return False
+
+        artist_data = get_artist(artist_id)
+        if not artist_data:
+            logger.error(f"Cannot evolve non-existent artist {artist_id}.")
+            return False
+
+        logger.info(
+            f"Attempting evolution for artist {artist_id} due to poor performance."
+        )
+        evolved = self._apply_evolution(artist_data)
+        update_artist_status(artist_id, "Active" if evolved else "Paused")
+        return evolved
+
+    def run_lifecycle_checks(self) -> Dict[str, Any]:
+        """Runs lifecycle evaluation for all relevant artists in bulk.
+
+        Loads the lifecycle columns of every relevant artist and the
+        performance counts of all artists in two queries, decides every
+        transition in memory and applies the resulting status changes in
+        one transaction, each as a compare-and-set against the status it was
+        decided from. Evolution still loads the
+        full profile of each (rare) artist that needs it.
+
+        Returns:
+            Report with the number of artists evaluated, the status changes
+            applied ({artist_id: new_status}), the changes skipped because
+            the artist's status changed after it was read (same form) and
+            per-phase timings in seconds.
+        """
+        report: Dict[str, Any] = {
+            "evaluated": 0,
+            "changes": {},
+            "skipped": {},
+            "timings": {},
+        }
         if not db_imports_successful:
             logger.error(
                 "Cannot run lifecycle checks: DB functions unavailable."
             )
-            return
+            return report
 
         logger.info("Starting periodic artist lifecycle checks...")
+        start = time.perf_counter()
+
         # Evaluate Active, Evolving, Candidate, and Paused artists
-        artists_to_check = get_all_artists(status_filter=None)  # Get all
-        relevant_artists = [
-            a
-            for a in artists_to_check
-            if a.get("status") in ["Active", "Evolving", "Candidate", "Paused"]
-        ]
+        relevant_artists = get_lifecycle_states(LIFECYCLE_CHECK_STATUSES)
+        cutoff_date = datetime.utcnow() - timedelta(
+            days=PERFORMANCE_EVALUATION_PERIOD_DAYS
+        )
+        all_counts = get_performance_summaries(since=cutoff_date.isoformat())
+        loaded = time.perf_counter()
+        report["timings"]["load"] = loaded - start
 
         if not relevant_artists:
             logger.info("No artists found requiring lifecycle checks.")
-            return
+            return report
 
         logger.info(f"Found {len(relevant_artists)} artists to evaluate.")
+        status_updates = []
         for artist in relevant_artists:
             artist_id = artist.get("artist_id")
-            if artist_id:
-                self.evaluate_artist_lifecycle(artist_id)
-            else:
+            if not artist_id:
                 logger.warning(
                     "Found artist data without an ID during checks."
                 )
+                continue
+            performance = self._build_performance_summary(
+                artist_id, artist, all_counts.get(artist_id, {})
+            )
+            decision = self._decide_lifecycle(artist_id, performance)
+            if decision == EVOLVE_ACTION:
+                artist_data = get_artist(artist_id)
+                if not artist_data:
+                    logger.error(
+                        f"Cannot evolve non-existent artist {artist_id}."
+                    )
+                    continue
+                logger.info(
+                    f"Attempting evolution for artist {artist_id} due to poor performance."
+                )
+                evolved = self._apply_evolution(artist_data)
+                decision = "Active" if evolved else "Paused"
+            if decision != performance["current_status"]:
+                status_updates.append(
+                    (artist_id, performance["current_status"], decision)
+                )
+        report["evaluated"] = len(relevant_artists)
+        decided = time.perf_counter()
+        report["timings"]["decide"] = decided - loaded
+
+        if status_updates:
+            applied = update_artist_statuses(status_updates)
+            if applied is None:
+                logger.error(
+                    f"Failed to apply {len(status_updates)} lifecycle status "
+                    f"changes."
+                )
+            else:
+                applied = set(applied)
+                for artist_id, _, new_status in status_updates:
+                    if artist_id in applied:
+                        report["changes"][artist_id] = new_status
+                    else:
+                        report["skipped"][artist_id] = new_status
+                if report["skipped"]:
+                    logger.info(
+                        f"Skipped {len(report['skipped'])} lifecycle status "
+                        f"changes for artists whose status changed during "
+                        f"the sweep: {sorted(report['skipped'])}"
+                    )
+        finished = time.perf_counter()
+        report["timings"]["apply"] = finished - decided
+        report["timings"]["total"] = finished - start
 
-        logger.info("Finished periodic artist lifecycle checks.")
+        logger.info(
+            f"Finished periodic artist lifecycle checks: evaluated "
+            f"{report['evaluated']} artists, {len(report['changes'])} status "
+            f"changes in {report['timings']['total']:.3f}s (load "
+            f"{report['timings']['load']:.3f}s, decide "
+            f"{report['timings']['decide']:.3f}s, apply "
+            f"{report['timings']['apply']:.3f}s)."
+        )
+        return report
 
 
 # --- Main Execution / Test --- #
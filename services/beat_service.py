@@ -74,6 +74,18 @@ class BeatService:
         Returns:
             A dictionary containing track_url, tempo, duration, and model_used,                 or None if failed.
         """
+        track_info = self.generate_beat(prompt)
+        if not track_info:
+            return None
+        return self.analyze_beat(track_info)
+
+    def generate_beat(self, prompt: str) -> dict | None:
+        """Generates a music track using primary/fallback APIs (network only).
+
+        Returns:
+            A dictionary containing track_id, track_url and model_used, or
+            None if failed.
+        """
         track_info = None
         logger.info("Attempting to generate beat...")
 
@@ -117,6 +129,27 @@ class BeatService:
                     exc_info=True,
                 )
 
+        if track_info and track_info.get("track_url"):
+            return track_info
+        logger.error("Failed to generate beat from any source.")
+        return None
+
+    @staticmethod
+    def analyze_beat(
+        track_info: dict,
+        audio_path: str | None = None,
+        digest: str | None = None,
+    ) -> dict | None:
+        """Analyzes a generated track and adds its features to track_info.
+
+        CPU-bound; safe to run in a worker process when given `audio_path`
+        (workers never touch the artifact cache).
+
+        Args:
+            track_info: Result of `generate_beat`.
+            audio_path: Local copy of the track, if already downloaded.
+            digest: sha256 of the local copy, if known.
+        """
         # --- Analysis --- #
         if track_info and track_info.get("track_url"):
             # Corrected f-string
@@ -124,7 +157,9 @@ class BeatService:
                 f"Beat generated ({track_info['model_used']}). Analyzing tempo                     and duration..."
             )
             try:
-                analysis = analyze_audio(track_info["track_url"])
+                analysis = analyze_audio(
+                    audio_path or track_info["track_url"], digest
+                )
                 if analysis:
                     track_info.update(
                         analysis
@@ -152,7 +187,7 @@ class BeatService:
                 )
                 return None
         else:
-            logger.error("Failed to generate beat from any source.")
+            logger.error("No generated track to analyze.")
             return None
 
 
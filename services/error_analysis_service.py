@@ -16,17 +16,23 @@ from typing import Optional, Dict, Any
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
+from services.error_fingerprint import fingerprint_error
+from services.log_monitor import ErrorBlockScanner, LogTailer
+
 # --- Import necessary components ---
 try:
     from llm_orchestrator.orchestrator import (
         LLMOrchestrator,
         LLMOrchestratorError,
+        get_orchestrator,
     )
     from services.telegram_service import send_notification
 
     # Import DB functions for error reporting
     from services.artist_db_service import (
         add_error_report,
+        record_error_occurrence,
+        set_error_occurrence_report,
         update_error_report_status,
     )
 
@@ -39,6 +45,7 @@ except ImportError as e:
     # Define dummy functions if imports fail to allow basic structure
     LLMOrchestrator = None
     LLMOrchestratorError = Exception
+    get_orchestrator = None
     db_imports_successful = False  # Added flag
 
     async def send_notification(message: str):
@@ -60,6 +67,16 @@ except ImportError as e:
         )
         return True
 
+    def record_error_occurrence(
+        error_hash: str,
+        timestamp: Optional[str] = None,
+        service_name: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        return None  # Service falls back to in-memory counts
+
+    def set_error_occurrence_report(error_hash: str, report_id: int) -> bool:
+        return False
+
 
 # --- Configuration ---
 LOG_FILE_TO_MONITOR = os.path.join(PROJECT_ROOT, "logs", "batch_runner.log")
@@ -84,6 +101,9 @@ ENGINEER_TEMPERATURE = float(os.getenv("ENGINEER_TEMPERATURE", 0.3))
 AUTO_FIX_ENABLED = os.getenv("AUTO_FIX_ENABLED", "False").lower() == "true"
 MONITOR_INTERVAL_SECONDS = int(os.getenv("MONITOR_INTERVAL_SECONDS", 60))
 ERROR_CONTEXT_LINES = int(os.getenv("ERROR_CONTEXT_LINES", 20))
+# Seconds an error block at the end of the log may go without new lines
+# before it is reported (its traceback may still be being written)
+ERROR_BLOCK_IDLE_SECONDS = float(os.getenv("ERROR_BLOCK_IDLE_SECONDS", 30))
 SERVICE_NAME = "error_analysis_service"  # Name of this service for logging
 
 # Configure logging for this service
@@ -99,14 +119,20 @@ class ErrorAnalysisService:
         self.last_check_time = datetime.utcnow() - timedelta(
             minutes=5
         )  # Start check from 5 mins ago
-        self.last_error_hash = None
-        self.error_count = 0
+        # Occurrence counts per error fingerprint, used when the DB is not
+        # available (otherwise kept in the error_occurrences table)
+        self.error_counts: Dict[str, int] = {}
+        # Only bytes appended since the previous check are read and parsed
+        self.log_tailer = LogTailer(LOG_FILE_TO_MONITOR)
+        self.error_scanner = ErrorBlockScanner(
+            ERROR_CONTEXT_LINES, since=self.last_check_time
+        )
         self.llm_analyzer = None
         self.llm_engineer = None
 
         if LLMOrchestrator:
             try:
-                self.llm_analyzer = LLMOrchestrator(
+                self.llm_analyzer = get_orchestrator(
                     primary_model=ERROR_ANALYSIS_LLM_PRIMARY,
                     fallback_models=ERROR_ANALYSIS_LLM_FALLBACKS,
                     enable_auto_discovery=False,
@@ -119,7 +145,7 @@ class ErrorAnalysisService:
                 )
 
             try:
-                self.llm_engineer = LLMOrchestrator(
+                self.llm_engineer = get_orchestrator(
                     primary_model=ENGINEER_LLM_PRIMARY,
                     fallback_models=ENGINEER_LLM_FALLBACKS,
                     enable_auto_discovery=False,
@@ -166,7 +192,7 @@ class ErrorAnalysisService:
             await asyncio.sleep(MONITOR_INTERVAL_SECONDS)
 
     async def check_for_errors(self):
-        """Checks the log file for errors since the last check."""
+        """Checks the lines appended to the log file since the last check."""
         if not os.path.exists(LOG_FILE_TO_MONITOR):
             logger.warning(
                 f"Log file {LOG_FILE_TO_MONITOR} not found. Skipping check."
@@ -175,104 +201,15 @@ class ErrorAnalysisService:
 
         current_check_time = datetime.utcnow()
         new_errors = []
-        current_service = "unknown"  # Track current service context
 
         try:
-            with open(LOG_FILE_TO_MONITOR, "r") as f:
-                lines = f.readlines()
-
-            error_block = []
-            in_error_block = False
-            timestamp_format = "%Y-%m-%d %H:%M:%S,%f"
-            error_timestamp = None
-            error_service = "unknown"  # Try to infer service from log line
-
-            for i, line in enumerate(lines):
-                # Try to parse timestamp and service name
-                try:
-                    # Format: 2024-05-02 20:42:05,123 - service_name - LEVEL - message
-                    parts = line.split(" - ", 3)
-                    log_timestamp_str = parts[0]
-                    log_timestamp = datetime.strptime(
-                        log_timestamp_str, timestamp_format
-                    )
-                    if len(parts) > 2:
-                        potential_service = parts[1]
-                        # Basic check if it looks like a service name (avoid log levels)
-                        if potential_service not in [
-                            "DEBUG",
-                            "INFO",
-                            "WARNING",
-                            "ERROR",
-                            "CRITICAL",
-                        ]:
-                            current_service = potential_service  # Update current service context
-
-                except (ValueError, IndexError):
-                    # If parsing fails or line format is wrong, check if part of a traceback
-                    if in_error_block and line.startswith(
-                        (" ", "\t", "Traceback")
-                    ):
-                        error_block.append(line.strip())
-                    else:
-                        if in_error_block:
-                            # End of traceback block
-                            new_errors.append(
-                                {
-                                    "log": "\n".join(error_block),
-                                    "timestamp": error_timestamp
-                                    or self.last_check_time.isoformat(),
-                                    "service": error_service,
-                                }
-                            )
-                            error_block = []
-                        in_error_block = False
-                    continue  # Skip lines without valid timestamp format at the start
-
-                if log_timestamp > self.last_check_time:
-                    if "ERROR" in line or "CRITICAL" in line:
-                        if not in_error_block:
-                            # Start of a new error block, include context lines before
-                            start_context = max(0, i - ERROR_CONTEXT_LINES)
-                            error_block.extend(
-                                [
-                                    log_line.strip()
-                                    for log_line in lines[start_context:i]
-                                ]
-                            )
-                            in_error_block = True
-                            error_timestamp = log_timestamp.isoformat()
-                            error_service = current_service  # Capture service at error start
-                        error_block.append(line.strip())
-                    elif in_error_block and line.startswith(
-                        (" ", "\t", "Traceback")
-                    ):
-                        # Part of a traceback for a recent error
-                        error_block.append(line.strip())
-                    elif in_error_block:
-                        # End of error block
-                        new_errors.append(
-                            {
-                                "log": "\n".join(error_block),
-                                "timestamp": error_timestamp
-                                or self.last_check_time.isoformat(),
-                                "service": error_service,
-                            }
-                        )
-                        error_block = []
-                        in_error_block = False
-
-            # Add the last block if file ends during it
-            if in_error_block:
-                new_errors.append(
-                    {
-                        "log": "\n".join(error_block),
-                        "timestamp": error_timestamp
-                        or self.last_check_time.isoformat(),
-                        "service": error_service,
-                    }
-                )
-
+            lines = self.log_tailer.read_new_lines()
+            new_errors = self.error_scanner.scan(lines)
+            # A block the log ends with stays open until later lines end
+            # it, or until it has been idle long enough
+            new_errors.extend(
+                self.error_scanner.close_idle(ERROR_BLOCK_IDLE_SECONDS)
+            )
         except Exception as e:
             logger.error(
                 f"Error reading or parsing log file {LOG_FILE_TO_MONITOR}: {e}"
@@ -303,52 +240,70 @@ class ErrorAnalysisService:
             logger.info(
                 f"Found {len(new_errors)} new error block(s) in log file."
             )
-            # Process the first significant new error to avoid spamming
-            first_error = new_errors[0]
-            error_log_content = first_error["log"]
-            error_hash = str(hash(error_log_content))  # Use string hash
-
-            if error_hash != self.last_error_hash:
-                self.last_error_hash = error_hash
-                self.error_count = 1
-                # Add initial report to DB
-                report_id = None
-                if db_imports_successful:
-                    report_id = add_error_report(
-                        {
-                            "timestamp": first_error["timestamp"],
-                            "error_hash": error_hash,
-                            "error_log": error_log_content,
-                            "status": "new",
-                            "service_name": first_error["service"],
-                        }
+            # Each distinct fault is analyzed once; repeats are counted
+            for error in new_errors:
+                try:
+                    await self.process_error_block(error)
+                except Exception as e:
+                    logger.error(
+                        f"Error processing error block: {e}", exc_info=True
                     )
+        else:
+            logger.debug("No new errors found in log file.")
 
+    def _count_occurrence(self, error_hash: str, error: Dict[str, Any]):
+        """Counts an error occurrence; returns (count, report_id)."""
+        occurrence = None
+        if db_imports_successful:
+            occurrence = record_error_occurrence(
+                error_hash, error["timestamp"], error["service"]
+            )
+        if occurrence is None:
+            count = self.error_counts.get(error_hash, 0) + 1
+            self.error_counts[error_hash] = count
+            return count, None
+        return occurrence["occurrence_count"], occurrence["report_id"]
+
+    async def process_error_block(self, error: Dict[str, Any]):
+        """Reports and analyzes a new fault, or counts a known one."""
+        error_log_content = error["log"]
+        # Fingerprint the error itself, not the context lines before it
+        error_hash = fingerprint_error(error.get("error") or error_log_content)
+        count, report_id = self._count_occurrence(error_hash, error)
+
+        if count == 1:
+            # Add initial report to DB
+            if db_imports_successful:
+                report_id = add_error_report(
+                    {
+                        "timestamp": error["timestamp"],
+                        "error_hash": error_hash,
+                        "error_log": error_log_content,
+                        "status": "new",
+                        "service_name": error["service"],
+                    }
+                )
                 if report_id:
-                    await self.analyze_and_fix_error(
-                        report_id, error_log_content
-                    )
-                else:
-                    # Log locally and notify if DB add failed or unavailable
-                    logger.error(
-                        "Failed to add initial error report to database. Aborting analysis."
-                    )
-                    await send_notification(
-                        f"🚨 Error Analysis Service Alert: Failed to log new error (hash: {error_hash}) to DB. Manual check required."
-                    )
+                    set_error_occurrence_report(error_hash, report_id)
+
+            if report_id:
+                await self.analyze_and_fix_error(report_id, error_log_content)
             else:
-                self.error_count += 1
-                logger.warning(
-                    f"Detected repeated error (hash: {error_hash}). Count: {self.error_count}. Skipping analysis."
+                # Log locally and notify if DB add failed or unavailable
+                logger.error(
+                    "Failed to add initial error report to database. Aborting analysis."
+                )
+                await send_notification(
+                    f"🚨 Error Analysis Service Alert: Failed to log new error (hash: {error_hash}) to DB. Manual check required."
                 )
-                if self.error_count % 5 == 0:  # Notify every 5 repeats
-                    await send_notification(
-                        f"⚠️ Error Analysis Service Alert: Repeated error detected {self.error_count} times (Hash: {error_hash}). Last error block:\n```\n{error_log_content[-1000:]}\n```"
-                    )
         else:
-            logger.debug("No new errors found in log file.")
-            self.last_error_hash = None  # Reset hash if no errors
-            self.error_count = 0
+            logger.warning(
+                f"Detected repeated error (hash: {error_hash}, report: {report_id}). Count: {count}. Skipping analysis."
+            )
+            if count % 5 == 0:  # Notify every 5 repeats
+                await send_notification(
+                    f"⚠️ Error Analysis Service Alert: Repeated error detected {count} times (Hash: {error_hash}). Last error block:\n```\n{error_log_content[-1000:]}\n```"
+                )
 
     async def analyze_and_fix_error(self, report_id: int, error_log: str):
         """Analyzes the error log using LLM, logs to DB, and attempts to fix it."""
@@ -0,0 +1,65 @@
+"""
+Stable fingerprints for error blocks found by ErrorAnalysisService.
+
+Two occurrences of the same fault rarely produce identical text: log
+timestamps, run and session IDs, object addresses, temp file names,
+durations and line numbers differ. `normalize_error` rewrites those to
+placeholders, and `fingerprint_error` hashes the result with SHA-256.
+Python's `hash()` is salted per process, so it cannot be used for this:
+the digest must stay the same across restarts so that occurrences can be
+counted in the database.
+"""
+
+import hashlib
+import re
+
+FINGERPRINT_LENGTH = 16  # Hex characters kept from the SHA-256 digest
+
+# Applied in order; earlier patterns consume text later ones would split
+_NORMALIZERS = [
+    # 2024-05-02 20:42:05,123 / 2024-05-02T20:42:05.123456+00:00
+    (
+        re.compile(
+            r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?"
+            r"(?:Z|[+-]\d{2}:?\d{2})?"
+        ),
+        "<TS>",
+    ),
+    (
+        re.compile(
+            r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+            r"[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+        ),
+        "<UUID>",
+    ),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<ADDR>"),
+    # Hashes and hex IDs (at least 12 characters with a digit)
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{12,}\b"), "<HEX>"),
+    (re.compile(r"\btmp[A-Za-z0-9_]{6,}"), "<TMP>"),
+    # Traceback line numbers shift with unrelated edits
+    (re.compile(r"\bline \d+"), "line <N>"),
+    # Durations, sizes, counters and numeric IDs; short integers such as
+    # HTTP status codes are kept since they tell faults apart
+    (re.compile(r"(?<![\w.])\d+\.\d+(?![\d.])|\b\d{4,}\b"), "<N>"),
+    (re.compile(r"[ \t]+"), " "),
+]
+
+
+def normalize_error(text: str) -> str:
+    """Strips the variable parts of an error block, line by line."""
+    lines = []
+    for line in text.splitlines():
+        for pattern, replacement in _NORMALIZERS:
+            line = pattern.sub(replacement, line)
+        line = line.strip()
+        # Runs of "^^^^" markers and separators vary with line length
+        if line.strip("^~-=*# "):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def fingerprint_error(text: str) -> str:
+    """Stable digest of an error block; equal for the same fault."""
+    normalized = normalize_error(text)
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return digest[:FINGERPRINT_LENGTH]
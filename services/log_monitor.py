@@ -0,0 +1,235 @@
+"""
+Incremental log reading for ErrorAnalysisService.
+
+LogTailer follows a log file the way `tail -F` does. It remembers the byte
+offset and the file's identity (device, inode) between calls and returns
+only lines appended since the last call. It copes with:
+
+- rotation (the path now names a different file): the rest of the old file
+  is drained, then the new file is read from the start;
+- truncation (the file shrank): reading restarts at offset 0;
+- a partially written last line: it is held back until its newline
+  arrives.
+
+ErrorBlockScanner turns those lines into error blocks. It keeps the last
+ERROR_CONTEXT_LINES lines in a ring buffer for context, and parses the
+"<timestamp> - <service> - <LEVEL> - message" prefix with a precompiled
+regex. Each cycle therefore costs time proportional to the new bytes, not
+to the size of the log. A block still open at the end of a read (its
+traceback may be half written) stays open until a later non-continuation
+line ends it, or until it has gained no lines for a while (`close_idle`).
+"""
+
+import logging
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+LOG_LEVELS = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
+CONTINUATION_PREFIXES = (" ", "\t", "Traceback")
+
+# "2024-05-02 20:42:05,123 - service_name - LEVEL - message"
+_LINE_PREFIX = re.compile(
+    r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{1,6})(?: - |$)"
+)
+
+
+class LogTailer:
+    """Returns the complete lines appended to a file since the last read."""
+
+    def __init__(self, path: str, chunk_size: int = READ_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.file_id: Optional[tuple] = None
+        self.rotations = 0
+        self.truncations = 0
+        self._file = None
+        self._partial = b""
+
+    def _open(self) -> bool:
+        try:
+            self._file = open(self.path, "rb")
+        except OSError as e:
+            logger.warning(f"Cannot open log file {self.path}: {e}")
+            self._file = None
+            return False
+        stat = os.fstat(self._file.fileno())
+        self.file_id = (stat.st_dev, stat.st_ino)
+        self.offset = 0
+        self._partial = b""
+        return True
+
+    def _drain(self) -> List[str]:
+        """Reads from the current offset to the end of the open file."""
+        lines: List[str] = []
+        self._file.seek(self.offset)
+        while True:
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                break
+            self.offset += len(chunk)
+            data = self._partial + chunk
+            complete, newline, self._partial = data.rpartition(b"\n")
+            if newline:
+                lines.extend(
+                    complete.decode("utf-8", errors="replace").split("\n")
+                )
+        return lines
+
+    def read_new_lines(self) -> List[str]:
+        """Returns lines completed since the previous call (no newlines)."""
+        lines: List[str] = []
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Mid-rotation; whatever is left in the old file can still be
+            # read through the open handle
+            if self._file is not None:
+                lines.extend(self._drain())
+            return lines
+
+        if self._file is None:
+            if not self._open():
+                return lines
+        elif (stat.st_dev, stat.st_ino) != self.file_id:
+            lines.extend(self._drain())
+            self._file.close()
+            self.rotations += 1
+            logger.info(f"Log file {self.path} was rotated; following it.")
+            if not self._open():
+                return lines
+        elif stat.st_size < self.offset:
+            self.truncations += 1
+            logger.info(f"Log file {self.path} was truncated; rereading.")
+            self.offset = 0
+            self._partial = b""
+
+        lines.extend(self._drain())
+        return lines
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ErrorBlockScanner:
+    """Groups ERROR/CRITICAL lines and their tracebacks into blocks.
+
+    A block starts at an ERROR or CRITICAL log line, includes the
+    `context_lines` lines before it, and runs through the following
+    traceback lines (indented, or starting with "Traceback"). Lines logged
+    at or before `since` (if given) never start a block.
+    """
+
+    def __init__(
+        self, context_lines: int = 20, since: Optional[datetime] = None
+    ):
+        self.since = since
+        self.context: Deque[str] = deque(maxlen=max(0, context_lines))
+        self.current_service = "unknown"
+        self._block: List[str] = []
+        self._block_context = 0
+        self._block_timestamp: Optional[str] = None
+        self._block_service = "unknown"
+        # time.monotonic() when the open block last gained a line
+        self._block_updated = 0.0
+
+    def _close_block(self, blocks: List[Dict[str, Any]]):
+        if self._block:
+            context = self._block_context
+            blocks.append(
+                {
+                    "log": "\n".join(self._block),
+                    # The block without its leading context lines
+                    "error": "\n".join(self._block[context:]),
+                    "timestamp": self._block_timestamp,
+                    "service": self._block_service,
+                }
+            )
+        self._block = []
+        self._block_timestamp = None
+
+    def _is_recent(self, timestamp: str) -> bool:
+        if self.since is None:
+            return True
+        try:
+            parsed = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+        except ValueError:
+            return False
+        if parsed <= self.since:
+            return False
+        # Everything after the first recent line is recent as well
+        self.since = None
+        return True
+
+    def scan(self, lines: List[str]) -> List[Dict[str, Any]]:
+        """Feeds new lines; returns the blocks they completed."""
+        blocks: List[Dict[str, Any]] = []
+        for raw_line in lines:
+            line = raw_line.strip()
+            match = _LINE_PREFIX.match(raw_line)
+            if match is None:
+                if self._block and raw_line.startswith(CONTINUATION_PREFIXES):
+                    self._block.append(line)
+                else:
+                    self._close_block(blocks)
+            else:
+                message_start = match.end()
+                service, separator, _ = raw_line[message_start:].partition(
+                    " - "
+                )
+                if separator and service not in LOG_LEVELS:
+                    self.current_service = service
+
+                if not self._is_recent(match.group(1)):
+                    # Logged before monitoring started; context only
+                    pass
+                elif "ERROR" in raw_line or "CRITICAL" in raw_line:
+                    if not self._block:
+                        self._block.extend(self.context)
+                        self._block_context = len(self.context)
+                        self._block_timestamp = datetime.strptime(
+                            match.group(1), TIMESTAMP_FORMAT
+                        ).isoformat()
+                        self._block_service = self.current_service
+                    self._block.append(line)
+                elif self._block and raw_line.startswith(
+                    CONTINUATION_PREFIXES
+                ):
+                    self._block.append(line)
+                else:
+                    self._close_block(blocks)
+            self.context.append(line)
+        if self._block and lines:
+            # An open block always ends with the last line fed
+            self._block_updated = time.monotonic()
+        return blocks
+
+    def close_idle(
+        self, idle_seconds: float, now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Closes the open block if it gained no lines for `idle_seconds`.
+
+        Lets a block the log ends with be reported without cutting off a
+        traceback whose remaining lines arrive in the next read.
+        """
+        if now is None:
+            now = time.monotonic()
+        if self._block and now - self._block_updated >= idle_seconds:
+            return self.finish()
+        return []
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Closes a block still open at the end of the available lines."""
+        blocks: List[Dict[str, Any]] = []
+        self._close_block(blocks)
+        return blocks
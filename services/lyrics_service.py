@@ -6,7 +6,12 @@ import os
 
 # Assuming LLMOrchestrator is accessible via project structure
 # Need to adjust import based on actual location
-from llm_orchestrator.orchestrator import LLMOrchestrator, LLMOrchestratorError
+from llm_orchestrator.orchestrator import (
+    PROVIDER_CONFIG,
+    LLMOrchestratorError,
+    get_orchestrator,
+    infer_provider,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +25,18 @@ REFLECTION_LLM_FALLBACKS = os.getenv(
 ).split(",")
 REFLECTION_MAX_TOKENS = int(os.getenv("REFLECTION_MAX_TOKENS", 500))
 REFLECTION_TEMPERATURE = float(os.getenv("REFLECTION_TEMPERATURE", 0.6))
+# Race a fallback provider when the primary is slower than usual
+REFLECTION_LLM_HEDGE = (
+    os.getenv("REFLECTION_LLM_HEDGE", "True").lower() == "true"
+)
 
 try:
-    # Attempt to reuse the orchestrator instance if possible, otherwise create
-    # new
-    # This is a simplification; a better design would pass the orchestrator
-    # instance
-    llm_orchestrator = LLMOrchestrator(
+    # Shared with the batch runner, which uses the same reflection models
+    llm_orchestrator = get_orchestrator(
         primary_model=REFLECTION_LLM_PRIMARY,
         fallback_models=REFLECTION_LLM_FALLBACKS,
         enable_auto_discovery=False,
+        config={"hedge": REFLECTION_LLM_HEDGE},
     )
 except Exception as e:
     logger.error(
@@ -49,7 +56,37 @@ class LyricsService:
         # Orchestrator initialized globally for now
         self.orchestrator = llm_orchestrator
 
-    def generate_lyrics(
+    def _orchestrator_for(self, model: str | None):
+        """Returns the orchestrator to use when an artist names a model.
+
+        An artist's llm_config "model" becomes the primary model, with the
+        usual fallbacks; unknown or unconfigured models use the default.
+        """
+        if not model or model == REFLECTION_LLM_PRIMARY:
+            return self.orchestrator
+        if infer_provider(model) not in PROVIDER_CONFIG:
+            # e.g. the placeholder "default-llm"; guessing a provider would
+            # send requests for a model that does not exist
+            logger.info(
+                f"Model {model} matches no known provider; using "
+                f"{REFLECTION_LLM_PRIMARY}."
+            )
+            return self.orchestrator
+        try:
+            return get_orchestrator(
+                primary_model=model,
+                fallback_models=REFLECTION_LLM_FALLBACKS,
+                enable_auto_discovery=False,
+                config={"hedge": REFLECTION_LLM_HEDGE},
+            )
+        except ValueError as e:
+            logger.warning(
+                f"Model {model} unavailable for lyrics ({e}); using "
+                f"{REFLECTION_LLM_PRIMARY}."
+            )
+            return self.orchestrator
+
+    async def generate_lyrics(
         self,
         base_prompt: str,
         genre: str,
@@ -84,7 +121,10 @@ class LyricsService:
         prompt += f"Theme/Topic: {base_prompt}\n"
 
         if duration is not None:
-            prompt += f"The track duration is approximately {duration:                .0f} seconds.\n"
+            prompt += (
+                f"The track duration is approximately {duration:.0f} "
+                "seconds.\n"
+            )
         if tempo is not None:
             prompt += f"The track tempo is approximately {tempo:.0f} BPM.\n"
 
@@ -103,9 +143,8 @@ class LyricsService:
         max_tokens = llm_config.get("max_tokens", REFLECTION_MAX_TOKENS)
 
         try:
-            response = self.orchestrator.generate_text(
+            response = await self._orchestrator_for(model).generate_text(
                 prompt=prompt,
-                model_name=model,
                 max_tokens=max_tokens,
                 temperature=temperature,
             )
@@ -136,6 +175,8 @@ class LyricsService:
 
 # Example Usage
 if __name__ == "__main__":
+    import asyncio
+
     logging.basicConfig(level=logging.INFO)
     # load_dotenv() # If using .env
     lyrics_service = LyricsService()
@@ -149,13 +190,15 @@ if __name__ == "__main__":
         test_duration = 180.0
 
         print("--- Testing Lyrics Generation (with tempo/duration) ---")
-        generated_lyrics = lyrics_service.generate_lyrics(
-            test_base_prompt,
-            test_genre,
-            test_style,
-            test_config,
-            test_tempo,
-            test_duration,
+        generated_lyrics = asyncio.run(
+            lyrics_service.generate_lyrics(
+                test_base_prompt,
+                test_genre,
+                test_style,
+                test_config,
+                test_tempo,
+                test_duration,
+            )
         )
 
         if generated_lyrics:
@@ -165,8 +208,10 @@ if __name__ == "__main__":
             print("Lyrics generation failed.")
 
         print("\n--- Testing Lyrics Generation (without tempo/duration) ---")
-        generated_lyrics_no_timing = lyrics_service.generate_lyrics(
-            test_base_prompt, test_genre, test_style, test_config
+        generated_lyrics_no_timing = asyncio.run(
+            lyrics_service.generate_lyrics(
+                test_base_prompt, test_genre, test_style, test_config
+            )
         )
         if generated_lyrics_no_timing:
             print("Generated Lyrics (no timing info):")
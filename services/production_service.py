@@ -2,81 +2,189 @@
 
 import logging
 import os
-import requests
 import tempfile
+import uuid
+from typing import Iterator
+
 import numpy as np
-from pydub import AudioSegment
-from pydub.effects import normalize
+import soundfile as sf
+from scipy.signal import fftconvolve, lfilter
+
+from services.artifact_cache import get_artifact_cache
+
+try:
+    from pydub import AudioSegment
+except ImportError:
+    AudioSegment = None
 
 logger = logging.getLogger(__name__)
 
+# Frames processed per block; bounds peak memory for long tracks
+BLOCK_FRAMES = int(os.getenv("HUMANIZE_BLOCK_FRAMES", 65536))
+
+# soundfile (format, subtype) per output extension
+OUTPUT_FORMATS = {
+    "wav": ("WAV", "PCM_16"),
+    "flac": ("FLAC", "PCM_16"),
+    "ogg": ("OGG", "VORBIS"),
+    "mp3": ("MP3", "MPEG_LAYER_III"),
+}
+
 # --- Helper Functions --- #
 
 
-def _download_audio(audio_url: str) -> tuple[str | None, str | None]:
-    """Downloads audio from a URL to a temporary file, preserving extension."""
-    try:
-        response = requests.get(audio_url, stream=True, timeout=60)
-        response.raise_for_status()
-
-        # Try to guess extension from URL
-        file_extension = os.path.splitext(audio_url)[1]
-        if not file_extension or len(file_extension) > 5:  # Basic check
-            # Guess from content type if possible
-            content_type = response.headers.get("content-type")
-            if content_type == "audio/mpeg":
-                file_extension = ".mp3"
-            elif content_type == "audio/wav":
-                file_extension = ".wav"
-            elif content_type == "audio/ogg":
-                file_extension = ".ogg"
-            else:
-                file_extension = ".audio"  # Fallback generic extension
-
-        with tempfile.NamedTemporaryFile(
-            suffix=file_extension, delete=False
-        ) as tmp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                tmp_file.write(chunk)
-            logger.info(f"Audio downloaded temporarily to: {tmp_file.name}")
-            return tmp_file.name, file_extension
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to download audio from {audio_url}: {e}")
-        return None, None
-    except IOError as e:
-        logger.error(
-            f"Failed to write downloaded audio to temporary file: {e}"
-        )
+def _download_audio(
+    audio_url: str, owner: str
+) -> tuple[str | None, str | None]:
+    """Fetches audio through the shared artifact cache, preserving extension.
+
+    The returned file is shared with other stages of the run; it is pinned
+    for `owner` and must not be modified or deleted.
+    """
+    local_path = get_artifact_cache().acquire(audio_url, owner)
+    if not local_path:
         return None, None
+    return local_path, os.path.splitext(local_path)[1]
+
+
+class _AudioSource:
+    """Float32 (frames, channels) blocks of an audio file.
 
+    Decodes with soundfile, streaming block by block, and falls back to
+    decoding the whole file once with pydub (ffmpeg) for formats
+    libsndfile cannot read.
+    """
 
-def _generate_noise_file(
-    duration_ms: int, volume_db: float = -40.0
-) -> str | None:
-    """Generates a temporary white noise file."""
-    try:
-        sample_rate = 44100
-        num_samples = int(sample_rate * duration_ms / 1000)
-        noise = np.random.random(num_samples) * 2 - 1  # -1 to 1
-        # Convert numpy array to AudioSegment
-        noise_segment = AudioSegment(
-            noise.tobytes(),
-            frame_rate=sample_rate,
-            sample_width=noise.dtype.itemsize,
-            channels=1,
+    def __init__(self, path: str):
+        self.path = path
+        self._samples = None
+        try:
+            info = sf.info(path)
+            self.sample_rate = info.samplerate
+            self.channels = info.channels
+        except Exception as sf_err:
+            if AudioSegment is None:
+                raise ProductionServiceError(
+                    f"Could not load audio file {path}: {sf_err}"
+                ) from sf_err
+            try:
+                audio = AudioSegment.from_file(path)
+            except Exception as load_err:
+                raise ProductionServiceError(
+                    f"Could not load audio file {path}: {load_err}"
+                ) from load_err
+            self.sample_rate = audio.frame_rate
+            self.channels = audio.channels
+            scale = float(1 << (8 * audio.sample_width - 1))
+            self._samples = (
+                np.array(
+                    audio.get_array_of_samples(), dtype=np.float32
+                ).reshape(-1, audio.channels)
+                / scale
+            )
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        if self._samples is not None:
+            for start in range(0, len(self._samples), BLOCK_FRAMES):
+                end = start + BLOCK_FRAMES
+                yield self._samples[start:end]
+            return
+        with sf.SoundFile(self.path) as f:
+            yield from f.blocks(
+                blocksize=BLOCK_FRAMES, dtype="float32", always_2d=True
+            )
+
+    def peak(self) -> float:
+        """Absolute sample peak (one streaming pass)."""
+        peak = 0.0
+        for block in self.blocks():
+            if len(block):
+                peak = max(peak, float(np.max(np.abs(block))))
+        return peak
+
+
+class _HumanizeChain:
+    """Block-wise effect chain: gain, EQ, jitter, reverb, noise.
+
+    Filter, delay-line and reverb tails are carried between blocks, so the
+    output is the same as processing the whole track at once.
+    """
+
+    def __init__(self, service: "ProductionService", sample_rate, channels):
+        self.rng = np.random.default_rng(service.seed)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.gain = 1.0
+        self.noise_amplitude = 10 ** (service.noise_level_db / 20)
+
+        # EQ: one-pole low-pass blended with the dry signal (gentle
+        # high-frequency roll-off)
+        alpha = 1 - np.exp(-2 * np.pi * service.eq_cutoff_hz / sample_rate)
+        self.eq_b = np.array([alpha], dtype=np.float32)
+        self.eq_a = np.array([1, alpha - 1], dtype=np.float32)
+        self.eq_mix = service.eq_mix
+        self.eq_state = np.zeros((1, channels), dtype=np.float32)
+
+        # Jitter: slowly varying fractional delay (wow), in samples
+        self.jitter_depth = service.jitter_depth_ms * sample_rate / 1000
+        self.jitter_rate = service.jitter_rate_hz / sample_rate
+        self.jitter_phase = self.rng.uniform(0, 2 * np.pi)
+        self.history_len = int(np.ceil(2 * self.jitter_depth)) + 2
+        self.history = np.zeros((self.history_len, channels), np.float32)
+        self.position = 0
+
+        # Reverb: short exponentially decaying noise impulse response
+        ir_len = max(1, int(service.reverb_decay_s * sample_rate))
+        t = np.arange(ir_len) / sample_rate
+        ir = self.rng.standard_normal(ir_len) * np.exp(
+            -6.9 * t / service.reverb_decay_s
         )
-        # Adjust volume
-        noise_segment = noise_segment + volume_db
+        self.ir = (ir / np.sqrt(np.sum(ir**2))).astype(np.float32)
+        self.reverb_wet = service.reverb_wet
+        self.reverb_tail = np.zeros((ir_len - 1, channels), np.float32)
 
-        with tempfile.NamedTemporaryFile(
-            suffix=".wav", delete=False
-        ) as tmp_file:
-            noise_segment.export(tmp_file.name, format="wav")
-            logger.info(f"Generated temporary noise file: {tmp_file.name}")
-            return tmp_file.name
-    except Exception as e:
-        logger.error(f"Failed to generate noise file: {e}")
-        return None
+    def _eq(self, x):
+        lowpassed, self.eq_state = lfilter(
+            self.eq_b, self.eq_a, x, axis=0, zi=self.eq_state
+        )
+        return x + self.eq_mix * (lowpassed - x)
+
+    def _jitter(self, x):
+        n = len(x)
+        buffer = np.concatenate([self.history, x])
+        idx = np.arange(n, dtype=np.float64) + self.position
+        delay = self.jitter_depth * (
+            1 + np.sin(2 * np.pi * self.jitter_rate * idx + self.jitter_phase)
+        )
+        read_pos = np.arange(n) + self.history_len - 1 - delay
+        base = np.floor(read_pos).astype(np.int64)
+        frac = (read_pos - base).astype(np.float32)[:, None]
+        out = buffer[base] * (1 - frac) + buffer[base + 1] * frac
+        self.history = buffer[n:]
+        self.position += n
+        return out
+
+    def _reverb(self, x):
+        wet = fftconvolve(x, self.ir[:, None], axes=0).astype(np.float32)
+        tail_len = len(self.reverb_tail)
+        overlap = min(tail_len, len(wet))
+        wet[:overlap] += self.reverb_tail[:overlap]
+        # Carry the part of the old tail this block did not cover
+        carried = self.reverb_tail[overlap:]
+        block_len = len(x)
+        self.reverb_tail = wet[block_len:]
+        self.reverb_tail[: len(carried)] += carried
+        return x + self.reverb_wet * wet[: len(x)]
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        x = block * self.gain
+        x = self._eq(x)
+        x = self._jitter(x)
+        x = self._reverb(x)
+        x += self.rng.uniform(-1, 1, x.shape).astype(np.float32) * (
+            self.noise_amplitude
+        )
+        return np.clip(x, -1.0, 1.0)
 
 
 # --- Production Service --- #
@@ -92,112 +200,75 @@ class ProductionService:
     def __init__(self):
         # Configuration for effects can be added here
         self.noise_level_db = -45.0  # Very subtle background noise
-        pass
+        self.normalize_headroom_db = 0.1  # Peak target below full scale
+        self.eq_cutoff_hz = 9000.0  # Low-pass corner of the warmth EQ
+        self.eq_mix = 0.3  # 0 = dry, 1 = fully low-passed
+        self.jitter_depth_ms = 0.25  # Peak timing deviation
+        self.jitter_rate_hz = 0.7  # Speed of the timing drift
+        self.reverb_decay_s = 0.35  # Time to decay by 60 dB
+        self.reverb_wet = 0.08  # Reverb level mixed into the signal
+        self.seed = None  # Set for reproducible noise/jitter/reverb
 
     def humanize_audio(self, audio_url: str) -> str | None:
         """Applies subtle effects to make audio sound less sterile.
 
-        Current effects:
+        Effects, applied in memory on float32 blocks:
         - Normalization
-        - Subtle background noise overlay
-
-        Placeholder for future effects:
+        - EQ (gentle high-frequency roll-off)
         - Timing jitter
         - Reverb
-        - EQ
+        - Subtle background noise
+
+        The track is decoded block by block and encoded once at the end.
 
         Args:
-            audio_url: URL of the input audio file.
+            audio_url: URL or local path of the input audio file. URLs are
+                fetched through the artifact cache, which belongs to the
+                parent process; worker processes must be given a local
+                path (e.g. a copy the parent fetched from the cache).
 
         Returns:
             URL/path of the processed audio file, or None if failed.
         """
         logger.info(f"Starting audio humanization for: {audio_url}")
         local_path = None
-        noise_path = None
         processed_path = None
-        downloaded = False
+        cache_owner = None
 
         try:
             # 1. Download Audio
-            local_path, file_extension = _download_audio(audio_url)
+            if os.path.isfile(audio_url):
+                local_path = audio_url
+                file_extension = os.path.splitext(audio_url)[1]
+            else:
+                cache_owner = f"humanize_audio:{uuid.uuid4()}"
+                local_path, file_extension = _download_audio(
+                    audio_url, cache_owner
+                )
             if not local_path:
                 raise ProductionServiceError("Failed to download input audio.")
-            downloaded = True
 
-            # 2. Load Audio
+            # 2. Open Audio
             logger.info(f"Loading audio file: {local_path}")
-            # Explicitly specify format if needed, otherwise pydub tries to
-            # guess
-            try:
-                audio = AudioSegment.from_file(local_path)
-            except Exception as load_err:
-                # Try common formats if guessing failed
-                try:
-                    audio = AudioSegment.from_mp3(local_path)
-                except Exception as e:
-                    logger.warning(f"Could not load {local_path} as MP3: {e}")
-                    pass
-                try:
-                    audio = AudioSegment.from_wav(local_path)
-                except Exception as e:
-                    logger.warning(f"Could not load {local_path} as WAV: {e}")
-                    pass
-                if "audio" not in locals():  # If still not loaded
-                    raise ProductionServiceError(
-                        f"Could not load audio file {local_path}: {load_err}"
-                    ) from load_err
-
-            # --- Apply Effects --- #
-
-            # 3. Normalization
-            logger.info("Applying normalization...")
-            processed_audio = normalize(audio)
-
-            # 4. Add Subtle Background Noise
+            source = _AudioSource(local_path)
+            chain = _HumanizeChain(self, source.sample_rate, source.channels)
+
+            # 3. Normalization gain (needs the whole-track peak)
+            peak = source.peak()
+            if peak > 0:
+                target = 10 ** (-self.normalize_headroom_db / 20)
+                chain.gain = target / peak
             logger.info(
-                f"Generating and adding background noise (level:                     {self.noise_level_db} dB)..."
-            )
-            noise_path = _generate_noise_file(
-                duration_ms=len(processed_audio), volume_db=self.noise_level_db
+                f"Applying normalization (gain {chain.gain:.3f}), EQ, jitter, "
+                f"reverb and background noise (level: {self.noise_level_db} "
+                f"dB)..."
             )
-            if noise_path:
-                try:
-                    noise = AudioSegment.from_wav(noise_path)
-                    # Ensure noise is same length as audio
-                    if len(noise) > len(processed_audio):
-                        noise = noise[: len(processed_audio)]
-                    elif len(noise) < len(processed_audio):
-                        # Loop or pad noise - simple padding for now
-                        silence_needed = len(processed_audio) - len(noise)
-                        noise += AudioSegment.silent(duration=silence_needed)
-
-                    processed_audio = processed_audio.overlay(noise)
-                    logger.info("Background noise added.")
-                except Exception as noise_err:
-                    logger.warning(
-                        f"Failed to load or overlay noise file {noise_path}:                             {noise_err}. Skipping noise addition."
-                    )
-            else:
-                logger.warning(
-                    "Failed to generate noise file. Skipping noise addition."
-                )
-
-            # --- Placeholder for Future Effects --- #
-            # TODO: Implement Timing Jitter (complex, requires             # slicing/shifting)
-            # logger.info("Applying timing jitter... (Placeholder)")
 
-            # TODO: Implement Reverb (likely requires ffmpeg or external             # library)
-            # logger.info("Applying reverb... (Placeholder)")
-
-            # TODO: Implement EQ (requires ffmpeg or external library)
-            # logger.info("Applying EQ... (Placeholder)")
-
-            # 5. Export Processed Audio
+            # 4. Process and export
             output_format = (
                 file_extension.lstrip(".") if file_extension else "mp3"
             )
-            if output_format not in ["mp3", "wav", "ogg", "flac"]:
+            if output_format not in OUTPUT_FORMATS:
                 # Rewritten line 165 again, removing the newline completely
                 log_message = f"Original format '{output_format}' not ideal for                     export, defaulting to mp3."
                 logger.warning(log_message)
@@ -207,10 +278,10 @@ class ProductionService:
                 suffix=f".{output_format}", delete=False
             ) as tmp_out_file:
                 processed_path = tmp_out_file.name
-                logger.info(
-                    f"Exporting processed audio to: {processed_path} (format:                         {output_format})"
-                )
-                processed_audio.export(processed_path, format=output_format)
+            logger.info(
+                f"Exporting processed audio to: {processed_path} (format:                     {output_format})"
+            )
+            self._export(source, chain, processed_path, output_format)
 
             # Return mock file URL for local testing
             mock_cloud_url = f"file://{processed_path}"
@@ -223,32 +294,59 @@ class ProductionService:
             logger.error(
                 f"Error during audio humanization: {e}", exc_info=True
             )
+            if processed_path and os.path.exists(processed_path):
+                os.remove(processed_path)
             # Raise or return None based on desired error handling
             # raise ProductionServiceError(f"Humanization failed: {e}") from e
             return None
         finally:
-            # Clean up temporary files
-            if downloaded and local_path and os.path.exists(local_path):
-                try:
-                    os.remove(local_path)
-                    logger.debug(f"Cleaned up input file: {local_path}")
-                except OSError as e:
-                    logger.warning(
-                        f"Failed to clean up input file {local_path}: {e}"
-                    )
-            if noise_path and os.path.exists(noise_path):
-                try:
-                    os.remove(noise_path)
-                    logger.debug(f"Cleaned up noise file: {noise_path}")
-                except OSError as e:
-                    logger.warning(
-                        f"Failed to clean up noise file {noise_path}: {e}"
-                    )
+            # Unpin the cached input (shared with other stages)
+            if cache_owner:
+                get_artifact_cache().release(audio_url, cache_owner)
             # Note: The final processed file (processed_path) is NOT deleted
             # here,
             # as its path is returned. The caller needs to manage it or upload
             # it.
 
+    def _export(self, source, chain, processed_path, output_format):
+        """Runs the chain over all blocks and encodes the result once.
+
+        Streams blocks straight into the encoder when libsndfile supports
+        the format; otherwise collects int16 samples and encodes with pydub.
+        """
+        sf_format, subtype = OUTPUT_FORMATS[output_format]
+        if sf_format in sf.available_formats() and sf.check_format(
+            sf_format, subtype
+        ):
+            with sf.SoundFile(
+                processed_path,
+                "w",
+                samplerate=source.sample_rate,
+                channels=source.channels,
+                format=sf_format,
+                subtype=subtype,
+            ) as out:
+                for block in source.blocks():
+                    out.write(chain.process(block))
+            return
+
+        if AudioSegment is None:
+            raise ProductionServiceError(
+                f"No encoder available for {output_format}."
+            )
+        pcm = np.concatenate(
+            [
+                (chain.process(block) * 32767).astype(np.int16)
+                for block in source.blocks()
+            ]
+        )
+        AudioSegment(
+            pcm.tobytes(),
+            frame_rate=source.sample_rate,
+            sample_width=2,
+            channels=source.channels,
+        ).export(processed_path, format=output_format)
+
 
 # Example Usage
 if __name__ == "__main__":
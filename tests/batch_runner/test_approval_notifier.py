@@ -0,0 +1,96 @@
+"""Unit tests for the approval notification channel."""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from batch_runner.approval_notifier import ApprovalNotifier  # noqa: E402
+
+
+def _write_status(status_dir, run_id, status):
+    path = os.path.join(status_dir, f"{run_id}.json")
+    with open(path, "w") as f:
+        json.dump({"run_id": run_id, "status": status}, f)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_notify_wakes_waiter_immediately(tmp_path):
+    """An in-process decision resolves the run's Future."""
+    notifier = ApprovalNotifier(str(tmp_path), use_watchdog=False)
+    future = notifier.register("run1")
+
+    assert notifier.notify("run1", "approved", {"by": "tester"}) is True
+    status_data = await asyncio.wait_for(future, timeout=1)
+
+    assert status_data["status"] == "approved"
+    assert status_data["by"] == "tester"
+    await notifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_notify_from_other_thread(tmp_path):
+    """Decisions posted from a worker thread reach the event loop."""
+    notifier = ApprovalNotifier(str(tmp_path), use_watchdog=False)
+    future = notifier.register("run2")
+
+    await asyncio.to_thread(notifier.notify, "run2", "rejected")
+    status_data = await asyncio.wait_for(future, timeout=1)
+
+    assert status_data["status"] == "rejected"
+    await notifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_waiting_status_does_not_resolve(tmp_path):
+    """pending_approval and unknown runs are ignored."""
+    notifier = ApprovalNotifier(str(tmp_path), use_watchdog=False)
+    future = notifier.register("run3")
+
+    assert notifier.notify("run3", "pending_approval") is False
+    assert notifier.notify("unknown_run", "approved") is False
+    assert not future.done()
+    await notifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_status_file_change_wakes_waiter(tmp_path):
+    """The fallback scanner picks up decisions written to disk."""
+    notifier = ApprovalNotifier(
+        str(tmp_path), scan_interval=0.01, use_watchdog=False
+    )
+    _write_status(str(tmp_path), "run4", "pending_approval")
+    future = notifier.register("run4")
+    await asyncio.sleep(0.05)
+    assert not future.done()
+
+    _write_status(str(tmp_path), "run4", "approved")
+    # Force a different mtime on coarse-grained filesystems
+    path = os.path.join(str(tmp_path), "run4.json")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    status_data = await asyncio.wait_for(future, timeout=1)
+    assert status_data["status"] == "approved"
+    await notifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_unregister_cancels_future(tmp_path):
+    """Runs that stop waiting leave nothing behind."""
+    notifier = ApprovalNotifier(str(tmp_path), use_watchdog=False)
+    future = notifier.register("run5")
+
+    notifier.unregister("run5")
+
+    assert future.cancelled()
+    assert notifier.notify("run5", "approved") is False
+    await notifier.stop()
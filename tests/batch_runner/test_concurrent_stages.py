@@ -0,0 +1,135 @@
+"""Unit tests for the concurrent pipeline stages and async reflection."""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+import services.artist_db_service as artist_db  # noqa: E402
+from batch_runner import artist_batch_runner as runner  # noqa: E402
+from batch_runner.reflection_prompt import ReflectionPolicy  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def artist_db_file(monkeypatch, tmp_path):
+    """Keeps the runner's DB access away from the tracked data/artists.db."""
+    artist_db.close_db_connections()
+    monkeypatch.setattr(artist_db, "DB_FILE", str(tmp_path / "artists.db"))
+    yield
+    artist_db.close_db_connections()
+
+
+@pytest.mark.asyncio
+async def test_stages_overlap():
+    """Independent stages take max(stage), not sum(stages)."""
+
+    async def stage(seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    started = time.monotonic()
+    results = await runner.run_concurrent_stages(
+        stage(0.2), stage(0.2), stage(0.2)
+    )
+
+    assert results == [0.2, 0.2, 0.2]
+    assert time.monotonic() - started < 0.4
+
+
+@pytest.mark.asyncio
+async def test_failed_stage_waits_for_the_others():
+    """A failure is raised only after the other stages have finished."""
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        finished.append("slow")
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await runner.run_concurrent_stages(broken(), slow())
+    assert finished == ["slow"]
+
+
+@pytest.mark.asyncio
+async def test_lyrics_video_and_audio_run_concurrently():
+    """Steps 3-5 of a run overlap and each fills in run_data."""
+
+    async def lyrics(**kwargs):
+        await asyncio.sleep(0.2)
+        return "la la la"
+
+    def select_video(params):
+        time.sleep(0.2)
+        return {"video_url": "https://v", "source": "pexels"}
+
+    run_data = {
+        "run_id": "run-1",
+        "track_url": "https://t",
+        "tempo": 120.0,
+        "duration": 60.0,
+        "lyrics": None,
+        "video_url": None,
+        "video_source": None,
+        "processed_audio_url": None,
+    }
+
+    async def humanize(*args):
+        await asyncio.sleep(0.2)
+        return "https://p"
+
+    process_runner = SimpleNamespace(run=humanize)
+    with patch.object(
+        runner, "lyrics_service", SimpleNamespace(generate_lyrics=lyrics)
+    ), patch.object(runner, "select_video", select_video), patch.object(
+        runner, "production_service", SimpleNamespace(humanize_audio=None)
+    ), patch.object(
+        runner, "process_stage_runner", process_runner
+    ), patch.object(
+        runner, "save_run_status"
+    ):
+        started = time.monotonic()
+        await runner.run_concurrent_stages(
+            runner.generate_run_lyrics({}, {}, run_data),
+            runner.select_run_video({}, run_data),
+            runner.post_process_run_audio(run_data, "/tmp/track.mp3"),
+        )
+        elapsed = time.monotonic() - started
+
+    assert elapsed < 0.5
+    assert run_data["lyrics"] == "la la la"
+    assert run_data["video_url"] == "https://v"
+    assert run_data["processed_audio_url"] == "https://p"
+
+
+@pytest.mark.asyncio
+async def test_reflect_on_run_parses_json_from_generate_text():
+    """Reflection uses generate_text (retries, hedging, cache) and parses
+    the first JSON object of the reply."""
+    orchestrator = SimpleNamespace(
+        generate_text=AsyncMock(
+            return_value='Sure:\n{"style_notes": "darker"}\nGood luck!'
+        )
+    )
+    run_data = {"run_id": "run-1", "track_url": "https://t"}
+    with patch.object(runner, "llm_orchestrator", orchestrator), patch.object(
+        runner, "reflection_policy", ReflectionPolicy(enabled=False)
+    ):
+        suggestions = await runner.reflect_on_run(
+            {"artist_id": 1, "name": "Nova"}, run_data, "rejected"
+        )
+
+    assert suggestions == {"style_notes": "darker"}
+    kwargs = orchestrator.generate_text.await_args.kwargs
+    assert kwargs["max_tokens"] == runner.REFLECTION_MAX_TOKENS
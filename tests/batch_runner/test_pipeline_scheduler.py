@@ -0,0 +1,149 @@
+"""Unit tests for the concurrent artist pipeline scheduler."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from batch_runner.pipeline_scheduler import (  # noqa: E402
+    PipelineScheduler,
+    StageLimiter,
+)
+
+
+def _make_selector(artist_ids, calls):
+    """Returns a selector that picks the first artist not in flight."""
+
+    def select(exclude_ids):
+        calls.append(set(exclude_ids))
+        for artist_id in artist_ids:
+            if artist_id not in exclude_ids:
+                return {"artist_id": artist_id, "name": artist_id}
+        return None
+
+    return select
+
+
+@pytest.mark.asyncio
+async def test_fill_slots_runs_artists_concurrently():
+    """Runs up to max_concurrent_runs pipelines at the same time."""
+    release = asyncio.Event()
+    running = []
+
+    async def run_pipeline(artist):
+        running.append(artist["artist_id"])
+        await release.wait()
+
+    calls = []
+    scheduler = PipelineScheduler(
+        run_pipeline,
+        _make_selector(["a1", "a2", "a3"], calls),
+        max_concurrent_runs=2,
+    )
+    launched = await scheduler.fill_slots()
+    await asyncio.sleep(0)
+
+    assert launched == 2
+    assert sorted(running) == ["a1", "a2"]
+    assert scheduler.in_flight_artist_ids == {"a1", "a2"}
+
+    release.set()
+    await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_never_selects_in_flight_artist_twice():
+    """In-flight artists are excluded from selection."""
+    release = asyncio.Event()
+
+    async def run_pipeline(artist):
+        await release.wait()
+
+    calls = []
+    scheduler = PipelineScheduler(
+        run_pipeline, _make_selector(["only"], calls), max_concurrent_runs=3
+    )
+    launched = await scheduler.fill_slots()
+
+    assert launched == 1
+    assert calls[-1] == {"only"}
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert scheduler.in_flight_artist_ids == set()
+    await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_selector_ignoring_exclusions_is_not_double_booked():
+    """A selector returning an in-flight artist does not start a new run."""
+    release = asyncio.Event()
+
+    async def run_pipeline(artist):
+        await release.wait()
+
+    scheduler = PipelineScheduler(
+        run_pipeline,
+        lambda exclude_ids: {"artist_id": "same"},
+        max_concurrent_runs=3,
+    )
+    launched = await scheduler.fill_slots()
+
+    assert launched == 1
+    assert scheduler.runs_started == 1
+
+    release.set()
+    await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_run_frees_its_slot():
+    """A pipeline raising an exception releases the artist."""
+
+    async def run_pipeline(artist):
+        raise RuntimeError("boom")
+
+    scheduler = PipelineScheduler(
+        run_pipeline, _make_selector(["a1"], []), max_concurrent_runs=1
+    )
+    await scheduler.fill_slots()
+    await asyncio.sleep(0.01)
+
+    assert scheduler.in_flight_artist_ids == set()
+    assert scheduler.runs_finished == 1
+
+
+@pytest.mark.asyncio
+async def test_stage_limiter_bounds_concurrency():
+    """No more than the configured number of calls run inside a stage."""
+    limiter = StageLimiter({"beat_generation": 2})
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with limiter.stage("beat_generation"):
+            peak = max(peak, limiter.active_counts()["beat_generation"])
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(work() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.active_counts()["beat_generation"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stage_limiter_run_offloads_blocking_call():
+    """Blocking callables run in a worker thread and return their result."""
+    limiter = StageLimiter({"video_search": 1})
+
+    result = await limiter.run("video_search", lambda x, y=0: x + y, 2, y=3)
+    unlimited = await limiter.run("unknown_stage", lambda: "ok")
+
+    assert result == 5
+    assert unlimited == "ok"
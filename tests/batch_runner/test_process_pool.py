@@ -0,0 +1,78 @@
+"""Unit tests for the process pool used by CPU-bound audio stages."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from batch_runner.process_pool import ProcessStageRunner  # noqa: E402
+
+
+def _describe(value, scale=1):
+    return {"pid": os.getpid(), "value": value * scale}
+
+
+def _crash(value):
+    if os.getpid() != value:
+        os._exit(1)
+    return "recovered"
+
+
+@pytest.mark.asyncio
+async def test_run_executes_in_worker_process():
+    """Callables run in a separate, pre-started worker process."""
+    runner = ProcessStageRunner(1, warm_modules=("json",))
+    try:
+        runner.start()
+        result = await runner.run(_describe, 21, scale=2)
+    finally:
+        runner.shutdown()
+
+    assert result["value"] == 42
+    assert result["pid"] != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_zero_workers_runs_in_thread():
+    """max_workers=0 keeps work in this process, off the event loop."""
+    runner = ProcessStageRunner(0)
+    thread_ids = []
+
+    def record():
+        thread_ids.append(threading.get_ident())
+        return os.getpid()
+
+    assert await runner.run(record) == os.getpid()
+    assert thread_ids and thread_ids[0] != threading.get_ident()
+    assert runner.start() is None
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_falls_back_and_recreates():
+    """A crashed worker does not fail the run and the pool is rebuilt."""
+    runner = ProcessStageRunner(1, warm_modules=())
+    try:
+        runner.start()
+        broken = runner._executor
+        # Exits the worker; the retry runs in this process and succeeds
+        assert await runner.run(_crash, os.getpid()) == "recovered"
+        assert runner._executor is None
+
+        result = await runner.run(_describe, 1)
+        assert runner._executor is not broken
+        assert result["pid"] != os.getpid()
+    finally:
+        runner.shutdown()
+
+
+def test_default_start_method_is_not_fork():
+    """Workers never fork a parent that has threads and open databases."""
+    runner = ProcessStageRunner(1)
+
+    assert runner.start_method in ("forkserver", "spawn")
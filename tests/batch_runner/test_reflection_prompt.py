@@ -0,0 +1,116 @@
+"""Unit tests for reflection prompt compaction and the reflection policy."""
+
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from batch_runner.reflection_prompt import (  # noqa: E402
+    REFLECTION_INSTRUCTIONS,
+    ReflectionMetrics,
+    ReflectionPolicy,
+    build_reflection_prompt,
+    legacy_prompt_tokens,
+)
+
+PROFILE = {
+    "artist_id": 7,
+    "name": "Nova",
+    "genre": "synthwave",
+    "style_notes": "dreamy, 80s",
+    "llm_config": {"temperature": 0.7},
+    "status": "Active",
+    "performance_history": [
+        {"run_id": f"run-{i}", "status": "rejected", "timestamp": "t"}
+        for i in range(8)
+    ],
+    "voice_url": "https://example.com/voice.mp3",
+}
+
+
+def _run(run_id="r1", lyrics="Neon lights " * 40, message_id=11):
+    return {
+        "run_id": run_id,
+        "parameters_used": {"music_prompt": "A dreamy synthwave track"},
+        "track_url": "https://example.com/track.mp3",
+        "track_model_used": "suno-v3",
+        "tempo": 120.1234,
+        "duration": None,
+        "lyrics": lyrics,
+        "video_url": "https://example.com/video.mp4",
+        "video_source": "pexels",
+        "telegram_message_id": message_id,
+    }
+
+
+def _context(prompt):
+    return json.loads(prompt.split("Context:\n", 1)[1])
+
+
+def test_prompt_is_static_prefix_plus_compact_context():
+    """Instructions lead verbatim; context drops URLs and empty fields."""
+    prompt, tokens = build_reflection_prompt(
+        PROFILE, [(_run(), "rejected")], "deepseek"
+    )
+
+    assert prompt.startswith(REFLECTION_INSTRUCTIONS)
+    assert "https://" not in prompt and ": " not in prompt.split("Context:")[1]
+    context = _context(prompt)
+    run = context["runs"][0]
+    assert "duration" not in run and run["tempo"] == 120.12
+    assert context["artist"]["recent_outcomes"] == ["rejected"] * 5
+    assert tokens < legacy_prompt_tokens(
+        PROFILE, _run(), "rejected", "deepseek"
+    )
+
+
+def test_prompt_is_trimmed_to_budget():
+    """Over budget, history and lyrics shrink and older runs are dropped."""
+    runs = [(_run(f"r{i}"), "approved") for i in range(3)]
+    full, full_tokens = build_reflection_prompt(PROFILE, runs, "openai")
+
+    trimmed, tokens = build_reflection_prompt(
+        PROFILE, runs, "openai", token_budget=full_tokens - 50
+    )
+
+    assert tokens <= full_tokens - 50
+    context = _context(trimmed)
+    assert len(context["artist"].get("recent_outcomes", [])) < 5
+    assert len(context["runs"][0].get("lyrics", "")) < 200
+
+
+def test_policy_skips_defers_and_batches():
+    policy = ReflectionPolicy(batch_size=3)
+
+    assert policy.plan(7, {"run_id": "x"}, "error") == ("skip", [])
+    assert policy.plan(7, _run("a"), "approved") == ("defer", [])
+    assert policy.plan(7, _run("b", message_id=None), "rejected") == (
+        "defer",
+        [],
+    )
+    action, runs = policy.plan(7, _run("c"), "rejected")
+
+    assert action == "reflect"
+    assert [run["run_id"] for run, _ in runs] == ["a", "b", "c"]
+    assert policy.pending_counts() == {}
+
+
+def test_policy_disabled_reflects_every_run():
+    policy = ReflectionPolicy(enabled=False)
+    assert policy.plan(7, {"run_id": "x"}, "error")[0] == "reflect"
+
+
+def test_metrics_track_tokens_saved():
+    metrics = ReflectionMetrics()
+    metrics.record("skip", 500)
+    metrics.record("defer", 400)
+    assert metrics.record("reflect", 450, 300) == 150
+
+    snapshot = metrics.snapshot()
+    assert snapshot["prompts_sent"] == 1
+    assert snapshot["skipped"] == 1 and snapshot["deferred"] == 1
+    assert snapshot["tokens_saved"] == 1350 - 300
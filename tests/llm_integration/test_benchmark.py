@@ -0,0 +1,106 @@
+"""Unit tests for the mock providers and the benchmark harness."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator import benchmark  # noqa: E402
+from llm_orchestrator.llm_interface import (  # noqa: E402
+    LLMRequest,
+    LLMRequestType,
+    MockLLMProvider,
+    MockRateLimitError,
+)
+from llm_orchestrator.rate_limiter import retry_after_seconds  # noqa: E402
+
+
+def _request(prompt="hello"):
+    return LLMRequest(LLMRequestType.GENERATE, prompt)
+
+
+@pytest.mark.asyncio
+async def test_mock_latency_does_not_block_the_loop():
+    """Concurrent mock calls overlap instead of running back to back."""
+    provider = MockLLMProvider(latency_range=(0.1, 0.1), seed=1)
+
+    started = time.monotonic()
+    await asyncio.gather(
+        *(provider.send_request(_request()) for _ in range(10))
+    )
+
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_mock_quota_raises_rate_limit_with_retry_after():
+    """Requests over the quota fail with a readable Retry-After."""
+    provider = MockLLMProvider(
+        latency_range=(0, 0), requests_per_minute=2, seed=1
+    )
+    await provider.send_request(_request())
+    await provider.send_request(_request())
+
+    with pytest.raises(MockRateLimitError) as excinfo:
+        await provider.send_request(_request())
+
+    assert 0 < retry_after_seconds(excinfo.value) <= 60
+    assert provider.rate_limited_count == 1
+
+
+@pytest.mark.asyncio
+async def test_same_seed_replays_same_mock_behaviour():
+    """Seeded mocks fail and answer identically across runs."""
+
+    async def run(seed):
+        provider = MockLLMProvider(
+            latency_range=(0, 0.001), error_rate=0.3, seed=seed
+        )
+        outcomes = []
+        for i in range(20):
+            try:
+                response = await provider.send_request(_request(f"p{i}"))
+                outcomes.append(response.content)
+            except Exception as e:
+                outcomes.append(type(e).__name__)
+        return outcomes
+
+    assert await run(42) == await run(42)
+
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert benchmark.percentile(samples, 0.50) == 50.0
+    assert benchmark.percentile(samples, 0.99) == 99.0
+    assert benchmark.percentile([], 0.95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_benchmark_reports_stages(tmp_path):
+    """A small run completes every workflow and reports each stage."""
+    report = await benchmark.run_benchmark(
+        requests=12,
+        concurrency=4,
+        seed=3,
+        storage_dir=str(tmp_path),
+        latency_range=(0.001, 0.005),
+        error_rate=0.0,
+    )
+
+    assert report["succeeded"] == 12 and report["failed"] == 0
+    assert report["throughput"] > 0
+    for stage in benchmark.STAGES:
+        stats = report["stages"][stage]
+        assert stats["count"] == 12
+        assert stats["p50"] <= stats["p95"] <= stats["p99"] <= stats["max"]
+    assert report["providers"]["openai:mock-primary"]["requests"] == 12
+    with open(tmp_path / "sessions" / "sessions.journal") as f:
+        assert len({json.loads(line)[1] for line in f}) == 12
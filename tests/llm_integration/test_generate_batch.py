@@ -0,0 +1,68 @@
+"""Unit tests for LLMOrchestrator.generate_batch."""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator import orchestrator as orch  # noqa: E402
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return orch.LLMOrchestrator(
+        primary_model="openai:gpt-4o",
+        enable_auto_discovery=False,
+        enable_fallback_notifications=False,
+        config={"max_retries": 1, "initial_delay": 0},
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_concurrently_and_keeps_order(orchestrator):
+    """Prompts run in parallel up to max_concurrency; results keep order."""
+    running, peak, calls = [0], [0], []
+
+    async def request(instance, prompt, max_tokens, temperature):
+        calls.append(prompt)
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.05 if prompt == "a" else 0.01)
+        running[0] -= 1
+        return prompt.upper()
+
+    prompts = ["a", "b", "c", "a", "d"]
+    with patch.object(orchestrator, "_request_completion", request):
+        results = await orchestrator.generate_batch(prompts, max_concurrency=3)
+
+    assert results == ["A", "B", "C", "A", "D"]
+    assert sorted(calls) == ["a", "b", "c", "d"]  # duplicate sent once
+    assert peak[0] == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_per_item_errors(orchestrator):
+    """A failing prompt yields its exception; one summary is sent."""
+
+    async def request(instance, prompt, max_tokens, temperature):
+        if prompt == "bad":
+            raise orch.OrchestratorError("refused")
+        return "ok"
+
+    notify = AsyncMock()
+    with patch.object(
+        orchestrator, "_request_completion", request
+    ), patch.object(orch, "send_notification", notify):
+        results = await orchestrator.generate_batch(["good", "bad", "fine"])
+
+    assert results[0] == "ok" and results[2] == "ok"
+    assert isinstance(results[1], orch.OrchestratorError)
+    assert notify.await_count == 1
@@ -0,0 +1,98 @@
+"""Unit tests for hedged provider requests in LLMOrchestrator."""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator.orchestrator import (  # noqa: E402
+    LLMOrchestrator,
+    OrchestratorError,
+)
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    return LLMOrchestrator(
+        primary_model="openai:gpt-4o",
+        fallback_models=["anthropic:claude-3-haiku-20240307"],
+        enable_auto_discovery=False,
+        enable_fallback_notifications=False,
+        config={
+            "max_retries": 1,
+            "initial_delay": 0,
+            "hedge": True,
+            "hedge_default_delay": 0.05,
+        },
+    )
+
+
+def _fake_request(latencies, calls, cancelled, failing=()):
+    async def request(instance, prompt, max_tokens, temperature):
+        calls.append(instance.provider)
+        try:
+            await asyncio.sleep(latencies[instance.provider])
+        except asyncio.CancelledError:
+            cancelled.append(instance.provider)
+            raise
+        if instance.provider in failing:
+            raise OrchestratorError("down")
+        return instance.provider
+
+    return request
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled(orchestrator):
+    """A slow primary triggers the fallback; the loser is cancelled."""
+    calls, cancelled = [], []
+    request = _fake_request(
+        {"openai": 1.0, "anthropic": 0.01}, calls, cancelled
+    )
+    with patch.object(orchestrator, "_request_completion", request):
+        started = asyncio.get_running_loop().time()
+        result = await orchestrator.generate_text("prompt")
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert result == "anthropic"
+    assert calls == ["openai", "anthropic"]
+    assert cancelled == ["openai"]
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(orchestrator):
+    """No second request is made when the primary answers in time."""
+    calls, cancelled = [], []
+    request = _fake_request(
+        {"openai": 0.0, "anthropic": 0.0}, calls, cancelled
+    )
+    with patch.object(orchestrator, "_request_completion", request):
+        assert await orchestrator.generate_text("prompt") == "openai"
+
+    assert calls == ["openai"]
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_starts_fallback_immediately(orchestrator):
+    """A fast failure does not wait for the hedge delay."""
+    orchestrator.hedge_default_delay = 10
+    calls, cancelled = [], []
+    request = _fake_request(
+        {"openai": 0.0, "anthropic": 0.0}, calls, cancelled, {"openai"}
+    )
+    with patch.object(orchestrator, "_request_completion", request):
+        result = await asyncio.wait_for(
+            orchestrator.generate_text("prompt"), timeout=1
+        )
+
+    assert result == "anthropic"
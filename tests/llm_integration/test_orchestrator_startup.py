@@ -0,0 +1,120 @@
+"""Startup-time guards for LLMOrchestrator: lazy SDKs and clients."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator import orchestrator as orch  # noqa: E402
+from llm_orchestrator.llm_registry import LLM_REGISTRY  # noqa: E402
+
+SDK_MODULES = ["openai", "anthropic", "google.generativeai", "mistralai"]
+IMPORT_BUDGET_SECONDS = 1.0
+CONSTRUCT_BUDGET_SECONDS = 0.2
+
+
+def _set_all_keys(monkeypatch, value):
+    for info in orch.PROVIDER_CONFIG.values():
+        monkeypatch.setenv(info["api_key_env"], value)
+
+
+def test_import_does_not_load_provider_sdks():
+    """Importing the orchestrator stays fast and imports no SDK."""
+    code = (
+        "import json, sys, time\n"
+        f"sys.path.insert(0, {PROJECT_ROOT!r})\n"
+        "started = time.perf_counter()\n"
+        "import llm_orchestrator.orchestrator\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"loaded = [m for m in {SDK_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'loaded': loaded}))\n"
+    )
+    output = (
+        subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        .stdout.strip()
+        .splitlines()[-1]
+    )
+    result = json.loads(output)
+
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_auto_discovery_creates_no_clients(monkeypatch):
+    """Discovered providers are registered without building clients."""
+    _set_all_keys(monkeypatch, "startup-test")
+    clients_before = len(orch._clients)
+
+    started = time.perf_counter()
+    orchestrator = orch.LLMOrchestrator(
+        primary_model="deepseek:deepseek-chat",
+        enable_auto_discovery=True,
+        enable_fallback_notifications=False,
+    )
+    elapsed = time.perf_counter() - started
+
+    available = sum(
+        len(data["models"])
+        for provider, data in LLM_REGISTRY.items()
+        if orch.PROVIDER_CONFIG[provider]["library_present"]
+    )
+    assert len(orchestrator.providers) == available
+    assert len(orch._clients) == clients_before
+    assert not orch._loopless_clients
+    assert elapsed < CONSTRUCT_BUDGET_SECONDS
+
+
+def test_clients_and_orchestrators_are_shared(monkeypatch):
+    """Models of one provider share a client; settings share orchestrators."""
+    _set_all_keys(monkeypatch, "shared-test")
+    first = orch.get_orchestrator(
+        "openai:gpt-4o",
+        fallback_models=["openai:gpt-4o-mini"],
+        enable_auto_discovery=False,
+    )
+    second = orch.get_orchestrator(
+        "openai:gpt-4o",
+        fallback_models=["openai:gpt-4o-mini"],
+        enable_auto_discovery=False,
+    )
+    assert first is second
+    assert first is not orch.get_orchestrator(
+        "openai:gpt-4o", enable_auto_discovery=False
+    )
+
+    if orch.PROVIDER_CONFIG["openai"]["library_present"]:
+        gpt4o = first.providers["openai:gpt-4o"].client
+        mini = first.providers["openai:gpt-4o-mini"].client
+        assert gpt4o is mini
+
+
+def test_clients_are_not_shared_across_event_loops(monkeypatch):
+    """A second asyncio.run gets fresh clients; closed loops are dropped."""
+    _set_all_keys(monkeypatch, "loop-test")
+    sdk = SimpleNamespace(client_class=lambda **kwargs: object())
+    instance = orch.LLMProviderInstance("openai", "gpt-4o", "loop-test", {})
+
+    async def lookup():
+        return instance.client, instance.client
+
+    with patch.object(orch, "_load_sdk", return_value=sdk):
+        first, again = asyncio.run(lookup())
+        second, _ = asyncio.run(lookup())
+
+    assert first is again
+    assert first is not second
+    assert len(orch._clients) == 1
@@ -0,0 +1,85 @@
+"""Unit tests for provider circuit breakers and health ranking."""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator.orchestrator import (  # noqa: E402
+    LLMOrchestrator,
+    OrchestratorError,
+)
+from llm_orchestrator.provider_health import (  # noqa: E402
+    CircuitState,
+    ProviderHealth,
+    ProviderHealthTracker,
+)
+
+
+def test_circuit_opens_then_probes_after_recovery():
+    """Consecutive failures open the circuit; one probe is let through."""
+    health = ProviderHealth(failure_threshold=2, recovery_timeout=10)
+    health.record_failure(now=0)
+    assert health.current_state(now=1) is CircuitState.CLOSED
+    health.record_failure(now=1)
+
+    assert health.allow_request(now=5) is False
+    assert health.allow_request(now=11) is True  # half-open probe
+    assert health.allow_request(now=11) is False  # probe already taken
+    health.record_failure(now=12)
+    assert health.current_state(now=13) is CircuitState.OPEN
+
+    assert health.allow_request(now=22) is True
+    health.record_success(0.5)
+    assert health.current_state() is CircuitState.CLOSED
+
+
+def test_rank_prefers_fast_healthy_providers():
+    """Open circuits are dropped and timed healthy providers go first."""
+    tracker = ProviderHealthTracker(failure_threshold=1)
+    preference = [("a", "m"), ("b", "m"), ("c", "m"), ("d", "m")]
+    tracker.record_failure("a:m")
+    tracker.record_success("b:m", 2.0)
+    tracker.record_success("c:m", 0.5)
+
+    assert tracker.rank(preference) == [("c", "m"), ("b", "m"), ("d", "m")]
+
+
+@pytest.mark.asyncio
+async def test_generate_text_skips_open_circuit(monkeypatch):
+    """After the primary's circuit opens, calls go straight to fallback."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    orchestrator = LLMOrchestrator(
+        primary_model="openai:gpt-4o",
+        fallback_models=["anthropic:claude-3-haiku-20240307"],
+        enable_auto_discovery=False,
+        enable_fallback_notifications=False,
+        config={
+            "max_retries": 2,
+            "initial_delay": 0,
+            "circuit_failure_threshold": 2,
+        },
+    )
+    calls = []
+
+    async def request(instance, prompt, max_tokens, temperature):
+        calls.append(instance.provider)
+        if instance.provider == "openai":
+            raise OrchestratorError("down")
+        return "ok"
+
+    with patch.object(orchestrator, "_request_completion", request):
+        assert await orchestrator.generate_text("one") == "ok"
+        assert calls == ["openai", "openai", "anthropic"]
+        calls.clear()
+        assert await orchestrator.generate_text("two") == "ok"
+
+    assert calls == ["anthropic"]
+    assert orchestrator.health.snapshot()["openai:gpt-4o"]["state"] == "open"
@@ -0,0 +1,145 @@
+"""Unit tests for per-provider LLM rate limiting."""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator import orchestrator as orch  # noqa: E402
+from llm_orchestrator.rate_limiter import (  # noqa: E402
+    ProviderRateLimiter,
+    count_tokens,
+    retry_after_seconds,
+)
+
+
+class FakeRateLimitError(Exception):
+    def __init__(self, headers):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight_caps_concurrency():
+    """No more than max_in_flight calls run at once; the rest queue."""
+    limiter = ProviderRateLimiter("test", max_in_flight=2)
+    running, peak, queued = [0], [0], []
+
+    async def call():
+        async with limiter.slot():
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            queued.append(limiter.metrics()["queued"])
+            await asyncio.sleep(0.02)
+            running[0] -= 1
+
+    await asyncio.gather(*(call() for _ in range(5)))
+
+    assert peak[0] == 2
+    assert max(queued) > 0
+    assert limiter.metrics()["queued"] == 0
+    assert limiter.metrics()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_request_bucket_delays_when_empty():
+    """An exhausted requests-per-minute bucket makes callers wait."""
+    limiter = ProviderRateLimiter("test", requests_per_minute=60)
+    limiter.request_bucket.tokens = 0.95  # refills at 1 token/s
+
+    started = time.monotonic()
+    async with limiter.slot():
+        pass
+
+    assert time.monotonic() - started >= 0.04
+    assert limiter.metrics()["throttled"] == 1
+
+
+def test_count_tokens_uses_provider_ratio_without_tokenizer():
+    """Providers without a local tokenizer use their chars-per-token."""
+    text = "x" * 700
+    assert count_tokens(text, "anthropic") == 200
+    assert count_tokens(text, "gemini") == 175
+    assert count_tokens("", "openai") == 0
+
+
+def test_retry_after_header_parsing():
+    assert retry_after_seconds(FakeRateLimitError({"retry-after": "2"})) == 2
+    assert retry_after_seconds(
+        FakeRateLimitError({"retry-after-ms": "250"})
+    ) == pytest.approx(0.25)
+    assert retry_after_seconds(FakeRateLimitError({})) is None
+    assert retry_after_seconds(ValueError("no response")) is None
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_honors_retry_after(monkeypatch):
+    """A 429 with Retry-After pauses the provider instead of backing off."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    orchestrator = orch.LLMOrchestrator(
+        primary_model="openai:gpt-4o",
+        enable_auto_discovery=False,
+        enable_fallback_notifications=False,
+        config={"max_retries": 3, "initial_delay": 10},
+    )
+    limiter = orchestrator._rate_limiter("openai")
+    rate_limited_before = limiter.metrics()["rate_limited"]
+    attempts = []
+
+    async def request(instance, prompt, max_tokens, temperature):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise FakeRateLimitError({"retry-after": "0.1"})
+        return "ok"
+
+    with patch.object(
+        orch.LLMProviderInstance, "retryable_errors", (FakeRateLimitError,)
+    ), patch.object(orchestrator, "_request_completion", request):
+        result = await asyncio.wait_for(
+            orchestrator.generate_text("prompt"), timeout=2
+        )
+
+    assert result == "ok"
+    assert attempts[1] - attempts[0] >= 0.09
+    metrics = orchestrator.rate_limit_metrics()["openai"]
+    assert metrics["rate_limited"] == rate_limited_before + 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_does_not_trip_the_breaker(monkeypatch):
+    """Throttling is not a provider fault; only the limiter reacts."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    orchestrator = orch.LLMOrchestrator(
+        primary_model="openai:gpt-4o",
+        enable_auto_discovery=False,
+        enable_fallback_notifications=False,
+        config={"max_retries": 3, "initial_delay": 10},
+    )
+
+    async def request(instance, prompt, max_tokens, temperature):
+        raise FakeRateLimitError({"retry-after": "0.01"})
+
+    with patch.object(
+        orch.LLMProviderInstance, "retryable_errors", (FakeRateLimitError,)
+    ), patch.object(
+        orchestrator, "_request_completion", request
+    ), patch.object(
+        orch, "send_notification", side_effect=lambda *_: asyncio.sleep(0)
+    ):
+        with pytest.raises(orch.OrchestratorError):
+            await asyncio.wait_for(
+                orchestrator.generate_text("prompt"), timeout=2
+            )
+
+    health = orchestrator.health.get("openai:gpt-4o")
+    assert health.consecutive_failures == 0
+    assert orchestrator.health.allow_request("openai:gpt-4o")
@@ -0,0 +1,87 @@
+"""Unit tests for the LLM response cache and its orchestrator wiring."""
+
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator.orchestrator import LLMOrchestrator  # noqa: E402
+from llm_orchestrator.response_cache import (  # noqa: E402
+    ResponseCache,
+    make_cache_key,
+)
+
+
+def test_key_covers_all_generation_parameters():
+    """Changing any keyed parameter produces a different key."""
+    base = make_cache_key("openai", "gpt-4o", "hi", 100, 0.7)
+    assert base == make_cache_key("openai", "gpt-4o", "hi", 100, 0.7)
+    assert base != make_cache_key("deepseek", "gpt-4o", "hi", 100, 0.7)
+    assert base != make_cache_key("openai", "gpt-4o-mini", "hi", 100, 0.7)
+    assert base != make_cache_key("openai", "gpt-4o", "hi!", 100, 0.7)
+    assert base != make_cache_key("openai", "gpt-4o", "hi", 200, 0.7)
+    assert base != make_cache_key("openai", "gpt-4o", "hi", 100, 0.2)
+
+
+def test_memory_tier_is_lru_and_ttl_bound():
+    """The memory tier evicts least recently used and expired entries."""
+    cache = ResponseCache(max_entries=2, db_path=None)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "C")  # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+
+    cache.set("short", "S", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Entries persist in SQLite and reload into memory on a hit."""
+    db_path = str(tmp_path / "cache.db")
+    first = ResponseCache(db_path=db_path)
+    first.set("key", "persisted")
+    first.set("expired", "old", ttl=0.01)
+    first.close()
+    time.sleep(0.02)
+
+    second = ResponseCache(db_path=db_path)
+    assert second.get("key") == "persisted"
+    assert second.get("expired") is None
+    assert second.stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_text_uses_cache(monkeypatch):
+    """Repeated prompts are served from cache unless bypassed."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    cache = ResponseCache(db_path=None)
+    orchestrator = LLMOrchestrator(
+        primary_model="openai:gpt-4o",
+        enable_auto_discovery=False,
+        enable_fallback_notifications=False,
+        response_cache=cache,
+    )
+    call = AsyncMock(side_effect=["first", "second"])
+    with patch.object(orchestrator, "_call_provider_with_retry", call):
+        assert await orchestrator.generate_text("prompt") == "first"
+        assert await orchestrator.generate_text("prompt") == "first"
+        assert (
+            await orchestrator.generate_text("prompt", bypass_cache=True)
+            == "second"
+        )
+        assert await orchestrator.generate_text("prompt") == "second"
+
+    assert call.await_count == 2
+    assert cache.stats()["hits"] == 2
@@ -0,0 +1,112 @@
+"""Unit tests for ReviewLogger storage backends and the migration tool."""
+
+import json
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator import review_log_store  # noqa: E402
+from llm_orchestrator.review_log_store import (  # noqa: E402
+    SQLiteReviewLogStore,
+    migrate_file_logs,
+)
+from llm_orchestrator.review_logger import ReviewLogger  # noqa: E402
+
+
+def _log_iterations(reviews, session_id, scores):
+    for iteration, score in enumerate(scores, start=1):
+        prompt_id = reviews.log_prompt_version(
+            session_id, iteration, f"prompt {iteration}"
+        )
+        feedback_id = reviews.log_feedback(
+            session_id, iteration, prompt_id, {"rating": iteration}
+        )
+        validation_id = reviews.log_validation_result(
+            session_id, iteration, prompt_id, {"confidence_score": score}
+        )
+        reviews.log_iteration_summary(
+            session_id,
+            iteration,
+            prompt_id,
+            feedback_id,
+            validation_id,
+            "needs_improvement",
+            score,
+        )
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "files"])
+def test_queries_match_across_backends(tmp_path, backend):
+    reviews = ReviewLogger(storage_dir=str(tmp_path), backend=backend)
+    _log_iterations(reviews, "s1", [0.4, 0.9, 0.6])
+    _log_iterations(reviews, "s2", [0.1])
+
+    logs = reviews.get_logs_by_session("s1")
+    assert {category: len(entries) for category, entries in logs.items()} == {
+        "prompts": 3,
+        "feedback": 3,
+        "validations": 3,
+        "summaries": 3,
+    }
+    assert reviews.get_latest_prompt("s1")["prompt"] == "prompt 3"
+    assert reviews.get_best_prompt("s1")["prompt"] == "prompt 2"
+
+    history = reviews.get_iteration_history("s1", iteration=2)["iterations"]
+    assert len(history) == 1
+    assert history[0]["prompt"] == "prompt 2"
+    assert history[0]["feedback"] == {"rating": 2}
+    assert history[0]["validation_result"] == {"confidence_score": 0.9}
+
+    assert reviews.get_logs_by_session("missing") == {}
+    assert reviews.get_iteration_history("missing") == {"iterations": []}
+    assert reviews.get_best_prompt("missing") is None
+    reviews.close()
+
+
+@pytest.mark.parametrize("query", ["LATEST_SQL", "BEST_SQL"])
+def test_latest_and_best_prompt_need_no_sort(tmp_path, query):
+    store = SQLiteReviewLogStore(str(tmp_path / "reviews.db"))
+    plan = " ".join(
+        row[-1]
+        for row in store._conn.execute(
+            f"EXPLAIN QUERY PLAN {getattr(store, query)}", ("s1", "prompts")
+        )
+    )
+
+    assert "USING INDEX" in plan
+    assert "TEMP B-TREE" not in plan
+    store.close()
+
+
+def test_migration_imports_the_file_tree_once(tmp_path):
+    files = ReviewLogger(storage_dir=str(tmp_path), backend="files")
+    _log_iterations(files, "s1", [0.3, 0.8])
+    with open(tmp_path / "s1" / "prompts" / "broken.json", "w") as f:
+        f.write("{")
+
+    store = SQLiteReviewLogStore(str(tmp_path / "migrated.db"))
+    counts = migrate_file_logs(str(tmp_path), store)
+    assert counts == {"sessions": 1, "imported": 8, "skipped": 0, "errors": 1}
+    assert migrate_file_logs(str(tmp_path), store)["skipped"] == 8
+
+    migrated = ReviewLogger(storage_dir=str(tmp_path), store=store)
+    assert migrated.get_best_prompt("s1")["prompt"] == "prompt 2"
+    migrated.close()
+
+
+def test_new_sqlite_store_imports_existing_files(tmp_path, capsys):
+    files = ReviewLogger(storage_dir=str(tmp_path), backend="files")
+    _log_iterations(files, "s1", [0.5])
+
+    reviews = ReviewLogger(storage_dir=str(tmp_path), backend="sqlite")
+    assert reviews.get_latest_prompt("s1")["prompt"] == "prompt 1"
+    reviews.close()
+
+    assert review_log_store.main(["--storage-dir", str(tmp_path)]) == 0
+    assert json.loads(capsys.readouterr().out)["skipped"] == 4
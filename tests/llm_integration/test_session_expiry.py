@@ -0,0 +1,89 @@
+"""Unit tests for SessionManager's heap-based session expiry."""
+
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator.session_manager import (  # noqa: E402
+    Session,
+    SessionManager,
+    SessionStatus,
+)
+from llm_orchestrator.session_store import JournalSessionStore  # noqa: E402
+
+
+def _manager(tmp_path, cleanup_interval_seconds=60, flush_interval=0.05):
+    store = JournalSessionStore(str(tmp_path), flush_interval=flush_interval)
+    return SessionManager(
+        storage_dir=str(tmp_path),
+        cleanup_interval_seconds=cleanup_interval_seconds,
+        store=store,
+    )
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_background_thread_expires_sessions_without_lookups(tmp_path):
+    """The thread wakes at the earliest deadline, not the interval."""
+    manager = _manager(tmp_path, cleanup_interval_seconds=60)
+    short = manager.create_session(ttl_seconds=0.1)
+    long = manager.create_session(ttl_seconds=60)
+
+    assert _wait_for(lambda: short.id not in manager.active_sessions)
+    assert long.id in manager.active_sessions
+    assert manager.store.load(short.id)["status"] == "expired"
+    manager.close()
+
+
+def test_extended_sessions_outlive_their_first_deadline(tmp_path):
+    manager = _manager(tmp_path, cleanup_interval_seconds=0)
+    session = manager.create_session(ttl_seconds=0.1)
+    manager.extend_session_expiry(session.id, 60)
+
+    time.sleep(0.2)
+    assert manager.get_session(session.id) is session
+    assert session.status == SessionStatus.ACTIVE
+    manager.close()
+
+
+def test_lookups_do_not_scan_every_session(tmp_path, monkeypatch):
+    manager = _manager(tmp_path, cleanup_interval_seconds=0)
+    sessions = [manager.create_session() for _ in range(50)]
+    expiring = manager.create_session(ttl_seconds=0.05)
+    time.sleep(0.1)
+
+    def fail(self):
+        raise AssertionError("is_expired should not be called")
+
+    monkeypatch.setattr(Session, "is_expired", fail)
+    assert len(manager.list_sessions()) == 50
+    assert manager.get_session(sessions[0].id) is sessions[0]
+    assert expiring.id not in manager.active_sessions
+    manager.close()
+
+
+def test_expiry_writes_are_batched(tmp_path):
+    manager = _manager(tmp_path, cleanup_interval_seconds=0, flush_interval=5)
+    for _ in range(20):
+        manager.create_session(ttl_seconds=0.05)
+    manager.store.flush()
+    flushes = manager.store.flushes
+    time.sleep(0.1)
+
+    manager.list_sessions()
+    assert manager.store.pending == 20
+    manager.store.flush()
+    assert manager.store.flushes == flushes + 1
+    manager.close()
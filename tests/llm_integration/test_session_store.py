@@ -0,0 +1,165 @@
+"""Unit tests for the session stores and SessionManager persistence."""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator.orchestrator import (  # noqa: E402
+    OrchestrationResult,
+    OrchestrationStatus,
+)
+from llm_orchestrator.session_manager import (  # noqa: E402
+    Session,
+    SessionManager,
+    SessionStatus,
+)
+from llm_orchestrator.session_store import (  # noqa: E402
+    JournalSessionStore,
+    SQLiteSessionStore,
+    create_session_store,
+)
+
+
+def _session(session_id, ttl_seconds=3600, status="active"):
+    data = Session(session_id=session_id, ttl_seconds=ttl_seconds).to_dict()
+    data["status"] = status
+    return data
+
+
+def _orchestration(content="text"):
+    result = OrchestrationResult()
+    result.status = OrchestrationStatus.COMPLETED
+    result.content = content
+    return result
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+def test_manager_round_trip(tmp_path, backend):
+    """Sessions and their orchestrations survive a restart."""
+    manager = SessionManager(storage_dir=str(tmp_path), backend=backend)
+    session = manager.create_session(metadata={"user": "a"})
+    result = _orchestration()
+    manager.add_orchestration_to_session(session.id, result)
+    result.content = "revised"
+    manager.update_orchestration(session.id, result)
+    manager.extend_session_expiry(session.id, 60)
+    done = manager.create_session()
+    manager.complete_session(done.id)
+    manager.close()
+
+    reloaded = SessionManager(storage_dir=str(tmp_path), backend=backend)
+    restored = reloaded.get_session(session.id)
+    assert restored.metadata == {"user": "a"}
+    assert restored.expires_at == session.expires_at
+    assert restored.orchestrations[result.id].content == "revised"
+    assert done.id not in reloaded.active_sessions
+    assert reloaded.get_session(done.id).status == SessionStatus.COMPLETED
+    reloaded.close()
+
+
+def test_changes_are_batched_until_the_flush_interval(tmp_path):
+    """Changes inside one flush interval are written together."""
+    store = JournalSessionStore(str(tmp_path), flush_interval=0.1)
+    store.put(_session("s1"))
+    for i in range(5):
+        store.patch("s1", {"updated_at": str(i)})
+
+    assert store.flushes == 0
+    assert store.load("s1")["updated_at"] == "4"
+    time.sleep(0.3)
+    assert store.flushes == 1
+    assert store.records_written == 6
+
+
+def test_journal_skips_a_truncated_last_record(tmp_path):
+    store = JournalSessionStore(str(tmp_path), flush_interval=0)
+    store.put(_session("s1"))
+    store.patch("s1", {"status": "completed"})
+    with open(store.path, "a") as f:
+        f.write('["patch","s1",{"status":"fa')
+
+    replayed = JournalSessionStore(str(tmp_path), flush_interval=0)
+    assert replayed.load("s1")["status"] == "completed"
+
+
+def test_journal_compaction_keeps_one_record_per_session(tmp_path):
+    store = JournalSessionStore(
+        str(tmp_path), flush_interval=0, compact_records=10
+    )
+    store.put(_session("s1"))
+    store.put(_session("s2"))
+    for i in range(20):
+        store.patch("s1", {"updated_at": str(i)})
+
+    assert store.compactions >= 1
+    with open(store.path) as f:
+        assert len(f.readlines()) < 10
+    replayed = JournalSessionStore(str(tmp_path), flush_interval=0)
+    assert replayed.load("s1")["updated_at"] == "19"
+    assert replayed.load("s2") is not None
+
+
+def test_journal_compaction_drops_old_finished_sessions(tmp_path):
+    """Only active and recently finished sessions survive compaction."""
+    store = JournalSessionStore(
+        str(tmp_path), flush_interval=0, compact_records=10
+    )
+    long_ago = (datetime.now() - timedelta(days=2)).isoformat()
+    store.put(_session("live"))
+    store.put(_session("recent", status="completed"))
+    old = _session("old", status="completed")
+    old["updated_at"] = long_ago
+    store.put(old)
+    stale = _session("stale")
+    stale["expires_at"] = long_ago
+    store.put(stale)
+    for i in range(20):
+        store.patch("live", {"metadata": {"step": i}})
+
+    assert store.sessions_dropped == 2
+    assert store.load("old") is None
+    replayed = JournalSessionStore(str(tmp_path), flush_interval=0)
+    assert replayed.load("live")["metadata"] == {"step": 19}
+    assert replayed.load("recent") is not None
+    assert replayed.load("stale") is None
+
+
+def test_sqlite_loads_only_active_unexpired_sessions(tmp_path):
+    store = create_session_store(str(tmp_path), "sqlite", flush_interval=0)
+    assert isinstance(store, SQLiteSessionStore)
+    store.put(_session("live"))
+    store.put(_session("stale", ttl_seconds=-10))
+    store.put(_session("done", status="completed"))
+    store.put_orchestration(
+        "live", _orchestration().to_dict(), datetime.now().isoformat()
+    )
+
+    active = store.load_active(datetime.now().isoformat())
+    assert [session["id"] for session in active] == ["live"]
+    assert len(active[0]["orchestrations"]) == 1
+    store.close()
+
+
+def test_legacy_session_files_are_imported_once(tmp_path):
+    legacy = _session("legacy")
+    legacy["expires_at"] = (datetime.now() + timedelta(hours=1)).isoformat()
+    with open(tmp_path / "legacy.json", "w") as f:
+        json.dump(legacy, f, indent=2)
+
+    manager = SessionManager(storage_dir=str(tmp_path))
+    assert "legacy" in manager.active_sessions
+    manager.close()
+
+    os.remove(tmp_path / "legacy.json")
+    reloaded = SessionManager(storage_dir=str(tmp_path))
+    assert "legacy" in reloaded.active_sessions
+    reloaded.close()
@@ -0,0 +1,114 @@
+"""Unit tests for streamed generation and early-stop JSON parsing."""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator import orchestrator as orch  # noqa: E402
+from llm_orchestrator.streaming import (  # noqa: E402
+    JsonObjectDetector,
+    extract_json_object,
+)
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    return orch.LLMOrchestrator(
+        primary_model="openai:gpt-4o",
+        fallback_models=["anthropic:claude-3-haiku-20240307"],
+        enable_auto_discovery=False,
+        enable_fallback_notifications=False,
+        config={"health_ranking": False},
+    )
+
+
+def _fake_stream(chunks_by_provider, pulled, closed):
+    async def stream(instance, prompt, max_tokens, temperature):
+        try:
+            for chunk in chunks_by_provider[instance.provider]:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                pulled.append(chunk)
+                yield chunk
+        finally:
+            closed.append(instance.provider)
+
+    return stream
+
+
+def test_detector_handles_prefix_strings_and_chunking():
+    """Braces in strings and escaped quotes do not end the object."""
+    detector = JsonObjectDetector()
+    text = 'Sure! ```json\n{"a": "x}\\"{", "b": {"c": [1, 2]}} trailing'
+    chunks = [text[i:][:3] for i in range(0, len(text), 3)]
+    done_at = next(i for i, c in enumerate(chunks) if detector.feed(c))
+
+    assert detector.result == '{"a": "x}\\"{", "b": {"c": [1, 2]}}'
+    assert done_at < len(chunks) - 1
+    assert extract_json_object("no object {") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_before_first_chunk(orchestrator):
+    """A provider failing before any text is replaced by the next one."""
+    pulled, closed = [], []
+    stream = _fake_stream(
+        {
+            "openai": [orch.OrchestratorError("down")],
+            "anthropic": ["Hel", "lo"],
+        },
+        pulled,
+        closed,
+    )
+    with patch.object(orchestrator, "_stream_completion", stream):
+        chunks = [c async for c in orchestrator.generate_text_stream("hi")]
+
+    assert chunks == ["Hel", "lo"]
+    assert closed == ["openai", "anthropic"]
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_after_text_raises(orchestrator):
+    """Once text was yielded, a broken stream is an error, not a fallback."""
+    pulled, closed = [], []
+    stream = _fake_stream(
+        {"openai": ["par", orch.OrchestratorError("reset")]}, pulled, closed
+    )
+    with patch.object(orchestrator, "_stream_completion", stream):
+        with pytest.raises(orch.OrchestratorError, match="after 1 chunks"):
+            async for _ in orchestrator.generate_text_stream("hi"):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_generate_json_stops_at_closing_brace(orchestrator):
+    """The provider stream is closed once the JSON object is complete."""
+    pulled, closed = [], []
+    stream = _fake_stream(
+        {
+            "openai": [
+                "Here: {",
+                '"style_notes": "more bass"',
+                "}",
+                " Let me explain",
+                " at length...",
+            ]
+        },
+        pulled,
+        closed,
+    )
+    with patch.object(orchestrator, "_stream_completion", stream):
+        result = await orchestrator.generate_json("reflect")
+
+    assert result == {"style_notes": "more bass"}
+    assert pulled == ["Here: {", '"style_notes": "more bass"', "}"]
+    assert closed == ["openai"]
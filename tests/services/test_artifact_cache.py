@@ -0,0 +1,127 @@
+"""Unit tests for the shared artifact cache."""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from services.artifact_cache import ArtifactCache  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, content, content_type="audio/mpeg"):
+        self.content = content
+        self.headers = {"content-type": content_type}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.content), chunk_size):
+            end = i + chunk_size
+            yield self.content[i:end]
+
+
+def _fake_get(bodies, calls, delay=0):
+    def get(url, stream=True, timeout=None):
+        calls.append(url)
+        time.sleep(delay)
+        return FakeResponse(bodies[url])
+
+    return get
+
+
+def test_acquire_downloads_once_and_shares_file(tmp_path):
+    """Later stages reuse the first download."""
+    calls = []
+    bodies = {"https://x/track.mp3": b"abc" * 100}
+    cache = ArtifactCache(str(tmp_path), max_bytes=10_000)
+    with patch("requests.get", _fake_get(bodies, calls)):
+        first = cache.acquire("https://x/track.mp3", "analyze")
+        cache.release("https://x/track.mp3", "analyze")
+        second = cache.acquire("https://x/track.mp3", "humanize")
+
+    assert first == second
+    assert first.endswith(".mp3")
+    assert cache.digest("https://x/track.mp3") == os.path.basename(first)[:64]
+    assert calls == ["https://x/track.mp3"]
+    assert (cache.hits, cache.misses) == (1, 1)
+    with open(first, "rb") as f:
+        assert f.read() == b"abc" * 100
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    """Two URLs serving the same bytes share one cache file."""
+    calls = []
+    bodies = {"https://a/t.mp3": b"same", "https://b/t.mp3": b"same"}
+    cache = ArtifactCache(str(tmp_path), max_bytes=10_000)
+    with patch("requests.get", _fake_get(bodies, calls)):
+        path_a = cache.acquire("https://a/t.mp3", "run1")
+        path_b = cache.acquire("https://b/t.mp3", "run2")
+
+    assert path_a == path_b
+    assert cache.total_bytes == 4
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_lru_eviction_skips_pinned_entries(tmp_path):
+    """Unpinned entries are evicted oldest first; pinned ones survive."""
+    calls = []
+    bodies = {f"https://x/{i}.wav": bytes([i]) * 40 for i in range(3)}
+    cache = ArtifactCache(str(tmp_path), max_bytes=100)
+    with patch("requests.get", _fake_get(bodies, calls)):
+        pinned = cache.acquire("https://x/0.wav", "run_a")
+        old = cache.acquire("https://x/1.wav", "run_b")
+        cache.release_owner("run_b")
+        cache.acquire("https://x/2.wav", "run_c")
+
+    assert os.path.exists(pinned)
+    assert not os.path.exists(old)
+    assert cache.total_bytes == 80
+
+    cache.release_owner("run_a")
+    cache.release_owner("run_c")
+    assert cache.pin("https://x/1.wav", "run_d") is False
+
+
+def test_concurrent_acquire_downloads_once(tmp_path):
+    """Concurrent stages wait for the in-progress download."""
+    calls = []
+    bodies = {"https://x/track.mp3": b"data"}
+    cache = ArtifactCache(str(tmp_path), max_bytes=10_000)
+    results = []
+    with patch("requests.get", _fake_get(bodies, calls, delay=0.05)):
+        threads = [
+            threading.Thread(
+                target=lambda i=i: results.append(
+                    cache.acquire("https://x/track.mp3", f"owner{i}")
+                )
+            )
+            for i in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert calls == ["https://x/track.mp3"]
+    assert len(set(results)) == 1
+
+
+def test_existing_files_are_accounted_on_startup(tmp_path):
+    """Files from a previous process count toward the size limit."""
+    for i in range(3):
+        name = f"{i:064x}.mp3"
+        (tmp_path / name).write_bytes(b"x" * 50)
+        os.utime(tmp_path / name, (i, i))
+
+    cache = ArtifactCache(str(tmp_path), max_bytes=100)
+
+    assert cache.total_bytes == 100
+    assert not (tmp_path / f"{0:064x}.mp3").exists()
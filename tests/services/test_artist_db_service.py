@@ -5,7 +5,6 @@ import pytest
 import os
 import sys
 import json
-import sqlite3
 from datetime import datetime
 
 # Add project root to sys.path to allow importing services
@@ -47,6 +46,7 @@ def db_service(monkeypatch, tmp_path):
     yield service
 
     # Cleanup: tmp_path fixture handles file deletion automatically
+    service.close_db_connections()
 
 
 # --- Test Cases ---
@@ -376,6 +376,80 @@ def test_update_artist_performance_history_limit(db_service, monkeypatch):
 
 # Note: No need to restore MAX_HISTORY_LENGTH, monkeypatch handles it.
 
+
+def test_pooled_connection_reused_and_wal(db_service):
+    """Test that service calls share one WAL-mode connection per thread."""
+    conn1 = db_service.get_pooled_connection()
+    conn2 = db_service.get_pooled_connection()
+    assert conn1 is conn2
+    journal_mode = conn1.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal"
+
+    # A closed pooled connection is transparently replaced
+    conn1.close()
+    conn3 = db_service.get_pooled_connection()
+    assert conn3 is not conn1
+    assert db_service.get_all_artists() == []
+
+
+def test_db_transaction_rolls_back_on_error(db_service):
+    """Test that a failing transaction leaves no partial writes."""
+    db_service.add_artist(
+        {
+            "artist_id": "tx_test",
+            "name": "Tx Test",
+            "created_at": datetime.utcnow().isoformat(),
+            "status": "Active",
+        }
+    )
+    with pytest.raises(RuntimeError):
+        with db_service.db_transaction() as conn:
+            conn.execute(
+                "UPDATE artists SET status = 'Paused' WHERE artist_id = ?",
+                ("tx_test",),
+            )
+            raise RuntimeError("abort")
+
+    assert db_service.get_artist("tx_test")["status"] == "Active"
+
+
+def test_concurrent_performance_updates_not_lost(db_service):
+    """Test that concurrent read-modify-write updates are serialized."""
+    import threading
+
+    artist_id = "perf_concurrent_test"
+    db_service.add_artist(
+        {
+            "artist_id": artist_id,
+            "name": "Perf Concurrent",
+            "created_at": datetime.utcnow().isoformat(),
+            "status": "Active",
+        }
+    )
+    num_threads = 8
+    results = []
+
+    def worker(i):
+        results.append(
+            db_service.update_artist_performance_db(
+                artist_id, f"run_{i}", "rejected", 100
+            )
+        )
+
+    threads = [
+        threading.Thread(target=worker, args=(i,)) for i in range(num_threads)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(results)
+    retrieved = db_service.get_artist(artist_id)
+    assert retrieved["consecutive_rejections"] == num_threads
+    assert len(retrieved["performance_history"]) == num_threads
+
+
 # --- Error Report Tests (Placeholder - Add if needed) ---
 # def test_add_error_report(db_service):
 #     ...
@@ -387,3 +461,175 @@ def test_update_artist_performance_history_limit(db_service, monkeypatch):
 #     ...
 # def test_prune_error_reports(db_service):
 #     ...
+
+
+def test_run_history_not_capped_in_storage(db_service, monkeypatch):
+    """Test that artist_runs keeps every run while the profile view is capped."""
+    monkeypatch.setattr("services.artist_db_service.MAX_HISTORY_LENGTH", 2)
+    artist_id = "runs_uncapped_test"
+    db_service.add_artist(
+        {
+            "artist_id": artist_id,
+            "name": "Runs Uncapped",
+            "created_at": datetime.utcnow().isoformat(),
+            "status": "Active",
+        }
+    )
+    for i in range(5):
+        db_service.update_artist_performance_db(
+            artist_id, f"run_{i}", "approved", 5
+        )
+
+    runs = db_service.get_artist_runs(artist_id)
+    assert [r["run_id"] for r in runs] == [f"run_{i}" for i in range(5)]
+    assert len(db_service.get_artist(artist_id)["performance_history"]) == 2
+    assert [
+        r["run_id"] for r in db_service.get_artist_runs(artist_id, limit=2)
+    ] == [
+        "run_3",
+        "run_4",
+    ]
+
+
+def test_performance_summaries_group_by_window(db_service):
+    """Test SQL aggregation of run outcomes per artist and time window."""
+    old_ts = "2020-01-01T00:00:00"
+    new_ts = "2030-01-01T00:00:00"
+    db_service.add_artist(
+        {
+            "artist_id": "sum_a",
+            "name": "Sum A",
+            "created_at": old_ts,
+            "performance_history": [
+                {"run_id": "a1", "status": "approved", "timestamp": old_ts},
+                {"run_id": "a2", "status": "rejected", "timestamp": new_ts},
+                {"run_id": "a3", "status": "error", "timestamp": new_ts},
+            ],
+        }
+    )
+    db_service.add_artist(
+        {
+            "artist_id": "sum_b",
+            "name": "Sum B",
+            "created_at": old_ts,
+            "performance_history": [
+                {"run_id": "b1", "status": "approved", "timestamp": new_ts},
+            ],
+        }
+    )
+
+    all_time = db_service.get_performance_summaries()
+    assert all_time["sum_a"] == {
+        "total_runs": 3,
+        "approved_runs": 1,
+        "rejected_runs": 1,
+        "error_runs": 1,
+    }
+    recent = db_service.get_performance_summaries(since="2025-01-01")
+    assert recent["sum_a"]["total_runs"] == 2
+    assert recent["sum_a"]["approved_runs"] == 0
+    assert recent["sum_b"]["approved_runs"] == 1
+
+    single = db_service.get_performance_summary("sum_a", since="2025-01-01")
+    assert single["total_runs"] == 2
+    assert db_service.get_performance_summary("missing")["total_runs"] == 0
+
+
+def test_legacy_performance_history_migrated(db_service):
+    """Test that JSON performance_history blobs move into artist_runs."""
+    conn = db_service.get_db_connection()
+    try:
+        conn.execute(
+            "INSERT INTO artists (artist_id, name, created_at, status, "
+            "performance_history) VALUES (?, ?, ?, ?, ?)",
+            (
+                "legacy_artist",
+                "Legacy",
+                "2024-01-01T00:00:00",
+                "Active",
+                json.dumps(
+                    [
+                        {
+                            "run_id": "l1",
+                            "status": "approved",
+                            "timestamp": "2024-01-02T00:00:00",
+                        },
+                        {
+                            "run_id": "l2",
+                            "status": "rejected",
+                            "timestamp": "2024-01-03T00:00:00",
+                        },
+                    ]
+                ),
+            ),
+        )
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+    finally:
+        conn.close()
+
+    db_service.initialize_database()
+    db_service.initialize_database()  # Idempotent
+
+    runs = db_service.get_artist_runs("legacy_artist")
+    assert [r["run_id"] for r in runs] == ["l1", "l2"]
+    artist = db_service.get_artist("legacy_artist")
+    assert [r["status"] for r in artist["performance_history"]] == [
+        "approved",
+        "rejected",
+    ]
+
+
+def test_select_next_artists_uses_priority_and_last_run(db_service):
+    """Test indexed next-artist selection order, exclusion and projection."""
+    db_service.add_artist(
+        {
+            "artist_id": "active_old",
+            "name": "Active Old",
+            "status": "Active",
+            "last_run_at": "2024-01-01T00:00:00",
+            "llm_config": {"temperature": 0.7},
+        }
+    )
+    db_service.add_artist(
+        {
+            "artist_id": "active_never",
+            "name": "Active Never",
+            "status": "Active",
+        }
+    )
+    db_service.add_artist(
+        {
+            "artist_id": "candidate_new",
+            "name": "Candidate New",
+            "status": "Candidate",
+            "last_run_at": "2025-01-01T00:00:00",
+        }
+    )
+    db_service.add_artist(
+        {"artist_id": "paused", "name": "Paused", "status": "Paused"}
+    )
+
+    order = [a["artist_id"] for a in db_service.select_next_artists(limit=10)]
+    assert order == ["candidate_new", "active_never", "active_old"]
+    assert db_service.count_artists(["Candidate", "Active"]) == 3
+
+    (first,) = db_service.select_next_artists(
+        exclude_ids=["candidate_new", "active_never"]
+    )
+    assert first["artist_id"] == "active_old"
+    assert first["llm_config"] == {"temperature": 0.7}
+
+    (light,) = db_service.select_next_artists(
+        statuses=["Active"], lightweight=True
+    )
+    assert light["artist_id"] == "active_never"
+    assert "llm_config" not in light
+    assert "performance_history" not in light
+
+    assert (
+        db_service.select_next_artists(
+            exclude_ids=["candidate_new", "active_never", "active_old"]
+        )
+        == []
+    )
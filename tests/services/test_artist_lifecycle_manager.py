@@ -0,0 +1,151 @@
+"""Unit tests for the Artist Lifecycle Manager."""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+
+@pytest.fixture
+def lifecycle(monkeypatch, tmp_path):
+    """Fixture returning (manager module, db module) on a temporary DB."""
+    monkeypatch.setattr(
+        "services.artist_db_service.DB_FILE", str(tmp_path / "artists.db")
+    )
+    import services.artist_db_service as db
+    import services.artist_lifecycle_manager as manager_module
+
+    db.initialize_database()
+    yield manager_module, db
+    db.close_db_connections()
+
+
+def _runs(approved, rejected, days_ago=1):
+    ts = (datetime.utcnow() - timedelta(days=days_ago)).isoformat()
+    return [
+        {"run_id": f"a{i}", "status": "approved", "timestamp": ts}
+        for i in range(approved)
+    ] + [
+        {"run_id": f"r{i}", "status": "rejected", "timestamp": ts}
+        for i in range(rejected)
+    ]
+
+
+def _add(db, artist_id, status, history=None, **extra):
+    data = {
+        "artist_id": artist_id,
+        "name": artist_id,
+        "status": status,
+        "last_run_at": datetime.utcnow().isoformat(),
+        "performance_history": history or [],
+    }
+    data.update(extra)
+    assert db.add_artist(data) == artist_id
+
+
+def test_run_lifecycle_checks_batches_status_updates(lifecycle, monkeypatch):
+    """Test that the sweep decides in memory and writes once."""
+    manager_module, db = lifecycle
+    _add(db, "retire_me", "Active", consecutive_rejections=5)
+    _add(db, "promote_me", "Candidate", _runs(10, 0))
+    _add(db, "pause_me", "Active", _runs(1, 9))
+    _add(db, "steady", "Active", _runs(7, 3))
+    _add(
+        db,
+        "long_paused",
+        "Paused",
+        last_run_at=(datetime.utcnow() - timedelta(days=200)).isoformat(),
+    )
+    _add(db, "already_retired", "Retired", consecutive_rejections=9)
+
+    batches = []
+    original = manager_module.update_artist_statuses
+
+    def spy(updates):
+        batches.append(list(updates))
+        return original(updates)
+
+    monkeypatch.setattr(manager_module, "update_artist_statuses", spy)
+    monkeypatch.setattr(
+        manager_module,
+        "get_artist",
+        lambda artist_id: pytest.fail("get_artist called during sweep"),
+    )
+
+    report = manager_module.ArtistLifecycleManager().run_lifecycle_checks()
+
+    assert report["evaluated"] == 5
+    assert report["changes"] == {
+        "retire_me": "Retired",
+        "promote_me": "Active",
+        "pause_me": "Paused",
+        "long_paused": "Retired",
+    }
+    assert len(batches) == 1
+    assert set(report["timings"]) == {"load", "decide", "apply", "total"}
+    assert db.get_artist("steady")["status"] == "Active"
+    assert db.get_artist("promote_me")["status"] == "Active"
+    assert db.get_artist("long_paused")["status"] == "Retired"
+
+
+def test_run_lifecycle_checks_skips_statuses_changed_meanwhile(
+    lifecycle, monkeypatch
+):
+    """Test that a status changed after the snapshot is not overwritten."""
+    manager_module, db = lifecycle
+    _add(db, "retire_me", "Active", consecutive_rejections=5)
+    _add(db, "raced", "Active", consecutive_rejections=5)
+    original = manager_module.get_lifecycle_states
+
+    def snapshot_then_race(statuses):
+        states = original(statuses)
+        # A concurrent pipeline changes the status after the snapshot
+        db.update_artist_status("raced", "Paused")
+        return states
+
+    monkeypatch.setattr(
+        manager_module, "get_lifecycle_states", snapshot_then_race
+    )
+
+    report = manager_module.ArtistLifecycleManager().run_lifecycle_checks()
+
+    assert report["changes"] == {"retire_me": "Retired"}
+    assert report["skipped"] == {"raced": "Retired"}
+    assert db.get_artist("raced")["status"] == "Paused"
+
+
+def test_run_lifecycle_checks_evolves_poor_performers(lifecycle, monkeypatch):
+    """Test that evolution updates the profile and batches the status."""
+    manager_module, db = lifecycle
+    _add(
+        db,
+        "evolve_me",
+        "Evolving",
+        _runs(3, 7),
+        llm_config={"model": "test-llm", "temperature": 0.5},
+    )
+    monkeypatch.setattr(manager_module.random, "uniform", lambda a, b: 0.05)
+
+    report = manager_module.ArtistLifecycleManager().run_lifecycle_checks()
+
+    assert report["changes"] == {"evolve_me": "Active"}
+    artist = db.get_artist("evolve_me")
+    assert artist["status"] == "Active"
+    assert artist["llm_config"]["temperature"] == 0.55
+
+
+def test_evaluate_artist_lifecycle_matches_bulk_decision(lifecycle):
+    """Test that single-artist evaluation uses the same decision logic."""
+    manager_module, db = lifecycle
+    _add(db, "single", "Candidate", _runs(9, 1))
+
+    manager = manager_module.ArtistLifecycleManager()
+    assert manager.evaluate_artist_lifecycle("single") == "Active"
+    assert db.get_artist("single")["status"] == "Active"
+    assert manager.evaluate_artist_lifecycle("missing") is None
@@ -0,0 +1,134 @@
+"""Unit tests for error fingerprinting and occurrence deduplication."""
+
+import os
+import subprocess
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from services.error_fingerprint import (  # noqa: E402
+    fingerprint_error,
+    normalize_error,
+)
+
+RUN_IDS = [
+    "3f2b9c1e-1111-2222-3333-444455556666",
+    "9a8b7c6d-aaaa-bbbb-cccc-ddddeeeeffff",
+]
+
+
+def _error(timestamp, run_id, address, line, duration):
+    return "\n".join(
+        [
+            f"{timestamp} - batch_runner - ERROR - Run {run_id} failed "
+            f"after {duration}s (HTTP 429)",
+            "Traceback (most recent call last):",
+            f'File "/app/batch_runner/runner.py", line {line}, in run',
+            f"RuntimeError: client <Client object at {address}> closed",
+        ]
+    )
+
+
+def test_same_fault_gets_the_same_fingerprint():
+    first = _error(
+        "2024-05-02 20:42:05,123",
+        RUN_IDS[0],
+        "0x7f3a2b10",
+        120,
+        "12.5",
+    )
+    second = _error(
+        "2024-05-03 08:01:59,900",
+        RUN_IDS[1],
+        "0x7f11c0d8",
+        131,
+        "3.25",
+    )
+
+    assert fingerprint_error(first) == fingerprint_error(second)
+    assert "<UUID>" in normalize_error(first)
+
+
+def test_different_faults_get_different_fingerprints():
+    base = _error("2024-05-02 20:42:05,123", "run", "0x1", 1, "1.0")
+
+    assert fingerprint_error(base) != fingerprint_error(
+        base.replace("HTTP 429", "HTTP 500")
+    )
+    assert fingerprint_error(base) != fingerprint_error(
+        base.replace("RuntimeError", "ValueError")
+    )
+
+
+def test_fingerprint_is_stable_across_processes():
+    code = (
+        "from services.error_fingerprint import fingerprint_error;"
+        "print(fingerprint_error('ValueError: boom'))"
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        for seed in ("1", "2")
+    }
+
+    assert digests == {fingerprint_error("ValueError: boom")}
+
+
+@pytest.fixture
+def error_service(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "services.artist_db_service.DB_FILE", str(tmp_path / "errors.db")
+    )
+    import services.artist_db_service as db
+    import services.error_analysis_service as service
+
+    db.initialize_database()
+    monkeypatch.setattr(service, "send_notification", AsyncMock())
+    monkeypatch.setattr(
+        service.ErrorAnalysisService, "analyze_and_fix_error", AsyncMock()
+    )
+    yield service.ErrorAnalysisService(), db
+    db.close_db_connections()
+
+
+@pytest.mark.asyncio
+async def test_every_block_is_processed_and_analyzed_once(error_service):
+    service, db = error_service
+    blocks = [
+        {
+            "log": f"context line {i}\n{error}",
+            "error": error,
+            "timestamp": f"2024-05-02T20:42:0{i}",
+            "service": "batch_runner",
+        }
+        for i, error in enumerate(
+            [
+                _error("2024-05-02 20:42:01,000", RUN_IDS[0], "0x1", 1, "1.5"),
+                "2024-05-02 20:42:02,000 - runner - ERROR - disk full",
+                _error("2024-05-02 20:42:03,000", RUN_IDS[1], "0x2", 2, "2.5"),
+            ]
+        )
+    ]
+
+    for block in blocks:
+        await service.process_error_block(block)
+
+    assert service.analyze_and_fix_error.await_count == 2
+    occurrence = db.get_error_occurrence(fingerprint_error(blocks[0]["error"]))
+    assert occurrence["occurrence_count"] == 2
+    assert occurrence["first_seen"] == "2024-05-02T20:42:00"
+    assert occurrence["last_seen"] == "2024-05-02T20:42:02"
+    report = db.get_error_report(occurrence["report_id"])
+    assert report["error_hash"] == occurrence["error_hash"]
@@ -0,0 +1,113 @@
+"""Unit tests for the incremental log tailer and error block scanner."""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from services.log_monitor import ErrorBlockScanner, LogTailer  # noqa: E402
+
+
+def _line(second, service, level, message):
+    timestamp = f"2024-05-02 20:42:{second:02d},123"
+    return f"{timestamp} - {service} - {level} - {message}"
+
+
+def _append(path, text):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+def test_tailer_returns_only_new_complete_lines(tmp_path):
+    path = tmp_path / "app.log"
+    _append(path, "one\ntwo\nthr")
+    tailer = LogTailer(str(path), chunk_size=4)
+
+    assert tailer.read_new_lines() == ["one", "two"]
+    assert tailer.read_new_lines() == []
+    _append(path, "ee\nfour\n")
+    assert tailer.read_new_lines() == ["three", "four"]
+    assert tailer.offset == os.path.getsize(path)
+    tailer.close()
+
+
+def test_tailer_follows_rotation_and_truncation(tmp_path):
+    path = tmp_path / "app.log"
+    _append(path, "old 1\n")
+    tailer = LogTailer(str(path))
+    assert tailer.read_new_lines() == ["old 1"]
+
+    _append(path, "old 2\n")
+    os.rename(path, tmp_path / "app.log.1")
+    _append(path, "new 1\n")
+    assert tailer.read_new_lines() == ["old 2", "new 1"]
+    assert tailer.rotations == 1
+
+    with open(path, "w") as f:
+        f.write("cut\n")
+    assert tailer.read_new_lines() == ["cut"]
+    assert tailer.truncations == 1
+    tailer.close()
+
+
+def test_scanner_builds_blocks_with_bounded_context():
+    scanner = ErrorBlockScanner(context_lines=2)
+    lines = [
+        _line(1, "runner", "INFO", "starting"),
+        _line(2, "runner", "INFO", "step 1"),
+        _line(3, "runner", "INFO", "step 2"),
+        _line(4, "suno_client", "ERROR", "request failed"),
+        "Traceback (most recent call last):",
+        '  File "client.py", line 10, in call',
+        "ValueError: boom",
+        _line(5, "runner", "INFO", "recovered"),
+    ]
+
+    blocks = scanner.scan(lines)
+
+    assert len(blocks) == 1
+    assert blocks[0]["service"] == "suno_client"
+    assert blocks[0]["timestamp"] == "2024-05-02T20:42:04.123000"
+    assert blocks[0]["log"].splitlines() == [
+        lines[1],
+        lines[2],
+        lines[3],
+        lines[4],
+        lines[5].strip(),
+    ]
+    assert scanner.finish() == []
+
+
+def test_scanner_skips_errors_before_since_and_keeps_open_blocks():
+    scanner = ErrorBlockScanner(
+        context_lines=0, since=datetime(2024, 5, 2, 20, 42, 2)
+    )
+    assert scanner.scan([_line(1, "runner", "ERROR", "old failure")]) == []
+
+    assert scanner.scan([_line(3, "runner", "ERROR", "new failure")]) == []
+    blocks = scanner.finish()
+    assert [block["log"] for block in blocks] == [
+        _line(3, "runner", "ERROR", "new failure")
+    ]
+
+
+def test_traceback_split_across_reads_stays_one_block():
+    scanner = ErrorBlockScanner(context_lines=0)
+    error = _line(1, "runner", "ERROR", "failed")
+    assert scanner.scan([error, "Traceback (most recent call last):"]) == []
+    # Not idle yet: the rest of the traceback may still be written
+    assert scanner.close_idle(30) == []
+
+    frames = ['  File "runner.py", line 3, in run', "    raise ValueError()"]
+    assert scanner.scan(frames) == []
+    blocks = scanner.close_idle(30, now=time.monotonic() + 31)
+    assert [block["log"].splitlines() for block in blocks] == [
+        [error, "Traceback (most recent call last):"]
+        + [frame.strip() for frame in frames]
+    ]
+    assert scanner.close_idle(0) == []
@@ -0,0 +1,75 @@
+"""Unit tests for the async LyricsService."""
+
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+from llm_orchestrator.orchestrator import OrchestratorError  # noqa: E402
+from services import lyrics_service as module  # noqa: E402
+
+
+@pytest.fixture
+def service():
+    lyrics = module.LyricsService()
+    lyrics.orchestrator = AsyncMock()
+    return lyrics
+
+
+@pytest.mark.asyncio
+async def test_generate_lyrics_awaits_orchestrator(service):
+    service.orchestrator.generate_text.return_value = "  la la la \n"
+
+    lyrics = await service.generate_lyrics(
+        "neon nights", "synthwave", "dreamy", {}, tempo=120, duration=180
+    )
+
+    assert lyrics == "la la la"
+    kwargs = service.orchestrator.generate_text.await_args.kwargs
+    assert set(kwargs) == {"prompt", "max_tokens", "temperature"}
+    assert "120 BPM" in kwargs["prompt"]
+
+
+@pytest.mark.asyncio
+async def test_generate_lyrics_uses_artist_model(service):
+    """An artist's configured model gets its own shared orchestrator."""
+    artist_orchestrator = AsyncMock()
+    artist_orchestrator.generate_text.return_value = "verse"
+    with patch.object(
+        module, "get_orchestrator", return_value=artist_orchestrator
+    ) as get_orchestrator:
+        lyrics = await service.generate_lyrics(
+            "x", "drill", "", {"model": "openai:gpt-4o"}
+        )
+
+    assert lyrics == "verse"
+    assert get_orchestrator.call_args.kwargs["primary_model"] == (
+        "openai:gpt-4o"
+    )
+    service.orchestrator.generate_text.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unknown_model_uses_the_default_orchestrator(service):
+    """Placeholder models such as "default-llm" use the default primary."""
+    service.orchestrator.generate_text.return_value = "verse"
+    with patch.object(module, "get_orchestrator") as get_orchestrator:
+        lyrics = await service.generate_lyrics(
+            "x", "drill", "", {"model": "default-llm"}
+        )
+
+    assert lyrics == "verse"
+    get_orchestrator.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_generate_lyrics_returns_none_on_orchestrator_error(service):
+    service.orchestrator.generate_text.side_effect = OrchestratorError("down")
+
+    assert await service.generate_lyrics("x", "lo-fi", "", {}) is None
@@ -0,0 +1,111 @@
+"""Unit tests for the Production Service humanization chain."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+import services.artifact_cache as artifact_cache  # noqa: E402
+import services.production_service as production  # noqa: E402
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    """ProductionService reading local files through an isolated cache."""
+    monkeypatch.setattr(
+        artifact_cache,
+        "_cache",
+        artifact_cache.ArtifactCache(str(tmp_path / "cache")),
+    )
+    monkeypatch.setattr(
+        production,
+        "_download_audio",
+        lambda url, owner: (url, os.path.splitext(url)[1]),
+    )
+    svc = production.ProductionService()
+    svc.seed = 1234
+    return svc
+
+
+def _write_tone(path, seconds=3.0, sr=22050, amplitude=0.25):
+    t = np.arange(int(sr * seconds)) / sr
+    tone = amplitude * np.sin(2 * np.pi * 440.0 * t)
+    sf.write(path, np.stack([tone, 0.5 * tone], axis=1), sr)
+
+
+def test_humanize_audio_processes_in_memory(service, tmp_path):
+    """Test output shape, format, normalization and clipping."""
+    path = str(tmp_path / "tone.wav")
+    _write_tone(path)
+
+    result = service.humanize_audio(path)
+
+    assert result.startswith("file://")
+    out_path = result.replace("file://", "", 1)
+    info = sf.info(out_path)
+    assert (info.channels, info.samplerate) == (2, 22050)
+    assert info.subtype == "PCM_16"
+    out, _ = sf.read(out_path)
+    source, _ = sf.read(path)
+    assert out.shape == source.shape
+    assert np.max(np.abs(out)) == pytest.approx(1.0, abs=0.1)
+    assert not np.allclose(out, source / np.max(np.abs(source)))
+    os.remove(out_path)
+
+
+def test_block_processing_matches_single_pass(service, monkeypatch):
+    """Test that carrying filter/delay/reverb state makes blocks seamless."""
+    rng = np.random.default_rng(0)
+    signal = (rng.standard_normal((20000, 2)) * 0.1).astype(np.float32)
+
+    whole = production._HumanizeChain(service, 22050, 2).process(signal)
+    chain = production._HumanizeChain(service, 22050, 2)
+    blocks = np.concatenate(
+        [
+            chain.process(block)
+            for block in np.array_split(signal, range(1500, 20000, 1500))
+        ]
+    )
+
+    np.testing.assert_allclose(blocks, whole, atol=1e-5)
+
+
+def test_noise_level_matches_configured_db(service):
+    """Test the background noise is float noise at noise_level_db."""
+    service.eq_mix = 0.0
+    service.reverb_wet = 0.0
+    chain = production._HumanizeChain(service, 22050, 1)
+
+    out = chain.process(np.zeros((44100, 1), dtype=np.float32))
+
+    expected_rms = 10 ** (service.noise_level_db / 20) / np.sqrt(3)
+    assert np.sqrt(np.mean(out**2)) == pytest.approx(expected_rms, rel=0.05)
+
+
+def test_humanize_audio_returns_none_on_bad_input(service, tmp_path):
+    """Test undecodable input is reported as a failure."""
+    path = str(tmp_path / "broken.wav")
+    with open(path, "wb") as f:
+        f.write(b"not audio")
+
+    assert service.humanize_audio(path) is None
+
+
+def test_local_input_never_creates_a_cache(monkeypatch, tmp_path):
+    """Test worker-side calls on local paths leave the cache untouched."""
+    monkeypatch.setattr(artifact_cache, "_cache", None)
+    path = str(tmp_path / "tone.wav")
+    _write_tone(path, seconds=0.5)
+
+    result = production.ProductionService().humanize_audio(path)
+
+    assert result.startswith("file://")
+    assert artifact_cache._cache is None
+    os.remove(result.replace("file://", "", 1))
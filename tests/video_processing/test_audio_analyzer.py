@@ -0,0 +1,87 @@
+"""Unit tests for the audio feature engine."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+sys.path.append(PROJECT_ROOT)
+
+import video_processing.audio_analyzer as audio_analyzer  # noqa: E402
+
+
+@pytest.fixture
+def feature_cache(monkeypatch, tmp_path):
+    """Isolates the on-disk and in-memory feature caches."""
+    monkeypatch.setattr(
+        audio_analyzer, "AUDIO_FEATURE_CACHE_DIR", str(tmp_path / "features")
+    )
+    monkeypatch.setattr(audio_analyzer, "_feature_cache", {})
+    return tmp_path
+
+
+def _write_click_track(path, bpm=120.0, seconds=8.0, sr=44100):
+    """Stereo A-major chord (tonic doubled) with a click on every beat."""
+    t = np.arange(int(sr * seconds)) / sr
+    tone = sum(
+        a * np.sin(2 * np.pi * f * t)
+        for f, a in ((110.0, 0.3), (220.0, 0.3), (277.18, 0.15), (329.63, 0.2))
+    )
+    clicks = np.zeros_like(t)
+    for beat in np.arange(0, seconds, 60.0 / bpm):
+        start = int(beat * sr)
+        end = start + 100
+        clicks[start:end] = 0.5
+    mono = tone + clicks
+    sf.write(path, np.stack([mono, mono], axis=1), sr)
+
+
+def test_analyze_audio_extracts_full_feature_set(feature_cache):
+    """Test tempo, energy, onsets, centroid and key from one pass."""
+    path = str(feature_cache / "click.wav")
+    _write_click_track(path)
+
+    features = audio_analyzer.analyze_audio(path)
+
+    assert features["duration"] == pytest.approx(8.0, abs=0.01)
+    assert features["tempo"] == pytest.approx(120.0, rel=0.05)
+    assert 0.0 < features["energy"] <= 1.0
+    assert features["onset_density"] == pytest.approx(2.0, abs=0.5)
+    assert features["spectral_centroid"] > 0
+    assert features["key"].startswith("A")
+    assert len(features["content_hash"]) == 64
+
+
+def test_features_are_cached_by_content_hash(feature_cache, monkeypatch):
+    """Test that re-analysis of identical bytes skips decoding."""
+    first = str(feature_cache / "first.wav")
+    _write_click_track(first, seconds=4.0)
+    features = audio_analyzer.analyze_audio(first)
+
+    copy = str(feature_cache / "copy.wav")
+    with open(first, "rb") as src, open(copy, "wb") as dst:
+        dst.write(src.read())
+    monkeypatch.setattr(audio_analyzer, "_feature_cache", {})
+    monkeypatch.setattr(
+        audio_analyzer,
+        "extract_features",
+        lambda *a, **k: pytest.fail("features recomputed"),
+    )
+
+    assert audio_analyzer.analyze_audio(copy) == features
+
+
+def test_silence_has_zero_energy(feature_cache):
+    """Test the energy floor on a silent track."""
+    path = str(feature_cache / "silence.wav")
+    sf.write(path, np.zeros(22050 * 2), 22050)
+
+    features = audio_analyzer.analyze_audio(path)
+
+    assert features["energy"] == 0.0
+    assert features["key"] == "unknown"
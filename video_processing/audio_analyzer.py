@@ -1,15 +1,49 @@
 # Audio analysis functions using librosa
 
+import hashlib
+import json
 import logging
 import librosa
 import soundfile as sf
 import numpy as np
-import requests
-import tempfile
 import os
+import threading
+import uuid
+
+from services.artifact_cache import get_artifact_cache
 
 logger = logging.getLogger(__name__)
 
+# --- Configuration ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Analysis rate; tracks are downmixed and resampled to this once
+AUDIO_FEATURE_SAMPLE_RATE = int(os.getenv("AUDIO_FEATURE_SAMPLE_RATE", 22050))
+AUDIO_FEATURE_CACHE_DIR = os.getenv(
+    "AUDIO_FEATURE_CACHE_DIR",
+    os.path.join(PROJECT_ROOT, "data", "audio_features"),
+)
+# Bump when the feature set or its computation changes
+FEATURE_VERSION = 1
+DECODE_BLOCK_FRAMES = 65536
+N_FFT = 2048
+HOP_LENGTH = 512
+# RMS level (dBFS) mapped to energy 0.0; 0 dBFS maps to 1.0
+ENERGY_FLOOR_DB = -40.0
+
+PITCH_CLASSES = [
+    "C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"
+]  # fmt: skip
+# Krumhansl-Kessler key profiles
+MAJOR_PROFILE = np.array(
+    [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88]
+)
+MINOR_PROFILE = np.array(
+    [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17]
+)
+
+_feature_cache: dict = {}
+_feature_cache_lock = threading.Lock()
+
 
 class AudioAnalysisError(Exception):
     """Custom exception for audio analysis errors."""
@@ -17,44 +51,182 @@ class AudioAnalysisError(Exception):
     pass
 
 
-def _download_audio(audio_url: str) -> str | None:
-    """Downloads audio from a URL to a temporary file."""
+def _download_audio(audio_url: str, owner: str) -> str | None:
+    """Fetches audio from a URL through the shared artifact cache.
+
+    The returned file is shared with later stages of the run; it is pinned
+    for `owner` and must not be modified or deleted.
+    """
+    return get_artifact_cache().acquire(audio_url, owner)
+
+
+def _file_digest(path: str) -> str:
+    """Returns the sha256 of a file's content."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _decode_mono(path: str, sr: int) -> tuple[np.ndarray, float]:
+    """Decodes a file once into mono float32 at `sr`, block by block.
+
+    Returns:
+        The resampled signal and the track duration in seconds.
+    """
+    with sf.SoundFile(path) as f:
+        native_sr = f.samplerate
+        blocks = [
+            block.mean(axis=1) if block.ndim > 1 else block
+            for block in f.blocks(
+                blocksize=DECODE_BLOCK_FRAMES, dtype="float32", always_2d=True
+            )
+        ]
+    y = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+    duration = len(y) / native_sr
+    if native_sr != sr and len(y):
+        y = librosa.resample(y, orig_sr=native_sr, target_sr=sr)
+    return y, duration
+
+
+def _estimate_key(chroma: np.ndarray) -> tuple[str, float]:
+    """Matches the mean chroma vector against the 24 major/minor profiles."""
+    profile = chroma.mean(axis=1)
+    if not np.any(profile):
+        return "unknown", 0.0
+    best_key, best_score = "unknown", -1.0
+    for mode, template in (("major", MAJOR_PROFILE), ("minor", MINOR_PROFILE)):
+        for shift in range(12):
+            score = np.corrcoef(profile, np.roll(template, shift))[0, 1]
+            if score > best_score:
+                best_key = f"{PITCH_CLASSES[shift]} {mode}"
+                best_score = score
+    return best_key, float(best_score)
+
+
+def extract_features(path: str, sr: int = AUDIO_FEATURE_SAMPLE_RATE) -> dict:
+    """Computes all audio features from a single decode and STFT.
+
+    Returns:
+        Dict with duration, tempo (BPM), rms, energy (0-1), onset_density
+        (onsets per second), spectral_centroid (Hz), key and key_confidence.
+    """
+    y, duration = _decode_mono(path, sr)
+    if not len(y):
+        raise AudioAnalysisError(f"No audio samples decoded from {path}")
+
+    # One magnitude STFT feeds every spectral feature
+    S = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+    power = S**2
+    mel_db = librosa.power_to_db(
+        librosa.feature.melspectrogram(S=power, sr=sr), ref=np.max
+    )
+    onset_env = librosa.onset.onset_strength(
+        S=mel_db, sr=sr, hop_length=HOP_LENGTH
+    )
+
+    tempo, _ = librosa.beat.beat_track(
+        onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH
+    )
+    onsets = librosa.onset.onset_detect(
+        onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH
+    )
+    rms = float(
+        np.mean(
+            librosa.feature.rms(S=S, frame_length=N_FFT, hop_length=HOP_LENGTH)
+        )
+    )
+    rms_db = 20 * np.log10(max(rms, 1e-10))
+    energy = float(
+        np.clip((rms_db - ENERGY_FLOOR_DB) / -ENERGY_FLOOR_DB, 0, 1)
+    )
+    centroid = float(np.mean(librosa.feature.spectral_centroid(S=S, sr=sr)))
+    key, key_confidence = _estimate_key(
+        librosa.feature.chroma_stft(S=power, sr=sr, tuning=0.0)
+    )
+
+    return {
+        "duration": float(duration),
+        "tempo": float(np.atleast_1d(tempo)[0]),
+        "rms": rms,
+        "energy": energy,
+        "onset_density": len(onsets) / duration if duration else 0.0,
+        "spectral_centroid": centroid,
+        "key": key,
+        "key_confidence": key_confidence,
+    }
+
+
+def _load_cached_features(digest: str) -> dict | None:
+    with _feature_cache_lock:
+        features = _feature_cache.get(digest)
+    if features is not None:
+        return features
+    cache_path = os.path.join(AUDIO_FEATURE_CACHE_DIR, f"{digest}.json")
     try:
-        response = requests.get(audio_url, stream=True, timeout=60)
-        response.raise_for_status()
-
-        # Create a temporary file
-        # Note: Ensure the temp file has an appropriate extension if
-        # librosa/soundfile needs it.
-        # Using .wav as a common intermediate format.
-        with tempfile.NamedTemporaryFile(
-            suffix=".wav", delete=False
-        ) as tmp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                tmp_file.write(chunk)
-            logger.info(f"Audio downloaded temporarily to: {tmp_file.name}")
-            return tmp_file.name
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to download audio from {audio_url}: {e}")
+        with open(cache_path, "r") as f:
+            features = json.load(f)
+    except (IOError, json.JSONDecodeError):
         return None
-    except IOError as e:
-        logger.error(
-            f"Failed to write downloaded audio to temporary file: {e}"
-        )
+    if features.get("feature_version") != FEATURE_VERSION:
         return None
+    with _feature_cache_lock:
+        _feature_cache[digest] = features
+    return features
 
 
-def analyze_audio(audio_path_or_url: str) -> dict | None:
-    """Analyzes an audio file (local path or URL) to extract tempo and         duration.
+def _store_cached_features(digest: str, features: dict):
+    with _feature_cache_lock:
+        _feature_cache[digest] = features
+    try:
+        os.makedirs(AUDIO_FEATURE_CACHE_DIR, exist_ok=True)
+        cache_path = os.path.join(AUDIO_FEATURE_CACHE_DIR, f"{digest}.json")
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(features, f)
+        os.replace(tmp_path, cache_path)
+    except (IOError, OSError) as e:
+        logger.warning(f"Failed to persist audio features for {digest}: {e}")
+
+
+def get_audio_features(path: str, digest: str | None = None) -> dict:
+    """Returns the features of a local audio file, cached by content hash.
+
+    Pass `digest` when the content hash is already known (e.g. the file came
+    from the artifact cache) to skip hashing the file.
+    """
+    digest = digest or _file_digest(path)
+    features = _load_cached_features(digest)
+    if features is not None:
+        logger.info(f"Using cached audio features for {path}")
+        return features
+    features = extract_features(path)
+    features["content_hash"] = digest
+    features["feature_version"] = FEATURE_VERSION
+    _store_cached_features(digest, features)
+    return features
+
+
+def analyze_audio(
+    audio_path_or_url: str, digest: str | None = None
+) -> dict | None:
+    """Analyzes an audio file (local path or URL) to extract its features.
+
+    URLs are fetched through the artifact cache, which belongs to the
+    parent process; worker processes must be given a local path.
 
     Args:
         audio_path_or_url: Local path or URL to the audio file.
+        digest: sha256 of a local file's content, if already known.
 
     Returns:
-        A dictionary containing {"tempo": float, "duration":             float} or None if analysis fails.
+        The feature dict from `extract_features` (tempo, duration, energy,
+        onset_density, spectral_centroid, key, ...) or None if the audio
+        could not be fetched. Results are cached by content hash.
     """
     local_path = None
-    downloaded = False
+    cache_owner = None
 
     if audio_path_or_url.startswith("http://") or audio_path_or_url.startswith(
         "https://"
@@ -62,10 +234,10 @@ def analyze_audio(audio_path_or_url: str) -> dict | None:
         logger.info(
             f"Downloading audio for analysis from: {audio_path_or_url}"
         )
-        local_path = _download_audio(audio_path_or_url)
+        cache_owner = f"analyze_audio:{uuid.uuid4()}"
+        local_path = _download_audio(audio_path_or_url, cache_owner)
         if not local_path:
             return None
-        downloaded = True
     elif audio_path_or_url.startswith("file://"):
         local_path = audio_path_or_url[7:]  # Remove "file://"
         if not os.path.exists(local_path):
@@ -81,23 +253,13 @@ def analyze_audio(audio_path_or_url: str) -> dict | None:
 
     try:
         logger.info(f"Analyzing audio file: {local_path}")
-        # Load audio file using soundfile (more robust for different formats)
-        # and convert to mono if needed
-        y, sr = sf.read(local_path)
-        if y.ndim > 1:
-            y = np.mean(y, axis=1)  # Convert to mono by averaging channels
-
-        # Get duration
-        duration = len(y) / sr
-
-        # Estimate tempo
-        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-        tempo = float(tempo)  # Ensure tempo is float
-
+        features = get_audio_features(local_path, digest)
         logger.info(
-            f"Analysis complete: Duration={duration:.2f}s, Tempo={tempo:                .2f} BPM"
+            f"Analysis complete: Duration={features['duration']:.2f}s, "
+            f"Tempo={features['tempo']:.2f} BPM, "
+            f"Energy={features['energy']:.2f}, Key={features['key']}"
         )
-        return {"tempo": tempo, "duration": duration}
+        return features
 
     except Exception as e:
         logger.error(
@@ -105,15 +267,9 @@ def analyze_audio(audio_path_or_url: str) -> dict | None:
         )
         raise AudioAnalysisError(f"Failed to analyze audio: {e}") from e
     finally:
-        # Clean up temporary file if downloaded
-        if downloaded and local_path and os.path.exists(local_path):
-            try:
-                os.remove(local_path)
-                logger.info(f"Cleaned up temporary audio file: {local_path}")
-            except OSError as e:
-                logger.warning(
-                    f"Failed to clean up temporary audio file {local_path}:                         {e}"
-                )
+        # Unpin the cached download; later stages of the run reuse it
+        if cache_owner:
+            get_artifact_cache().release(audio_path_or_url, cache_owner)
 
 
 # Example Usage